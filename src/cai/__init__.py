@@ -1,7 +1,7 @@
 """cai - a small LLM agent, built from scratch layer by layer.
 
 Layer 0: cai.api    - the OpenAI-compatible HTTP client (the LLM call).
-Layer 1: cai.llm    - the core agentic loop (call_llm).
+Layer 1: cai.llm    - the core agentic loop (call_llm / async_call_llm).
          cai.events - the Event value the loop yields, and EventType.
          cai.hooks  - the hook registry the loop fires.
 Layer 2: cai.agent  - Agent (persistent conversation) + Run (one-shot execution).
@@ -26,7 +26,7 @@ from cai.paths import safe_path, scratch_dir
 from cai.events import Event, EventType
 from cai.hooks import HookContext, HookEvent, HooksRegistry, ToolCall, hook
 from cai.commands import Command, CommandContext, command
-from cai.llm import LLMError, MaxStepsReached, call_llm
+from cai.llm import LLMError, MaxStepsReached, async_call_llm, call_llm
 
 # Agent/Run/Environment stay lazy at runtime (see __getattr__ below) so
 # `import cai` doesn't pull agent + its config/api. this block is type-checker
@@ -62,6 +62,7 @@ __all__ = [
     "LLMError",
     "MaxStepsReached",
     "call_llm",
+    "async_call_llm",
     "Agent",
     "Run",
     "RunInFlight",
@@ -5,7 +5,8 @@ and skill registries, the hooks and ui, and the call_llm orchestration itself.
 `run(prompt)` folds the prompt in as a user turn and hands back a handle over the
 agent's live `messages` - iterating it streams the answer and evolves the
 conversation in place, so the next `run` continues where this one left off. Once
-the handle drains, `text` holds the final answer.
+the handle drains, `text` holds the final answer. `arun(prompt)` is the same turn
+over asyncio (`async for` the handle), for driving many agents from one loop.
 
 Run is syntactic sugar for a one-shot execution: it builds a throwaway Agent from
 the params you pass and streams a single turn over the messages you give it. It
@@ -34,10 +35,10 @@ import tempfile
 import threading
 
 from cai import config
-from cai.api import OpenAiApi
+from cai.api import AsyncOpenAiApi, OpenAiApi, WireCache, batch_options, pool_options
 from cai.environment import Environment
 from cai.events import Event, EventType
-from cai.llm import call_llm, SteerQueue
+from cai.llm import async_call_llm, call_llm, SteerQueue
 from cai.strict import enforce_strict_format
 from cai.tools import ToolsRegistry
 from cai.skills import SkillsRegistry
@@ -178,11 +179,49 @@ class RunHandle:
         return False
 
 
+class AsyncRunHandle:
+    """the handle Agent.arun() returns: RunHandle over asyncio. `async for` it
+    for Event objects; once it drains, `text` holds the final answer. like the
+    sync handle it is lazy and single-consumption, and it holds the agent's run
+    lock while it streams. cancelling the task consuming it sets the agent's
+    interrupt, so the run winds down exactly as a stop() would."""
+
+    def __init__(self, agent, stream, prompt=None):
+        self.agent = agent
+        self.messages = agent.messages
+        self.interrupt = agent.interrupt
+        self.stream = stream
+        self.prompt = prompt
+        self.text = ""
+        self._consumed = False
+
+    def __aiter__(self):
+        if self._consumed:
+            raise RuntimeError("Run already consumed")
+        self._consumed = True
+        return self.agent._astream(self.stream, self.prompt, self._finished)
+
+    def _finished(self, text):
+        self.text = text
+
+    async def wait(self):
+        """drain the run without consuming the events yourself; returns self,
+        so `(await handle.wait()).text` reads the final answer."""
+        async for _event in self:
+            pass
+        return self
+
+
 class Agent:
     # class-level defaults so scratch()/close() work on any Agent, however
     # constructed (tests build bare agents via __new__).
     _scratch = None
     _scratch_owned = False
+    async_api = None
+    tool_workers = None
+    speculate_tools = False
+    context = None
+    _wire_cache = None
 
     def __init__(self,
                  *,
@@ -200,8 +239,15 @@ class Agent:
                  temperature=None,
                  max_steps=None,
                  tool_result_max_chars=None,
+                 tool_workers=None,
+                 speculate_tools=False,
+                 result_cache=None,
+                 cache_tools=None,
+                 context=None,
+                 warm_servers=False,
                  stream=True,
-                 scratch=None):
+                 scratch=None,
+                 async_api=None):
         # only read config/key for a default the caller didn't supply - a child
         # agent given both a model and an api never touches the disk.
         cfg = None
@@ -212,11 +258,24 @@ class Agent:
         if api is None:
             api = OpenAiApi(cfg.base_url,
                             config.load_api_key(),
-                            ssl_verify=config.load_optional("ssl_verify", True))
+                            ssl_verify=config.load_optional("ssl_verify", True),
+                            prompt_cache=config.load_optional("prompt_cache", False),
+                            **batch_options(config.load_optional("stream_batch_ms"),
+                                            config.load_optional("stream_batch_max")),
+                            **pool_options(config.load_optional("api_pool_size"),
+                                           config.load_optional("api_keep_alive"),
+                                           config.load_optional("api_idle_timeout"),
+                                           config.load_optional("api_retries")))
 
         self.name = name
         self.model = model
         self.api = api
+        # the asyncio client arun() drives; None builds one from `api` on first
+        # use (see _async_api).
+        self.async_api = async_api
+        # the encoded wire form of self.messages, carried across turns and runs
+        # so each request only serializes what is new (see cai.api.WireCache).
+        self._wire_cache = WireCache()
         # the install catalogue this agent resolves tools/skills/hooks against:
         # the caller's env, else the process default (empty until a frontend
         # loads it). a sub-agent / clone inherits its parent's explicitly.
@@ -232,6 +291,18 @@ class Agent:
         # an explicit param, not an ambient read - the CLI sources it from
         # cai.settings, an SDK caller passes its own (or leaves it off).
         self.tool_result_max_chars = tool_result_max_chars
+        # how many of one turn's parallel-safe tool calls may run at once (see
+        # ToolsRegistry.parallel_safe); None or 1 runs every call in turn.
+        # explicit like the cap above - the CLI sources it from cai.settings.
+        self.tool_workers = tool_workers
+        # start read-only tool calls (ToolsRegistry.read_only) while the
+        # model is still streaming the rest of its turn.
+        self.speculate_tools = speculate_tools
+        # the cai.context.ContextManager fitting each request into the model's
+        # window; a summarizing strategy without an api of its own uses ours.
+        self.context = context
+        if context is not None and context.api is None:
+            context.api = api
         self.stream = stream
         if interrupt is None: interrupt = threading.Event()
         self.interrupt = interrupt
@@ -254,7 +325,16 @@ class Agent:
         # a saved session does not keep it.
         self._scratch = scratch
         self._scratch_owned = False
-        self.tools_registry = ToolsRegistry(self.env, scratch=self.scratch)
+        # result_cache (a cai.result_cache.ResultCache) answers repeated calls to
+        # the cache_tools names; a sub-agent or clone shares its parent's, so
+        # what one agent read the other needn't read again. warm_servers
+        # connects each referenced MCP server in the background as its tools
+        # are registered, instead of on first use (see ToolsRegistry.warm).
+        self.tools_registry = ToolsRegistry(self.env,
+                                            scratch=self.scratch,
+                                            result_cache=result_cache,
+                                            warm_servers=warm_servers)
+        for name in (cache_tools or []): self.tools_registry.cache_tool(name)
 
         # registers the env's agent-bound tools (the sub-agent tools by default).
         # override=True so these bind to *this* agent even if a tool of the same
@@ -466,8 +546,15 @@ class Agent:
                       temperature=overrides.get("temperature", self.temperature),
                       max_steps=overrides.get("max_steps", self.max_steps),
                       tool_result_max_chars=self.tool_result_max_chars,
+                      tool_workers=self.tool_workers,
+                      speculate_tools=self.speculate_tools,
+                      result_cache=self.tools_registry.result_cache,
+                      cache_tools=self.tools_registry.cached_tools(),
+                      context=self._forked_context(),
+                      warm_servers=self.tools_registry.warm_servers,
                       stream=self.stream,
-                      scratch=self._scratch)
+                      scratch=self._scratch,
+                      async_api=self.async_api)
         if "messages" in overrides:
             clone.messages = list(overrides["messages"] or [])
         else:
@@ -652,7 +739,12 @@ class Agent:
                                     temperature=0,
                                     max_steps=self.max_steps,
                                     stream=False,
-                                    hooks_data={"agent": self})
+                                    hooks_data={"agent": self},
+                                    wire_cache=self._wire_cache,
+                                    tool_workers=self.tool_workers,
+                                    parallel_safe=self.tools_registry.parallel_safe,
+                                    speculate=self._speculate(),
+                                    context=self.context)
                 text = yield from enforce_strict_format(make_stream,
                                                         strict_format,
                                                         system_prompt,
@@ -673,11 +765,83 @@ class Agent:
                                        temperature=self.temperature,
                                        max_steps=self.max_steps,
                                        stream=stream,
-                                       hooks_data={"agent": self})
+                                       hooks_data={"agent": self},
+                                       wire_cache=self._wire_cache,
+                                       tool_workers=self.tool_workers,
+                                       parallel_safe=self.tools_registry.parallel_safe,
+                                       speculate=self._speculate(),
+                                       context=self.context)
             return text
         finally:
             self._run_lock.release()
 
+    def _forked_context(self):
+        """a fresh ContextManager like this agent's, for a conversation that
+        branches off it (a clone, a sub-agent), or None."""
+        if self.context is None:
+            return None
+        return self.context.fork()
+
+    def _speculate(self):
+        """call_llm's speculate=: the registry's read-only check when
+        speculate_tools is on, else None."""
+        if not self.speculate_tools:
+            return None
+        return self.tools_registry.read_only
+
+    def _async_api(self):
+        """the asyncio client for arun(): the one given as async_api=, else one
+        built (once) for the same endpoint as the blocking api."""
+        if self.async_api is None:
+            if not isinstance(self.api, OpenAiApi):
+                raise TypeError(f"agent {self.name!r}: arun() needs an async_api for {type(self.api).__name__}")
+            self.async_api = AsyncOpenAiApi.from_api(self.api)
+        return self.async_api
+
+    async def _astream(self, stream, prompt, finished):
+        """_stream over asyncio, for arun(): the same run lock, prompt fold-in,
+        prompt/hook composition and tool dispatch, driven by async_call_llm.
+        an async generator can't return the answer, so it goes to
+        finished(text) once the run completes."""
+        if not self._run_lock.acquire(blocking=False):
+            raise RunInFlight(f"agent {self.name!r}: a run is already consuming the conversation")
+        try:
+            if prompt is not None:
+                self.messages.append({"role": "user", "content": prompt})
+                yield Event(type=EventType.USER, text=prompt)
+            system_prompt = _combine_prompts(self._system_prompt, self.skills_registry.system_prompt)
+            dispatch = _selected_dispatch(self.tools_registry)
+            if self.tool_result_max_chars:
+                dispatch = _trim_dispatch(dispatch, self.tool_result_max_chars)
+            llm_stream = async_call_llm(self.messages,
+                                        self.model,
+                                        self._async_api(),
+                                        system_prompt=system_prompt,
+                                        tools=self.tools_registry.tools,
+                                        tools_dispatch=dispatch,
+                                        hooks=self._hooks_registry(),
+                                        ui=self._ui,
+                                        interrupt=self.interrupt,
+                                        steer=self._steer.drain,
+                                        reasoning_effort=self.reasoning_effort,
+                                        temperature=self.temperature,
+                                        max_steps=self.max_steps,
+                                        stream=stream,
+                                        hooks_data={"agent": self},
+                                        wire_cache=self._wire_cache,
+                                        tool_workers=self.tool_workers,
+                                        parallel_safe=self.tools_registry.parallel_safe,
+                                        speculate=self._speculate(),
+                                        context=self.context)
+            try:
+                async for event in llm_stream:
+                    yield event
+            finally:
+                await llm_stream.aclose()
+            finished(llm_stream.text)
+        finally:
+            self._run_lock.release()
+
     def run(self, prompt=None, *, strict_format=None):
         """return a handle over the agent's live conversation; iterating it
         appends `prompt` as a user turn (if given) and streams events. the
@@ -695,6 +859,18 @@ class Agent:
             self.interrupt.set()
         return RunHandle(self, self.stream, prompt, strict_format=strict_format)
 
+    def arun(self, prompt=None):
+        """run() for asyncio: the same turn on the same live conversation, as
+        an AsyncRunHandle - `async for` it for the Events, then read `text`.
+        the model call awaits an AsyncOpenAiApi and tools run in worker
+        threads, so one event loop can drive hundreds of agents' runs at once
+        with no thread parked per request. strict_format is not offered here:
+        its retry loop is blocking-only."""
+        self.interrupt.clear()
+        if self._killed.is_set():
+            self.interrupt.set()
+        return AsyncRunHandle(self, self.stream, prompt)
+
     def gate(self, options, prompt, *, system_prompt=None):
         """single-turn quality gate: ask `prompt` and get back exactly one of
         `options`. runs in isolation - a throwaway conversation on this agent's
@@ -777,6 +953,12 @@ class Run(RunHandle):
                  temperature=None,
                  max_steps=None,
                  tool_result_max_chars=None,
+                 tool_workers=None,
+                 speculate_tools=False,
+                 result_cache=None,
+                 cache_tools=None,
+                 context=None,
+                 warm_servers=False,
                  stream=True,
                  strict_format=None):
         agent = Agent(model=model,
@@ -792,6 +974,12 @@ class Run(RunHandle):
                       temperature=temperature,
                       max_steps=max_steps,
                       tool_result_max_chars=tool_result_max_chars,
+                      tool_workers=tool_workers,
+                      speculate_tools=speculate_tools,
+                      result_cache=result_cache,
+                      cache_tools=cache_tools,
+                      context=context,
+                      warm_servers=warm_servers,
                       stream=stream)
         agent.set_messages(messages)
         # no prompt to fold in: `messages` is already the complete conversation,
@@ -2,11 +2,16 @@ import json
 import time
 import queue
 import socket
+import asyncio
 import logging
 import warnings
 import threading
+import weakref
+import httpx
 import requests
-from urllib3.exceptions import InsecureRequestWarning
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import HTTPError, InsecureRequestWarning
 
 log = logging.getLogger("cai")
 
@@ -18,6 +23,18 @@ _RETRY_BACKOFF = 0.5
 # pump thread is blocked on the network.
 _POLL_TICK = 0.2
 
+# the pooled session's defaults: connections kept per host, and how long the
+# pool may sit unused before its idle sockets are dropped (a provider's load
+# balancer closes a quiet keep-alive connection long before we would notice).
+_POOL_SIZE = 10
+_IDLE_TIMEOUT = 60.0
+
+# a batching stream's default cap on deltas per hand-over (see _Batch).
+_BATCH_MAX = 64
+
+# how much an async read asks the socket for at a time.
+_READ_SIZE = 65536
+
 
 class ApiError(Exception):
     """a chat request failed for good: a transport error, a bad HTTP status, or
@@ -33,6 +50,34 @@ class ApiError(Exception):
         self.status = status
 
 
+def batch_options(batch_ms, batch_max=None):
+    """the OpenAiApi batching kwargs for the stream_batch_ms /
+    stream_batch_max config keys (see cai.config): an unset or zero window
+    leaves batching off."""
+    options = {}
+    if batch_ms:
+        options['batch_window'] = float(batch_ms) / 1000
+    if batch_max:
+        options['batch_max'] = int(batch_max)
+    return options
+
+
+def pool_options(pool_size=None, keep_alive=None, idle_timeout=None, retries=None):
+    """the OpenAiApi connection kwargs for the api_pool_size, api_keep_alive,
+    api_idle_timeout and api_retries config keys (see cai.config): an unset
+    key keeps the default, and an api_idle_timeout of 0 never evicts."""
+    options = {}
+    if pool_size is not None:
+        options['pool_size'] = int(pool_size)
+    if keep_alive is not None:
+        options['keep_alive'] = bool(keep_alive)
+    if idle_timeout is not None:
+        options['idle_timeout'] = float(idle_timeout) or None
+    if retries is not None:
+        options['retries'] = max(1, int(retries))
+    return options
+
+
 def _retryable(status):
     """whether a failed request is worth retrying: any network-level failure
     (no status), rate limiting (429), or a server-side error (5xx). other 4xx
@@ -44,6 +89,12 @@ def _retryable(status):
     return status >= 500
 
 
+def _retry_delay(attempt):
+    """the backoff before retrying after failed attempt number `attempt`
+    (1-based): _RETRY_BACKOFF, doubling per further attempt."""
+    return _RETRY_BACKOFF * (2 ** (attempt - 1))
+
+
 def _price_per_mtok(value):
     """convert a per-token USD price (string or number) to USD per million
     tokens, or None when absent/unparseable. '0' is a real price (free)."""
@@ -83,6 +134,546 @@ def _wire_messages(messages):
     return cleaned
 
 
+# the breakpoint marker Anthropic-style prompt caching reads (OpenRouter passes
+# it through): everything up to and including the marked block is cached.
+_CACHE_CONTROL = {"type": "ephemeral"}
+
+
+def _with_cached_tokens(usage):
+    """usage with a provider-neutral `cached_tokens`: the prompt tokens served
+    from the provider's prompt cache, read from whichever shape it reports -
+    OpenAI's prompt_tokens_details.cached_tokens, Anthropic's
+    cache_read_input_tokens, DeepSeek's prompt_cache_hit_tokens. usage without
+    any of them is returned as-is."""
+    if not usage: return usage
+    details = usage.get('prompt_tokens_details') or {}
+    cached = details.get('cached_tokens')
+    if cached is None:
+        cached = usage.get('cache_read_input_tokens')
+    if cached is None:
+        cached = usage.get('prompt_cache_hit_tokens')
+    if cached is None: return usage
+    usage = dict(usage)
+    usage['cached_tokens'] = cached
+    return usage
+
+
+def _with_breakpoint(item):
+    """a copy of a message (or tool schema) carrying a cache breakpoint. a
+    message's text moves into a content part, where the marker lives; one
+    with no text to hang it on is returned unchanged."""
+    if not isinstance(item, dict): return item
+    if 'content' not in item:
+        # a tool schema: the marker sits on the entry itself.
+        marked = dict(item)
+        marked['cache_control'] = _CACHE_CONTROL
+        return marked
+    content = item['content']
+    if isinstance(content, str) and content:
+        part = {}
+        part['type'] = "text"
+        part['text'] = content
+        part['cache_control'] = _CACHE_CONTROL
+        parts = [part]
+    elif isinstance(content, list) and content and isinstance(content[-1], dict):
+        parts = list(content)
+        last = dict(parts[-1])
+        last['cache_control'] = _CACHE_CONTROL
+        parts[-1] = last
+    else:
+        return item
+    marked = dict(item)
+    marked['content'] = parts
+    return marked
+
+
+def _cache_marks(messages):
+    """the indices of `messages` that carry a prompt-cache breakpoint (see
+    _mark_prompt_cache)."""
+    marks = set()
+    if not messages: return marks
+    first = messages[0]
+    if isinstance(first, dict) and first.get('role') == 'system':
+        marks.add(0)
+    for i in range(len(messages) - 1, 0, -1):
+        message = messages[i]
+        if isinstance(message, dict) and message.get('role') == 'assistant':
+            marks.add(i - 1)
+            break
+    marks.add(len(messages) - 1)
+    return marks
+
+
+def _mark_tools(data):
+    tools = data.get('tools')
+    if not tools: return
+    tools = list(tools)
+    tools[-1] = _with_breakpoint(tools[-1])
+    data['tools'] = tools
+
+
+def _mark_prompt_cache(data):
+    """place prompt-cache breakpoints on the stable prefix of a request body,
+    in place (on copies of the marked entries - the caller's messages and
+    tool schemas are never touched). four at most, the Anthropic limit:
+
+      - the last tool schema (the tool list is the very front of the prompt),
+      - the system prompt,
+      - the message just before the latest assistant turn - where the
+        previous request of this tool loop ended, so this one reads it back,
+      - the last message, so the next request reads this one back.
+
+    providers with automatic caching (OpenAI) ignore the markers and simply
+    benefit from the prefix staying byte-identical."""
+    _mark_tools(data)
+    messages = list(data['messages'])
+    for i in _cache_marks(messages):
+        messages[i] = _with_breakpoint(messages[i])
+    data['messages'] = messages
+
+
+def _encode(value):
+    # the encoding requests applies to json=: NaN/Infinity are not JSON.
+    return json.dumps(value, allow_nan=False).encode()
+
+
+def _fingerprint(message):
+    """what a cached fragment was encoded from: each key with its value
+    object (held, so an id can't be recycled under us) and, for a list or
+    dict value, its length."""
+    fingerprint = []
+    for key, value in message.items():
+        size = None
+        if isinstance(value, (list, dict)):
+            size = len(value)
+        fingerprint.append((key, value, size))
+    return fingerprint
+
+
+def _same_fingerprint(a, b):
+    if len(a) != len(b): return False
+    for (key_a, value_a, size_a), (key_b, value_b, size_b) in zip(a, b):
+        if key_a != key_b: return False
+        if value_a is not value_b: return False
+        if size_a != size_b: return False
+    return True
+
+
+class WireCache:
+    """pre-encoded wire fragments for one conversation's messages, so a turn
+    only pays json.dumps (and the `_`-key scan) for what is new - on a
+    multi-megabyte transcript that is the difference between tens of ms of
+    CPU per turn and next to none.
+
+    an entry is keyed on the message's identity (and whether it carries a
+    prompt-cache breakpoint) and versioned by a fingerprint of its values:
+    replacing a value (message['content'] = ...), adding or dropping a key,
+    or growing/shrinking a list or dict value re-encodes the message. an edit
+    deep inside a value that keeps its identity and length (content[0]['text']
+    = ...) is not seen - call clear() after one. each encode keeps only the
+    entries it used, so the cache is the size of the current conversation.
+
+    thread-safe; hits/misses count fragments reused/encoded."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+
+    def encode_messages(self, messages, marks=()):
+        """the JSON array of `messages`, wire-cleaned, as bytes - reusing the
+        fragment of every message unchanged since the last encode. `marks` are
+        the indices that carry a prompt-cache breakpoint."""
+        parts = []
+        with self._lock:
+            entries = {}
+            for i, message in enumerate(messages):
+                marked = i in marks
+                if not isinstance(message, dict):
+                    if marked:
+                        message = _with_breakpoint(message)
+                    parts.append(_encode(message))
+                    continue
+                key = (id(message), marked)
+                fingerprint = _fingerprint(message)
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] is message and _same_fingerprint(entry[1], fingerprint):
+                    self.hits += 1
+                else:
+                    self.misses += 1
+                    wire_message = _wire_messages([message])[0]
+                    if marked:
+                        wire_message = _with_breakpoint(wire_message)
+                    entry = (message, fingerprint, _encode(wire_message))
+                entries[key] = entry
+                parts.append(entry[2])
+            self._entries = entries
+        return b"[" + b", ".join(parts) + b"]"
+
+
+def _dump_body(data):
+    """the request body as bytes. a data['messages'] that is already the
+    encoded JSON array (from a WireCache) is spliced in as-is; only the rest of
+    the body - model, tools, flags - is encoded here."""
+    messages = data['messages']
+    if not isinstance(messages, bytes):
+        return _encode(data)
+    rest = dict(data)
+    del rest['messages']
+    head = _encode(rest)
+    if head == b"{}":
+        return b'{"messages": ' + messages + b"}"
+    return b'{"messages": ' + messages + b", " + head[1:]
+
+
+def _completion_tuple(url, result):
+    """the (content, reasoning, tool_calls, usage) tuple of one parsed,
+    non-streamed completion body. a body that can't be one raises ApiError - a
+    failed call must never read as the model answering with an empty string."""
+    choices = result.get("choices", [])
+    if len(choices) != 1:
+        raise ApiError(f"request {url} returned {len(choices)} choices, expected 1")
+
+    message = choices[0].get('message', None)
+    if not message:
+        raise ApiError(f"request {url} returned a choice with no message")
+
+    content = message.get('content', "")
+    reasoning = message.get('reasoning') or message.get('reasoning_content') or ""
+    tool_calls = message.get('tool_calls', None)
+    usage = _with_cached_tokens(result.get('usage', {}))
+
+    return content, reasoning, tool_calls, usage
+
+
+# json.loads minus its per-call argument handling: the decoder calls it once
+# per streamed chunk.
+_json_decode = json.JSONDecoder().decode
+
+
+class _SSEDecoder:
+    """incremental decoding of one streaming response, transport-free so the
+    blocking and the asyncio paths share it. feed() takes each network read as
+    it arrives and returns the deltas it completed; final() is the closing
+    tuple with the assembled tool calls + full usage.
+
+    the bytes accumulate in one reusable bytearray: lines are found in place
+    (find/startswith with offsets, no per-line slices), a `data: ` payload is
+    decoded straight out of a memoryview into the str json.loads wants, and the
+    consumed prefix is dropped once per read. consecutive deltas of the same
+    kind completed by one read - a run of content, or of reasoning - are
+    coalesced into one, so a read carrying ten tokens costs the consumer one
+    tuple, not ten; a read never waits for the next one, so nothing is held
+    back.
+
+    on_tool_call, when given, is called with a copy of each tool call as soon
+    as its arguments are complete - when the next call's index starts, or at
+    the finish for the last ones - long before the turn's final tuple."""
+
+    def __init__(self, url, on_tool_call=None):
+        self.url = url
+        self.on_tool_call = on_tool_call
+        self.done = False   # the `data: [DONE]` marker was seen
+        self.finished_tool_calls = None
+        self.tool_calls = {}
+        self.usage = {}
+        self._buf = bytearray()
+        self._announced = set()   # tool-call indices handed to on_tool_call
+
+    def feed(self, data):
+        """append one read and return the deltas it completed. once done, the
+        rest of the body is ignored."""
+        if self.done: return []
+        buf = self._buf
+        buf += data
+        deltas = []
+        start = 0
+        find = buf.find
+        with memoryview(buf) as view:
+            while True:
+                end = find(b"\n", start)
+                if end < 0: break
+                # blank separators (every other line in SSE) cost one compare.
+                if end > start + 1:
+                    self._line(buf, view, start, end, deltas)
+                    if self.done:
+                        start = end + 1
+                        break
+                start = end + 1
+        del buf[:start]
+        return deltas
+
+    def flush(self):
+        """end of body: decode a last line the server sent without its line
+        ending."""
+        if self.done or not self._buf: return []
+        deltas = []
+        with memoryview(self._buf) as view:
+            self._line(self._buf, view, 0, len(self._buf), deltas)
+        self._buf.clear()
+        return deltas
+
+    def final(self):
+        return None, None, self.finished_tool_calls, self.usage
+
+    def _line(self, buf, view, start, end, deltas):
+        if buf[end - 1] == 0x0d:   # a CRLF line ending
+            end -= 1
+        if not buf.startswith(b"data: ", start, end): return
+        start += 6   # len(b"data: ")
+        if end - start == 6 and buf.startswith(b"[DONE]", start):
+            self.done = True
+            return
+        try:
+            chunk = _json_decode(str(view[start:end], "utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            log.error(f"[!] request {self.url} stream returned invalid JSON: {e}")
+            return
+        delta = self._chunk(chunk)
+        if delta is None: return
+        _coalesce(deltas, delta)
+
+    def _chunk(self, chunk):
+        """fold one parsed chunk in; returns its delta tuple, or None when it
+        carries nothing to yield."""
+        # the final usage chunk has empty choices.
+        if chunk.get('usage'):
+            self.usage = _with_cached_tokens(chunk['usage'])
+
+        if len(chunk.get("choices") or []) != 1: return None
+
+        choice = chunk["choices"][0]
+        finish_reason = choice.get('finish_reason', None)
+        delta = choice["delta"]
+
+        # process tool-call fragments before snapshotting finish_reason,
+        # so the snapshot captures data from the final chunk too.
+        tool_calls = self.tool_calls
+        if "tool_calls" in delta:
+            for tool_call in delta['tool_calls']:
+                idx = tool_call['index']
+                if idx not in tool_calls:
+                    # a new call starts: every one before it is complete.
+                    if self.on_tool_call is not None:
+                        self._announce(tool_calls)
+                    function = {}
+                    function['name'] = tool_call.get('function', {}).get('name')
+                    function['arguments'] = ""
+
+                    tool_calls[idx] = {}
+                    tool_calls[idx]['index'] = tool_call.get('index')
+                    tool_calls[idx]['id'] = tool_call.get('id')
+                    tool_calls[idx]['type'] = "function"
+                    tool_calls[idx]['function'] = function
+                args = tool_call.get('function', {}).get('arguments')
+                if args:
+                    tool_calls[idx]['function']['arguments'] += args
+
+        # only snapshot when tool_calls is non-empty - some providers
+        # fire finish_reason="tool_calls" twice, and the second time
+        # tool_calls is already reset to {}.
+        if finish_reason in ("tool_calls", "tool_use") and tool_calls:
+            if self.on_tool_call is not None:
+                self._announce(tool_calls)
+            self.finished_tool_calls = list(tool_calls.values())
+            self.tool_calls = {}
+
+        content = delta.get('content', None)
+        reasoning = delta.get('reasoning') or delta.get('reasoning_content')
+
+        if content or reasoning or self.tool_calls:
+            return content, reasoning, self.finished_tool_calls, {}
+        return None
+
+    def _announce(self, tool_calls):
+        for idx, call in tool_calls.items():
+            if idx in self._announced: continue
+            self._announced.add(idx)
+            snapshot = dict(call)
+            snapshot['function'] = dict(call['function'])
+            try:
+                self.on_tool_call(snapshot)
+            except Exception:
+                log.exception("on_tool_call failed for %r", snapshot['function'].get('name'))
+
+
+def _coalesce(deltas, delta):
+    """append `delta` to `deltas`, merging it into the previous one when both
+    are of the same kind - content only, or reasoning only - and the tool-call
+    snapshot is unchanged. a delta carrying both texts, or a mixed run, stays
+    separate: the consumer emits content before reasoning within one tuple, so
+    merging across kinds would reorder them. a no-op delta (no text, no usage:
+    a tool-call fragment's progress tick) adds nothing to a previous delta with
+    the same snapshot, so it is dropped - or replaced by the delta after it."""
+    content, reasoning, finished, usage = delta
+    if deltas:
+        last_content, last_reasoning, last_finished, last_usage = deltas[-1]
+        if last_finished is finished and not last_usage and not usage:
+            if not content and not reasoning:
+                return
+            if not last_content and not last_reasoning:
+                deltas[-1] = delta
+                return
+            if content and not reasoning and last_content and not last_reasoning:
+                deltas[-1] = (last_content + content, None, finished, {})
+                return
+            if reasoning and not content and last_reasoning and not last_content:
+                deltas[-1] = (None, last_reasoning + reasoning, finished, {})
+                return
+    deltas.append(delta)
+
+
+def _body_reads(r):
+    """a streamed requests.Response's body one network read at a time - each
+    read returns whatever has arrived (read1), so SSE events reach the decoder
+    without waiting for a fixed block to fill, whatever the framing. the
+    body is decoded (gzip/deflate) as iter_content would. a response without
+    a raw stream falls back to iter_content."""
+    read1 = getattr(r.raw, "read1", None)
+    if read1 is None:
+        yield from r.iter_content(chunk_size=None)
+        return
+    while True:
+        data = read1(_READ_SIZE, decode_content=True)
+        if not data: return
+        yield data
+
+
+class PoolStats:
+    """connection counters for one PooledSession: how many requests went out,
+    how many of them had to open a fresh TCP(+TLS) connection, and how often the
+    idle pool was evicted. the difference between the first two is the reuse
+    the pool bought. thread-safe - every thread sharing the session bumps the
+    same counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._connections = 0
+        self._evictions = 0
+
+    def sent(self):
+        with self._lock:
+            self._requests += 1
+
+    def opened(self):
+        with self._lock:
+            self._connections += 1
+
+    def evicted(self):
+        with self._lock:
+            self._evictions += 1
+
+    def snapshot(self):
+        """the counters as a plain dict: requests, new_connections,
+        reused_connections, evictions."""
+        with self._lock:
+            stats = {}
+            stats['requests'] = self._requests
+            stats['new_connections'] = self._connections
+            stats['reused_connections'] = max(0, self._requests - self._connections)
+            stats['evictions'] = self._evictions
+            return stats
+
+
+def _counting_pool(base, stats):
+    """a urllib3 connection-pool class that reports every connection it opens
+    to `stats`. _new_conn is the one place a pool dials a socket, so counting
+    there separates new connections from reused ones."""
+    class CountingPool(base):
+        def _new_conn(self):
+            stats.opened()
+            return super()._new_conn()
+    return CountingPool
+
+
+class _CountingAdapter(HTTPAdapter):
+    """an HTTPAdapter whose pools count their connections and whose sends count
+    requests, both into one PoolStats."""
+
+    def __init__(self, stats, **kwargs):
+        # set before super().__init__, which builds the pool manager.
+        self._stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        pool_classes = {}
+        pool_classes['http'] = _counting_pool(HTTPConnectionPool, self._stats)
+        pool_classes['https'] = _counting_pool(HTTPSConnectionPool, self._stats)
+        self.poolmanager.pool_classes_by_scheme = pool_classes
+
+    def send(self, request, **kwargs):
+        self._stats.sent()
+        return super().send(request, **kwargs)
+
+
+class PooledSession:
+    """one keep-alive connection pool shared by every request an api object
+    makes - so a 50-turn tool loop pays one TCP+TLS handshake, not 50. the
+    threads that lines.run, watch.run and sub-agents spin up against one api
+    all draw from it: urllib3's pools are thread-safe, and a pool hands a
+    connection to one request at a time (a streaming response keeps its
+    connection until it is closed).
+
+    pool_size bounds the connections kept per host; keep_alive=False sends
+    'Connection: close' (a fresh connection per request, for proxies that
+    mishandle reuse); idle_timeout (seconds, None = never) drops the idle
+    sockets once the pool has gone that long unused, instead of finding out on
+    the next request that the server closed them."""
+
+    def __init__(self, pool_size=_POOL_SIZE, keep_alive=True, idle_timeout=_IDLE_TIMEOUT):
+        self.pool_size = max(1, pool_size)
+        self.keep_alive = keep_alive
+        self.idle_timeout = idle_timeout
+        self.stats = PoolStats()
+        self._lock = threading.Lock()
+        self._last_used = time.monotonic()
+        self._session = self._new_session()
+
+    def _new_session(self):
+        session = requests.Session()
+        adapter = _CountingAdapter(self.stats,
+                                   pool_connections=self.pool_size,
+                                   pool_maxsize=self.pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if not self.keep_alive:
+            session.headers['Connection'] = "close"
+        return session
+
+    def _touch(self):
+        """evict the idle pool when it sat unused past idle_timeout, then mark
+        it used. only idle sockets go: a connection a streaming response still
+        holds is closed when that response is, rather than returned."""
+        with self._lock:
+            now = time.monotonic()
+            idle = now - self._last_used
+            self._last_used = now
+            if self.idle_timeout is None: return
+            if idle < self.idle_timeout: return
+            for adapter in self._session.adapters.values():
+                adapter.poolmanager.clear()
+            self.stats.evicted()
+        log.info("api: evicted the connection pool after %.0fs idle", idle)
+
+    def post(self, url, **kwargs):
+        self._touch()
+        return self._session.post(url, **kwargs)
+
+    def get(self, url, **kwargs):
+        self._touch()
+        return self._session.get(url, **kwargs)
+
+    def close(self):
+        self._session.close()
+
+
 class _Flight:
     """shared state between an interruptible request's foreground poll loop
     and its pump thread: the queue the pump feeds, and the live response once
@@ -93,6 +684,56 @@ class _Flight:
         self.response = None
 
 
+class _Batch:
+    """the batching hand-over between a stream's pump thread and its consumer,
+    in place of one queue put/get (and one wakeup) per delta: the pump appends
+    under a condition, and the consumer takes everything that arrived since
+    its last take in one swap. the consumer wakes on the first delta, then
+    lets the batch fill for at most `window` seconds - or until max_items
+    deltas are in - so a slow stream still flows at once and a fast one costs
+    a wakeup per window, not per token."""
+
+    def __init__(self, max_items=_BATCH_MAX):
+        self.max_items = max(1, max_items)
+        self._cond = threading.Condition()
+        self._items = []
+        self._first_at = None
+        self._end = None   # ('done', None) or ('error', exception) once the pump stops
+
+    def put(self, item):
+        with self._cond:
+            self._items.append(item)
+            count = len(self._items)
+            if count == 1:
+                self._first_at = time.monotonic()
+                self._cond.notify()
+            elif count >= self.max_items:
+                self._cond.notify()
+
+    def finish(self, kind, value=None):
+        with self._cond:
+            self._end = (kind, value)
+            self._cond.notify()
+
+    def take(self, window, timeout):
+        """wait up to `timeout` for a first delta, then up to `window` from its
+        arrival for more. returns (items, end): every delta that arrived since
+        the last take (possibly none) and the pump's end marker once it
+        stopped (None while it runs)."""
+        with self._cond:
+            if not self._items and self._end is None:
+                self._cond.wait(timeout)
+            if self._items:
+                deadline = self._first_at + window
+                while self._end is None and len(self._items) < self.max_items:
+                    left = deadline - time.monotonic()
+                    if left <= 0: break
+                    self._cond.wait(left)
+            items = self._items
+            self._items = []
+            return items, self._end
+
+
 def _abort_flight(flight):
     """tear down an in-flight request from the foreground side. shutdown() on
     the underlying socket (not close() - only shutdown reliably wakes a recv
@@ -111,25 +752,20 @@ def _abort_flight(flight):
         pass
 
 
-class OpenAiApi:
-    """A minimal OpenAI-compatible chat client: one HTTP POST to
-    /chat/completions that returns the assistant's message. This is the bottom
-    of the stack - it knows nothing about tools-as-code or sessions; it speaks
-    the wire format, retries the transient failures, and raises ApiError for
-    everything it cannot recover."""
+class _ChatClient:
+    """what the blocking and the asyncio clients share: the endpoint, key and
+    retry/timeout settings, and the chat request each one sends.
 
-    def __init__(self,
-                 base_url,
-                 api_key,
-                 ssl_verify=True,
-                 timeout=(10, 120),
-                 retries=3):
+    prompt_cache=True marks the stable prefix of every request with cache
+    breakpoints (see _mark_prompt_cache), for providers that cache prompts
+    only when asked. off by default: a strict provider may reject the
+    markers, or the list-shaped content they need."""
+
+    def __init__(self, base_url, api_key, ssl_verify, timeout, retries, prompt_cache=False):
         self.base_url = base_url
+        self.prompt_cache = prompt_cache
         self.api_key = api_key
         self.ssl_verify = ssl_verify
-        if not ssl_verify:
-            # only mute InsecureRequestWarning when verification is actually off.
-            warnings.filterwarnings("ignore", category=InsecureRequestWarning)
         # (connect, read) seconds.
         if isinstance(timeout, (list, tuple)):
             timeout = tuple(timeout)
@@ -144,7 +780,10 @@ class OpenAiApi:
                       tools,
                       tool_choice,
                       reasoning_effort,
-                      temperature):
+                      temperature,
+                      wire_cache=None):
+        """the request body as a dict. with a wire_cache, data['messages'] is
+        the already-encoded JSON array (bytes) for _dump_body to splice in."""
         data = {}
         data['model'] = model
         data['messages'] = []
@@ -159,11 +798,103 @@ class OpenAiApi:
         if temperature is not None:
             data['temperature'] = temperature
 
+        if wire_cache is not None:
+            if system_prompt:
+                messages = [system_prompt] + list(messages)
+            marks = ()
+            if self.prompt_cache:
+                _mark_tools(data)
+                marks = _cache_marks(messages)
+            data['messages'] = wire_cache.encode_messages(messages, marks)
+            return data
+
         if system_prompt:
             data['messages'].append(system_prompt)
         data['messages'].extend(_wire_messages(messages))
+        if self.prompt_cache:
+            _mark_prompt_cache(data)
         return data
 
+    def _chat_request(self,
+                      messages,
+                      model,
+                      system_prompt,
+                      tools,
+                      tool_choice,
+                      reasoning_effort,
+                      temperature,
+                      stream,
+                      wire_cache=None):
+        """the (url, headers, data) of one chat-completion request."""
+        url = f"{self.base_url}/chat/completions"
+        headers = {}
+        headers['Authorization'] = f"Bearer {self.api_key}"
+        headers['Content-Type'] = "application/json"
+
+        data = self._request_data(messages,
+                                  model,
+                                  system_prompt,
+                                  tools,
+                                  tool_choice,
+                                  reasoning_effort,
+                                  temperature,
+                                  wire_cache)
+        if stream:
+            data['stream'] = True
+            data['stream_options'] = {"include_usage": True}
+        return url, headers, data
+
+
+class OpenAiApi(_ChatClient):
+    """A minimal OpenAI-compatible chat client: one HTTP POST to
+    /chat/completions that returns the assistant's message. This is the bottom
+    of the stack - it knows nothing about tools-as-code or sessions; it speaks
+    the wire format, retries the transient failures, and raises ApiError for
+    everything it cannot recover.
+
+    every request goes through one PooledSession (see there for pool_size,
+    keep_alive and idle_timeout), shared by all threads using this object;
+    pool_stats() reads its reuse counters.
+
+    batch_window (seconds) turns on batching for interruptible streams: the
+    pump hands over every delta that arrived within the window (or batch_max
+    of them, whichever comes first) in one go, merged, instead of one queue
+    round-trip per token. 0.016 keeps the added latency under a frame."""
+
+    def __init__(self,
+                 base_url,
+                 api_key,
+                 ssl_verify=True,
+                 timeout=(10, 120),
+                 retries=3,
+                 pool_size=_POOL_SIZE,
+                 keep_alive=True,
+                 idle_timeout=_IDLE_TIMEOUT,
+                 batch_window=None,
+                 batch_max=_BATCH_MAX,
+                 prompt_cache=False):
+        super().__init__(base_url, api_key, ssl_verify, timeout, retries, prompt_cache)
+        # batching for interruptible streams (see _Batch): seconds a batch may
+        # wait to fill, None for the per-delta hand-over; and its delta cap.
+        self.batch_window = batch_window
+        self.batch_max = batch_max
+        if not ssl_verify:
+            # only mute InsecureRequestWarning when verification is actually off.
+            warnings.filterwarnings("ignore", category=InsecureRequestWarning)
+        self._http = PooledSession(pool_size=pool_size,
+                                   keep_alive=keep_alive,
+                                   idle_timeout=idle_timeout)
+
+    def pool_stats(self):
+        """the connection pool's counters: requests, new_connections,
+        reused_connections, evictions (see PoolStats)."""
+        return self._http.stats.snapshot()
+
+    def close(self):
+        """drop the pooled connections. the object stays usable - the next
+        request simply dials again."""
+        self._http.close()
+
     def chat(self,
              messages,
              model,
@@ -173,7 +904,9 @@ class OpenAiApi:
              reasoning_effort=None,
              temperature=None,
              stream=False,
-             interrupt=None):
+             interrupt=None,
+             wire_cache=None,
+             on_tool_call=None):
         """One chat-completion request. This is a dispatcher, not itself a
         generator, so its return shape depends on `stream`:
 
@@ -195,26 +928,32 @@ class OpenAiApi:
         request within _POLL_TICK even while a recv is blocked mid-request. an
         interrupted call comes back as empty content (streaming: the generator
         just ends early) - the caller holds the Event, so it can tell that
-        apart from a real empty answer."""
-        url = f"{self.base_url}/chat/completions"
-        headers = {}
-        headers['Authorization'] = f"Bearer {self.api_key}"
-        headers['Content-Type'] = "application/json"
+        apart from a real empty answer.
 
-        data = self._request_data(messages,
-                                  model,
-                                  system_prompt,
-                                  tools,
-                                  tool_choice,
-                                  reasoning_effort,
-                                  temperature)
+        `wire_cache`, when given, is the conversation's WireCache: unchanged
+        messages reuse their encoded fragments and the body goes out as
+        ready-made bytes instead of being serialized whole.
 
+        `on_tool_call`, streaming only, is called (from the reading thread)
+        with each tool call as soon as its arguments are complete, before the
+        stream ends - see _SSEDecoder."""
+        url, headers, data = self._chat_request(messages,
+                                                model,
+                                                system_prompt,
+                                                tools,
+                                                tool_choice,
+                                                reasoning_effort,
+                                                temperature,
+                                                stream,
+                                                wire_cache)
+        if wire_cache is not None:
+            data = _dump_body(data)
         if stream:
-            data['stream'] = True
-            data['stream_options'] = {"include_usage": True}
             if interrupt is None:
-                return self._stream(url, headers, data)
-            return self._stream_polled(url, headers, data, interrupt)
+                return self._stream(url, headers, data, on_tool_call=on_tool_call)
+            if self.batch_window is not None:
+                return self._stream_batched(url, headers, data, interrupt, on_tool_call)
+            return self._stream_polled(url, headers, data, interrupt, on_tool_call)
         if interrupt is None:
             return self._complete(url, headers, data)
         return self._complete_polled(url, headers, data, interrupt)
@@ -225,10 +964,10 @@ class OpenAiApi:
         headers = {}
         headers['Authorization'] = f"Bearer {self.api_key}"
         try:
-            r = requests.get(url,
-                             headers=headers,
-                             timeout=self.timeout,
-                             verify=self.ssl_verify)
+            r = self._http.get(url,
+                               headers=headers,
+                               timeout=self.timeout,
+                               verify=self.ssl_verify)
         except requests.RequestException as e:
             log.error(f"[!] request {url} failed: {e}")
             return
@@ -312,8 +1051,9 @@ class OpenAiApi:
                 record.update(extra)
 
     def _post_with_retry(self, url, headers, data, stream, interrupt=None):
-        """POST one chat request, retrying the transient failures (network
-        errors, 429/5xx) with a short doubling backoff. returns the 200
+        """POST one chat request - `data` is the body dict, or its bytes
+        already encoded - retrying the transient failures (network errors,
+        429/5xx) with a short doubling backoff. returns the 200
         response; raises ApiError once the attempts run out or on a permanent
         failure. a streaming caller gets the response back before any body was
         read, so a retry here never duplicates streamed output. a set
@@ -323,13 +1063,18 @@ class OpenAiApi:
         while True:
             attempt += 1
             status = None
+            body = {}
+            if isinstance(data, bytes):
+                body['data'] = data
+            else:
+                body['json'] = data
             try:
-                r = requests.post(url,
-                                  headers=headers,
-                                  json=data,
-                                  stream=stream,
-                                  timeout=self.timeout,
-                                  verify=self.ssl_verify)
+                r = self._http.post(url,
+                                    headers=headers,
+                                    stream=stream,
+                                    timeout=self.timeout,
+                                    verify=self.ssl_verify,
+                                    **body)
             except requests.RequestException as e:
                 error = f"request {url} failed: {e}"
             else:
@@ -340,7 +1085,7 @@ class OpenAiApi:
                 r.close()
             if not _retryable(status) or attempt >= self.retries:
                 raise ApiError(error, status=status)
-            delay = _RETRY_BACKOFF * (2 ** (attempt - 1))
+            delay = _retry_delay(attempt)
             log.warning("api: %s; retrying in %.1fs (attempt %d/%d)",
                         error, delay, attempt, self.retries)
             if interrupt is None:
@@ -363,26 +1108,12 @@ class OpenAiApi:
             result = r.json()
         except ValueError as e:
             raise ApiError(f"request {url} returned invalid JSON: {e}")
+        return _completion_tuple(url, result)
 
-        choices = result.get("choices", [])
-        if len(choices) != 1:
-            raise ApiError(f"request {url} returned {len(choices)} choices, expected 1")
-
-        message = choices[0].get('message', None)
-        if not message:
-            raise ApiError(f"request {url} returned a choice with no message")
-
-        content = message.get('content', "")
-        reasoning = message.get('reasoning') or message.get('reasoning_content') or ""
-        tool_calls = message.get('tool_calls', None)
-        usage = result.get('usage', {})
-
-        return content, reasoning, tool_calls, usage
-
-    def _stream(self, url, headers, data, interrupt=None, flight=None):
+    def _stream(self, url, headers, data, interrupt=None, flight=None, on_tool_call=None):
         """Streaming path: POST with stream=True (retried while transient,
-        before any byte was read), parse the SSE `data:` lines, reassemble
-        tool-call argument fragments, and yield deltas as they arrive. The
+        before any byte was read), hand each network read to an _SSEDecoder,
+        and yield the deltas it completes as they arrive. The
         final yield carries the assembled tool calls + full usage. a drop
         mid-stream raises ApiError without retrying - a retry would replay
         output the consumer already saw.
@@ -390,10 +1121,6 @@ class OpenAiApi:
         `flight`, when given, receives the live response as soon as the POST
         came back, so the foreground poll loop can abort the socket under a
         blocked read."""
-        finished_tool_calls = None
-        tool_calls = {}
-        usage = {}
-
         r = self._post_with_retry(url, headers, data, stream=True,
                                   interrupt=interrupt)
         if flight is not None:
@@ -402,72 +1129,23 @@ class OpenAiApi:
             r.close()
             return
 
+        decoder = _SSEDecoder(url, on_tool_call)
         with r:
-            lines = r.iter_lines()
-            while True:
+            reads = _body_reads(r)
+            while not decoder.done:
                 # each read may hit the connection dropping mid-stream; that
-                # surfaces from iter_lines as a requests exception, re-raised
-                # as ApiError so the consumer sees one uniform failure type.
+                # surfaces as a requests/urllib3 (or socket) exception,
+                # re-raised as ApiError so the consumer sees one uniform
+                # failure type.
                 try:
-                    line = next(lines)
+                    data = next(reads)
                 except StopIteration:
+                    yield from decoder.flush()
                     break
-                except requests.RequestException as e:
+                except (requests.RequestException, HTTPError, OSError) as e:
                     raise ApiError(f"request {url} stream aborted: {e}")
-                if not line: continue
-                if not line.startswith(b"data: "): continue
-
-                payload = line[len(b"data: "):]
-                if payload == b"[DONE]": break
-
-                try:
-                    chunk = json.loads(payload)
-                except json.JSONDecodeError as e:
-                    log.error(f"[!] request {url} stream returned invalid JSON: {e}")
-                    continue
-
-                # the final usage chunk has empty choices.
-                if chunk.get('usage'):
-                    usage = chunk['usage']
-
-                if len(chunk.get("choices") or []) != 1: continue
-
-                choice = chunk["choices"][0]
-                finish_reason = choice.get('finish_reason', None)
-                delta = choice["delta"]
-
-                # process tool-call fragments before snapshotting finish_reason,
-                # so the snapshot captures data from the final chunk too.
-                if "tool_calls" in delta:
-                    for tool_call in delta['tool_calls']:
-                        idx = tool_call['index']
-                        if idx not in tool_calls:
-                            function = {}
-                            function['name'] = tool_call.get('function', {}).get('name')
-                            function['arguments'] = ""
-
-                            tool_calls[idx] = {}
-                            tool_calls[idx]['index'] = tool_call.get('index')
-                            tool_calls[idx]['id'] = tool_call.get('id')
-                            tool_calls[idx]['type'] = "function"
-                            tool_calls[idx]['function'] = function
-                        args = tool_call.get('function', {}).get('arguments')
-                        if args:
-                            tool_calls[idx]['function']['arguments'] += args
-
-                # only snapshot when tool_calls is non-empty - some providers
-                # fire finish_reason="tool_calls" twice, and the second time
-                # tool_calls is already reset to {}.
-                if finish_reason in ("tool_calls", "tool_use") and tool_calls:
-                    finished_tool_calls = list(tool_calls.values())
-                    tool_calls = {}
-
-                content = delta.get('content', None)
-                reasoning = delta.get('reasoning') or delta.get('reasoning_content')
-
-                if content or reasoning or tool_calls:
-                    yield content, reasoning, finished_tool_calls, {}
-            yield None, None, finished_tool_calls, usage
+                yield from decoder.feed(data)
+            yield decoder.final()
 
     def _complete_polled(self, url, headers, data, interrupt):
         """_complete behind a pump thread: the POST blocks over there while
@@ -499,7 +1177,7 @@ class OpenAiApi:
         except Exception as e:
             flight.queue.put(('error', e))
 
-    def _stream_polled(self, url, headers, data, interrupt):
+    def _stream_polled(self, url, headers, data, interrupt, on_tool_call=None):
         """_stream behind a pump thread: the pump reads the SSE lines and
         queues the yielded tuples while this generator polls the queue, so a
         set interrupt ends the stream within _POLL_TICK even while the pump is
@@ -507,7 +1185,7 @@ class OpenAiApi:
         so the pump dies right away instead of running out the read timeout."""
         flight = _Flight()
         thread = threading.Thread(target=self._pump_stream,
-                                  args=(url, headers, data, interrupt, flight),
+                                  args=(url, headers, data, interrupt, flight, on_tool_call),
                                   daemon=True,
                                   name="cai-api-pump")
         thread.start()
@@ -529,10 +1207,362 @@ class OpenAiApi:
             # closed the response and the abort is a no-op).
             _abort_flight(flight)
 
-    def _pump_stream(self, url, headers, data, interrupt, flight):
+    def _stream_batched(self, url, headers, data, interrupt, on_tool_call=None):
+        """_stream_polled with a _Batch as the hand-over (batch_window set):
+        each take drains what arrived in the window and yields it coalesced -
+        a run of content (or reasoning) deltas becomes one - so the consumer
+        builds one Event per batch, not per token."""
+        flight = _Flight()
+        batch = _Batch(self.batch_max)
+        thread = threading.Thread(target=self._pump_batch,
+                                  args=(url, headers, data, interrupt, flight, batch, on_tool_call),
+                                  daemon=True,
+                                  name="cai-api-pump")
+        thread.start()
+        try:
+            while True:
+                if interrupt.is_set(): return
+                items, end = batch.take(self.batch_window, _POLL_TICK)
+                merged = []
+                for item in items:
+                    _coalesce(merged, item)
+                for delta in merged:
+                    yield delta
+                if end is None: continue
+                kind, value = end
+                if kind == 'error':
+                    raise value
+                return
+        finally:
+            _abort_flight(flight)
+
+    def _pump_batch(self, url, headers, data, interrupt, flight, batch, on_tool_call):
+        try:
+            for item in self._stream(url, headers, data, interrupt, flight, on_tool_call):
+                batch.put(item)
+            batch.finish('done')
+        except Exception as e:
+            batch.finish('error', e)
+
+    def _pump_stream(self, url, headers, data, interrupt, flight, on_tool_call):
         try:
-            for item in self._stream(url, headers, data, interrupt, flight):
+            for item in self._stream(url, headers, data, interrupt, flight, on_tool_call):
                 flight.queue.put(('item', item))
             flight.queue.put(('done', None))
         except Exception as e:
             flight.queue.put(('error', e))
+
+
+# what an async request can fail with below the HTTP layer: httpx's request
+# errors (connect/read/write failures and timeouts, a proxy refusing, a peer
+# hanging up or breaking the framing mid-response) and plain socket errors.
+_NETWORK_ERRORS = (httpx.RequestError, OSError)
+
+
+class _Interrupted(Exception):
+    """a network step of an async request was abandoned: its interrupt is set."""
+
+
+async def _unless_interrupted(awaitable, interrupt):
+    """await one network step of a request, abandoning it once `interrupt` is
+    set. the interrupt is a threading.Event (set from any thread), so the step
+    runs as its own task while the interrupt is polled every _POLL_TICK - one
+    sleeping wait per request, where the blocking client parks a whole pump
+    thread. raises _Interrupted when the interrupt cut the step short."""
+    if interrupt is None:
+        return await awaitable
+    if interrupt.is_set():
+        awaitable.close()
+        raise _Interrupted()
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _pending = await asyncio.wait((task,), timeout=_POLL_TICK)
+            if done:
+                return task.result()
+            if interrupt.is_set():
+                raise _Interrupted()
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+class _Dial:
+    """what one attempt did for a connection, from httpcore's trace: whether
+    it dialed a fresh one (started) and got it (opened). an attempt that did
+    neither ran on a pooled connection. opened connections are counted."""
+
+    def __init__(self, stats):
+        self.stats = stats
+        self.started = False
+        self.opened = False
+
+    async def trace(self, event, info):
+        if event == "connection.connect_tcp.started":
+            self.started = True
+        elif event == "connection.connect_tcp.complete":
+            self.opened = True
+            self.stats.opened()
+
+
+async def _sleep_unless(interrupt, delay):
+    """sleep `delay` seconds, cut short by the interrupt. returns whether it
+    was interrupted."""
+    if interrupt is None:
+        await asyncio.sleep(delay)
+        return False
+    deadline = time.monotonic() + delay
+    while not interrupt.is_set():
+        left = deadline - time.monotonic()
+        if left <= 0: return False
+        await asyncio.sleep(min(left, _POLL_TICK))
+    return True
+
+
+def _is_set(interrupt):
+    return interrupt is not None and interrupt.is_set()
+
+
+class AsyncOpenAiApi(_ChatClient):
+    """OpenAiApi over asyncio: the same wire format, retry policy and
+    ApiError surface, but chat() hands back awaitables, so one event loop can
+    carry hundreds of requests at once - no pump thread per request, no OS
+    thread parked on each socket.
+
+    the transport is an httpx.AsyncClient per event loop (a connection can't
+    cross loops), which honours the proxy env vars the way requests does.
+    pool_size, keep_alive and idle_timeout mean what they do on PooledSession
+    and the counters are the same PoolStats, except that httpx expires idle
+    connections one by one, so evictions stays 0. a set interrupt abandons
+    the request's pending read within _POLL_TICK; cancelling the awaiting
+    task abandons it at once."""
+
+    def __init__(self,
+                 base_url,
+                 api_key,
+                 ssl_verify=True,
+                 timeout=(10, 120),
+                 retries=3,
+                 pool_size=_POOL_SIZE,
+                 keep_alive=True,
+                 idle_timeout=_IDLE_TIMEOUT,
+                 prompt_cache=False):
+        super().__init__(base_url, api_key, ssl_verify, timeout, retries, prompt_cache)
+        self.pool_size = max(1, pool_size)
+        self.keep_alive = keep_alive
+        self.idle_timeout = idle_timeout
+        self.stats = PoolStats()
+        # event loop -> its httpx.AsyncClient; the lock is for an api shared
+        # by event loops in several threads.
+        self._clients = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_api(cls, api):
+        """an async client for the endpoint a blocking OpenAiApi talks to,
+        with the same key, verification, timeouts, retries and prompt
+        caching."""
+        return cls(api.base_url,
+                   api.api_key,
+                   ssl_verify=api.ssl_verify,
+                   timeout=api.timeout,
+                   retries=api.retries,
+                   pool_size=api._http.pool_size,
+                   keep_alive=api._http.keep_alive,
+                   idle_timeout=api._http.idle_timeout,
+                   prompt_cache=api.prompt_cache)
+
+    def pool_stats(self):
+        """the connection pool's counters (see PoolStats)."""
+        return self.stats.snapshot()
+
+    def close(self):
+        """forget the pooled connections: the next request starts a fresh
+        client. (closing one needs its own loop, so the sockets go as the
+        clients are collected.)"""
+        with self._lock:
+            self._clients = weakref.WeakKeyDictionary()
+
+    def _timeouts(self):
+        """(connect, read) seconds, from either timeout shape."""
+        if isinstance(self.timeout, tuple):
+            return self.timeout
+        return self.timeout, self.timeout
+
+    def _client(self):
+        """the httpx.AsyncClient of the running event loop, made on first use."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.get(loop)
+            if client is not None:
+                return client
+            connect_timeout, read_timeout = self._timeouts()
+            keep = self.pool_size
+            if not self.keep_alive:
+                keep = 0
+            limits = httpx.Limits(max_connections=None,
+                                  max_keepalive_connections=keep,
+                                  keepalive_expiry=self.idle_timeout)
+            headers = {}
+            if not self.keep_alive:
+                headers['Connection'] = "close"
+            client = httpx.AsyncClient(verify=self.ssl_verify,
+                                       timeout=httpx.Timeout(read_timeout, connect=connect_timeout, pool=None),
+                                       limits=limits,
+                                       headers=headers,
+                                       trust_env=True)
+            self._clients[loop] = client
+            return client
+
+    def chat(self,
+             messages,
+             model,
+             system_prompt=None,
+             tools=None,
+             tool_choice="auto",
+             reasoning_effort=None,
+             temperature=None,
+             stream=False,
+             interrupt=None,
+             wire_cache=None,
+             on_tool_call=None):
+        """OpenAiApi.chat's contract, asynchronously:
+
+        - stream=False: returns a coroutine resolving to the
+          (content, reasoning, tool_calls, usage) tuple.
+        - stream=True: returns an async generator of the incremental
+          (content, reasoning, finished_tool_calls, usage) tuples.
+
+        the same retries, the same ApiError on failure, and an interrupted
+        call comes back as empty content (streaming: the generator ends
+        early)."""
+        url, headers, data = self._chat_request(messages,
+                                                model,
+                                                system_prompt,
+                                                tools,
+                                                tool_choice,
+                                                reasoning_effort,
+                                                temperature,
+                                                stream,
+                                                wire_cache)
+        body = _dump_body(data)
+        if stream:
+            return self._stream(url, headers, body, interrupt, on_tool_call)
+        return self._complete(url, headers, body, interrupt)
+
+    async def _post_with_retry(self, url, headers, body, interrupt):
+        """OpenAiApi._post_with_retry over asyncio: the same transient set,
+        backoff and attempt budget. returns the 200 response with its body
+        unread; raises _Interrupted when the interrupt cut it short. a pooled
+        connection the server closed while idle fails on first use; that is
+        retried once on a fresh one without spending an attempt, the way
+        urllib3 does."""
+        client = self._client()
+        attempt = 0
+        stale_retried = False
+        while True:
+            attempt += 1
+            status = None
+            dial = _Dial(self.stats)
+            request = client.build_request("POST",
+                                           url,
+                                           headers=headers,
+                                           content=body,
+                                           extensions={"trace": dial.trace})
+            try:
+                response = await _unless_interrupted(client.send(request, stream=True), interrupt)
+            except _NETWORK_ERRORS as e:
+                if not dial.started and not stale_retried and not _is_set(interrupt):
+                    stale_retried = True
+                    attempt -= 1
+                    continue
+                if dial.opened or not dial.started:
+                    self.stats.sent()
+                error = f"request {url} failed: {e}"
+            else:
+                # counted once it went out: the free retry of a stale
+                # pooled connection above is the same request.
+                self.stats.sent()
+                if response.status_code == 200:
+                    return response
+                status = response.status_code
+                try:
+                    text = (await _unless_interrupted(response.aread(), interrupt)).decode("utf-8", "replace")
+                except (_Interrupted, *_NETWORK_ERRORS):
+                    text = ""
+                finally:
+                    await response.aclose()
+                error = f"request {url} failed with {status}: {text[:300]}"
+            if _is_set(interrupt) or not _retryable(status) or attempt >= self.retries:
+                raise ApiError(error, status=status)
+            delay = _retry_delay(attempt)
+            log.warning("api: %s; retrying in %.1fs (attempt %d/%d)",
+                        error, delay, attempt, self.retries)
+            if await _sleep_unless(interrupt, delay):
+                raise ApiError(error, status=status)
+
+    async def _complete(self, url, headers, body, interrupt):
+        try:
+            response = await self._post_with_retry(url, headers, body, interrupt)
+        except _Interrupted:
+            return "", "", None, {}
+        except ApiError:
+            if _is_set(interrupt):
+                return "", "", None, {}
+            raise
+        try:
+            payload = await _unless_interrupted(response.aread(), interrupt)
+        except _Interrupted:
+            return "", "", None, {}
+        except _NETWORK_ERRORS as e:
+            if _is_set(interrupt):
+                return "", "", None, {}
+            raise ApiError(f"request {url} failed: {e}")
+        finally:
+            await response.aclose()
+        if _is_set(interrupt):
+            return "", "", None, {}
+        try:
+            result = json.loads(payload)
+        except ValueError as e:
+            raise ApiError(f"request {url} returned invalid JSON: {e}")
+        return _completion_tuple(url, result)
+
+    async def _stream(self, url, headers, body, interrupt, on_tool_call=None):
+        try:
+            response = await self._post_with_retry(url, headers, body, interrupt)
+        except _Interrupted:
+            return
+        except ApiError:
+            if _is_set(interrupt): return
+            raise
+        try:
+            chunks = response.aiter_bytes()
+            decoder = _SSEDecoder(url, on_tool_call)
+            try:
+                while not decoder.done:
+                    data = await _unless_interrupted(anext(chunks, b""), interrupt)
+                    if not data:
+                        for delta in decoder.flush():
+                            yield delta
+                        break
+                    for delta in decoder.feed(data):
+                        yield delta
+            except _Interrupted:
+                return
+            except _NETWORK_ERRORS as e:
+                if _is_set(interrupt): return
+                raise ApiError(f"request {url} stream aborted: {e}")
+            if _is_set(interrupt): return
+            # read past [DONE] to the body's end (the closing chunk), so the
+            # connection can go back to the pool; a server that lingers loses
+            # it instead.
+            try:
+                async with asyncio.timeout(_POLL_TICK):
+                    async for _data in chunks:
+                        pass
+            except (TimeoutError, *_NETWORK_ERRORS):
+                pass
+            yield decoder.final()
+        finally:
+            await response.aclose()
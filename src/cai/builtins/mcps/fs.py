@@ -13,27 +13,90 @@ takes hex/base64 content via encoding=, edit_file replaces byte spans via
 encoding='hex', copy_file is byte-exact anyway, and copy_bytes moves a byte
 range between files (extract, append, patch) without the bytes ever passing
 through the model. search covers binary files too - a binary hit comes back
-as its byte offset plus a hexdump of the match with context.
+as its byte offset plus a hexdump of the match with context. It is one
+streaming ``rg --json --text`` pass over text and binary files alike, stopped
+as soon as the requested page is filled. read_file starts reading text from
+the nearest ``cai.line_index.LineIndex`` checkpoint, so a page deep into a
+huge log - or its tail, with negative line numbers - is as cheap as the first.
 
 Pair them with the ``fs-read-only`` skill for inspection, or the ``fs`` skill
 which adds the mutating tools. Every path is confined via ``cai.safe_path`` to
 the current working directory - plus the session scratch directory when cai
 hands one down as ``CAI_SCRATCH``, so scratch artifacts (bulky tool outputs,
 binary intermediates) stay searchable and readable with these same tools.
+
+With ``fs_index: true`` in cai's config.json the server keeps a
+``cai.fs_index.FileIndex`` of the tree: list_files answers from it instead of
+walking the disk, and search takes the binary flag of each file it finds a
+match in from the index instead of reading the file's head. With
+``fs_trigram_index: true`` search asks a persistent
+``cai.trigram_index.TrigramIndex`` which files can hold a match and hands rg
+only those. Results are the same either way.
 """
 
+import base64
+import heapq
+import io
+import json
 import os
 import re
 import shutil
-from collections import deque
+import threading
+import time
 from typing import Optional
 
 from mcp.server.fastmcp import FastMCP
+from mcp.types import ToolAnnotations
 
-from cai import safe_path
+from cai import config, safe_path
+from cai.fs_index import FileIndex
+from cai.line_index import LineIndex
+from cai.trigram_index import TrigramIndex
 
 mcp = FastMCP(name="fs")
 
+# how many bytes of paths one rg command line carries (ARG_MAX is far above).
+_ARGS_BYTES = 100_000
+
+# search shows at most this many characters of a long line, as rg's
+# --max-columns/--max-columns-preview would.
+_MAX_COLUMNS = 120
+
+# binary hits rendered per open of their file.
+_BINARY_BATCH = 64
+
+# rg transcodes a file starting with one of these.
+_BOMS = (b"\xff\xfe", b"\xfe\xff")
+
+# the read-only tools say so, so cai may run several of them side by side.
+_READ_ONLY = ToolAnnotations(readOnlyHint=True)
+
+
+def _index(safe):
+    """the FileIndex covering directory `safe` when fs_index is on, else None."""
+    if not config.load_optional("fs_index", False):
+        return None
+    if not os.path.isdir(safe):
+        return None
+    return FileIndex.for_path(safe)
+
+
+def _candidates(pattern, safe, file_glob):
+    """the files under directory `safe` that can hold a match, from the
+    TrigramIndex when fs_trigram_index is on; None: search all of it."""
+    if not config.load_optional("fs_trigram_index", False):
+        return None
+    if not os.path.isdir(safe):
+        return None
+    return TrigramIndex.for_path(safe).candidates(pattern, safe, file_glob)
+
+
+def _touched(*paths):
+    """tell the indexes a mutating tool changed these paths."""
+    for path in paths:
+        FileIndex.invalidate(path)
+        LineIndex.invalidate(path)
+
 
 def _is_binary(safe):
     """the same sniff grep/git use: binary if the first 8KB contain a NUL.
@@ -67,98 +130,225 @@ def _hexdump(data, offset):
     return "\n".join(lines)
 
 
-def _paginate(lines, start, end, unit):
-    """return a window of `lines` as text (100 lines by default), with a footer
-    when more remain. start/end are 1-based and inclusive."""
-    total = len(lines)
-    if start is None:
-        start = 1
-    if start < 1:
+def _window(start, end):
+    """the 1-based inclusive window start/end ask for, 100 lines by default."""
+    if start is None or start < 1:
         start = 1
     if end is None:
         end = start + 99
-    window = lines[start - 1:end]
+    return start, end
+
+
+def _paginate(lines, start, end, unit):
+    """return a window of `lines` as text (100 lines by default), with a footer
+    when more remain. start/end are 1-based and inclusive. `lines` may be any
+    iterable: it is consumed only up to one line past the window, and the
+    footer then says more follow rather than how many - a list's footer
+    gives its length. None when `lines` is empty; a note saying how many there
+    are when start is past the last."""
+    start, end = _window(start, end)
+    if isinstance(lines, list):
+        if not lines:
+            return None
+        if start > len(lines):
+            return _past_the_end(start, len(lines), unit)
+        text = "\n".join(lines[start - 1:end])
+        if end < len(lines):
+            text += f"\n[Showing {start}-{end} of {len(lines)} {unit}; call again with start={end + 1}]"
+        return text
+    window = []
+    seen = 0
+    for line in lines:
+        seen += 1
+        if seen > end:
+            break
+        if seen >= start:
+            window.append(line)
+    if not seen:
+        return None
+    if not window:
+        return _past_the_end(start, seen, unit)
     text = "\n".join(window)
-    if end < total:
-        shown = min(end, total)
-        text += f"\n[Showing {start}-{shown} of {total} {unit}; call again with start={end + 1}]"
+    if seen > end:
+        text += f"\n[Showing {start}-{end} {unit}, more follow; call again with start={end + 1}]"
     return text
 
 
-def _rg(cmd):
-    """run an rg command; returns (stdout_bytes, error) - exactly one is
-    None. stdout stays bytes because binary match text can be anything."""
+def _past_the_end(start, total, unit):
+    return f"[No {unit} at start={start}; there are {total} - call again with a start of 1-{total}]"
+
+
+def _rg_json(cmd):
+    """run an rg --json command, yielding its messages as they come; rg is
+    stopped when the caller stops early. Raises ValueError('Error: ...')
+    when rg is missing, times out or fails."""
     import subprocess
+    import tempfile
+    deadline = time.monotonic() + 60
+    # stderr to a file: a pipe nobody reads while stdout streams could fill up.
+    with tempfile.TemporaryFile() as stderr:
+        try:
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr)
+        except FileNotFoundError:
+            raise ValueError("Error: ripgrep (rg) is not installed or not on PATH.")
+        timer = threading.Timer(60, proc.kill)
+        timer.start()
+        try:
+            for line in proc.stdout:
+                yield json.loads(line)
+            proc.wait()
+        finally:
+            timer.cancel()
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            proc.stdout.close()
+        if proc.returncode < 0 and time.monotonic() >= deadline:
+            raise ValueError("Error: search timed out")
+        if proc.returncode not in (0, 1):
+            stderr.seek(0)
+            message = stderr.read().decode("utf-8", errors="replace").strip()
+            raise ValueError(f"Error: {message or 'rg exited with code ' + str(proc.returncode)}")
+
+
+def _chunks(paths):
+    """`paths` in runs short enough for one rg command line."""
+    run = []
+    size = 0
+    for path in paths:
+        if run and size + len(path) > _ARGS_BYTES:
+            yield run
+            run = []
+            size = 0
+        run.append(path)
+        size += len(path) + 1
+    if run:
+        yield run
+
+
+def _rg_json_each(cmd, targets):
+    """_rg_json over `cmd` + targets, in as many rg calls as the command line
+    needs."""
+    for run in _chunks(targets):
+        yield from _rg_json(cmd + run)
+
+
+def _json_bytes(value):
+    """the bytes of an rg --json text-or-bytes value."""
+    if "text" in value:
+        return value["text"].encode("utf-8", errors="surrogateescape")
+    return base64.b64decode(value["bytes"])
+
+
+def _rendered_binary(path, sniff):
+    """whether search renders the hits in `path` as binary ones: fs's sniff
+    (or the index's remembered flag), except that a file starting with a
+    UTF-16 BOM is text - rg transcodes it, so its offsets are not the
+    file's. An unreadable file counts as text."""
     try:
-        result = subprocess.run(cmd, capture_output=True, timeout=60)
-    except FileNotFoundError:
-        return None, "Error: ripgrep (rg) is not installed or not on PATH."
-    except subprocess.TimeoutExpired:
-        return None, "Error: search timed out"
-    if result.returncode not in (0, 1):
-        stderr = result.stderr.decode("utf-8", errors="replace").strip()
-        return None, f"Error: {stderr or 'rg exited with code ' + str(result.returncode)}"
-    return result.stdout, None
-
-
-def _binary_match_lines(path, offset, length):
-    """render one binary match: a '<file>:<offset>: <n>-byte match' header,
+        if not sniff(path):
+            return False
+        with open(path, "rb") as f:
+            return f.read(2) not in _BOMS
+    except (IOError, OSError):
+        return False
+
+
+def _vimgrep_lines(shown, match):
+    """an rg match message as vimgrep lines, one per submatch:
+    <file>:<line>:<col>:<text>, a long line cut the way rg's
+    --max-columns _MAX_COLUMNS --max-columns-preview cuts it."""
+    line = _json_bytes(match["lines"])
+    if line.endswith(b"\n"):
+        line = line[:-1]
+    submatches = match["submatches"]
+    text = line.decode("utf-8", errors="surrogateescape")
+    more = None
+    if len(line) > _MAX_COLUMNS:
+        text = text[:_MAX_COLUMNS]
+        cut = len(text.encode("utf-8", errors="surrogateescape"))
+        more = 0
+        for sub in submatches:
+            if sub["end"] > cut:
+                more += 1
+    text = text.encode("utf-8", errors="surrogateescape").decode("utf-8", errors="replace")
+    if more is not None:
+        text += f" [... {more} more {'match' if more == 1 else 'matches'}]"
+    lines = []
+    for sub in submatches:
+        lines.append(f"{shown}:{match['line_number']}:{sub['start'] + 1}:{text}")
+    return lines
+
+
+def _binary_match_lines(path, shown, matches):
+    """render binary `matches` ((offset, length) pairs) of file `path`, one
+    open for the lot: per match a '<file>:<offset>: <n>-byte match' header,
     then an xxd-style hexdump of the match with 32 bytes of context either
-    side (aligned to 16 so offsets line up with read_file pages)."""
-    start = offset - 32
-    if start < 0:
-        start = 0
-    start = start - (start % 16)
-    end = offset + length + 32
+    side (aligned to 16 so offsets line up with read_file pages), then a
+    blank line."""
+    lines = []
     try:
         with open(path, "rb") as f:
-            f.seek(start)
-            data = f.read(end - start)
+            for offset, length in matches:
+                start = offset - 32
+                if start < 0:
+                    start = 0
+                start = start - (start % 16)
+                f.seek(start)
+                data = f.read(offset + length + 32 - start)
+                lines.append(f"{shown}:{offset}: {length}-byte match")
+                lines += _hexdump(data, start).split("\n")
+                lines.append("")
     except (IOError, OSError):
-        return []
-    lines = [f"{path}:{offset}: {length}-byte match"]
-    lines += _hexdump(data, start).split("\n")
-    lines.append("")
+        pass
     return lines
 
 
-def _search_binary(pattern, safe, file_glob, binary_only):
-    """rg pass over binary content: 'rg -a -o -b' reports each match as
-    '<path>NUL<offset>:<match bytes>', parsed as bytes so the match length
-    is exact. Returns (lines, error) - exactly one is None."""
-    cmd = ["rg", "--text", "--only-matching", "--byte-offset",
-           "--no-line-number", "--with-filename", "--null"]
+def _search_lines(pattern, targets, file_glob, sniff):
+    """search's result lines for `targets` (paths), lazily and in rg's
+    order, from one rg --json --text pass: rg reports every hit, text and
+    binary alike, with its line and byte offset. Each file with a hit is
+    classified once (`sniff`); a text hit becomes vimgrep lines, binary hits
+    are rendered _BINARY_BATCH at a time with one open of their file.
+    Raises ValueError('Error: ...') like _rg_json."""
+    cmd = ["rg", "--json", "--text"]
     if file_glob:
         cmd += ["--glob", file_glob]
-    cmd += ["--", pattern, safe]
-    raw, err = _rg(cmd)
-    if err:
-        return None, err
-    out = []
-    binary_cache = {}
-    for line in raw.split(b"\n"):
-        if b"\x00" not in line:
-            continue
-        path, _, rest = line.partition(b"\x00")
-        offset, sep, match = rest.partition(b":")
-        if not sep or not offset.isdigit():
-            continue
-        path = path.decode("utf-8", errors="replace")
-        if binary_only:
-            known = binary_cache.get(path)
-            if known is None:
-                try:
-                    known = _is_binary(path)
-                except (IOError, OSError):
-                    known = False
-                binary_cache[path] = known
-            if not known:
-                continue
-        out += _binary_match_lines(path, int(offset), len(match))
-    return out, None
-
-
-@mcp.tool()
+    # '--' ends options so a pattern/path starting with '-' is never parsed as a flag.
+    cmd += ["--", pattern]
+    path = shown = None
+    binary = False
+    pending = []
+    gap = False          # a binary hit's blank line, held back until more follows
+    for message in _rg_json_each(cmd, targets):
+        kind = message["type"]
+        lines = []
+        if kind == "begin":
+            raw = _json_bytes(message["data"]["path"])
+            path = os.fsdecode(raw)
+            shown = raw.decode("utf-8", errors="replace")
+            binary = _rendered_binary(path, sniff)
+        elif kind == "match" and not binary:
+            lines = _vimgrep_lines(shown, message["data"])
+        elif kind == "match":
+            match = message["data"]
+            for sub in match["submatches"]:
+                pending.append((match["absolute_offset"] + sub["start"], sub["end"] - sub["start"]))
+            if len(pending) >= _BINARY_BATCH:
+                lines = _binary_match_lines(path, shown, pending)
+                pending = []
+        elif kind == "end" and pending:
+            lines = _binary_match_lines(path, shown, pending)
+            pending = []
+        for line in lines:
+            if gap:
+                yield ""
+            gap = line == ""
+            if not gap:
+                yield line
+
+
+@mcp.tool(annotations=_READ_ONLY)
 def search(pattern: str,
            path: str = ".",
            file_glob: str = "",
@@ -186,40 +376,32 @@ def search(pattern: str,
     if not pattern:
         return "Error: empty pattern"
 
-    lines = []
-    single_binary = False
-    if os.path.isfile(safe):
-        try:
-            single_binary = _is_binary(safe)
-        except (IOError, OSError) as e:
-            return f"Error: {e}"
-    if not single_binary:
-        cmd = ["rg", "--vimgrep", "--max-columns", "120", "--max-columns-preview"]
-        if file_glob:
-            cmd += ["--glob", file_glob]
-        # '--' ends options so a pattern/path starting with '-' is never parsed as a flag.
-        cmd += ["--", pattern, safe]
-        raw, err = _rg(cmd)
-        if err:
-            return err
-        output = raw.decode("utf-8", errors="replace").strip()
-        if output:
-            lines = output.split("\n")
-
-    # second pass for the binary files the vimgrep pass skipped.
-    bin_lines, err = _search_binary(pattern, safe, file_glob, binary_only=not single_binary)
-    if err:
-        return err
-    lines += bin_lines
-    if lines and lines[-1] == "":
-        lines.pop()
-
-    if not lines:
+    # with the trigram index, rg is handed only the files that can match.
+    targets = _candidates(pattern, safe, file_glob)
+    if targets is None:
+        targets = [safe]
+    else:
+        file_glob = ""
+    index = _index(safe)
+    sniff = _is_binary
+    if index is not None:
+        index.refresh()
+        sniff = index.is_binary
+
+    # rg is stopped as soon as the window is filled and one more line is seen.
+    results = _search_lines(pattern, targets, file_glob, sniff)
+    try:
+        text = _paginate(results, start, end, "lines")
+    except ValueError as e:
+        return str(e)
+    finally:
+        results.close()
+    if text is None:
         return "No matches found."
-    return _paginate(lines, start, end, "lines")
+    return text
 
 
-@mcp.tool()
+@mcp.tool(annotations=_READ_ONLY)
 def read_file(file_path: str,
               line_start: Optional[int] = None,
               line_end: Optional[int] = None,
@@ -231,8 +413,10 @@ def read_file(file_path: str,
 
     Args:
         file_path:    Path to the file.
-        line_start:   TEXT ONLY. First line, 1-based (default 1).
-        line_end:     TEXT ONLY. Last line, inclusive (default line_start+199).
+        line_start:   TEXT ONLY. First line, 1-based (default 1); negative
+                      counts from the end (-50: the last 50 lines).
+        line_end:     TEXT ONLY. Last line, inclusive (default line_start+199);
+                      negative counts from the end (-1: the last line).
         offset_start: BINARY ONLY. First byte, 0-based (default 0).
         offset_end:   BINARY ONLY. End byte, exclusive (default offset_start+3200).
     """
@@ -260,21 +444,41 @@ def read_file(file_path: str,
 
 
 def _read_text(safe, line_start, line_end):
+    """the requested lines, read from the LineIndex checkpoint at or before
+    the first of them rather than from the top of the file."""
+    try:
+        index = LineIndex.for_file(safe)
+    except (IOError, OSError, ValueError) as e:
+        return f"Error: {e}"
     start = line_start
+    end = line_end
+    if (start is not None and start < 0) or (end is not None and end < 0):
+        if index is not None:
+            total = index.lines
+        else:
+            total = _count_lines(safe)
+        if start is not None and start < 0:
+            start = total + 1 + start
+        if end is not None and end < 0:
+            end = total + 1 + end
     if start is None:
         start = 1
     if start < 1:
         start = 1
-    end = line_end
     if end is None:
         end = start + 199
     if end < start:
         return ""
+    offset, number = 0, 1
+    if index is not None:
+        offset, number = index.checkpoint(start)
     out = []
     more = False
     try:
-        with open(safe, "r", encoding="utf-8", errors="replace") as f:
-            for i, line in enumerate(f, start=1):
+        with open(safe, "rb") as raw:
+            raw.seek(offset)
+            f = io.TextIOWrapper(raw, encoding="utf-8", errors="replace")
+            for i, line in enumerate(f, start=number):
                 if i < start:
                     continue
                 if i > end:
@@ -291,6 +495,18 @@ def _read_text(safe, line_start, line_end):
     return text
 
 
+def _count_lines(safe):
+    """the number of lines in text file `safe`, read from the top."""
+    count = 0
+    try:
+        with open(safe, "r", encoding="utf-8", errors="replace") as f:
+            for _line in f:
+                count += 1
+    except (IOError, OSError):
+        pass
+    return count
+
+
 def _read_binary(safe, offset_start, offset_end):
     start = offset_start
     if start is None:
@@ -318,7 +534,7 @@ def _read_binary(safe, offset_start, offset_end):
     return dump
 
 
-@mcp.tool()
+@mcp.tool(annotations=_READ_ONLY)
 def list_files(path: str = ".", pattern: str = "",
                start: Optional[int] = None, end: Optional[int] = None) -> str:
     """Recursively list files and directories under `path`, shallowest first -
@@ -345,35 +561,56 @@ def list_files(path: str = ".", pattern: str = "",
         except re.error as e:
             return f"Error: invalid pattern: {e}"
 
-    entries = []
-    queue = deque([root])
-    while queue:
-        current = queue.popleft()
-        try:
-            children = sorted(os.listdir(current))
-        except PermissionError:
-            continue
-        for name in children:
-            if name in (".git", "__pycache__"): continue
-            full = os.path.join(current, name)
-            rel = os.path.relpath(full, root)
-            kind = "file"
-            if os.path.isdir(full):
-                kind = "dir"
-            if rx is None or rx.search(rel):
-                entries.append(f"{kind}  {rel}")
-            if os.path.isdir(full):
-                queue.append(full)
-
-    if not entries:
+    # the index's listing is in memory, so its footer can give the total.
+    entries = None
+    index = _index(root)
+    if index is not None:
+        listing = index.listing(root)
+        if listing is not None:
+            entries = listing
+            if rx is not None:
+                entries = [entry for entry in listing if rx.search(entry.split("  ", 1)[1])]
+    if entries is None:
+        entries = _walk_entries(root, rx, _window(start, end)[1] + 1)
+    text = _paginate(entries, start, end, "entries")
+    if text is None:
         return "(empty)"
+    return text
 
-    def depth_then_name(entry):
-        rel = entry.split("  ", 1)[1]
-        return rel.count(os.sep), rel
 
-    entries.sort(key=depth_then_name)
-    return _paginate(entries, start, end, "entries")
+def _walk_entries(root, rx, limit):
+    """list_files' entries under `root` ("<kind>  <rel-path>" whose path rx
+    matches), shallowest first then by name, at most `limit` of them. The
+    tree is walked a level at a time and a level yielded once it is listed,
+    so a page near the top never lists the directories below it; of a level
+    wider than what is left of `limit`, a bounded heap keeps the first."""
+    level = [(root, "")]
+    while level and limit > 0:
+        entries = []
+        below = []
+        for current, prefix in level:
+            try:
+                children = os.listdir(current)
+            except PermissionError:
+                continue
+            for name in children:
+                if name in (".git", "__pycache__"): continue
+                full = os.path.join(current, name)
+                rel = os.path.join(prefix, name)
+                kind = "file"
+                if os.path.isdir(full):
+                    kind = "dir"
+                    below.append((full, rel))
+                if rx is None or rx.search(rel):
+                    entries.append((rel, kind))
+        if len(entries) > limit:
+            entries = heapq.nsmallest(limit, entries)
+        else:
+            entries.sort()
+        for rel, kind in entries:
+            yield f"{kind}  {rel}"
+        limit -= len(entries)
+        level = below
 
 
 def _decode_content(content, encoding):
@@ -418,6 +655,7 @@ def create_file(file_path: str, content: str, encoding: str = "text") -> str:
     os.makedirs(os.path.dirname(safe), exist_ok=True)
     with open(safe, "wb") as f:
         f.write(data)
+    _touched(safe)
     return f"Created {file_path} ({len(data)} bytes)"
 
 
@@ -475,6 +713,7 @@ def edit_file(file_path: str, old_text: str, new_text: str,
     updated = original.replace(old, new)
     with open(safe, "wb") as f:
         f.write(updated)
+    _touched(safe)
     plural = "s"
     if count == 1:
         plural = ""
@@ -495,6 +734,7 @@ def rename_file(src_path: str, dst_path: str) -> str:
         return f"Error: {src_path!r} is a directory, not a file"
     os.makedirs(os.path.dirname(safe_dst), exist_ok=True)
     os.rename(safe_src, safe_dst)
+    _touched(safe_src, safe_dst)
     return f"Renamed {src_path} -> {dst_path}"
 
 
@@ -515,6 +755,7 @@ def move_file(src_path: str, dst_path: str) -> str:
         safe_dst = os.path.join(safe_dst, os.path.basename(safe_src))
     os.makedirs(os.path.dirname(safe_dst), exist_ok=True)
     shutil.move(safe_src, safe_dst)
+    _touched(safe_src, safe_dst)
     dst_rel = os.path.relpath(safe_dst, os.path.realpath("."))
     return f"Moved {src_path} -> {dst_rel}"
 
@@ -536,6 +777,7 @@ def copy_file(src_path: str, dst_path: str) -> str:
         safe_dst = os.path.join(safe_dst, os.path.basename(safe_src))
     os.makedirs(os.path.dirname(safe_dst), exist_ok=True)
     shutil.copy2(safe_src, safe_dst)
+    _touched(safe_dst)
     dst_rel = os.path.relpath(safe_dst, os.path.realpath("."))
     return f"Copied {src_path} -> {dst_rel}"
 
@@ -598,6 +840,7 @@ def copy_bytes(src_path: str, dst_path: str,
         os.makedirs(os.path.dirname(safe_dst), exist_ok=True)
         with open(safe_dst, "ab") as f:
             f.write(data)
+        _touched(safe_dst)
         if existed:
             return f"Appended {len(data)} bytes to {dst_path} (from {src_path}[{a}:{b}])"
         return f"Created {dst_path} ({len(data)} bytes from {src_path}[{a}:{b}])"
@@ -621,6 +864,7 @@ def copy_bytes(src_path: str, dst_path: str,
     updated = original[:x] + data + original[y:]
     with open(safe_dst, "wb") as f:
         f.write(updated)
+    _touched(safe_dst)
     return (f"Replaced {dst_path}[{x}:{y}] ({y - x} bytes) with "
             f"{len(data)} bytes from {src_path}[{a}:{b}]")
 
@@ -637,6 +881,7 @@ def remove_file(file_path: str) -> str:
     if os.path.isdir(safe):
         return f"Error: {file_path!r} is a directory, not a file"
     os.remove(safe)
+    _touched(safe)
     return f"Removed {file_path}"
 
 
@@ -649,6 +894,7 @@ def create_directory(dir_path: str) -> str:
         return str(e)
     already_existed = os.path.isdir(safe)
     os.makedirs(safe, exist_ok=True)
+    _touched(safe)
     if already_existed:
         return f"Directory already exists: {dir_path}"
     return f"Created directory {dir_path}"
@@ -673,6 +919,7 @@ def move_directory(src_path: str, dst_path: str) -> str:
         return f"Error: cannot move {src_path!r} into itself"
     os.makedirs(os.path.dirname(safe_dst), exist_ok=True)
     shutil.move(safe_src, safe_dst)
+    _touched(safe_src, real_dst)
     dst_rel = os.path.relpath(real_dst, os.path.realpath("."))
     return f"Moved {src_path} -> {dst_rel}"
 
@@ -231,6 +231,10 @@ def build_parser():
     parser.add_argument("--model",
                         default=None,
                         help="model id (default: the `model` field in config.json)")
+    parser.add_argument("--warm-servers",
+                        action="store_true",
+                        help="start the MCP servers the tools use in the background "
+                             "right away, instead of on first use")
     parser.add_argument("--non-streaming",
                         action="store_true",
                         help="wait for the full response instead of streaming")
@@ -542,7 +546,9 @@ def main(argv=None):
     from cai import config
     from cai.environment import Environment
     from cai.agent import Run
-    from cai.api import OpenAiApi
+    from cai.api import OpenAiApi, batch_options, pool_options
+    from cai.context import ContextManager
+    from cai.result_cache import ResultCache
     from cai.ui import TerminalUI
 
     try:
@@ -592,7 +598,8 @@ def main(argv=None):
                        max_steps=args.max_steps,
                        resume_path=resume_path,
                        pick_session=pick_session,
-                       initial_prompt=prompt)
+                       initial_prompt=prompt,
+                       warm_servers=args.warm_servers)
 
     model = args.model or cfg.model
     env = Environment.default().load()
@@ -602,7 +609,18 @@ def main(argv=None):
     skills = Environment.merge_activations(args.skill, env.settings.skills)
     api = OpenAiApi(cfg.base_url,
                     api_key,
-                    ssl_verify=config.load_optional("ssl_verify", True))
+                    ssl_verify=config.load_optional("ssl_verify", True),
+                    prompt_cache=config.load_optional("prompt_cache", False),
+                    **batch_options(config.load_optional("stream_batch_ms"),
+                                    config.load_optional("stream_batch_max")),
+                    **pool_options(config.load_optional("api_pool_size"),
+                                   config.load_optional("api_keep_alive"),
+                                   config.load_optional("api_idle_timeout"),
+                                   config.load_optional("api_retries")))
+
+    # one cache for every run this invocation spawns (a --watch trigger reuses
+    # what the previous one read).
+    result_cache = ResultCache.for_settings(env.settings)
 
     def _driver(run):
         # the settings flag the TUI honors gates the headless stream too.
@@ -622,6 +640,12 @@ def main(argv=None):
                    temperature=args.temperature,
                    max_steps=args.max_steps,
                    tool_result_max_chars=env.settings.tool_result_max_chars,
+                   tool_workers=env.settings.tool_workers,
+                   speculate_tools=env.settings.speculate_tools,
+                   result_cache=result_cache,
+                   cache_tools=env.settings.cache_tools,
+                   context=ContextManager.for_settings(env.settings, api),
+                   warm_servers=args.warm_servers or env.settings.warm_servers,
                    stream=not args.non_streaming,
                    strict_format=args.strict_format)
 
@@ -21,6 +21,49 @@ Optional keys (read via load_optional, never required) may also appear:
                          python tool runs snippets under, instead of the managed
                          ~/.config/cai/venv. cai never builds, rebuilds or
                          deletes a user-supplied env.
+  python_workers       - warm jailed workers the python tool keeps per agent
+                         to fork snippets from (default 1; 0 spawns a fresh
+                         interpreter per call).
+  python_worker_uses   - snippets one worker serves before it is replaced
+                         (default 100).
+  python_call_workers  - how many calls of one tool_call_many() batch (or of
+                         the queued tool_call_async() futures) the python tool
+                         dispatches at once (default 8).
+  python_session       - true to make the python tool stateful: one long-lived
+                         sandboxed kernel per agent whose variables survive
+                         between calls (reset=True starts it afresh).
+  python_session_memory_mb  - the session kernel's address-space cap
+                         (default 4096).
+  python_session_cpu_seconds - the session kernel's total CPU-time budget
+                         (default unlimited).
+  fs_index             - true to have the built-in fs server keep an in-memory
+                         index of the tree (cai.fs_index): list_files answers
+                         from it and search takes files' binary flags from
+                         it. read by the fs server itself.
+  fs_trigram_index     - true to have the fs server keep a persistent trigram
+                         index (cai.trigram_index, under <config dir>/fs-index)
+                         so search hands rg only the files that can match.
+                         read by the fs server itself.
+  stream_batch_ms      - batch streamed tokens between the api's reader thread
+                         and the consumer: hand them over at most every this
+                         many milliseconds (e.g. 16), merged. unset streams
+                         token by token.
+  stream_batch_max     - with stream_batch_ms, hand a batch over early once it
+                         holds this many deltas (default 64).
+  api_pool_size        - keep-alive connections the api keeps per host
+                         (default 10).
+  api_keep_alive       - false to send 'Connection: close' and open a fresh
+                         connection per request, for proxies that mishandle
+                         reuse; default true.
+  api_idle_timeout     - seconds the connection pool may sit unused before
+                         its idle sockets are dropped (default 60; 0 never).
+  api_retries          - attempts a chat request gets before a transient
+                         failure (network error, 429, 5xx) is final
+                         (default 3).
+  prompt_cache         - true to mark each request's stable prefix (tools,
+                         system prompt, earlier turns) with prompt-cache
+                         breakpoints, for providers that cache only on request
+                         (Anthropic models via OpenRouter); default false.
 
 Every field, required or optional, can be SHADOWED from init.py: a cai.settings
 attribute of the same name that is not None wins over the config.json value
@@ -0,0 +1,389 @@
+"""context: fitting a long conversation into the model's context window.
+
+A run's `messages` grow without bound: every turn re-sends every old tool
+result, until the provider rejects the request. A ContextManager sits in front
+of each model call (call_llm's context=) and shrinks only the *outgoing* list
+to fit - the transcript itself (what is saved, resumed and shown) is never
+touched, so nothing is lost, only left unsent.
+
+The budget is the model's context length (ModelsRegistry.context_length, or an
+explicit/fallback limit) minus a reserve for the answer. Sizes come from
+cai.usage.estimate_tokens, calibrated against the prompt_tokens of the last
+real request (observe()), the same estimator the ctx readout uses.
+
+Over budget, the strategies run in order, each on the previous one's output,
+until the list fits:
+
+  StubToolResults - replace old tool results with a one-line stub
+  RollingWindow   - drop the oldest turns
+  Summarize       - replace the oldest turns with a model-written summary
+
+Every strategy keeps the list well-formed: a leading system message stays, a
+tool message is never separated from the assistant turn that called it, and
+messages are replaced by new dicts, never edited. A decision, once made, is
+remembered and re-applied on later turns (the same stubs, the same cut, the
+same summary), so the outgoing prefix stays stable for the prompt cache and
+the WireCache instead of shifting every turn.
+
+  context = ContextManager(strategies=[StubToolResults(), RollingWindow()])
+  call_llm(messages, model, api, context=context, ...)"""
+from __future__ import annotations
+
+import json
+import logging
+
+from cai import config
+from cai.models import ModelsRegistry
+from cai.usage import _CHARS_PER_TOKEN, estimate_tokens, message_chars
+
+
+log = logging.getLogger("cai")
+
+DEFAULT_RESERVE = 4096   # tokens kept free for the answer
+DEFAULT_LOW_WATER = 0.75  # a strategy that must act trims to this share of the budget
+
+_SUMMARY_PROMPT = ("Summarize the conversation below so it can continue without it: "
+                   "the user's goals, decisions made, facts and file paths learned, "
+                   "and work still pending. Be concise; plain text.")
+
+
+def _head(messages):
+    """how many leading system messages the list has - never trimmed."""
+    n = 0
+    while n < len(messages) and messages[n].get("role") == "system":
+        n += 1
+    return n
+
+
+def _cut_points(messages, start):
+    """the indices >= start a prefix may be cut at: any message but a tool
+    result, which must stay behind the assistant turn that called it."""
+    points = []
+    for i in range(start, len(messages)):
+        if messages[i].get("role") == "tool": continue
+        points.append(i)
+    return points
+
+
+def _index_of(messages, message, start=0):
+    """the index of `message` (by identity) in messages, or None."""
+    for i in range(start, len(messages)):
+        if messages[i] is message:
+            return i
+    return None
+
+
+def _elided(count):
+    return {"role": "user", "content": f"[{count} earlier messages elided to fit the context window]"}
+
+
+def _transcript(messages):
+    """messages as plain text for a summarizer: one 'role: content' block
+    each, tool calls as name(arguments)."""
+    blocks = []
+    for m in messages:
+        content = m.get("content")
+        if not isinstance(content, str):
+            content = json.dumps(content) if content is not None else ""
+        for tc in (m.get("tool_calls") or []):
+            fn = tc.get("function") or {}
+            content += f"\n{fn.get('name')}({fn.get('arguments') or ''})"
+        blocks.append(f"{m.get('role')}: {content}")
+    return "\n\n".join(blocks)
+
+
+class ContextManager:
+    """the pre-call trimming stage for one conversation.
+
+    limit          - the context window in tokens; None resolves the run's
+                     model through `models` (cache-only), then fallback_limit.
+                     no limit at all disables trimming.
+    strategies     - applied in order while the list is over budget.
+    reserve        - tokens kept free for the answer.
+    api            - what a Summarize without its own api calls (an Agent sets
+                     its own when this is None).
+
+    holds per-conversation state (calibration, the decisions strategies
+    remember): give each conversation its own - fork() makes one."""
+
+    def __init__(self,
+                 limit=None,
+                 strategies=None,
+                 *,
+                 reserve=DEFAULT_RESERVE,
+                 fallback_limit=None,
+                 low_water=DEFAULT_LOW_WATER,
+                 models=None,
+                 api=None):
+        self.limit = limit
+        self.strategies = list(strategies or [])
+        self.reserve = reserve
+        self.fallback_limit = fallback_limit
+        self.low_water = low_water
+        self.models = models
+        self.api = api
+        self.model = None   # the model of the call being fitted
+        self.budget = None
+        self.sample_tokens = 0
+        self.sample_chars = 0
+        self._memos = {}
+
+    @classmethod
+    def for_settings(cls, settings, api=None):
+        """the manager a CLI/TUI agent gets from cai.settings (context_strategies,
+        context_reserve, default_context_size), or None when no strategy is
+        set. strategy names: "stub", "window", "summarize"."""
+        if not settings.context_strategies:
+            return None
+        strategies = []
+        for name in settings.context_strategies:
+            factory = _STRATEGIES.get(name)
+            if factory is None:
+                log.warning("context: unknown strategy %r (known: %s)", name, ", ".join(_STRATEGIES))
+                continue
+            strategies.append(factory())
+        return cls(strategies=strategies,
+                   reserve=settings.context_reserve,
+                   fallback_limit=config.load_optional("default_context_size"),
+                   api=api)
+
+    def fork(self):
+        """a manager with the same configuration and none of this one's state,
+        for a cloned or child conversation."""
+        return ContextManager(self.limit,
+                              self.strategies,
+                              reserve=self.reserve,
+                              fallback_limit=self.fallback_limit,
+                              low_water=self.low_water,
+                              models=self.models,
+                              api=self.api)
+
+    def limit_for(self, model):
+        """the context window for `model`, or None when unknown."""
+        if self.limit:
+            return self.limit
+        if self.models is None:
+            self.models = ModelsRegistry()
+        limit = self.models.context_length(model) if model else None
+        return limit or self.fallback_limit
+
+    def estimate(self, messages):
+        return estimate_tokens(messages, self.sample_tokens, self.sample_chars)
+
+    def tokens(self, chars):
+        """the calibrated token count of `chars` characters."""
+        if self.sample_tokens and self.sample_chars:
+            return round(self.sample_tokens * chars / self.sample_chars)
+        return round(chars / _CHARS_PER_TOKEN)
+
+    @property
+    def target(self):
+        """what a strategy that has to act trims down to: below the budget,
+        so the next few turns fit without trimming again."""
+        return int(self.budget * self.low_water)
+
+    def memo(self, strategy):
+        """the dict `strategy` keeps its decisions for this conversation in."""
+        return self._memos.setdefault(id(strategy), {})
+
+    def observe(self, usage, messages):
+        """calibrate against a real request: `usage` is the provider's report
+        for the call that sent `messages`. (prompt_tokens also counts the tool
+        schemas, which message_chars does not - the estimate errs large.)"""
+        tokens = (usage or {}).get("prompt_tokens")
+        if not tokens: return
+        chars = message_chars(messages)
+        if not chars: return
+        self.sample_tokens = tokens
+        self.sample_chars = chars
+
+    def fit(self, messages, model=None):
+        """the list to send for `messages`: `messages` itself when it fits (or
+        no limit is known), else a trimmed copy. never mutates `messages`."""
+        limit = self.limit_for(model)
+        if not limit:
+            return messages
+        self.model = model
+        self.budget = max(1, limit - self.reserve)
+        if self.estimate(messages) <= self.budget:
+            return messages
+        out = messages
+        for strategy in self.strategies:
+            out = strategy(out, self)
+            if self.estimate(out) <= self.budget:
+                break
+        else:
+            log.warning("context: %d messages still ~%d tokens over a %d budget after trimming",
+                        len(out), self.estimate(out) - self.budget, self.budget)
+        log.debug("context: sending %d of %d messages (~%d tokens, budget %d)",
+                  len(out), len(messages), self.estimate(out), self.budget)
+        return out
+
+
+class StubToolResults:
+    """replace the content of old tool results with a one-line stub, oldest
+    first, until the list fits the manager's target. the last `keep_last` tool
+    results and any shorter than `min_chars` are left alone. the tool message
+    itself stays, so its tool_call_id still answers its call."""
+
+    def __init__(self, keep_last=4, min_chars=200):
+        self.keep_last = keep_last
+        self.min_chars = min_chars
+
+    def __call__(self, messages, context):
+        memo = context.memo(self)
+        stubs = memo.get("stubs", {})   # id(original) -> (original, stub)
+        tools = []
+        for i, m in enumerate(messages):
+            if m.get("role") == "tool": tools.append(i)
+        if self.keep_last:
+            tools = tools[:-self.keep_last]
+        out = list(messages)
+        kept = {}
+        # re-apply the stubs of earlier turns first: the same messages stay
+        # stubbed, so the prefix sent last turn is sent again unchanged.
+        for i in tools:
+            entry = stubs.get(id(out[i]))
+            if entry is None or entry[0] is not out[i]: continue
+            kept[id(out[i])] = entry
+            out[i] = entry[1]
+        tokens = context.estimate(out)
+        for i in tools:
+            if tokens <= context.target: break
+            original = out[i]
+            if id(original) in kept: continue
+            content = original.get("content")
+            if not isinstance(content, str) or len(content) < self.min_chars: continue
+            stub = dict(original)
+            stub["content"] = f"[tool result elided to fit the context window: {len(content)} chars]"
+            kept[id(original)] = (original, stub)
+            out[i] = stub
+            tokens -= context.tokens(len(content) - len(stub["content"]))
+        memo["stubs"] = kept
+        return out
+
+
+class RollingWindow:
+    """drop the oldest turns until the list fits the manager's target, always
+    keeping the last `keep_last` messages. a marker user message says how many
+    were dropped. the cut only moves forward: while it still fits, a later turn
+    cuts at the same message as the last one."""
+
+    def __init__(self, keep_last=8):
+        self.keep_last = keep_last
+
+    def __call__(self, messages, context):
+        memo = context.memo(self)
+        head = _head(messages)
+        points = _cut_points(messages, head + 1)
+        if not points:
+            return messages
+        last = max(head + 1, len(messages) - self.keep_last)
+        first = memo.get("first")
+        cut = None
+        if first is not None:
+            cut = _index_of(messages, first, head)
+        if cut is not None and context.estimate(self._window(messages, head, cut)) <= context.budget:
+            return self._window(messages, head, cut)
+        candidates = []
+        for point in points:
+            if cut is not None and point < cut: continue
+            if point > last: break
+            candidates.append(point)
+        if not candidates:
+            return messages
+        chosen = candidates[-1]
+        excess = context.estimate(messages) - context.target
+        dropped = 0
+        start = head
+        for point in candidates:
+            dropped += message_chars(messages[start:point])
+            start = point
+            if context.tokens(dropped) >= excess:
+                chosen = point
+                break
+        memo["first"] = messages[chosen]
+        return self._window(messages, head, chosen)
+
+    def _window(self, messages, head, cut):
+        out = list(messages[:head])
+        out.append(_elided(cut - head))
+        out.extend(messages[cut:])
+        return out
+
+
+class Summarize:
+    """replace everything but the last `keep_last` messages with a summary the
+    model writes (a user message), then reuse that summary on later turns until
+    the list outgrows the budget again - at which point the old summary and the
+    turns since are summarized together.
+
+    summarize is a callable(messages, model) -> str; None asks `api` (or the
+    manager's api) for a non-streamed completion with `model` (or the run's).
+    it runs inside the loop, so it blocks the driver for that one call (under
+    asyncio, a worker thread - never the event loop)."""
+
+    def __init__(self, summarize=None, *, api=None, model=None, keep_last=8):
+        self.summarize = summarize
+        self.api = api
+        self.model = model
+        self.keep_last = keep_last
+
+    def __call__(self, messages, context):
+        memo = context.memo(self)
+        head = _head(messages)
+        out = messages
+        first = memo.get("first")
+        if first is not None:
+            index = _index_of(messages, first, head)
+            if index is not None:
+                out = list(messages[:head])
+                out.append(memo["summary"])
+                out.extend(messages[index:])
+                if context.estimate(out) <= context.budget:
+                    return out
+        # out's head is followed by the previous summary (if any), so a
+        # re-summary folds it in with the turns since.
+        points = _cut_points(out, head + 1)
+        last = len(out) - self.keep_last
+        cut = None
+        for point in points:
+            if point > last: break
+            cut = point
+        if cut is None:
+            return out
+        text = self._summarize(out[head:cut], context)
+        if not text:
+            return out
+        summary = {"role": "user", "content": f"[summary of the earlier conversation]\n{text}"}
+        memo["first"] = out[cut]
+        memo["summary"] = summary
+        trimmed = list(out[:head])
+        trimmed.append(summary)
+        trimmed.extend(out[cut:])
+        return trimmed
+
+    def _summarize(self, messages, context):
+        model = self.model or context.model
+        if self.summarize is not None:
+            return self.summarize(messages, model)
+        api = self.api or context.api
+        if api is None:
+            log.warning("context: Summarize has no api to call - skipped")
+            return None
+        request = []
+        request.append({"role": "system", "content": _SUMMARY_PROMPT})
+        request.append({"role": "user", "content": _transcript(messages)})
+        try:
+            content, _reasoning, _tool_calls, _usage = api.chat(request, model, tools=None, stream=False)
+        except Exception as e:
+            log.warning("context: summarizing failed: %s", e)
+            return None
+        return content
+
+
+_STRATEGIES = {
+    "stub": StubToolResults,
+    "window": RollingWindow,
+    "summarize": Summarize,
+}
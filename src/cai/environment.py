@@ -100,6 +100,23 @@ class Settings:
     show_chips_tools: bool = False
     show_chips_subagents: bool = False
     tool_result_max_chars: int = 40_000
+    # >1 runs up to this many parallel-safe tool calls of one turn at once.
+    tool_workers: int = 1
+    # start read-only tool calls while the model is still streaming its turn.
+    speculate_tools: bool = False
+    # tools whose results are memoized (e.g. fs__read_file, fs__search,
+    # fs__list_files), and the cache's bounds - see cai.result_cache.
+    cache_tools: list = field(default_factory=list)
+    tool_cache_ttl: float = 300.0
+    tool_cache_size: int = 256
+    # how an over-long conversation is fit into the model's context window
+    # before each call, in order: "stub", "window", "summarize" - see
+    # cai.context. empty sends everything. the reserve is kept for the answer.
+    context_strategies: list = field(default_factory=list)
+    context_reserve: int = 4096
+    # spawn the MCP servers an agent's tools reference in the background at
+    # construction, rather than on first use (cai --warm-servers).
+    warm_servers: bool = False
     auto_save_sessions: bool = True
     max_sessions_mb: int = 500
     skills: list = field(default_factory=list)
@@ -114,6 +131,15 @@ class Settings:
     python_base: str = None
     python_sandbox: str = None
     python_venv: str = None
+    python_workers: int = None
+    python_worker_uses: int = None
+    python_call_workers: int = None
+    python_session: bool = None
+    python_session_memory_mb: int = None
+    python_session_cpu_seconds: int = None
+    stream_batch_ms: int = None
+    stream_batch_max: int = None
+    prompt_cache: bool = None
 
 
 def extensions_dir():
@@ -323,13 +349,15 @@ class Environment:
         return dict(self._function_tools)
 
     def register_server(self, name, command=None, url=None, env=None, headers=None, cwd=None,
-                        ssl_verify=True):
+                        ssl_verify=True, timeout=None):
         """declare a named MCP server (cai.mcp_server's backing), the
         programmatic counterpart to dropping a <name>.py into an mcps/ dir.
         exactly one of `command` (a stdio server: an argv list, with optional
         env/cwd) or `url` (a remote Streamable-HTTP server, with optional
         headers, and ssl_verify=False to skip certificate verification) must be
-        given. its tools surface namespaced '<name>__<tool>' like any MCP
+        given. timeout (seconds) bounds each request to a command server (None
+        waits as long as a tool takes) and is the read timeout of a url one.
+        its tools surface namespaced '<name>__<tool>' like any MCP
         server's. a later declaration of the same name wins."""
         if command is None and url is None:
             raise ValueError(f"MCP server {name!r}: give command= or url=")
@@ -350,12 +378,16 @@ class Environment:
                 spec["env"] = dict(env)
             if cwd is not None:
                 spec["cwd"] = cwd
+            if timeout is not None:
+                spec["timeout"] = timeout
         else:
             spec["url"] = url
             if headers is not None:
                 spec["headers"] = dict(headers)
             if not ssl_verify:
                 spec["ssl_verify"] = False
+            if timeout is not None:
+                spec["timeout"] = timeout
         self._declared_servers[name] = spec
 
     def server_spec(self, name):
@@ -431,26 +463,34 @@ class Environment:
         `tools=` accepts: the registered function tools (their exposed names)
         followed by every MCP tool ('<mcp_name>__<tool_name>') the servers
         expose - declared via cai.mcp_server first, then across the mcp dirs.
-        each MCP server is spawned (or, when remote, contacted) briefly to list
-        its tools and then closed - nothing is left running. a declared server
+        each MCP server is acquired from the ServerPool (spawned, or when remote
+        contacted, unless the pool holds one) to list its tools and released
+        again - it idles warm for the registry that wants it next; a server file
+        whose catalogue is in the SchemaCache (unchanged since) isn't spawned. a declared server
         shadows an on-disk one of the same name, and an extension file shadows a
         builtin; a server that fails to start is logged and skipped."""
-        from cai.tools import LocalMCPServer, server_from_spec
+        from cai.schema_cache import SchemaCache
+        from cai.server_pool import ServerPool, server_key
+        from cai.tools import server_from_spec
+
+        pool = ServerPool.default()
 
         names = list(self._function_tools.keys())
         seen_labels = set()
         for label in sorted(self._declared_servers.keys()):
             seen_labels.add(label)
+            spec = self._declared_servers[label]
             server = None
             try:
-                server = server_from_spec(label, self._declared_servers[label])
+                server = pool.acquire(server_key(label, spec, spec.get("env")),
+                                      lambda: server_from_spec(label, spec))
                 for tool in server.list_tools():
                     names.append(f"{label}__{tool['name']}")
             except Exception as e:
                 log.error("available_tools: declared server %r failed: %s", label, e)
             finally:
                 if server is not None:
-                    server.close()
+                    pool.release(server)
         for directory in self.mcp_dirs():
             if not os.path.isdir(directory): continue
             for filename in sorted(os.listdir(directory)):
@@ -462,12 +502,18 @@ class Environment:
                 path = os.path.join(directory, filename)
                 server = None
                 try:
-                    server = LocalMCPServer([sys.executable, path], label)
-                    for tool in server.list_tools():
+                    tools = SchemaCache.default().get(path)
+                    if tools is None:
+                        spec = {"command": [sys.executable, path]}
+                        server = pool.acquire(server_key(label, spec),
+                                              lambda: server_from_spec(label, spec))
+                        tools = server.list_tools()
+                        SchemaCache.default().put(path, tools)
+                    for tool in tools:
                         names.append(f"{label}__{tool['name']}")
                 except Exception as e:
                     log.error("available_tools: %r failed: %s", path, e)
                 finally:
                     if server is not None:
-                        server.close()
+                        pool.release(server)
         return names
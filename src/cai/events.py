@@ -35,7 +35,8 @@ class Event:
       reasoning   - text
       tool_call   - tool_name / tool_args / tool_call_id
       tool_result - tool_name / tool_result / tool_call_id / is_error
-      usage       - usage
+      usage       - usage (the provider's report, plus a neutral cached_tokens
+                    when it counted prompt-cache reads)
     """
     type: str
     text: Optional[str] = None
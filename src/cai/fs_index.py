@@ -0,0 +1,278 @@
+"""fs_index: an in-memory file index for the fs server's read-only tools.
+
+Without it, every fs__list_files call walks the whole tree (a listdir plus an
+isdir per entry) before it filters and paginates, and every fs__search reads
+the head of each file it finds a match in to tell whether it is binary. On a
+tree of millions of files that costs seconds, and the model calls them
+repeatedly.
+
+A FileIndex holds one directory tree in memory: per directory its
+subdirectories and files, per file its size, mtime and - sniffed lazily, the
+first time a search needs it - whether it is binary. It is built once, on
+first use, and kept fresh by an mtime scan: before each query every indexed
+directory is stat()ed, and only those whose mtime moved are listed again (a
+directory's mtime changes whenever an entry is created, removed or renamed
+in it). A directory modified within _RACY_NS of the scan could change again
+within the same mtime tick, so it is listed again on the next scan too. The
+fs server's own mutating tools also invalidate() what they touch.
+
+  index = FileIndex.for_path(root)   # the index covering root
+  index.listing(root)                # ["file  a.py", "dir  src", ...]
+  index.is_binary(path)              # file path binary? (NUL in 8KB)
+
+The listing is exactly list_files' own ("<kind>  <rel-path>", shallowest
+first, then by name; .git and __pycache__ skipped) and is cached until the
+tree changes. Thread-safe. Stdlib-only."""
+from __future__ import annotations
+
+import os
+import threading
+import time
+
+
+_SKIP = (".git", "__pycache__")
+
+# a directory whose mtime is this close to the scan is listed again next time.
+_RACY_NS = 2 * 10**9
+
+# how many roots the server keeps an index for at once.
+_MAX_INDEXES = 4
+
+
+class _Dir:
+    """one indexed directory: its mtime when last listed (None: list it on
+    the next scan), child directories by name, and files by name as
+    [size, mtime_ns, binary-or-None]. a `leaf` is a symlink back to one of
+    its own ancestors: listed as a dir, never descended into."""
+    __slots__ = ("mtime", "dirs", "files", "leaf")
+
+    def __init__(self, leaf=False):
+        self.mtime = None
+        self.dirs = {}
+        self.files = {}
+        self.leaf = leaf
+
+
+def _is_binary(path):
+    """the fs server's sniff: binary if the first 8KB contain a NUL."""
+    with open(path, "rb") as f:
+        return b"\x00" in f.read(8192)
+
+
+class FileIndex:
+    """one root's tree, in memory. see the module docstring."""
+
+    _indexes = {}
+    _indexes_lock = threading.Lock()
+
+    def __init__(self, root):
+        self.root = root
+        self._top = _Dir()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._listings = {}   # rel root -> (generation, entries)
+        self.scans = 0
+        self.relisted = 0
+
+    @classmethod
+    def for_path(cls, path):
+        """the index covering `path`: an existing one whose root contains it,
+        else a new one rooted at the working directory when path is inside it,
+        else one rooted at path itself (a scratch dir, an allowed path)."""
+        path = os.path.realpath(path)
+        with cls._indexes_lock:
+            for root, index in cls._indexes.items():
+                if _within(path, root):
+                    return index
+            cwd = os.path.realpath(os.getcwd())
+            root = cwd if _within(path, cwd) else path
+            if len(cls._indexes) >= _MAX_INDEXES:
+                cls._indexes.pop(next(iter(cls._indexes)))
+            index = cls(root)
+            cls._indexes[root] = index
+            return index
+
+    @classmethod
+    def invalidate(cls, path):
+        """a tool changed `path`: list its directory again on the next scan,
+        whatever its mtime says."""
+        path = os.path.realpath(path)
+        with cls._indexes_lock:
+            indexes = list(cls._indexes.values())
+        for index in indexes:
+            if _within(path, index.root):
+                index._mark(os.path.dirname(path))
+
+    def _mark(self, path):
+        with self._lock:
+            node = self._node(path)
+            if node is not None:
+                node.mtime = None
+
+    def _node(self, path):
+        """the _Dir for absolute `path`, or None when it is not indexed."""
+        rel = os.path.relpath(os.path.realpath(path), self.root)
+        node = self._top
+        if rel == ".":
+            return node
+        for part in rel.split(os.sep):
+            node = node.dirs.get(part)
+            if node is None:
+                return None
+        return node
+
+    # --- freshness ------------------------------------------------------------
+
+    def refresh(self):
+        """bring the tree up to date: list every directory that is new or
+        whose mtime moved; stat() the rest."""
+        with self._lock:
+            self._refresh()
+
+    def _refresh(self):
+        self.scans += 1
+        now = time.time_ns()
+        changed = False
+        stack = [(self._top, self.root)]
+        while stack:
+            node, path = stack.pop()
+            if node.leaf: continue
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                mtime = None
+            if node.mtime is None or node.mtime != mtime:
+                changed = self._list(node, path) or changed
+                node.mtime = mtime
+                if mtime is not None and now - mtime < _RACY_NS:
+                    node.mtime = None
+            for name, child in node.dirs.items():
+                stack.append((child, os.path.join(path, name)))
+        if changed:
+            self._generation += 1
+
+    def _list(self, node, path):
+        """list `path` into `node`, keeping the subtrees and sniffed flags of
+        entries that are still there. True if anything changed."""
+        self.relisted += 1
+        dirs = {}
+        files = {}
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.name in _SKIP: continue
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        child = node.dirs.get(entry.name)
+                        if child is None:
+                            child = _Dir(leaf=entry.is_symlink() and _loops(entry.path))
+                        dirs[entry.name] = child
+                        continue
+                    try:
+                        st = entry.stat()
+                        size, mtime = st.st_size, st.st_mtime_ns
+                    except OSError:
+                        size, mtime = 0, 0
+                    old = node.files.get(entry.name)
+                    binary = None
+                    if old is not None and old[0] == size and old[1] == mtime:
+                        binary = old[2]
+                    files[entry.name] = [size, mtime, binary]
+        except OSError:
+            pass
+        changed = dirs.keys() != node.dirs.keys() or files.keys() != node.files.keys()
+        node.dirs = dirs
+        node.files = files
+        return changed
+
+    # --- queries --------------------------------------------------------------
+
+    def listing(self, path):
+        """every entry under `path` as list_files prints it, shallowest
+        first then by name - cached until the tree changes. None when `path`
+        is not an indexed directory."""
+        with self._lock:
+            self._refresh()
+            node = self._node(path)
+            if node is None:
+                return None
+            rel_root = os.path.relpath(os.path.realpath(path), self.root)
+            cached = self._listings.get(rel_root)
+            if cached is not None and cached[0] == self._generation:
+                return cached[1]
+            entries = []
+            for rel, kind, _record in self._walk(node, ""):
+                entries.append(f"{kind}  {rel}")
+
+            def depth_then_name(entry):
+                rel = entry.split("  ", 1)[1]
+                return rel.count(os.sep), rel
+            entries.sort(key=depth_then_name)
+            self._listings[rel_root] = (self._generation, entries)
+            return entries
+
+    def _walk(self, node, prefix):
+        """(rel path, "file"/"dir", file record or None) for everything under
+        node."""
+        stack = [(node, prefix)]
+        while stack:
+            node, prefix = stack.pop()
+            for name, record in node.files.items():
+                yield os.path.join(prefix, name), "file", record
+            for name, child in node.dirs.items():
+                rel = os.path.join(prefix, name)
+                yield rel, "dir", None
+                stack.append((child, rel))
+
+    def is_binary(self, path):
+        """the binary flag of file `path`, from the index when it is current;
+        sniffed (and remembered) otherwise. a file rewritten in place leaves
+        its directory's mtime alone, so its own size/mtime is checked."""
+        path = os.path.realpath(path)
+        with self._lock:
+            node = self._node(os.path.dirname(path))
+            record = None
+            if node is not None:
+                record = node.files.get(os.path.basename(path))
+            if record is None:
+                return _is_binary(path)
+            return _sniff(path, record)
+
+    def stats(self):
+        """the counters as a dict: scans, relisted, generation."""
+        with self._lock:
+            stats = {}
+            stats['scans'] = self.scans
+            stats['relisted'] = self.relisted
+            stats['generation'] = self._generation
+            return stats
+
+
+def _sniff(path, record):
+    """the binary flag of the file `record` indexes at `path`, re-sniffed
+    when its size or mtime moved. an unreadable file counts as text."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    if record[0] != st.st_size or record[1] != st.st_mtime_ns:
+        record[0], record[1], record[2] = st.st_size, st.st_mtime_ns, None
+    if record[2] is None:
+        try:
+            record[2] = _is_binary(path)
+        except OSError:
+            record[2] = False
+    return record[2]
+
+
+def _loops(path):
+    """whether symlinked directory `path` points at one of its ancestors."""
+    target = os.path.realpath(path)
+    return _within(os.path.dirname(os.path.abspath(path)), target)
+
+
+def _within(path, root):
+    return path == root or path.startswith(root.rstrip(os.sep) + os.sep)
@@ -144,6 +144,8 @@ class RunGate:
     messages: list
     usage: Optional[dict]
     hooks_data: Optional[dict]
+    # the run's interrupt Event: a tool blocked on a server gives up once set.
+    interrupt: Optional[object] = None
 
 
 def set_gate(gate):
@@ -166,6 +168,17 @@ def gated_dispatch(gate, name, args, call_id="tool"):
     dispatch, fire after, return the result. unlike the loop it does NOT append a
     tool message or fire messages_mutated - an inner call's result goes back to
     its caller, never into the conversation."""
+    pending, refusal = gated_before(gate, name, args, call_id)
+    if refusal is not None:
+        return refusal
+    return gated_after(gate, pending, gate.dispatch(name, args))
+
+
+def gated_before(gate, name, args, call_id="tool"):
+    """gated_dispatch's first half, for a caller that dispatches several calls
+    side by side but fires their hooks one at a time, in order (as the loop
+    does): fire before_tool_call. returns (pending, refusal) - refusal is the
+    veto's Error string, else None and `pending` goes to gated_after."""
     tool_call = ToolCall(name=name, arguments=json.dumps(args), args=args, id=call_id)
     data = dict(gate.hooks_data or {})
     before = HookContext(event=HookEvent.BEFORE_TOOL_CALL,
@@ -181,8 +194,15 @@ def gated_dispatch(gate, name, args, call_id="tool"):
         if response is False:
             vetoed = True
     if vetoed:
-        return f"Error: tool '{name}' was aborted by a before_tool_call hook"
-    result = gate.dispatch(name, args)
+        return None, f"Error: tool '{name}' was aborted by a before_tool_call hook"
+    return (tool_call, data), None
+
+
+def gated_after(gate, pending, result):
+    """gated_dispatch's second half: fire after_tool_call for the call
+    gated_before let through, with its dispatch `result`; returns the result
+    as a string."""
+    tool_call, data = pending
     if result is None:
         result = ""
     result = str(result)
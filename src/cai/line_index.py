@@ -0,0 +1,158 @@
+"""line_index: sparse line-offset checkpoints for fs__read_file on huge text files.
+
+Without it, fs__read_file(line_start=N) reads a text file line by line from
+the top until it reaches line N: paging through a 5GB log at line 40 million
+re-reads gigabytes on every call, and reading its last lines means reading
+all of it.
+
+A LineIndex holds, for one file, a checkpoint at the first line boundary past
+every _BLOCK bytes: its byte offset and the number of the line starting there.
+It is built once through an mmap (per block, one find and one count - no
+Python loop over lines) and reused while the file's size and mtime stay the
+same. A file that only grew - a log being written - is scanned from its last
+checkpoint on, when the bytes just before that checkpoint are still the same.
+
+  index = LineIndex.for_file(path)     # None: read it from the top
+  index.lines                          # how many lines the file has
+  index.checkpoint(line)               # (offset, number) at or before line
+
+Lines are counted the way Python's text mode reads them, so the numbers match
+a plain read. A file with a lone CR (a line break Python's universal newlines
+see but a newline count does not) gets no index. The fs server's own mutating
+tools also invalidate() what they touch. Thread-safe. Stdlib-only."""
+from __future__ import annotations
+
+import array
+import bisect
+import mmap
+import os
+import threading
+
+
+# bytes between checkpoints: a read past a checkpoint skips at most about this.
+_BLOCK = 1 << 20
+
+# how many files the server keeps an index for at once.
+_MAX_FILES = 16
+
+# bytes before the last checkpoint compared to tell that a file only grew.
+_MARK_BYTES = 64
+
+
+class LineIndex:
+    """one file's checkpoints. see the module docstring."""
+
+    _indexes = {}
+    _indexes_lock = threading.Lock()
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._reset()
+        self.scanned = 0
+
+    def _reset(self):
+        self.size = None
+        self.mtime = None
+        self.usable = True
+        self.lines = 0
+        self._offsets = array.array("Q", [0])
+        self._numbers = array.array("Q", [1])
+        self._mark = b""
+
+    @classmethod
+    def for_file(cls, path):
+        """the up-to-date index of text file `path`; None when it cannot have
+        one (a lone CR). Raises OSError when the file cannot be read."""
+        path = os.path.realpath(path)
+        st = os.stat(path)
+        with cls._indexes_lock:
+            index = cls._indexes.pop(path, None)
+            if index is None:
+                index = cls(path)
+            if len(cls._indexes) >= _MAX_FILES:
+                cls._indexes.pop(next(iter(cls._indexes)))
+            cls._indexes[path] = index          # most recently used last
+        with index._lock:
+            index._update(st)
+            if not index.usable:
+                return None
+            return index
+
+    @classmethod
+    def invalidate(cls, path):
+        """a tool changed `path`: build its index again on the next read."""
+        with cls._indexes_lock:
+            cls._indexes.pop(os.path.realpath(path), None)
+
+    def checkpoint(self, line):
+        """(byte offset, line number) of the last checkpoint at or before
+        1-based `line`."""
+        with self._lock:
+            i = bisect.bisect_right(self._numbers, line) - 1
+            if i < 0:
+                i = 0
+            return self._offsets[i], self._numbers[i]
+
+    def _update(self, st):
+        if st.st_size == self.size and st.st_mtime_ns == self.mtime:
+            return
+        with open(self.path, "rb") as f:
+            if st.st_size == 0:
+                self._reset()
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if self.size is None or not self._grew(mm):
+                        self._reset()
+                    self._scan(mm)
+        self.size = st.st_size
+        self.mtime = st.st_mtime_ns
+
+    def _grew(self, mm):
+        """whether the mapped file is the indexed one with bytes appended."""
+        done = self._offsets[-1]
+        if len(mm) < self.size:
+            return False
+        return mm[done - len(self._mark):done] == self._mark
+
+    def _scan(self, mm):
+        """checkpoint `mm` from the last checkpoint on, then count the lines
+        of what follows it."""
+        size = len(mm)
+        pos = self._offsets[-1]
+        number = self._numbers[-1]
+        while self.usable:
+            cut = -1
+            if pos + _BLOCK < size:
+                cut = mm.find(b"\n", pos + _BLOCK)
+            if cut < 0 or cut + 1 >= size:
+                break
+            cut += 1
+            block = mm[pos:cut]
+            self.scanned += len(block)
+            number += block.count(b"\n")
+            if block.count(b"\r") != block.count(b"\r\n"):
+                self.usable = False
+            self._offsets.append(cut)
+            self._numbers.append(number)
+            pos = cut
+        self._mark = mm[max(pos - _MARK_BYTES, 0):pos]
+        rest = mm[pos:size]
+        self.scanned += len(rest)
+        crs = rest.count(b"\r") - rest.count(b"\r\n")
+        if rest.endswith(b"\r"):
+            crs -= 1                               # a CR the next append may pair
+        if crs:
+            self.usable = False
+        self.lines = number - 1 + rest.count(b"\n")
+        if rest and not rest.endswith(b"\n"):
+            self.lines += 1
+
+    def stats(self):
+        """the counters as a dict: lines, checkpoints, scanned (bytes)."""
+        with self._lock:
+            stats = {}
+            stats['lines'] = self.lines
+            stats['checkpoints'] = len(self._offsets)
+            stats['scanned'] = self.scanned
+            return stats
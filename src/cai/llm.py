@@ -15,17 +15,33 @@ a tool, rewrite the final answer, or react to a finished turn.
       answer = stop.value           # the final assistant text
 
 This is the smallest loop still faithful to cai's design: streaming, tool
-dispatch, and the hook events. Steering, interrupts, strict-format, context
-trimming, and stuck detection are deliberately left to later layers.
+dispatch, and the hook events. Steering, interrupts, strict-format and stuck
+detection are left to later layers; context trimming is a pluggable stage
+(context=, see cai.context) that shrinks each outgoing request, never the
+transcript.
 
 Layering note: unlike cai's call_llm (which leaves the final assistant message
 for a higher `enrich` layer to append), this version appends it to `messages`
-itself, so `messages` is the complete transcript once the call returns."""
+itself, so `messages` is the complete transcript once the call returns.
+
+The loop itself (_loop) does no I/O: it yields Events plus two effects - a
+_ModelTurn (one model call) and a _ToolRun (one tool dispatch) - and is sent
+back each effect's result. call_llm drives it blocking; async_call_llm drives
+the very same loop over an asyncio api, so one event loop can carry hundreds
+of concurrent runs with no thread parked per request:
+
+  stream = async_call_llm(messages, model, async_api, tools=..., tools_dispatch=...)
+  async for event in stream:
+      ...
+  answer = stream.text"""
 from __future__ import annotations
 
+import asyncio
+import contextvars
 import json
 import logging
 import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from cai.events import Event, EventType
 from cai.hooks import HookContext, HookEvent, HooksRegistry, RunGate, ToolCall
@@ -35,6 +51,9 @@ from cai.ui import NULL_UI
 
 log = logging.getLogger("cai")
 
+# the worker bound for speculative tool calls when tool_workers is lower.
+_SPECULATE_WORKERS = 4
+
 
 class LLMError(Exception):
     pass
@@ -161,29 +180,223 @@ def _dispatch_tool(tools_dispatch, name, args):
     return str(result)
 
 
-def _turn(api,
-          call_messages,
-          model,
-          tools,
-          tool_choice,
-          reasoning_effort,
-          temperature,
-          stream,
-          interrupt):
+class _ModelTurn:
+    """an effect the loop yields: one model call for its driver to perform.
+    the driver sends back (content, reasoning, tool_calls, usage)."""
+
+    def __init__(self,
+                 call_messages,
+                 model,
+                 tools,
+                 tool_choice,
+                 reasoning_effort,
+                 temperature,
+                 stream,
+                 interrupt,
+                 wire_cache=None,
+                 speculate=None):
+        self.call_messages = call_messages
+        self.model = model
+        self.tools = tools
+        self.tool_choice = tool_choice
+        self.reasoning_effort = reasoning_effort
+        self.temperature = temperature
+        self.stream = stream
+        self.interrupt = interrupt
+        self.wire_cache = wire_cache
+        # a _Speculate when read-only tools may start while the turn streams.
+        self.speculate = speculate
+
+
+def _chat_extras(turn, speculation=None):
+    """the optional api.chat kwargs of one turn - passed only when set, so an
+    api without them keeps working."""
+    extras = {}
+    if turn.wire_cache is not None:
+        extras['wire_cache'] = turn.wire_cache
+    if speculation is not None:
+        extras['on_tool_call'] = speculation.start
+    return extras
+
+
+class _ToolRun:
+    """an effect the loop yields: one tool dispatch for its driver to perform.
+    the driver sends back the result string (see _dispatch_tool). call_id ties
+    it to the model's call, so a driver can hand back a speculative result."""
+
+    def __init__(self, dispatch, name, args, call_id=None):
+        self.dispatch = dispatch
+        self.name = name
+        self.args = args
+        self.call_id = call_id
+
+
+class _Fit:
+    """an effect the loop yields: fit one request into the model's window
+    through a cai.context.ContextManager. the driver sends back the fitted
+    messages. it is an effect because a summarizing strategy makes a blocking
+    model call of its own, which the asyncio driver keeps off the event loop."""
+
+    def __init__(self, context, call_messages, model):
+        self.context = context
+        self.call_messages = call_messages
+        self.model = model
+
+
+class _ToolBatch:
+    """an effect the loop yields: several parallel-safe _ToolRuns for its driver
+    to perform concurrently, on at most `workers` threads at once. the driver
+    sends back their result strings in the runs' order."""
+
+    def __init__(self, runs, workers):
+        self.runs = runs
+        self.workers = workers
+
+
+def _dispatch_batch(batch, speculation=None):
+    """perform a _ToolBatch on a bounded thread pool. each run gets a copy of
+    this context, so the run gate and scratch provider reach the tool exactly
+    as they would inline."""
+    workers = min(batch.workers, len(batch.runs))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cai-tool") as pool:
+        futures = []
+        for run in batch.runs:
+            context = contextvars.copy_context()
+            futures.append(pool.submit(context.run, _perform_tool, run, speculation))
+        return [future.result() for future in futures]
+
+
+async def _aperform_tool(run, speculation):
+    """_perform_tool for the asyncio driver: a worker thread (asyncio.to_thread
+    carries the context along), or the speculative twin's future."""
+    if speculation is not None:
+        future = speculation.claim(run)
+        if future is not None:
+            return await asyncio.wrap_future(future)
+    return await asyncio.to_thread(_dispatch_tool, run.dispatch, run.name, run.args)
+
+
+async def _adispatch_batch(batch, speculation=None):
+    """_dispatch_batch for the asyncio driver: at most batch.workers runs at
+    once."""
+    limit = asyncio.Semaphore(batch.workers)
+
+    async def one(run):
+        async with limit:
+            return await _aperform_tool(run, speculation)
+    return list(await asyncio.gather(*[one(run) for run in batch.runs]))
+
+
+class _Speculate:
+    """what a _ModelTurn needs to speculate: the dispatcher, the read_only(name)
+    predicate picking the tools safe to start early, the worker bound, and the
+    run gate a speculated call runs under."""
+
+    def __init__(self, dispatch, read_only, workers, gate=None):
+        self.dispatch = dispatch
+        self.read_only = read_only
+        self.workers = workers
+        self.gate = gate
+
+
+class _Speculation:
+    """read-only tool calls started while their turn is still streaming: the
+    api reports each call once its arguments are complete (on_tool_call), and a
+    read-only one starts on a worker thread right away, overlapping the rest of
+    the generation. the loop still decides every call after the turn, in
+    order, with its hooks: a _ToolRun that matches a started call (same id,
+    name and arguments) takes its result instead of dispatching again. what is
+    never claimed - a vetoed call, an interrupted turn - is discarded: the
+    tools are read-only, so running one for nothing costs only its time. once
+    a call that is not read-only is announced, nothing after it in the turn
+    speculates: a read behind a write must see the write. each call runs in a
+    copy of the driver's context (on_tool_call may come from a pump thread,
+    which has none) with the run gate published, so an MCP call still gives up
+    on the run's interrupt."""
+
+    def __init__(self, speculate):
+        self._speculate = speculate
+        self._context = contextvars.copy_context()
+        self._pool = ThreadPoolExecutor(max_workers=speculate.workers,
+                                        thread_name_prefix="cai-speculate")
+        self._lock = threading.Lock()
+        self._started = {}   # call id -> (name, args, future)
+        self._stopped = False
+
+    def start(self, call):
+        """on_tool_call: start `call` if it is a read-only call with arguments
+        that parse."""
+        function = call.get('function') or {}
+        name = function.get('name')
+        call_id = call.get('id')
+        if self._stopped: return
+        if not name or not self._speculate.read_only(name):
+            self._stopped = True
+            return
+        if not call_id: return
+        arguments = function.get('arguments')
+        if not isinstance(arguments, str):
+            arguments = ''
+        valid, args = _parse_args(arguments)
+        if not valid: return
+        with self._lock:
+            if call_id in self._started: return
+            context = self._context.copy()
+            if self._speculate.gate is not None:
+                context.run(set_gate, self._speculate.gate)
+            future = self._pool.submit(context.run, _dispatch_tool,
+                                       self._speculate.dispatch, name, dict(args))
+            self._started[call_id] = (name, args, future)
+        log.debug("speculating tool call %s (%s)", name, call_id)
+
+    def claim(self, run):
+        """the future of a started call matching `run`, or None. a claimed call
+        is no longer discarded."""
+        with self._lock:
+            started = self._started.get(run.call_id)
+            if started is None: return None
+            name, args, future = started
+            if name != run.name or args != run.args: return None
+            del self._started[run.call_id]
+            return future
+
+    def discard(self):
+        """drop every unclaimed call. a running one finishes on its worker
+        (threads can't be stopped; an MCP call gives up once the run's interrupt
+        is set) and its result goes nowhere."""
+        with self._lock:
+            for _name, _args, future in self._started.values():
+                future.cancel()
+            self._started = {}
+        self._pool.shutdown(wait=False)
+
+
+def _perform_tool(run, speculation):
+    """_dispatch_tool for one _ToolRun, or the result of its speculative twin."""
+    if speculation is not None:
+        future = speculation.claim(run)
+        if future is not None:
+            return future.result()
+    return _dispatch_tool(run.dispatch, run.name, run.args)
+
+
+def _turn(api, turn, speculation=None):
     """Run one model call, yielding content/reasoning events as they arrive.
     Returns (content, reasoning, tool_calls, usage). the interrupt is handed
     down to the api layer, which polls it while blocked on the network - so a
     kill bites mid-request, not just between streamed chunks (the check here
     covers an api without that support). a failed call raises ApiError out of
     the api layer - it never reads as an empty answer."""
-    if not stream:
-        content, reasoning, tool_calls, usage = api.chat(call_messages,
-                                                         model,
-                                                         tools=tools,
-                                                         tool_choice=tool_choice,
-                                                         reasoning_effort=reasoning_effort,
-                                                         temperature=temperature,
-                                                         interrupt=interrupt)
+    interrupt = turn.interrupt
+    if not turn.stream:
+        content, reasoning, tool_calls, usage = api.chat(turn.call_messages,
+                                                         turn.model,
+                                                         tools=turn.tools,
+                                                         tool_choice=turn.tool_choice,
+                                                         reasoning_effort=turn.reasoning_effort,
+                                                         temperature=turn.temperature,
+                                                         interrupt=interrupt,
+                                                         **_chat_extras(turn))
         if reasoning:
             yield Event(type=EventType.REASONING, text=reasoning)
         if content:
@@ -194,14 +407,15 @@ def _turn(api,
     reasoning_parts = []
     tool_calls = None
     usage = {}
-    stream_gen = api.chat(call_messages,
-                          model,
-                          tools=tools,
-                          tool_choice=tool_choice,
-                          reasoning_effort=reasoning_effort,
-                          temperature=temperature,
+    stream_gen = api.chat(turn.call_messages,
+                          turn.model,
+                          tools=turn.tools,
+                          tool_choice=turn.tool_choice,
+                          reasoning_effort=turn.reasoning_effort,
+                          temperature=turn.temperature,
                           stream=True,
-                          interrupt=interrupt)
+                          interrupt=interrupt,
+                          **_chat_extras(turn, speculation))
     for delta_content, delta_reasoning, finished_tool_calls, chunk_usage in stream_gen:
         if _interrupted(interrupt): break
         if delta_content:
@@ -217,6 +431,63 @@ def _turn(api,
     return "".join(content_parts), "".join(reasoning_parts), tool_calls, usage
 
 
+async def _aturn(api, turn, speculation=None):
+    """_turn over an asyncio api, whose chat() returns a coroutine (stream=False)
+    or an async iterator of the same delta tuples (stream=True). an async
+    generator cannot return a value, so this yields the Events and then the
+    (content, reasoning, tool_calls, usage) tuple as its last item."""
+    interrupt = turn.interrupt
+    if not turn.stream:
+        content, reasoning, tool_calls, usage = await api.chat(turn.call_messages,
+                                                               turn.model,
+                                                               tools=turn.tools,
+                                                               tool_choice=turn.tool_choice,
+                                                               reasoning_effort=turn.reasoning_effort,
+                                                               temperature=turn.temperature,
+                                                               interrupt=interrupt,
+                                                               **_chat_extras(turn))
+        if reasoning:
+            yield Event(type=EventType.REASONING, text=reasoning)
+        if content:
+            yield Event(type=EventType.CONTENT, text=content)
+        yield content or "", reasoning or "", tool_calls, usage or {}
+        return
+
+    content_parts = []
+    reasoning_parts = []
+    tool_calls = None
+    usage = {}
+    stream_gen = api.chat(turn.call_messages,
+                          turn.model,
+                          tools=turn.tools,
+                          tool_choice=turn.tool_choice,
+                          reasoning_effort=turn.reasoning_effort,
+                          temperature=turn.temperature,
+                          stream=True,
+                          interrupt=interrupt,
+                          **_chat_extras(turn, speculation))
+    try:
+        async for delta_content, delta_reasoning, finished_tool_calls, chunk_usage in stream_gen:
+            if _interrupted(interrupt): break
+            if delta_content:
+                content_parts.append(delta_content)
+                yield Event(type=EventType.CONTENT, text=delta_content)
+            if delta_reasoning:
+                reasoning_parts.append(delta_reasoning)
+                yield Event(type=EventType.REASONING, text=delta_reasoning)
+            if finished_tool_calls is not None:
+                tool_calls = finished_tool_calls
+            if chunk_usage:
+                usage = chunk_usage
+    finally:
+        # unlike a sync generator, an abandoned async one is not finalized
+        # promptly: close it here so its connection goes back (or away) now.
+        aclose = getattr(stream_gen, "aclose", None)
+        if aclose is not None:
+            await aclose()
+    yield "".join(content_parts), "".join(reasoning_parts), tool_calls, usage
+
+
 def _merge_data(hooks_data, **event_keys):
     """the HookContext.data for one fire: the caller's hooks_data with this
     event's own keys layered on top, so caller-supplied data reaches every hook
@@ -226,6 +497,29 @@ def _merge_data(hooks_data, **event_keys):
     return data
 
 
+def _call_groups(calls, tool_workers, parallel_safe):
+    """split a turn's calls into the groups dispatch runs: each maximal run of
+    consecutive parallel-safe calls is one group (run concurrently), every
+    other call a group of its own - a barrier, run after everything before it
+    and before anything after. all singletons unless parallel dispatch is on
+    (tool_workers > 1 and a parallel_safe predicate)."""
+    if not tool_workers or tool_workers < 2 or parallel_safe is None:
+        return [[call] for call in calls]
+    groups = []
+    run = []
+    for call in calls:
+        if call['valid'] and parallel_safe(call['name']):
+            run.append(call)
+            continue
+        if run:
+            groups.append(run)
+            run = []
+        groups.append([call])
+    if run:
+        groups.append(run)
+    return groups
+
+
 def _handle_tool_calls(calls,
                        messages,
                        content,
@@ -236,7 +530,10 @@ def _handle_tool_calls(calls,
                        config,
                        ui,
                        hooks_data,
-                       usage):
+                       usage,
+                       tool_workers=None,
+                       parallel_safe=None,
+                       interrupt=None):
     """Append the assistant turn carrying every call, then run each tool:
     emit tool_call, fire before_tool_call (veto), dispatch, emit tool_result,
     append the tool message, fire messages_mutated + after_tool_call. Mutates
@@ -244,7 +541,13 @@ def _handle_tool_calls(calls,
     list from _normalize_tool_calls, so every entry has an id, name, original
     argument blob, parsed args, and a valid flag; every call gets a matching tool
     message, even one whose arguments don't parse, so the next request's tool_call
-    ids all line up."""
+    ids all line up.
+
+    with tool_workers > 1, consecutive calls parallel_safe(name) accepts run as
+    one _ToolBatch on up to tool_workers threads: their tool_call events and
+    before_tool_call hooks all go first, then the batch, then their results in
+    call order - so the transcript, the events and the after_tool_call hooks
+    keep the model's order whatever order the tools finish in."""
     # one assistant message carrying every call (the canonical OpenAI shape:
     # one assistant turn with N tool_calls, then N tool messages). arguments that
     # didn't parse are echoed as '{}' rather than the model's broken blob: a strict
@@ -272,6 +575,74 @@ def _handle_tool_calls(calls,
         assistant_msg['_reasoning'] = reasoning
     messages.append(assistant_msg)
 
+    def announce(call):
+        # tool_call event + before_tool_call hooks. returns the ToolCall and the
+        # result already decided here (a veto, unparseable arguments), or None
+        # when the tool should run.
+        name = call['name']
+        arguments = call['arguments']
+        args = call['args']
+
+        yield Event(type=EventType.TOOL_CALL, tool_name=name, tool_args=args, tool_call_id=call['id'])
+
+        tool_call = ToolCall(name=name, arguments=arguments, args=args, id=call['id'])
+        hook_ctx = HookContext(event=HookEvent.BEFORE_TOOL_CALL,
+                               messages=messages,
+                               model=model,
+                               config=config,
+                               ui=ui,
+                               usage=usage,
+                               tool_call=tool_call,
+                               data=_merge_data(hooks_data))
+        vetoed = False
+        for response in hooks.fire(HookEvent.BEFORE_TOOL_CALL, hook_ctx):
+            if response is False:
+                vetoed = True
+
+        if vetoed:
+            log.info("tool call: %s vetoed by hook", name)
+            return tool_call, f"Error: tool '{name}' was aborted by a before_tool_call hook"
+        if not call['valid']:
+            log.info("tool call: %s had unparseable arguments", name)
+            return tool_call, f"Error: arguments for tool '{name}' were not valid JSON: {arguments}"
+        return tool_call, None
+
+    def record(call, tool_call, result):
+        # tool_result event, the tool message, messages_mutated + after_tool_call.
+        call_id = call['id']
+        name = call['name']
+        is_error = result.startswith('Error:')
+        yield Event(type=EventType.TOOL_RESULT,
+                    tool_name=name,
+                    tool_result=result,
+                    tool_call_id=call_id,
+                    is_error=is_error)
+
+        tool_msg = {}
+        tool_msg['role'] = 'tool'
+        tool_msg['tool_call_id'] = call_id
+        tool_msg['content'] = result
+        messages.append(tool_msg)
+
+        mutated_ctx = HookContext(event=HookEvent.MESSAGES_MUTATED,
+                                  messages=messages,
+                                  model=model,
+                                  config=config,
+                                  ui=ui,
+                                  data=_merge_data(hooks_data, name=name, id=call_id))
+        hooks.fire(HookEvent.MESSAGES_MUTATED, mutated_ctx)
+
+        after_ctx = HookContext(event=HookEvent.AFTER_TOOL_CALL,
+                                messages=messages,
+                                model=model,
+                                config=config,
+                                ui=ui,
+                                usage=usage,
+                                tool_call=tool_call,
+                                content=result,
+                                data=_merge_data(hooks_data))
+        hooks.fire(HookEvent.AFTER_TOOL_CALL, after_ctx)
+
     # publish the run gate for the duration of the dispatch loop, so an in-process
     # tool that calls another tool on the model's behalf (the python tool) routes
     # through the same before/after_tool_call hooks - a gate vetoes an inner call
@@ -285,119 +656,92 @@ def _handle_tool_calls(calls,
                    ui=ui,
                    messages=messages,
                    usage=usage,
-                   hooks_data=hooks_data)
+                   hooks_data=hooks_data,
+                   interrupt=interrupt)
     token = set_gate(gate)
     try:
-        for call in calls:
-            call_id = call['id']
-            name = call['name']
-            arguments = call['arguments']
-            args = call['args']
-
-            yield Event(type=EventType.TOOL_CALL, tool_name=name, tool_args=args, tool_call_id=call_id)
-
-            tool_call = ToolCall(name=name, arguments=arguments, args=args, id=call_id)
-            hook_ctx = HookContext(event=HookEvent.BEFORE_TOOL_CALL,
-                                   messages=messages,
-                                   model=model,
-                                   config=config,
-                                   ui=ui,
-                                   usage=usage,
-                                   tool_call=tool_call,
-                                   data=_merge_data(hooks_data))
-            vetoed = False
-            for response in hooks.fire(HookEvent.BEFORE_TOOL_CALL, hook_ctx):
-                if response is False:
-                    vetoed = True
-
-            if vetoed:
-                result = f"Error: tool '{name}' was aborted by a before_tool_call hook"
-                log.info("tool call: %s vetoed by hook", name)
-            elif not call['valid']:
-                result = f"Error: arguments for tool '{name}' were not valid JSON: {arguments}"
-                log.info("tool call: %s had unparseable arguments", name)
-            else:
-                result = _dispatch_tool(tools_dispatch, name, args)
-
-            is_error = result.startswith('Error:')
-            yield Event(type=EventType.TOOL_RESULT,
-                        tool_name=name,
-                        tool_result=result,
-                        tool_call_id=call_id,
-                        is_error=is_error)
-
-            tool_msg = {}
-            tool_msg['role'] = 'tool'
-            tool_msg['tool_call_id'] = call_id
-            tool_msg['content'] = result
-            messages.append(tool_msg)
-
-            mutated_ctx = HookContext(event=HookEvent.MESSAGES_MUTATED,
-                                      messages=messages,
-                                      model=model,
-                                      config=config,
-                                      ui=ui,
-                                      data=_merge_data(hooks_data, name=name, id=call_id))
-            hooks.fire(HookEvent.MESSAGES_MUTATED, mutated_ctx)
-
-            after_ctx = HookContext(event=HookEvent.AFTER_TOOL_CALL,
-                                    messages=messages,
-                                    model=model,
-                                    config=config,
-                                    ui=ui,
-                                    usage=usage,
-                                    tool_call=tool_call,
-                                    content=result,
-                                    data=_merge_data(hooks_data))
-            hooks.fire(HookEvent.AFTER_TOOL_CALL, after_ctx)
+        for group in _call_groups(calls, tool_workers, parallel_safe):
+            if len(group) == 1:
+                call = group[0]
+                tool_call, result = yield from announce(call)
+                if result is None:
+                    result = yield _ToolRun(tools_dispatch, call['name'], call['args'], call['id'])
+                yield from record(call, tool_call, result)
+                continue
+
+            announced = []
+            runs = []
+            for call in group:
+                tool_call, result = yield from announce(call)
+                announced.append((call, tool_call, result))
+                if result is None:
+                    runs.append(_ToolRun(tools_dispatch, call['name'], call['args'], call['id']))
+            results = []
+            if runs:
+                results = yield _ToolBatch(runs, tool_workers)
+            results = iter(results)
+            for call, tool_call, result in announced:
+                if result is None:
+                    result = next(results)
+                yield from record(call, tool_call, result)
     finally:
         reset_gate(token)
 
 
-def call_llm(messages,
-             model,
-             api,
-             *,
-             tools=None,
-             tools_dispatch=None,
-             hooks=None,
-             ui=None,
-             interrupt=None,
-             steer=None,
-             system_prompt=None,
-             max_steps=None,
-             reasoning_effort=None,
-             temperature=None,
-             stream=True,
-             config=None,
-             hooks_data=None):
-    """The agentic loop. See the module docstring for the consumer contract.
-
-    messages   - the live conversation; mutated in place as the loop runs.
-    api        - a cai.api.OpenAiApi (or anything with the same .chat).
-    tools      - JSON tool schemas sent to the model (None disables tools).
-    tools_dispatch - callable(name, args_dict) -> result, runs one tool.
-    hooks      - a HooksRegistry, or None for no hooks.
-    ui         - a UI for hooks to prompt the human, or None for NULL_UI.
-    interrupt  - a threading.Event; when set the loop winds down at the next
-                 safe boundary and returns the partial text. None = no kill.
-    steer      - callable() -> list of pending steering texts; drained at each
-                 turn boundary and folded in as user turns. a would-be final
-                 answer with steers pending is not final: they fold in and the
-                 loop re-enters, so a steer lands at the closest boundary
-                 instead of waiting for the next run. None = no steering.
-    Returns the final assistant text (as the generator's return value).
-
-    a model call that fails for good raises cai.api.ApiError (the api layer
-    retries the transient cases first). the failed turn appends nothing, so
-    `messages` is left at its pre-turn state and a resubmit is clean - only
-    steering texts already folded in (real user turns) remain."""
+def _loop(messages,
+          model,
+          *,
+          tools,
+          tools_dispatch,
+          hooks,
+          ui,
+          interrupt,
+          steer,
+          system_prompt,
+          max_steps,
+          reasoning_effort,
+          temperature,
+          stream,
+          config,
+          hooks_data,
+          wire_cache=None,
+          tool_workers=None,
+          parallel_safe=None,
+          speculate=None,
+          context=None):
+    """the agentic loop itself, free of I/O: it yields Events for the consumer
+    and _ModelTurn/_ToolRun effects for its driver, which performs each one and
+    sends the result back (or throws its exception in, so a failure surfaces at
+    exactly the point a direct call would have raised it). returns the final
+    assistant text. see call_llm for the parameters."""
     hooks = _as_registry(hooks)
     if ui is None:
         ui = NULL_UI
     if not tools:
         tools = None  # falsy -> the api omits the tools field entirely
 
+    speculation = None
+    if speculate is not None and tools_dispatch is not None:
+        # a speculated call starts mid-turn, before _handle_tool_calls publishes
+        # its gate, so it gets one of its own (no turn usage yet).
+        gate = RunGate(hooks=hooks,
+                       dispatch=tools_dispatch,
+                       model=model,
+                       config=config,
+                       ui=ui,
+                       messages=messages,
+                       usage=None,
+                       hooks_data=hooks_data,
+                       interrupt=interrupt)
+        speculation = _Speculate(tools_dispatch, speculate,
+                                 max(tool_workers or 1, _SPECULATE_WORKERS), gate)
+
+    # one system message for the whole loop, so its identity is stable across
+    # turns and a wire_cache re-encodes it once, not every call.
+    system_message = None
+    if system_prompt:
+        system_message = {"role": "system", "content": system_prompt}
+
     content = ""
     turn = 0
     while True:
@@ -418,21 +762,27 @@ def call_llm(messages,
         # `messages` must stay system-free and be the live append target for
         # tool turns. prepend the system into a throwaway per-call list.
         call_messages = messages
-        if system_prompt:
-            call_messages = [{"role": "system", "content": system_prompt}]
+        if system_message is not None:
+            call_messages = [system_message]
             call_messages.extend(messages)
+        # the context stage shrinks what is sent, never `messages` itself.
+        if context is not None:
+            call_messages = yield _Fit(context, call_messages, model)
 
-        content, reasoning, tool_calls, usage = yield from _turn(api,
-                                                                 call_messages,
+        content, reasoning, tool_calls, usage = yield _ModelTurn(call_messages,
                                                                  model,
                                                                  tools,
                                                                  "auto",
                                                                  reasoning_effort,
                                                                  temperature,
                                                                  stream,
-                                                                 interrupt)
+                                                                 interrupt,
+                                                                 wire_cache,
+                                                                 speculation)
 
         if usage:
+            if context is not None:
+                context.observe(usage, call_messages)
             yield Event(type=EventType.USAGE, usage=dict(usage))
 
         if _interrupted(interrupt):
@@ -506,7 +856,10 @@ def call_llm(messages,
                                       config,
                                       ui,
                                       hooks_data,
-                                      usage)
+                                      usage,
+                                      tool_workers,
+                                      parallel_safe,
+                                      interrupt)
 
         turn_ctx = HookContext(event=HookEvent.AFTER_TURN,
                                messages=messages,
@@ -516,3 +869,289 @@ def call_llm(messages,
                                usage=usage,
                                data=_merge_data(hooks_data))
         hooks.fire(HookEvent.AFTER_TURN, turn_ctx)
+
+
+def _drive(loop, api):
+    """the blocking driver: step the loop, pass its Events through, and perform
+    its effects inline - a model turn via _turn (whose streamed events pass
+    through as they arrive), a tool via _dispatch_tool, a batch of tools via
+    _dispatch_batch, a context fit via the context manager. a streamed turn that may speculate gets a _Speculation,
+    kept until the next turn (or the end) so the tool effects can claim it."""
+    speculation = None
+    try:
+        item = next(loop)
+        while True:
+            try:
+                if isinstance(item, _ModelTurn):
+                    speculation = _next_speculation(speculation, item)
+                    reply = yield from _turn(api, item, speculation)
+                elif isinstance(item, _ToolRun):
+                    reply = _perform_tool(item, speculation)
+                elif isinstance(item, _ToolBatch):
+                    reply = _dispatch_batch(item, speculation)
+                elif isinstance(item, _Fit):
+                    reply = item.context.fit(item.call_messages, item.model)
+                else:
+                    yield item
+                    reply = None
+            except Exception as e:
+                item = loop.throw(e)
+            else:
+                item = loop.send(reply)
+    except StopIteration as stop:
+        return stop.value
+    finally:
+        if speculation is not None:
+            speculation.discard()
+        loop.close()
+
+
+def _next_speculation(speculation, turn):
+    """discard the previous turn's speculation; a fresh one when `turn` is a
+    streamed turn that may speculate, else None."""
+    if speculation is not None:
+        speculation.discard()
+    if turn.speculate is None or not turn.stream:
+        return None
+    return _Speculation(turn.speculate)
+
+
+def call_llm(messages,
+             model,
+             api,
+             *,
+             tools=None,
+             tools_dispatch=None,
+             hooks=None,
+             ui=None,
+             interrupt=None,
+             steer=None,
+             system_prompt=None,
+             max_steps=None,
+             reasoning_effort=None,
+             temperature=None,
+             stream=True,
+             config=None,
+             hooks_data=None,
+             wire_cache=None,
+             tool_workers=None,
+             parallel_safe=None,
+             speculate=None,
+             context=None):
+    """The agentic loop. See the module docstring for the consumer contract.
+
+    messages   - the live conversation; mutated in place as the loop runs.
+    api        - a cai.api.OpenAiApi (or anything with the same .chat).
+    tools      - JSON tool schemas sent to the model (None disables tools).
+    tools_dispatch - callable(name, args_dict) -> result, runs one tool.
+    hooks      - a HooksRegistry, or None for no hooks.
+    ui         - a UI for hooks to prompt the human, or None for NULL_UI.
+    interrupt  - a threading.Event; when set the loop winds down at the next
+                 safe boundary and returns the partial text. None = no kill.
+    steer      - callable() -> list of pending steering texts; drained at each
+                 turn boundary and folded in as user turns. a would-be final
+                 answer with steers pending is not final: they fold in and the
+                 loop re-enters, so a steer lands at the closest boundary
+                 instead of waiting for the next run. None = no steering.
+    wire_cache - a cai.api.WireCache kept across calls on the same conversation;
+                 each turn re-encodes only its new messages. None = encode
+                 the whole body every turn.
+    tool_workers - run up to this many tool calls of one turn at once. only
+                 calls parallel_safe(name) accepts run concurrently; any other
+                 call waits for those before it and holds back those after.
+                 events, tool messages and hooks stay in call order. None/1 =
+                 one tool at a time.
+    parallel_safe - callable(name) -> bool, the tools that may run concurrently
+                 (ToolsRegistry.parallel_safe). None = none.
+    speculate  - callable(name) -> bool, the read-only tools that may start
+                 while their turn is still streaming, as soon as the api sees
+                 their arguments complete (ToolsRegistry.read_only). results
+                 still land in call order after the turn, through the usual
+                 hooks; a vetoed call's or an interrupted turn's are
+                 discarded. None = no speculation.
+    context    - a cai.context.ContextManager: fits each outgoing request into
+                 the model's context window (stubbing old tool results,
+                 dropping or summarizing old turns) and calibrates on each
+                 turn's usage. `messages` keeps everything. None = send it all.
+    Returns the final assistant text (as the generator's return value).
+
+    a model call that fails for good raises cai.api.ApiError (the api layer
+    retries the transient cases first). the failed turn appends nothing, so
+    `messages` is left at its pre-turn state and a resubmit is clean - only
+    steering texts already folded in (real user turns) remain."""
+    loop = _loop(messages,
+                 model,
+                 tools=tools,
+                 tools_dispatch=tools_dispatch,
+                 hooks=hooks,
+                 ui=ui,
+                 interrupt=interrupt,
+                 steer=steer,
+                 system_prompt=system_prompt,
+                 max_steps=max_steps,
+                 reasoning_effort=reasoning_effort,
+                 temperature=temperature,
+                 stream=stream,
+                 config=config,
+                 hooks_data=hooks_data,
+                 wire_cache=wire_cache,
+                 tool_workers=tool_workers,
+                 parallel_safe=parallel_safe,
+                 speculate=speculate,
+                 context=context)
+    return (yield from _drive(loop, api))
+
+
+def _wind_down(loop, item):
+    """finish a cancelled loop without performing another effect. the interrupt
+    is already set, so the loop returns at its next check; until then a pending
+    tool gets a 'cancelled' result (the transcript keeps every tool_call paired
+    with its reply) and a pending model turn comes back empty. returns the
+    loop's partial text. the Events it yields on the way out are dropped - a
+    cancelled consumer takes no more."""
+    try:
+        while True:
+            reply = None
+            if isinstance(item, _ToolRun):
+                reply = f"Error: tool '{item.name}' was cancelled"
+            elif isinstance(item, _ToolBatch):
+                reply = [f"Error: tool '{run.name}' was cancelled" for run in item.runs]
+            elif isinstance(item, _ModelTurn):
+                reply = ("", "", None, {})
+            elif isinstance(item, _Fit):
+                reply = item.call_messages
+            item = loop.send(reply)
+    except StopIteration as stop:
+        return stop.value
+    finally:
+        loop.close()
+
+
+class AsyncLLMStream:
+    """what async_call_llm returns: an async iterator over the run's Events.
+    the final answer can't ride an async generator's return (there is none),
+    so it lands on `text` once the stream drains. a single consumption, like
+    the sync generator.
+
+    cancelling the consuming task maps onto the interrupt: it is set (so a
+    shared Agent.interrupt sees the kill too), the loop winds down without
+    another effect, and the CancelledError propagates. a tool already running
+    in its worker thread finishes there; its result is dropped."""
+
+    def __init__(self, loop, api, interrupt):
+        self.text = ""
+        self._events = self._drive(loop, api, interrupt)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self._events.__anext__()
+
+    async def aclose(self):
+        await self._events.aclose()
+
+    async def wait(self):
+        """drain the stream without consuming the events; returns the final
+        answer."""
+        async for _event in self:
+            pass
+        return self.text
+
+    async def _drive(self, loop, api, interrupt):
+        """the asyncio driver: _drive's twin. a model turn awaits the async api
+        and a tool or a context fit (a summary is a blocking model call) runs
+        in a worker thread (asyncio.to_thread, which carries the run gate's
+        context along), so the event loop never blocks on any of them. hooks
+        still run inline - they are synchronous by contract."""
+        speculation = None
+        try:
+            item = next(loop)
+            while True:
+                try:
+                    if isinstance(item, _ModelTurn):
+                        speculation = _next_speculation(speculation, item)
+                        reply = None
+                        async for value in _aturn(api, item, speculation):
+                            if isinstance(value, Event):
+                                yield value
+                            else:
+                                reply = value
+                    elif isinstance(item, _ToolRun):
+                        reply = await _aperform_tool(item, speculation)
+                    elif isinstance(item, _ToolBatch):
+                        reply = await _adispatch_batch(item, speculation)
+                    elif isinstance(item, _Fit):
+                        reply = await asyncio.to_thread(item.context.fit, item.call_messages, item.model)
+                    else:
+                        yield item
+                        reply = None
+                except asyncio.CancelledError:
+                    interrupt.set()
+                    self.text = _wind_down(loop, item)
+                    raise
+                except Exception as e:
+                    item = loop.throw(e)
+                else:
+                    item = loop.send(reply)
+        except StopIteration as stop:
+            self.text = stop.value
+        finally:
+            if speculation is not None:
+                speculation.discard()
+            loop.close()
+
+
+def async_call_llm(messages,
+                   model,
+                   api,
+                   *,
+                   tools=None,
+                   tools_dispatch=None,
+                   hooks=None,
+                   ui=None,
+                   interrupt=None,
+                   steer=None,
+                   system_prompt=None,
+                   max_steps=None,
+                   reasoning_effort=None,
+                   temperature=None,
+                   stream=True,
+                   config=None,
+                   hooks_data=None,
+                   wire_cache=None,
+                   tool_workers=None,
+                   parallel_safe=None,
+                   speculate=None,
+                   context=None):
+    """call_llm over asyncio: the same loop, parameters and Event sequence,
+    returned as an AsyncLLMStream - `async for` it for the Events, then read
+    `.text` for the final answer. `api` is a cai.api.AsyncOpenAiApi (or
+    anything with the same coroutine / async-iterator .chat).
+
+    interrupt keeps its threading.Event contract (Agent.stop() from any thread
+    still bites, through the api's watcher); one is made when none is given,
+    so cancelling the consuming task always has an interrupt to set."""
+    if interrupt is None:
+        interrupt = threading.Event()
+    loop = _loop(messages,
+                 model,
+                 tools=tools,
+                 tools_dispatch=tools_dispatch,
+                 hooks=hooks,
+                 ui=ui,
+                 interrupt=interrupt,
+                 steer=steer,
+                 system_prompt=system_prompt,
+                 max_steps=max_steps,
+                 reasoning_effort=reasoning_effort,
+                 temperature=temperature,
+                 stream=stream,
+                 config=config,
+                 hooks_data=hooks_data,
+                 wire_cache=wire_cache,
+                 tool_workers=tool_workers,
+                 parallel_safe=parallel_safe,
+                 speculate=speculate,
+                 context=context)
+    return AsyncLLMStream(loop, api, interrupt)
@@ -0,0 +1,87 @@
+"""metrics: latency histograms for the instrumentation surface.
+
+A Histogram counts observations into fixed, roughly log-spaced buckets (plus
+count, sum and max), cheap enough to bump on every request. LatencyStats keeps
+one for a whole target and one per named operation - an MCP server and each of
+its tools - and snapshots both as plain dicts, the shape the other stats()
+readouts (OpenAiApi.pool_stats, ResultCache.stats, ServerPool.stats) use.
+Thread-safe. Stdlib-only."""
+from __future__ import annotations
+
+import bisect
+import threading
+
+
+# bucket upper bounds in milliseconds; anything slower lands in "inf".
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class Histogram:
+    """latencies (seconds in, milliseconds out) bucketed by BUCKETS_MS."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, seconds):
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def snapshot(self):
+        """{count, mean_ms, max_ms, buckets: {"<=5": n, ..., "inf": n}}."""
+        buckets = {}
+        for bound, n in zip(BUCKETS_MS, self.counts):
+            buckets[f"<={bound}"] = n
+        buckets["inf"] = self.counts[-1]
+        snapshot = {}
+        snapshot['count'] = self.count
+        snapshot['mean_ms'] = round(self.total_ms / self.count, 3) if self.count else 0.0
+        snapshot['max_ms'] = round(self.max_ms, 3)
+        snapshot['buckets'] = buckets
+        return snapshot
+
+
+class LatencyStats:
+    """one Histogram overall and one per name, plus error and retry counts."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._overall = Histogram()
+        self._by_name = {}
+        self.errors = 0
+        self.retries = 0
+
+    def observe(self, name, seconds, error=False):
+        with self._lock:
+            self._overall.observe(seconds)
+            histogram = self._by_name.get(name)
+            if histogram is None:
+                histogram = Histogram()
+                self._by_name[name] = histogram
+            histogram.observe(seconds)
+            if error:
+                self.errors += 1
+
+    def retried(self):
+        with self._lock:
+            self.retries += 1
+
+    def snapshot(self):
+        """{latency, errors, retries, by_name: {name: latency}} - each latency
+        a Histogram.snapshot()."""
+        with self._lock:
+            by_name = {}
+            for name, histogram in self._by_name.items():
+                by_name[name] = histogram.snapshot()
+            snapshot = {}
+            snapshot['latency'] = self._overall.snapshot()
+            snapshot['errors'] = self.errors
+            snapshot['retries'] = self.retries
+            snapshot['by_name'] = by_name
+            return snapshot
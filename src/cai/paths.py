@@ -2,9 +2,10 @@
 
 scratch_dir() is the one way any tool code locates the session scratch
 directory (the place tools exchange binary/bulky intermediates): an MCP server
-subprocess reads the CAI_SCRATCH env var cai spawned it with; an in-process
-function tool reads the per-dispatch context ToolsRegistry brackets around its
-call. Same accessor, both contexts - "" when no session scratch exists (e.g.
+subprocess reads the cai_scratch each tools/call carries in its _meta (one
+pooled server serves many agents), falling back to a CAI_SCRATCH env var; an
+in-process function tool reads the per-dispatch context ToolsRegistry brackets
+around its call. Same accessor, both contexts - "" when no session scratch exists (e.g.
 under a bare MCP client), so callers can fall back to tempfile.
 
 safe_path confines a model-supplied path to the current working directory plus
@@ -19,6 +20,7 @@ function tools share one implementation instead of vendoring copies. A server
 file cai spawns runs under the same interpreter, so `from cai import safe_path`
 always resolves. Stdlib-only."""
 import os
+import sys
 from contextvars import ContextVar
 
 
@@ -36,15 +38,32 @@ _scratch_provider = ContextVar("cai_scratch_provider", default=None)
 
 def scratch_dir():
     """the session scratch directory, or "" when there is none. reads the
-    dispatch context inside a function tool, the CAI_SCRATCH env var inside a
-    spawned MCP server. note: a thread a tool spawns itself starts with a fresh
-    context - capture the value before spawning."""
+    dispatch context inside a function tool; inside a spawned MCP server, the
+    cai_scratch the current tools/call carries (a pooled server serves many
+    agents), else the CAI_SCRATCH env var. note: a thread a tool spawns itself
+    starts with a fresh context - capture the value before spawning."""
     provider = _scratch_provider.get()
     if provider is not None:
         return provider()
+    scratch = _request_scratch()
+    if scratch:
+        return scratch
     return os.environ.get("CAI_SCRATCH", "")
 
 
+def _request_scratch():
+    """the cai_scratch in the _meta of the MCP request being served, or None
+    outside one. only looks when the process already runs the mcp server
+    machinery - this module never imports it."""
+    server = sys.modules.get("mcp.server.lowlevel.server")
+    if server is None:
+        return None
+    ctx = server.request_ctx.get(None)
+    if ctx is None or ctx.meta is None:
+        return None
+    return getattr(ctx.meta, "cai_scratch", None)
+
+
 def _expand_scratch(user_path):
     """expand a leading $CAI_SCRATCH / ${CAI_SCRATCH} token in user_path to the
     real scratch directory (materializing it), so the model addresses scratch by
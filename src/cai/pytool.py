@@ -47,27 +47,99 @@ and return just the answer, the intermediate data never entering model context.
 The RPC pipes are plain inherited fds, which namespaces do not sever - the
 tool_call() channel is the one deliberate hole in the jail.
 
+tool_call() is one blocking round trip; tool_call_many([(name, kwargs), ...])
+sends a whole list as ONE request, and cai dispatches its entries side by side
+on up to `python_call_workers` threads (default 8) - each still through
+_dispatch_gated, so a gate sees and may veto every call - and replies with
+the results in order. tool_call_async(name, **kwargs) queues a call and
+returns a future; the first .result() sends everything queued as one batch,
+so a loop of tool_call_async() fans out like tool_call_many() does.
+
+The snippet's stdout/stderr is a pipe cai reads while it runs (_Output): only
+the head and tail the result keeps are stored, so a run that prints gigabytes
+costs no disk and bounded memory, and the latest line is posted as a
+status-line note on the run's UI (ctx.ui.status) as live progress.
+
+Starting that interpreter, and building the jail, costs far more than a short
+snippet. So each agent's tool keeps a small pool of ZYGOTES (PythonWorkers):
+a bootstrap process that pays the interpreter start-up and enters the jail
+once, then forks a fresh child per snippet. The child is jailed exactly as a
+one-shot run is - it installs the audit hook and runs the snippet in a process
+of its own, so nothing survives between calls. A zygote is bound to
+everything its jail was built from (interpreter, sandbox mode, cwd, scratch,
+environment) and replaced when any of it changes. `python_workers` in
+config.json sets how many idle zygotes an agent keeps warm (default 1; 0
+spawns a fresh interpreter per call, as before), and `python_worker_uses`
+how many snippets one serves before it is recycled (default 100). A zygote
+that cannot start (e.g. no user namespaces) falls back to the one-shot
+spawn, which reports why.
+
+With `python_session: true` the tool is STATEFUL instead (PythonSession): one
+long-lived kernel per agent, jailed by the same bootstrap, runs every snippet
+in one set of globals, so a file parsed once can be queried call after call.
+`reset=True` starts it afresh; a call that times out kills and restarts it;
+`python_session_memory_mb` (default 4096) and `python_session_cpu_seconds`
+(default unlimited) cap its address space and total CPU time.
+
+A tool_call() result is normally a JSON line on the reply pipe. One of
+_BULK_MIN characters or more is handed over as a file instead: cai writes its
+UTF-8 bytes under the scratch dir's .cai-bulk/ (the one place both sides can
+reach) and replies with the path; the child mmaps and unlinks it, so a 50 MB
+result is neither JSON-escaped nor squeezed through the pipe. tool_call()
+decodes the mapping straight into the str it returns; tool_bytes() returns a
+zero-copy memoryview of it instead. Without a scratch dir every result takes
+the pipe. cai removes whatever files are left once the snippet is done.
+
 The tool is bound to its Agent (like the sub-agent tools) - that is what gives
 tool_call() a live dispatch. It is registered on every agent but only offered to the
 model when the `python` skill selects it."""
 
+import contextvars
 import json
+import logging
 import os
 import select
 import shutil
+import signal
+import socket
 import subprocess
 import sys
 import tempfile
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 import cai
 from cai import config
 from cai import hooks
 
 
+log = logging.getLogger("cai")
+
 PY_TOOL_NAME = "python"
 
+# the worker pool's defaults (config.json python_workers / python_worker_uses),
+# and how long a starting zygote gets to report it is jailed and ready.
+_WORKERS = 1
+_WORKER_USES = 100
+_WORKER_START_TIMEOUT = 30.0
+
+# the stateful session's default address-space cap (python_session_memory_mb).
+_SESSION_MEMORY_MB = 4096
+
+# how many of one tool_call_many() batch's calls run at once (config.json
+# python_call_workers).
+_CALL_WORKERS = 8
+
+# how much of a snippet's output (in characters) the result keeps - head and
+# tail, half each - and how often its latest line is posted as live progress.
+_OUTPUT_LIMIT = 20000
+_PROGRESS_INTERVAL = 0.5
+
+# a tool_call() result this long (in characters) or longer travels as a file
+# in the scratch dir instead of a JSON line on the reply pipe.
+_BULK_MIN = 1 << 20
+
 
 # the child bootstrap lives in pytool_bootstrap.py - a real module so it
 # reads and edits like code - but it is executed as SOURCE TEXT via
@@ -82,7 +154,7 @@ def _bootstrap_source():
 
 def _truncate(text):
     """keep a long run's head and tail - tracebacks live at the tail."""
-    limit = 20000
+    limit = _OUTPUT_LIMIT
     if len(text) <= limit:
         return text
     half = limit // 2
@@ -90,6 +162,93 @@ def _truncate(text):
     return text[:half] + f"\n[... {omitted} chars omitted ...]\n" + text[-half:]
 
 
+class _Output:
+    """a snippet's stdout/stderr, read from a pipe as it is written. only the
+    head and the tail that _truncate would keep are stored - 4 bytes per kept
+    character, enough for any UTF-8 - so a run printing gigabytes costs
+    neither disk nor memory; the middle is counted and dropped. `progress`, if
+    given, is called with the latest output line at most every
+    _PROGRESS_INTERVAL seconds."""
+
+    def __init__(self, progress=None):
+        self.fd, self.write_fd = os.pipe()
+        os.set_blocking(self.fd, False)
+        self.keep = 4 * (_OUTPUT_LIMIT // 2)
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+        self.progress = progress
+        self._reported = time.monotonic()
+
+    def closed_writer(self):
+        """the parent's copy of the write end, closed once the child holds it
+        - so the pipe reports EOF when the child is gone."""
+        if self.write_fd is None: return
+        os.close(self.write_fd)
+        self.write_fd = None
+
+    def read(self):
+        """take in whatever the pipe holds; False once it reached EOF."""
+        while True:
+            try:
+                chunk = os.read(self.fd, 65536)
+            except BlockingIOError:
+                return True
+            if not chunk:
+                return False
+            self._feed(chunk)
+
+    def _feed(self, chunk):
+        self.total += len(chunk)
+        room = self.keep - len(self.head)
+        if room > 0:
+            self.head.extend(chunk[:room])
+            chunk = chunk[room:]
+        if chunk:
+            self.tail.extend(chunk)
+            if len(self.tail) > 2 * self.keep:
+                del self.tail[:-self.keep]
+        if self.progress is None: return
+        now = time.monotonic()
+        if now - self._reported < _PROGRESS_INTERVAL: return
+        self._reported = now
+        line = bytes((self.tail or self.head)[-200:]).decode("utf-8", errors="replace")
+        line = line.rstrip("\n").rpartition("\n")[2].strip()
+        if line:
+            self.progress(line)
+
+    def text(self):
+        """everything read, truncated as _truncate would - the middle of an
+        output too big to store is reported in bytes."""
+        self.read()
+        if len(self.head) + len(self.tail) == self.total:
+            return _truncate((self.head + self.tail).decode("utf-8", errors="replace").rstrip("\n"))
+        half = _OUTPUT_LIMIT // 2
+        head = self.head.decode("utf-8", errors="replace")[:half]
+        tail = self.tail[-self.keep:].decode("utf-8", errors="replace").rstrip("\n")[-half:]
+        omitted = self.total - len(head.encode("utf-8")) - len(tail.encode("utf-8"))
+        return head + f"\n[... {omitted} bytes omitted ...]\n" + tail
+
+    def close(self):
+        self.closed_writer()
+        os.close(self.fd)
+
+
+def _progress():
+    """a live-progress callback for a snippet's output: a status-line note on
+    the run's UI (the TUI shows it while the snippet runs). None outside a
+    run."""
+    gate = hooks.current_gate()
+    if gate is None or gate.ui is None:
+        return None
+
+    def note(line):
+        if len(line) > 120:
+            line = line[:117] + "..."
+        gate.ui.status(f"python: {line}")
+    return note
+
+
 _venv_lock = threading.Lock()
 
 
@@ -159,45 +318,180 @@ def _dispatch_gated(agent, name, kwargs):
     python tool itself (recursion) and any tool not currently offered to the
     model, then routes through the run gate so a before_tool_call gate can veto -
     falling back to a plain confined dispatch outside a run (SDK use)."""
+    refusal = _refusal(agent, name)
+    if refusal is not None:
+        return refusal
+    gate = hooks.current_gate()
+    if gate is None:
+        return agent.tools_registry.dispatch(name, kwargs)
+    return hooks.gated_dispatch(gate, name, kwargs, call_id=PY_TOOL_NAME)
+
+
+def _refusal(agent, name):
+    """why the snippet may not call tool `name`, or None."""
     if not name:
         return "Error: tool request had no name"
     if name == PY_TOOL_NAME:
         return f"Error: {PY_TOOL_NAME} cannot call itself"
     if name not in agent.tools:
         return f"Error: tool {name!r} is not available to tool_call() - callable tools are the agent's selected ones"
+    return None
+
+
+class _Bulk:
+    """one snippet's bulk replies: results of _BULK_MIN characters or more
+    written as files under <scratch>/.cai-bulk instead of sent down the pipe.
+    close() removes the ones the child did not consume (unlink) itself.
+
+    the snippet can write to scratch, so .cai-bulk is never trusted by path:
+    it is opened once without following a symlink, checked to still be the
+    directory under scratch, and every file is created relative to that
+    handle. when it cannot be, results go down the pipe instead."""
+
+    def __init__(self, scratch):
+        self.scratch = scratch
+        self.dir = None
+        if scratch:
+            self.dir = os.path.join(scratch, ".cai-bulk")
+        self.paths = []
+        self._fd = None
+
+    def _open(self):
+        """the .cai-bulk directory's fd, or None when it is not safely ours."""
+        if self._fd is not None:
+            return self._fd
+        try:
+            os.mkdir(self.dir, 0o700)          # never follows a planted symlink
+        except FileExistsError:
+            pass
+        try:
+            fd = os.open(self.dir, os.O_RDONLY | os.O_DIRECTORY | os.O_NOFOLLOW)
+        except OSError as e:
+            log.warning("python: %s is not a directory (%s) - results go down the pipe", self.dir, e)
+            self.dir = None
+            return None
+        real = os.path.realpath(self.dir)
+        top = os.path.realpath(self.scratch)
+        if not real.startswith(top.rstrip(os.sep) + os.sep) or not os.path.samestat(os.fstat(fd), os.stat(real)):
+            log.warning("python: %s left scratch - results go down the pipe", self.dir)
+            os.close(fd)
+            self.dir = None
+            return None
+        self._fd = fd
+        return fd
+
+    def reply(self, result):
+        """the reply dict for `result`: {"result"} inline, or {"bulk", "size"}
+        naming the file holding its UTF-8 bytes."""
+        reply = {}
+        if self.dir is None or len(result) < _BULK_MIN or self._open() is None:
+            reply["result"] = result
+            return reply
+        data = result.encode("utf-8")
+        name = f"result-{os.urandom(8).hex()}"
+        fd = os.open(name, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_NOFOLLOW, 0o600, dir_fd=self._fd)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        path = os.path.join(self.dir, name)
+        self.paths.append(name)
+        reply["bulk"] = path
+        reply["size"] = len(data)
+        return reply
+
+    def close(self):
+        for name in self.paths:
+            try:
+                os.unlink(name, dir_fd=self._fd)
+            except FileNotFoundError:
+                pass
+        self.paths = []
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+def _reply(result, bulk):
+    if bulk is None:
+        reply = {}
+        reply["result"] = result
+        return reply
+    return bulk.reply(result)
+
+
+def _dispatch_batch(agent, calls):
+    """the results of a tool_call_many() batch, in order. as in the loop's
+    own batches, the hooks fire one call at a time, in order - every
+    before_tool_call (a gate may prompt) first, then the approved calls are
+    dispatched side by side on up to python_call_workers threads, each under
+    a copy of this context, then every after_tool_call."""
     gate = hooks.current_gate()
-    if gate is None:
-        return agent.tools_registry.dispatch(name, kwargs)
-    return hooks.gated_dispatch(gate, name, kwargs, call_id=PY_TOOL_NAME)
+    results = [None] * len(calls)
+    approved = []   # (index, name, kwargs, pending)
+    for i, call in enumerate(calls):
+        name = call.get("name")
+        kwargs = call.get("kwargs") or {}
+        results[i] = _refusal(agent, name)
+        if results[i] is not None: continue
+        pending = None
+        if gate is not None:
+            pending, results[i] = hooks.gated_before(gate, name, kwargs, call_id=PY_TOOL_NAME)
+            if results[i] is not None: continue
+        approved.append((i, name, kwargs, pending))
+    dispatch = agent.tools_registry.dispatch if gate is None else gate.dispatch
+    workers = int(config.load_optional("python_call_workers", _CALL_WORKERS) or 1)
+    workers = max(1, min(workers, len(approved)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cai-pycall") as pool:
+        futures = []
+        for _i, name, kwargs, _pending in approved:
+            context = contextvars.copy_context()
+            futures.append(pool.submit(context.run, dispatch, name, kwargs))
+        for (i, _name, _kwargs, pending), future in zip(approved, futures):
+            result = future.result()
+            if gate is not None:
+                result = hooks.gated_after(gate, pending, result)
+            results[i] = result
+    return results
 
 
-def _handle_request(agent, line, rep_w):
-    """serve one child tool_call() request: dispatch it and write the reply back."""
+def _handle_request(agent, line, rep_w, bulk=None):
+    """serve one child request - a tool_call() {"name", "kwargs"}, or a
+    tool_call_many() {"batch": [...]} answered with {"results": [...]} - and
+    write the reply back: inline, or through `bulk` when a result is large."""
     try:
         request = json.loads(line.decode("utf-8"))
     except ValueError:
-        result = "Error: malformed tool request"
+        request = None
+    if isinstance(request, dict) and isinstance(request.get("batch"), list):
+        calls = [call if isinstance(call, dict) else {} for call in request["batch"]]
+        reply = {}
+        reply["results"] = [_reply(result, bulk) for result in _dispatch_batch(agent, calls)]
+    elif isinstance(request, dict):
+        reply = _reply(_dispatch_gated(agent, request.get("name"), request.get("kwargs") or {}), bulk)
     else:
-        result = _dispatch_gated(agent, request.get("name"), request.get("kwargs") or {})
-    reply = {}
-    reply["result"] = result
+        reply = _reply("Error: malformed tool request", bulk)
     os.write(rep_w, json.dumps(reply).encode("utf-8") + b"\n")
 
 
-def _serve(agent, proc, req_r, rep_w, timeout):
+def _serve(agent, proc, req_r, rep_w, timeout, bulk=None, output=None):
     """single-threaded driver: while the child runs, serve its tool_call() requests on
     this (the run-loop) thread - so inner calls are dispatched exactly like
     top-level ones. returns True if the child was killed on timeout. the child's
-    stdout/stderr go to a temp file, not a pipe, so this loop never blocks on
-    output and only ever reads the request channel."""
+    stdout/stderr pipe, when `output` is given, is read in the same select as
+    the request channel (a non-blocking read, so a chatty child never stalls
+    its tool calls); the caller drains what is left once the child is done."""
     deadline = time.monotonic() + timeout
     buf = bytearray()
+    watch = [req_r]
+    if output is not None:
+        watch.append(output.fd)
     while True:
         remaining = deadline - time.monotonic()
         if remaining <= 0:
             proc.kill()
             return True
-        ready, _, _ = select.select([req_r], [], [], min(remaining, 0.5))
+        ready, _, _ = select.select(watch, [], [], min(remaining, 0.5))
+        if output is not None and output.fd in ready and not output.read():
+            watch.remove(output.fd)
         if req_r not in ready:
             if proc.poll() is not None:
                 return False
@@ -212,32 +506,380 @@ def _serve(agent, proc, req_r, rep_w, timeout):
                 break
             line = bytes(buf[:nl])
             del buf[:nl + 1]
-            _handle_request(agent, line, rep_w)
-
+            _handle_request(agent, line, rep_w, bulk)
 
-def _run_python(agent, code, timeout):
-    """spawn the sandboxed child, feed it the snippet, serve its tool calls, and
-    return its combined stdout/stderr (truncated), with an exit-code footer."""
-    python = ensure_venv()
-    scratch = cai.scratch_dir()
-    sandbox = config.load_optional("python_sandbox", "kernel")
 
-    req_r, req_w = os.pipe()   # child -> parent: tool_call() requests
-    rep_r, rep_w = os.pipe()   # parent -> child: results
+def _child_env(scratch, sandbox):
+    """the environment a snippet's interpreter (or its zygote) starts with."""
     child_env = dict(os.environ)
     if scratch:
         child_env["CAI_SCRATCH"] = scratch
-    child_env["CAI_PY_RPC_READ"] = str(rep_r)
-    child_env["CAI_PY_RPC_WRITE"] = str(req_w)
     child_env["CAI_PY_SANDBOX"] = str(sandbox)
-    # the agent's own selected tools, minus python itself: the child turns each
-    # into a directly-callable function in the snippet's namespace (layer that
-    # makes the modified env look ordinary - fs__read_file(...) just works),
-    # resolved per call so it tracks the live selection.
+    return child_env
+
+
+def _tool_names(agent):
+    """the agent's own selected tools, minus python itself: the child turns
+    each into a directly-callable function in the snippet's namespace (layer
+    that makes the modified env look ordinary - fs__read_file(...) just
+    works), resolved per call so it tracks the live selection."""
     names = []
     for name in agent.tools:
         if name == PY_TOOL_NAME: continue
         names.append(name)
+    return names
+
+
+def _result(text, returncode):
+    """the tool result: the output (already truncated - _Output.text), with
+    an exit-code footer."""
+    if returncode != 0:
+        if text:
+            text += "\n"
+        text += f"[exit code {returncode}]"
+    if not text:
+        return "(no output)"
+    return text
+
+
+def _worker_key(python, sandbox, child_env):
+    """everything a worker's jail is built from: a worker is only reused
+    while this is unchanged."""
+    return json.dumps([python, sandbox, os.getcwd(), sorted(child_env.items())])
+
+
+class _Worker:
+    """one long-lived bootstrap process serving snippets over a control
+    socket (see pytool_bootstrap): a "zygote" forks a child per snippet, a
+    "kernel" runs them all itself. `key` is what its jail was built from."""
+
+    def __init__(self, key, python, child_env, sandbox, role="zygote"):
+        self.key = key
+        self.uses = 0
+        self._buf = bytearray()
+        self.staging = None
+        child_env = dict(child_env)
+        if sandbox != "hook":
+            self.staging = tempfile.mkdtemp(prefix="cai-py-")
+            child_env["CAI_PY_STAGING"] = self.staging
+        self.sock, theirs = socket.socketpair()
+        child_env["CAI_PY_CONTROL"] = str(theirs.fileno())
+        child_env["CAI_PY_ROLE"] = role
+        try:
+            self.proc = subprocess.Popen([python, "-c", _bootstrap_source()],
+                                         stdin=subprocess.DEVNULL,
+                                         stdout=subprocess.DEVNULL,
+                                         stderr=subprocess.DEVNULL,
+                                         pass_fds=(theirs.fileno(),),
+                                         env=child_env)
+        except OSError:
+            self.close()
+            raise
+        finally:
+            theirs.close()
+        try:
+            self._read(_WORKER_START_TIMEOUT)
+        except (OSError, ValueError):
+            self.close()
+            raise
+
+    def _read(self, timeout=None):
+        """the zygote's next JSON line. raises ConnectionError once it is
+        gone, TimeoutError when nothing came within `timeout` seconds."""
+        deadline = None
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
+        while True:
+            nl = self._buf.find(b"\n")
+            if nl >= 0:
+                line = bytes(self._buf[:nl])
+                del self._buf[:nl + 1]
+                return json.loads(line.decode("utf-8"))
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                ready, _, _ = select.select([self.sock], [], [], max(0, remaining))
+                if not ready:
+                    raise TimeoutError("python worker did not answer")
+            chunk = self.sock.recv(65536)
+            if not chunk:
+                raise ConnectionError("python worker exited")
+            self._buf.extend(chunk)
+
+    def alive(self):
+        return self.proc.poll() is None
+
+    def send(self, code, tools, out, rep_r, req_w):
+        """hand over one snippet with its output and RPC fds."""
+        socket.send_fds(self.sock, [b"R"], [out, rep_r, req_w])
+        request = {}
+        request["code"] = code
+        request["tools"] = tools
+        self.sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+
+    def spawn(self, code, tools, out, rep_r, req_w):
+        """a zygote's child for one snippet, forked and running."""
+        self.send(code, tools, out, rep_r, req_w)
+        return _ZygoteChild(self, self._read()["pid"])
+
+    def close(self):
+        self.sock.close()
+        proc = getattr(self, "proc", None)
+        if proc is not None and proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        if self.staging:
+            shutil.rmtree(self.staging, ignore_errors=True)
+
+
+class _ZygoteChild:
+    """a snippet's forked child, behind the poll/kill/wait surface of the
+    Popen a one-shot run serves (see _serve); its exit status is the zygote's
+    second answer."""
+
+    def __init__(self, zygote, pid):
+        self.zygote = zygote
+        self.pid = pid
+        self.returncode = None
+
+    def poll(self):
+        if self.returncode is None:
+            ready, _, _ = select.select([self.zygote.sock], [], [], 0)
+            if ready:
+                self.wait()
+        return self.returncode
+
+    def kill(self):
+        try:
+            os.kill(self.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    def wait(self):
+        if self.returncode is None:
+            self.returncode = self.zygote._read()["status"]
+        return self.returncode
+
+
+class PythonWorkers:
+    """an agent's pool of warm zygotes (see the module docstring). acquire()
+    hands out an idle one built for the current interpreter/sandbox/cwd/
+    scratch/environment, or starts one; release() keeps it for the next
+    snippet - up to python_workers idle, python_worker_uses snippets each.
+    a key whose zygote failed to start is not tried again: its calls take the
+    one-shot path."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._idle = []
+        self._failed = set()
+        self.started = 0
+        self.reused = 0
+
+    def acquire(self, python, sandbox, scratch):
+        """a ready zygote _Worker, or None when the pool is off or cannot start one."""
+        if int(config.load_optional("python_workers", _WORKERS) or 0) <= 0:
+            return None
+        child_env = _child_env(scratch, sandbox)
+        key = _worker_key(python, sandbox, child_env)
+        with self._lock:
+            if key in self._failed:
+                return None
+            stale = []
+            zygote = None
+            for idle in self._idle:
+                if zygote is None and idle.key == key and idle.alive():
+                    zygote = idle
+                else:
+                    stale.append(idle)
+            self._idle = []
+        for idle in stale:
+            idle.close()
+        if zygote is not None:
+            self.reused += 1
+            return zygote
+        try:
+            zygote = _Worker(key, python, child_env, sandbox)
+        except (OSError, ValueError) as e:
+            log.info("python: no worker (%s); spawning per call", e)
+            with self._lock:
+                self._failed.add(key)
+            return None
+        self.started += 1
+        return zygote
+
+    def release(self, zygote, healthy=True):
+        """return `zygote` after a snippet; one that broke, served its
+        python_worker_uses, or finds the pool full is closed instead."""
+        zygote.uses += 1
+        uses = int(config.load_optional("python_worker_uses", _WORKER_USES) or 1)
+        size = int(config.load_optional("python_workers", _WORKERS) or 0)
+        if healthy and zygote.uses < uses and zygote.alive():
+            with self._lock:
+                if len(self._idle) < size:
+                    self._idle.append(zygote)
+                    return
+        zygote.close()
+
+    def close(self):
+        """close the idle zygotes (the agent is done with its tool)."""
+        with self._lock:
+            idle = self._idle
+            self._idle = []
+        for zygote in idle:
+            zygote.close()
+
+
+class _KernelCall:
+    """a snippet running in the session kernel, behind the same
+    poll/kill/wait surface (see _serve). kill() takes the whole kernel down."""
+
+    def __init__(self, kernel):
+        self.kernel = kernel
+        self.returncode = None
+        self.killed = False
+
+    def poll(self):
+        if self.returncode is None and not self.killed:
+            ready, _, _ = select.select([self.kernel.sock], [], [], 0)
+            if ready:
+                self.wait()
+        return self.returncode
+
+    def kill(self):
+        self.killed = True
+        self.kernel.proc.kill()
+
+    def wait(self):
+        if self.returncode is not None:
+            return self.returncode
+        if self.killed:
+            self.returncode = self.kernel.proc.wait()
+        else:
+            self.returncode = self.kernel._read()["status"]
+        return self.returncode
+
+
+class PythonSession:
+    """an agent's stateful python kernel (python_session): started on first
+    use, kept across calls, replaced when what its jail was built from changes
+    (the next result then says its state is gone). one call at a time."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._kernel = None
+        self._warn = False   # a kernel went away unasked: say so on the next result
+        self.started = 0
+
+    def reset(self):
+        """drop the kernel and its state; the next call starts a fresh one."""
+        with self._lock:
+            self._stop()
+            self._warn = False
+
+    def close(self):
+        with self._lock:
+            self._stop()
+
+    def _stop(self):
+        if self._kernel is None: return
+        self._kernel.close()
+        self._kernel = None
+
+    def run(self, agent, code, timeout):
+        python = ensure_venv()
+        scratch = cai.scratch_dir()
+        sandbox = config.load_optional("python_sandbox", "kernel")
+        names = _tool_names(agent)
+        child_env = _child_env(scratch, sandbox)
+        memory = config.load_optional("python_session_memory_mb", _SESSION_MEMORY_MB)
+        if memory:
+            child_env["CAI_PY_MEMORY_MB"] = str(int(memory))
+        cpu = config.load_optional("python_session_cpu_seconds")
+        if cpu:
+            child_env["CAI_PY_CPU_SECONDS"] = str(int(cpu))
+        key = _worker_key(python, sandbox, child_env)
+        with self._lock:
+            kernel = self._kernel
+            if kernel is not None and (kernel.key != key or not kernel.alive()):
+                self._stop()
+                self._warn = True
+            if self._kernel is None:
+                try:
+                    self._kernel = _Worker(key, python, child_env, sandbox, role="kernel")
+                except (OSError, ValueError) as e:
+                    log.info("python: no session kernel (%s); running one-shot", e)
+                    text = _run_python(agent, code, timeout)
+                    return f"[python session unavailable ({e}); ran one-shot]\n{text}"
+                self.started += 1
+            notice = ""
+            if self._warn:
+                notice = "[python session restarted - earlier variables are gone]\n"
+                self._warn = False
+            return notice + self._call(agent, code, names, timeout, scratch)
+
+    def _call(self, agent, code, names, timeout, scratch):
+        kernel = self._kernel
+        req_r, req_w = os.pipe()
+        rep_r, rep_w = os.pipe()
+        out = _Output(_progress())
+        bulk = _Bulk(scratch)
+        died = False
+        try:
+            try:
+                kernel.send(code, names, out.write_fd, rep_r, req_w)
+            except OSError:
+                self._stop()
+                raise
+            finally:
+                os.close(req_w)
+                os.close(rep_r)
+                out.closed_writer()
+            call = _KernelCall(kernel)
+            timed_out = _serve(agent, call, req_r, rep_w, timeout, bulk, out)
+            try:
+                call.wait()
+            except (ConnectionError, ValueError):
+                died = True
+            # the kernel keeps the pipe as its stdout between calls, so there
+            # is no EOF: what it flushed before reporting its status is there.
+            text = out.text()
+        finally:
+            os.close(req_r)
+            os.close(rep_w)
+            bulk.close()
+            out.close()
+        if timed_out or died:
+            self._stop()
+
+        if timed_out:
+            return f"Error: run timed out after {timeout}s - the python session was restarted, its variables are gone"
+        if died:
+            returncode = kernel.proc.wait()
+            return _result(text, returncode) + "\n[the python session died - its variables are gone]"
+        return _result(text, call.returncode)
+
+
+def _run_python(agent, code, timeout, workers=None):
+    """run the snippet in a sandboxed child - forked from one of `workers`'
+    zygotes when there is one, else a freshly spawned interpreter - serve its
+    tool calls, and return its combined stdout/stderr (truncated), with an
+    exit-code footer."""
+    python = ensure_venv()
+    scratch = cai.scratch_dir()
+    sandbox = config.load_optional("python_sandbox", "kernel")
+    names = _tool_names(agent)
+
+    zygote = None
+    if workers is not None:
+        zygote = workers.acquire(python, sandbox, scratch)
+    if zygote is not None:
+        return _run_forked(agent, workers, zygote, code, names, timeout, scratch)
+
+    req_r, req_w = os.pipe()   # child -> parent: tool_call() requests
+    rep_r, rep_w = os.pipe()   # parent -> child: results
+    child_env = _child_env(scratch, sandbox)
+    child_env["CAI_PY_RPC_READ"] = str(rep_r)
+    child_env["CAI_PY_RPC_WRITE"] = str(req_w)
     child_env["CAI_PY_TOOLS"] = json.dumps(names)
 
     # the mount point the child's kernel jail pivots onto. the tmpfs and binds
@@ -248,55 +890,85 @@ def _run_python(agent, code, timeout):
         staging = tempfile.mkdtemp(prefix="cai-py-")
         child_env["CAI_PY_STAGING"] = staging
 
-    out = tempfile.TemporaryFile()
+    out = _Output(_progress())
+    bulk = _Bulk(scratch)
     proc = None
     timed_out = False
     try:
         proc = subprocess.Popen([python, "-c", _bootstrap_source()],
                                 stdin=subprocess.PIPE,
-                                stdout=out,
+                                stdout=out.write_fd,
                                 stderr=subprocess.STDOUT,
                                 pass_fds=(req_w, rep_r),
                                 env=child_env)
+    except BaseException:
+        out.close()
+        raise
     finally:
         # the child owns its ends now; the parent keeps req_r/rep_w. closed even
         # on a spawn failure so no fd leaks.
         os.close(req_w)
         os.close(rep_r)
+        out.closed_writer()
 
     try:
         proc.stdin.write(code.encode("utf-8"))
         proc.stdin.close()
-        timed_out = _serve(agent, proc, req_r, rep_w, timeout)
+        timed_out = _serve(agent, proc, req_r, rep_w, timeout, bulk, out)
         proc.wait()
+        text = out.text()
     finally:
         os.close(req_r)
         os.close(rep_w)
+        bulk.close()
+        out.close()
         if staging:
             shutil.rmtree(staging, ignore_errors=True)
 
     if timed_out:
         return f"Error: run timed out after {timeout}s"
+    return _result(text, proc.returncode)
 
-    out.seek(0)
-    text = out.read().decode("utf-8", errors="replace")
-    text = _truncate(text.rstrip("\n"))
-    if proc.returncode != 0:
-        if text:
-            text += "\n"
-        text += f"[exit code {proc.returncode}]"
-    if not text:
-        return "(no output)"
-    return text
 
+def _run_forked(agent, workers, zygote, code, names, timeout, scratch):
+    """_run_python on a warm zygote: the same pipes and serving loop, with
+    the child forked from the zygote instead of spawned. the zygote goes back
+    to the pool unless talking to it failed."""
+    req_r, req_w = os.pipe()
+    rep_r, rep_w = os.pipe()
+    out = _Output(_progress())
+    bulk = _Bulk(scratch)
+    healthy = False
+    try:
+        try:
+            proc = zygote.spawn(code, names, out.write_fd, rep_r, req_w)
+        finally:
+            os.close(req_w)
+            os.close(rep_r)
+            out.closed_writer()
+        timed_out = _serve(agent, proc, req_r, rep_w, timeout, bulk, out)
+        proc.wait()
+        healthy = True
+        text = out.text()
+    finally:
+        os.close(req_r)
+        os.close(rep_w)
+        bulk.close()
+        out.close()
+        workers.release(zygote, healthy)
 
-_DOC = """Run a Python snippet in cai's sandbox and return its output (stdout + stderr).
+    if timed_out:
+        return f"Error: run timed out after {timeout}s"
+    return _result(text, proc.returncode)
 
-    One-shot: fresh interpreter every call, no variables survive between calls.
 
-    YOUR OWN tools are callable right in the snippet: each is a plain function
+_DOC_BODY = """YOUR OWN tools are callable right in the snippet: each is a plain function
     of the same name (e.g. fs__read_file(file_path='big.log')), and
-    tool_call(name, **kwargs) does the same by name.
+    tool_call(name, **kwargs) does the same by name. tool_bytes(name, **kwargs)
+    returns the result as a memoryview of its UTF-8 bytes instead - zero-copy
+    for a large one. tool_call_many([(name, kwargs), ...]) runs many calls
+    concurrently and returns their results in order; tool_call_async(name,
+    **kwargs) returns a future whose .result() runs every queued call at once.
 
     Sandbox: the tool can read files and list directories under the working
     directory and the session scratch dir, and WRITE only under the scratch dir
@@ -308,15 +980,38 @@ _DOC = """Run a Python snippet in cai's sandbox and return its output (stdout +
     Args:
         code:    Python source to execute.
         timeout: Seconds before the run is killed (default 60).
+"""
+
+_DOC = """Run a Python snippet in cai's sandbox and return its output (stdout + stderr).
+
+    One-shot: fresh interpreter every call, no variables survive between calls.
+
+    """ + _DOC_BODY
+
+_SESSION_DOC = """Run Python in a persistent sandboxed session and return its output (stdout + stderr); variables survive between calls.
+
+    Stateful: globals, imports and loaded data persist from call to call - load
+    a big file once, then query it in later calls. reset=True starts a fresh
+    session first; a run that times out restarts it (its state is lost).
+
+    """ + _DOC_BODY + """        reset:   Start a fresh session (dropping every variable) before running.
     """
 
 
 def make_python(agent):
     """build the python tool bound to `agent`; tool_call() reaches the agent's live
-    tools/dispatch through the closure."""
+    tools/dispatch through the closure, and its worker pool lives as long as
+    the agent's registry (closed with it through _cai_close). with
+    python_session on, it is the stateful variant, backed by a PythonSession."""
+    if config.load_optional("python_session", False):
+        return _make_session_python(agent)
+    workers = PythonWorkers()
+
     def python(code: str, timeout: int = 60) -> str:
-        return _run_python(agent, code, timeout)
+        return _run_python(agent, code, timeout, workers)
     python.__doc__ = _DOC
+    python._cai_workers = workers
+    python._cai_close = workers.close
     # the concrete tool list the model sees comes from the python skill's
     # {{tools}} slot (registry.signatures); python must not list itself there -
     # it cannot call itself (see _dispatch_gated).
@@ -324,6 +1019,20 @@ def make_python(agent):
     return python
 
 
+def _make_session_python(agent):
+    session = PythonSession()
+
+    def python(code: str, timeout: int = 60, reset: bool = False) -> str:
+        if reset:
+            session.reset()
+        return session.run(agent, code, timeout)
+    python.__doc__ = _SESSION_DOC
+    python._cai_session = session
+    python._cai_close = session.close
+    python._cai_hide_from_tool_list = True
+    return python
+
+
 def python_tools(agent):
     """the python tool(s) bound to `agent` - the agent-tools factory analog of
     subagent_tools. registered unselected on every agent; the `python` skill
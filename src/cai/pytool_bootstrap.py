@@ -15,7 +15,19 @@ userspace: reads (and directory listings) are confined to the same roots;
 writes are allowed under the scratch dir only and denied everywhere else, as
 are subprocess/exec/fork, sockets, ctypes and cffi. raw
 os.read/os.write on the inherited fds emit no audit events and namespaces do
-not sever inherited fds, so tool_call() needs no exception in either jail."""
+not sever inherited fds, so tool_call() needs no exception in either jail. a
+large result arrives as a file under the scratch dir instead (see
+cai.pytool._Bulk), which both jails already let the child read and unlink.
+
+Given a control socket (CAI_PY_CONTROL), it serves snippet requests instead of
+reading one from stdin, in one of two roles (CAI_PY_ROLE). a ZYGOTE builds the
+jail once and then forks one child per request: the child takes the request's
+output and RPC fds (passed over the socket), and carries on exactly as a
+one-shot run would after the jail - hook, tool_call(), exec. the zygote itself
+never runs a snippet and never installs the audit hook. a KERNEL (the stateful
+python session) installs the hook once and runs every request itself, in one
+globals dict that outlives the call. CAI_PY_MEMORY_MB / CAI_PY_CPU_SECONDS,
+when set, cap the process's address space and CPU time."""
 import sys
 import os
 import json
@@ -388,6 +400,145 @@ def hook(event, args):
         in_hook[0] = False
 
 
+# --- zygote and kernel: serving requests over a control socket --------------
+# the control protocol with cai.pytool: the process says {"ready": true} once
+# jailed. each request is one byte carrying three fds (SCM_RIGHTS) - the
+# output file, the RPC read end and the RPC write end - followed by a JSON line
+# {"code", "tools"}. a zygote answers {"pid"} once the child is forked; both
+# answer {"status"} (a subprocess-style returncode) once the snippet is done.
+# EOF on the socket (cai went away) ends the process.
+
+def send_line(control, message):
+    control.sendall(json.dumps(message).encode("utf-8") + b"\n")
+
+
+def recv_line(control, buf):
+    while True:
+        nl = buf.find(b"\n")
+        if nl >= 0:
+            line = bytes(buf[:nl])
+            del buf[:nl + 1]
+            return line
+        chunk = control.recv(65536)
+        if not chunk:
+            os._exit(0)
+        buf.extend(chunk)
+
+
+def recv_request(control, buf):
+    """the next request's three fds and its JSON body; exits on EOF."""
+    import socket
+    try:
+        _msg, fds, _flags, _addr = socket.recv_fds(control, 1, 3)
+    except OSError:
+        os._exit(0)
+    if len(fds) != 3:
+        os._exit(0)
+    return fds, json.loads(recv_line(control, buf).decode("utf-8"))
+
+
+def apply_limits():
+    """cap this process per CAI_PY_MEMORY_MB (address space: a snippet that
+    outgrows it gets MemoryError) and CAI_PY_CPU_SECONDS (total CPU time: past
+    it the kernel kills the process)."""
+    memory = os.environ.get("CAI_PY_MEMORY_MB", "")
+    cpu = os.environ.get("CAI_PY_CPU_SECONDS", "")
+    if not memory and not cpu:
+        return
+    import resource
+    if memory:
+        limit = int(memory) * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    if cpu:
+        resource.setrlimit(resource.RLIMIT_CPU, (int(cpu), int(cpu) + 1))
+
+
+def zygote(fd):
+    """serve snippet requests on control socket `fd` until cai hangs up.
+    returns only in a forked child - the snippet source, with stdout/stderr on
+    the request's output file and the RPC fds published in the environment."""
+    import socket
+    control = socket.socket(fileno=fd)
+    send_line(control, {"ready": True})
+    buf = bytearray()
+    while True:
+        fds, request = recv_request(control, buf)
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            control.close()
+            out, rpc_read, rpc_write = fds
+            os.dup2(out, 1)
+            os.dup2(out, 2)
+            os.close(out)
+            os.environ["CAI_PY_RPC_READ"] = str(rpc_read)
+            os.environ["CAI_PY_RPC_WRITE"] = str(rpc_write)
+            os.environ["CAI_PY_TOOLS"] = json.dumps(request.get("tools") or [])
+            return request["code"]
+        for child_fd in fds:
+            os.close(child_fd)
+        send_line(control, {"pid": pid})
+        _pid, status = os.waitpid(pid, 0)
+        send_line(control, {"status": os.waitstatus_to_exitcode(status)})
+
+
+def exit_status(exc):
+    """the returncode `python -c` would exit with on SystemExit `exc`,
+    printing a non-integer code to stderr as the interpreter does."""
+    code = exc.code
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    sys.stderr.write(f"{code}\n")
+    return 1
+
+
+def kernel(fd):
+    """the stateful session: run every request in this one process, against
+    one globals dict, until cai hangs up. each call's output and RPC fds are
+    swapped in for its duration; its status is what `python -c` would have
+    exited with (an uncaught exception prints its traceback and counts as 1)."""
+    global _RPC_RD, _RPC_WR
+    import socket
+    import traceback
+    control = socket.socket(fileno=fd)
+    snippet_globals = {}
+    snippet_globals["__name__"] = "__main__"
+    snippet_globals["tool_call"] = tool_call
+    snippet_globals["tool_bytes"] = tool_bytes
+    snippet_globals["tool_call_many"] = tool_call_many
+    snippet_globals["tool_call_async"] = tool_call_async
+    sys.stdout.reconfigure(line_buffering=True)
+    sys.addaudithook(hook)
+    send_line(control, {"ready": True})
+    buf = bytearray()
+    while True:
+        fds, request = recv_request(control, buf)
+        out, _RPC_RD, _RPC_WR = fds
+        _rpc_buf.clear()
+        _pending.clear()
+        os.dup2(out, 1)
+        os.dup2(out, 2)
+        os.close(out)
+        os.environ["CAI_PY_TOOLS"] = json.dumps(request.get("tools") or [])
+        snippet_globals.update(tool_globals())
+        status = 0
+        try:
+            exec(compile(request["code"], "<python>", "exec"), snippet_globals)
+        except SystemExit as e:
+            status = exit_status(e)
+        except BaseException as e:
+            traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+            status = 1
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.close(_RPC_RD)
+        os.close(_RPC_WR)
+        send_line(control, {"status": status})
+
+
 # --- the tool_call() tool proxy ----------------------------------------------
 
 _RPC_RD = -1
@@ -408,18 +559,118 @@ def _rpc_readline():
         _rpc_buf.extend(chunk)
 
 
+def _send(request):
+    os.write(_RPC_WR, json.dumps(request).encode("utf-8") + b"\n")
+    return json.loads(_rpc_readline().decode("utf-8"))
+
+
+def _rpc(name, kwargs):
+    request = {}
+    request["name"] = name
+    request["kwargs"] = kwargs
+    return _send(request)
+
+
+def _bulk_view(reply):
+    """a memoryview over a bulk reply's file (see cai.pytool._Bulk), mapped
+    read-only and then unlinked - the mapping outlives the name."""
+    import mmap
+    path = reply["bulk"]
+    with open(path, "rb") as f:
+        if reply["size"]:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            data = b""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+    return memoryview(data)
+
+
 def tool_call(name, **kwargs):
     """dispatch one of the agent's own tools and return its result string. the
     call runs in the cai process, through cai's tool gates; only what you
     print() reaches the model, so reduce a big result here first."""
-    request = {}
-    request["name"] = name
-    request["kwargs"] = kwargs
-    os.write(_RPC_WR, json.dumps(request).encode("utf-8") + b"\n")
-    reply = json.loads(_rpc_readline().decode("utf-8"))
+    return _decode(_rpc(name, kwargs))
+
+
+def tool_bytes(name, **kwargs):
+    """tool_call, but the result as a memoryview of its UTF-8 bytes - for a
+    large result a read-only mapping of the file cai handed it over in, so
+    nothing is copied or decoded until you slice or search it."""
+    reply = _rpc(name, kwargs)
+    if "bulk" in reply:
+        return _bulk_view(reply)
+    return memoryview(reply["result"].encode("utf-8"))
+
+
+def _decode(reply):
+    if "bulk" in reply:
+        return str(_bulk_view(reply), "utf-8")
     return reply["result"]
 
 
+def tool_call_many(calls):
+    """dispatch many tool calls in ONE round trip and return their result
+    strings in order. `calls` is a list of (name, kwargs) pairs; cai runs
+    them side by side, each through its tool gates, so fanning out over 500
+    files costs one batch rather than 500 sequential calls."""
+    batch = []
+    for name, kwargs in calls:
+        call = {}
+        call["name"] = name
+        call["kwargs"] = kwargs or {}
+        batch.append(call)
+    if not batch:
+        return []
+    request = {}
+    request["batch"] = batch
+    return [_decode(reply) for reply in _send(request)["results"]]
+
+
+class ToolFuture:
+    """a queued tool_call_async(): its .result() sends every call queued so
+    far as one tool_call_many() batch, then returns this one's result."""
+
+    def __init__(self, name, kwargs):
+        self.name = name
+        self.kwargs = kwargs
+        self._done = False
+        self._result = None
+
+    def done(self):
+        return self._done
+
+    def result(self):
+        if not self._done:
+            if self not in _pending:
+                raise RuntimeError("cai sandbox: this tool_call_async() belongs to an earlier run")
+            _flush()
+        return self._result
+
+
+_pending = []
+
+
+def _flush():
+    queued = list(_pending)
+    _pending.clear()
+    results = tool_call_many([(future.name, future.kwargs) for future in queued])
+    for future, result in zip(queued, results):
+        future._result = result
+        future._done = True
+
+
+def tool_call_async(name, **kwargs):
+    """queue a tool call and return a ToolFuture for it. nothing is sent
+    until some future's .result() is asked for - then every queued call goes
+    in one concurrent batch."""
+    future = ToolFuture(name, kwargs)
+    _pending.append(future)
+    return future
+
+
 def make_tool_proxy(name):
     """a plain function that dispatches tool `name` over the same RPC as
     tool_call - so a snippet can call it directly (fs__read_file(...))."""
@@ -446,9 +697,13 @@ def tool_globals():
 def main():
     global read_roots, write_roots, _RPC_RD, _RPC_WR
 
-    code = sys.stdin.read()
+    control = os.environ.get("CAI_PY_CONTROL", "")
+    code = None
+    if not control:
+        code = sys.stdin.read()
     read_roots = compute_read_roots()
     write_roots = compute_write_roots()
+    apply_limits()
 
     if os.environ.get("CAI_PY_SANDBOX", "kernel") != "hook":
         try:
@@ -462,14 +717,25 @@ def main():
                 "to run with the audit-hook sandbox only.\n")
             sys.exit(97)
 
+    if control and os.environ.get("CAI_PY_ROLE") == "kernel":
+        kernel(int(control))
+    if control:
+        code = zygote(int(control))
+
     _RPC_RD = int(os.environ["CAI_PY_RPC_READ"])
     _RPC_WR = int(os.environ["CAI_PY_RPC_WRITE"])
 
     snippet_globals = {}
     snippet_globals["__name__"] = "__main__"
     snippet_globals["tool_call"] = tool_call
+    snippet_globals["tool_bytes"] = tool_bytes
+    snippet_globals["tool_call_many"] = tool_call_many
+    snippet_globals["tool_call_async"] = tool_call_async
     snippet_globals.update(tool_globals())
 
+    # stdout is a pipe cai reads as it fills (live progress): hand it each
+    # line as printed, as a terminal would, not in 8K blocks.
+    sys.stdout.reconfigure(line_buffering=True)
     sys.addaudithook(hook)
     exec(compile(code, "<python>", "exec"), snippet_globals)
 
@@ -0,0 +1,153 @@
+"""result_cache: memoized tool results for a ToolsRegistry.
+
+Agents re-read the same files and re-run the same searches, turn after turn and
+sub-agent after sub-agent. A ResultCache answers a repeated call to an opted-in
+tool (see ToolsRegistry.cache_tool / @cai.tool(cacheable=True)) from memory,
+keyed on the tool name plus its canonical (key-sorted JSON) arguments, saving
+the MCP round trip and whatever the tool spawns behind it.
+
+An entry is dropped when it:
+  - outlives the TTL,
+  - is the least recently used one and the cache is full,
+  - was stamped with the mtime/size of the files its arguments named, and one
+    of them changed (or appeared, or vanished) since,
+  - or the registry dispatched a tool that is not read-only - anything that may
+    have written (fs__edit_file, the python tool) clears the lot.
+
+A directory argument is stamped too, but its mtime only moves when an entry is
+added or removed directly inside it: a recursive listing or search over it is
+kept fresh by the TTL and the write-clears-all rule, not by its stamp.
+
+Thread-safe: parallel tool calls share one cache. Stdlib-only."""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_TTL = 300.0   # seconds
+
+
+def cache_key(name, arguments):
+    """(name, canonical JSON of arguments) - two calls spelling the same args in
+    a different key order share one entry."""
+    canonical = json.dumps(arguments or {}, sort_keys=True, separators=(",", ":"), default=str)
+    return name, canonical
+
+
+def stamp(paths):
+    """the (path, mtime_ns, size) of each path, (path, None, None) when it does
+    not exist - what validates an entry later."""
+    stamps = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            stamps.append((path, None, None))
+            continue
+        stamps.append((path, st.st_mtime_ns, st.st_size))
+    return tuple(stamps)
+
+
+class ResultCache:
+    """an LRU of tool results, bounded by max_entries and aged out after ttl
+    seconds (None: no expiry). stats() reports the hit/miss counters, overall
+    and per tool."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> (result, expires_at, stamps)
+        self._tools = {}                # name -> {"hits": n, "misses": n}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        # bumped by invalidate(): a put() that began before a clear is dropped,
+        # so a read racing a write can't cache what the write replaced.
+        self.generation = 0
+
+    @classmethod
+    def for_settings(cls, settings):
+        """the cache a CLI/TUI agent gets from cai.settings (cache_tools,
+        tool_cache_size, tool_cache_ttl), or None when no tool opts in."""
+        if not settings.cache_tools:
+            return None
+        return cls(max_entries=settings.tool_cache_size, ttl=settings.tool_cache_ttl)
+
+    def get(self, name, arguments):
+        """the cached result of this call, or None (counted as a miss)."""
+        key = cache_key(name, arguments)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not self._fresh(entry):
+                del self._entries[key]
+                entry = None
+            counters = self._tools.setdefault(name, {"hits": 0, "misses": 0})
+            if entry is None:
+                self.misses += 1
+                counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            counters["hits"] += 1
+            return entry[0]
+
+    def put(self, name, arguments, result, stamps=(), generation=None):
+        """remember `result` for this call. `stamps` (see stamp) are the files
+        it read, taken before it ran; `generation`, the value read then too -
+        an invalidation since makes the put a no-op."""
+        if not self.max_entries: return
+        key = cache_key(name, arguments)
+        expires = None
+        if self.ttl is not None:
+            expires = self._clock() + self.ttl
+        entry = (result, expires, tuple(stamps))
+        with self._lock:
+            if generation is not None and generation != self.generation: return
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        """drop every entry (a tool that may have written ran)."""
+        with self._lock:
+            self.generation += 1
+            if not self._entries: return
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self):
+        """the counters as a dict: hits, misses, evictions, invalidations,
+        size, and per-tool {name: {"hits", "misses"}}."""
+        with self._lock:
+            tools = {}
+            for name, counters in self._tools.items():
+                tools[name] = dict(counters)
+            stats = {}
+            stats['hits'] = self.hits
+            stats['misses'] = self.misses
+            stats['evictions'] = self.evictions
+            stats['invalidations'] = self.invalidations
+            stats['size'] = len(self._entries)
+            stats['tools'] = tools
+            return stats
+
+    def _fresh(self, entry):
+        _result, expires, stamps = entry
+        if expires is not None and self._clock() >= expires:
+            return False
+        if not stamps:
+            return True
+        paths = []
+        for path, _mtime, _size in stamps:
+            paths.append(path)
+        return stamp(paths) == stamps
@@ -0,0 +1,108 @@
+"""schema_cache: the tools/list catalogues of file-backed MCP servers, on disk.
+
+Registering '<mcp>__<tool>' needs the tool's schema, and getting it means
+spawning the server and asking - once per registry, so every new Agent and
+sub-agent paid a spawn (and the handshake) just to learn schemas it already
+knew. A SchemaCache remembers each server file's catalogue keyed on its path,
+mtime and size: while the file is unchanged, a registry registers its tools
+from the cache and spawns the server only when one is actually called.
+
+Only servers that are a source file (an extension's mcps/<name>.py, the
+builtins) are cached: a cai.mcp_server command or url has no cheap change
+signal, so those are still asked on connect (once per connection - see
+LocalMCPServer.list_tools).
+
+One JSON file under the config dir, read once per process and rewritten
+atomically when an entry changes. Stdlib-only."""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+
+from cai import config
+
+
+log = logging.getLogger("cai")
+
+
+def schema_cache_path():
+    return os.path.join(config.config_dir(), "mcp_tools.json")
+
+
+def _file_stamp(path):
+    """(mtime_ns, size) of path, or None when it can't be stat'ed."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+class SchemaCache:
+    """source path -> {"stamp": [mtime_ns, size], "tools": [...]}. thread-safe."""
+
+    _default = None
+
+    def __init__(self, path=None):
+        self.path = path or schema_cache_path()
+        self._lock = threading.Lock()
+        self._entries = None   # loaded on first use
+
+    @classmethod
+    def default(cls):
+        """the process-wide cache every registry shares unless given its own."""
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def _load(self):
+        if self._entries is not None: return
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        if not isinstance(data, dict):
+            data = {}
+        self._entries = data
+
+    def get(self, source):
+        """the cached catalogue of the server file `source`, or None when there
+        is none or the file changed since it was stored."""
+        stamp = _file_stamp(source)
+        if stamp is None:
+            return None
+        with self._lock:
+            self._load()
+            entry = self._entries.get(source)
+        if not isinstance(entry, dict):
+            return None
+        if entry.get("stamp") != stamp:
+            return None
+        return entry.get("tools")
+
+    def put(self, source, tools):
+        """store `tools` as the catalogue of the server file `source` as it is
+        now. a no-op when that is what is already stored."""
+        stamp = _file_stamp(source)
+        if stamp is None: return
+        entry = {}
+        entry["stamp"] = stamp
+        entry["tools"] = tools
+        with self._lock:
+            self._load()
+            if self._entries.get(source) == entry: return
+            self._entries[source] = entry
+            self._write()
+
+    def _write(self):
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp, "w") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            log.warning("could not write MCP schema cache %s: %s", self.path, e)
@@ -0,0 +1,186 @@
+"""server_pool: MCP server connections shared across registries.
+
+Every ToolsRegistry used to spawn its own servers: each Agent, each --watch or
+--line-by-line run and each sub-agent paid a Python start-up, the FastMCP
+import and the initialize handshake for the same fs.py. A ServerPool hands out
+one live connection per key and counts who holds it:
+
+  server = pool.acquire(key, factory)   # the pooled one, or factory() spawned
+  ...
+  pool.release(server)                  # idle once nobody holds it
+
+The key is what makes two servers interchangeable: the label, the command (or
+url/headers), the spawn env and cwd (the client's cwd when the spec names
+none), and CAI_ALLOWED_PATHS as the spawned process would inherit it. What
+differs per agent is the scratch dir: a bundled builtin server gets it with
+each tools/call instead (see ToolsRegistry._call_meta and cai.paths), so one
+serves every agent; any other local server is still spawned with CAI_SCRATCH
+in its env (see ToolsRegistry._scratch_env), so only agents sharing a scratch
+dir share it.
+
+A pooled server is health-checked before it is handed out again (a local
+process that exited is dropped and respawned), and one left idle longer than
+idle_timeout is closed at the next acquire/release (or reap()). Thread-safe."""
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+
+
+log = logging.getLogger("cai")
+
+DEFAULT_IDLE_TIMEOUT = 300.0   # seconds an unheld server stays warm
+
+
+def server_key(label, spec, env=None):
+    """the pool key of a server spawned from `spec` (a cai.mcp_server spec, or
+    {"command": [...]} for a server file) with `env` as its extra env."""
+    key = {}
+    key["label"] = label
+    if "url" in spec:
+        key["url"] = spec["url"]
+        key["headers"] = spec.get("headers") or {}
+        key["ssl_verify"] = spec.get("ssl_verify", True)
+    else:
+        key["command"] = list(spec["command"])
+        key["env"] = env or {}
+        key["cwd"] = spec.get("cwd") or os.getcwd()
+        key["allowed"] = os.environ.get("CAI_ALLOWED_PATHS", "")
+    key["timeout"] = spec.get("timeout")
+    return json.dumps(key, sort_keys=True, default=str)
+
+
+def _alive(server):
+    """whether a pooled connection can still be used: a local server's
+    process is running (a remote one has no process to check)."""
+    process = getattr(server, "_process", None)
+    if process is None:
+        return True
+    return process.poll() is None
+
+
+class ServerPool:
+    """key -> one live server, reference-counted. see the module docstring."""
+
+    _default = None
+
+    def __init__(self, idle_timeout=DEFAULT_IDLE_TIMEOUT, clock=time.monotonic):
+        self.idle_timeout = idle_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = {}   # key -> [server, refs, idle_since]
+        self._keys = {}      # id(server) -> key
+        self._spawning = {}  # key -> Event set once its in-flight factory() ends
+        self.spawned = 0
+        self.reused = 0
+        self.evicted = 0
+
+    @classmethod
+    def default(cls):
+        """the process-wide pool every registry shares unless given its own."""
+        if cls._default is None:
+            cls._default = cls()
+            atexit.register(cls._default.close)
+        return cls._default
+
+    def acquire(self, key, factory):
+        """the live server for `key`, held until release(): the pooled one when
+        it passes the health check, else a fresh factory(). factory runs outside
+        the pool lock, so servers of different keys spawn side by side, while
+        concurrent acquires of one key wait for its single spawn."""
+        while True:
+            with self._lock:
+                self._reap()
+                entry = self._entries.get(key)
+                if entry is not None and not _alive(entry[0]):
+                    log.warning("MCP server %r exited; respawning", entry[0].label)
+                    self._drop(key)
+                    entry = None
+                if entry is not None:
+                    entry[1] += 1
+                    entry[2] = None
+                    self.reused += 1
+                    return entry[0]
+                spawning = self._spawning.get(key)
+                if spawning is None:
+                    self._spawning[key] = threading.Event()
+                    break
+            # another thread is spawning this key: take its server once it is
+            # up (or, should that spawn fail, try again ourselves).
+            spawning.wait()
+        try:
+            server = factory()
+        except BaseException:
+            with self._lock:
+                self._spawning.pop(key).set()
+            raise
+        with self._lock:
+            self._spawning.pop(key).set()
+            self._entries[key] = [server, 1, None]
+            self._keys[id(server)] = key
+            self.spawned += 1
+        return server
+
+    def release(self, server):
+        """drop one hold on `server`; with none left it idles until evicted. a
+        server the pool doesn't know (already evicted) is just closed."""
+        with self._lock:
+            key = self._keys.get(id(server))
+            entry = self._entries.get(key) if key is not None else None
+            if entry is None or entry[0] is not server:
+                _close(server)
+                return
+            entry[1] = max(0, entry[1] - 1)
+            if entry[1] == 0:
+                entry[2] = self._clock()
+            self._reap()
+
+    def reap(self):
+        """close every server idle longer than idle_timeout."""
+        with self._lock:
+            self._reap()
+
+    def _reap(self):
+        now = self._clock()
+        for key in list(self._entries):
+            _server, refs, idle_since = self._entries[key]
+            if refs or idle_since is None: continue
+            if now - idle_since < self.idle_timeout: continue
+            self._drop(key)
+            self.evicted += 1
+
+    def _drop(self, key):
+        server = self._entries.pop(key)[0]
+        self._keys.pop(id(server), None)
+        _close(server)
+
+    def stats(self):
+        """the counters as a dict: spawned, reused, evicted, live, idle."""
+        with self._lock:
+            idle = 0
+            for _server, refs, _idle_since in self._entries.values():
+                if not refs: idle += 1
+            stats = {}
+            stats['spawned'] = self.spawned
+            stats['reused'] = self.reused
+            stats['evicted'] = self.evicted
+            stats['live'] = len(self._entries)
+            stats['idle'] = idle
+            return stats
+
+    def close(self):
+        """close every pooled server, held or not (process exit, tests)."""
+        with self._lock:
+            for key in list(self._entries):
+                self._drop(key)
+
+
+def _close(server):
+    try:
+        server.close()
+    except Exception:
+        log.exception("closing MCP server %r failed", getattr(server, "label", "?"))
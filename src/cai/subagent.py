@@ -285,6 +285,12 @@ def _launch_agent(parent,
                       tools=child_tools,
                       skills=child_skills,
                       hooks=parent.hooks,
+                      # share the parent's result cache: a file the parent
+                      # already read is not read again for the child.
+                      result_cache=parent.tools_registry.result_cache,
+                      cache_tools=parent.tools_registry.cached_tools(),
+                      context=parent._forked_context(),
+                      warm_servers=parent.tools_registry.warm_servers,
                       # share the parent's scratch: a path the child reports in
                       # its final text must outlive the child's teardown.
                       scratch=parent.scratch())
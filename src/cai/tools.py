@@ -25,8 +25,9 @@ The install-wide catalogue (which tools exist at all) is the Environment's:
 env.available_tools() lists it, and each registry keeps an env reference to
 resolve names and server specs against.
 
-Minimal by design: blocking JSON-RPC (no timeouts/retries/threads), one
-request/response at a time; a stdio server's stderr is discarded. Local stdio
+A stdio server's JSON-RPC is multiplexed: requests from many threads are
+pipelined down its pipe and a reader thread matches the responses back, with
+optional per-request timeouts and cancellation; its stderr is discarded. Local stdio
 servers (a command, run as a subprocess) and remote servers (a URL, spoken to
 over Streamable HTTP) sit side by side; images and user-only display blocks are
 still later layers."""
@@ -36,32 +37,73 @@ import os
 import sys
 import json
 import typing
+import time
 import atexit
 import inspect
 import logging
+import threading
 import subprocess
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
 
 import requests
 import urllib3
 
 from cai import paths
-from cai.environment import Environment
+from cai.api import PooledSession, _retry_delay, _retryable
+from cai.environment import Environment, builtin_mcp_dir
+from cai.hooks import current_gate
+from cai.metrics import LatencyStats
+from cai.result_cache import stamp
+from cai.schema_cache import SchemaCache
+from cai.server_pool import ServerPool, server_key
 
 
 log = logging.getLogger("cai")
 
 MCP_PROTOCOL_VERSION = "2024-11-05"
 
+_HANDSHAKE_TIMEOUT = 30.0   # seconds a local server gets to answer initialize
+_CANCEL_POLL = 0.05         # how often a request with a cancel Event checks it
+
+# a remote server's defaults: seconds to establish the connection, seconds a
+# reply may go quiet (between bytes, not in total), and attempts per request.
+_CONNECT_TIMEOUT = 10.0
+_READ_TIMEOUT = 300.0
+_REMOTE_ATTEMPTS = 3
+
+# statuses a remote server answers before running anything - a tools/call
+# refused with one of them is safe to send again.
+_NOT_RUN = (429, 503)
+
+
+class MCPRequestCancelled(Exception):
+    """an MCP request given up on before its response came back: it timed out
+    or its run was interrupted (the server was sent notifications/cancelled)."""
+
 
 class LocalMCPServer:
     """One MCP stdio server subprocess, spoken to over line-delimited JSON-RPC.
-    The loop runs tools one at a time, so this stays single-threaded: write a
-    request, read stdout lines until the matching id comes back."""
-
-    def __init__(self, command, label, env=None, cwd=None):
+    the client is multiplexed: a reader thread demuxes every response by id
+    into the Future its caller waits on, so any number of requests (parallel
+    tool calls, several agents sharing the server through the pool) are in
+    flight at once, pipelined down the one pipe - the lock only keeps their
+    lines from interleaving. a request waits at most `timeout` seconds (None:
+    as long as it takes) or until its `cancel` Event is set; either way the
+    server is sent notifications/cancelled for it. the tools/list catalogue is
+    fetched once and kept until the server says
+    notifications/tools/list_changed."""
+
+    def __init__(self, command, label, env=None, cwd=None, timeout=None):
         self.label = label
+        self.timeout = timeout
         self._command = command
         self._req_id = 0
+        self._lock = threading.Lock()
+        self._pending = {}   # request id -> Future of its response
+        self._closed = None  # the ConnectionError every request fails with, once the pipe is gone
+        self._tools = None   # the cached tools/list catalogue
+        self._stats = LatencyStats()
         popen_env = None
         if env is not None:
             popen_env = dict(os.environ)
@@ -75,6 +117,8 @@ class LocalMCPServer:
                                          env=popen_env,
                                          cwd=cwd)
         atexit.register(self.close)
+        self._reader = threading.Thread(target=self._read_loop, daemon=True, name=f"cai-mcp-{label}")
+        self._reader.start()
         self._handshake()
 
     def _handshake(self):
@@ -82,55 +126,164 @@ class LocalMCPServer:
         params["protocolVersion"] = MCP_PROTOCOL_VERSION
         params["capabilities"] = {}
         params["clientInfo"] = {"name": "cai", "version": "1.0"}
-        self._request("initialize", params)
+        self._request("initialize", params, timeout=_HANDSHAKE_TIMEOUT)
         self._notify("notifications/initialized")
         log.info("MCP server %r started", self.label)
 
     def _write(self, message):
-        self._process.stdin.write(json.dumps(message) + "\n")
-        self._process.stdin.flush()
+        line = json.dumps(message) + "\n"
+        with self._lock:
+            self._process.stdin.write(line)
+            self._process.stdin.flush()
 
-    def _notify(self, method):
+    def _notify(self, method, params=None):
         message = {}
         message["jsonrpc"] = "2.0"
         message["method"] = method
+        if params is not None:
+            message["params"] = params
         self._write(message)
 
-    def _request(self, method, params):
-        """send one JSON-RPC request and return its response dict, skipping any
-        interleaved notification/log line until the matching id comes back."""
-        self._req_id += 1
-        req_id = self._req_id
+    def _request(self, method, params, timeout=None, cancel=None):
+        """send one JSON-RPC request and wait for its response dict. raises
+        ConnectionError when the server is gone, MCPRequestCancelled when
+        `timeout` passes or `cancel` (a threading.Event) is set first."""
+        future = Future()
         message = {}
         message["jsonrpc"] = "2.0"
-        message["id"] = req_id
         message["method"] = method
         message["params"] = params
-        self._write(message)
+        with self._lock:
+            if self._closed is not None:
+                raise ConnectionError(str(self._closed))
+            self._req_id += 1
+            req_id = self._req_id
+            message["id"] = req_id
+            self._pending[req_id] = future
+        try:
+            self._write(message)
+            return self._wait(future, req_id, method, timeout, cancel)
+        except (BrokenPipeError, ValueError) as e:
+            raise ConnectionError(f"MCP server {self.label!r} exited during {method!r}") from e
+        finally:
+            with self._lock:
+                self._pending.pop(req_id, None)
 
+    def _wait(self, future, req_id, method, timeout, cancel):
+        deadline = None
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
         while True:
-            line = self._process.stdout.readline()
-            if line == "":
-                raise ConnectionError(f"MCP server {self.label!r} exited during {method!r}")
-            line = line.strip()
-            if not line: continue
+            wait = None
+            if cancel is not None:
+                wait = _CANCEL_POLL
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._cancel(req_id, "timed out")
+                    raise MCPRequestCancelled(f"MCP server {self.label!r}: {method!r} timed out after {timeout}s")
+                if wait is None or remaining < wait:
+                    wait = remaining
             try:
-                response = json.loads(line)
-            except json.JSONDecodeError:
-                log.warning("MCP %r: ignoring non-JSON line: %r", self.label, line[:200])
-                continue
-            if not isinstance(response, dict): continue
-            if response.get("id") != req_id: continue
-            return response
-
-    def list_tools(self):
-        response = self._request("tools/list", {})
-        return _tools_from_response(response)
-
-    def call_tool(self, name, arguments):
-        response = self._request("tools/call", {"name": name, "arguments": arguments or {}})
+                return future.result(wait)
+            except FutureTimeout:
+                pass
+            if cancel is not None and cancel.is_set():
+                self._cancel(req_id, "interrupted")
+                raise MCPRequestCancelled(f"MCP server {self.label!r}: {method!r} interrupted")
+
+    def _cancel(self, req_id, reason):
+        params = {}
+        params["requestId"] = req_id
+        params["reason"] = reason
+        try:
+            self._notify("notifications/cancelled", params)
+        except (OSError, ValueError):
+            pass
+
+    def _read_loop(self):
+        """the reader thread: every stdout line is a response (resolving the
+        Future waiting on its id), a notification, or a server-to-client
+        request. on EOF every pending request fails with ConnectionError."""
+        try:
+            for line in self._process.stdout:
+                line = line.strip()
+                if not line: continue
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError:
+                    log.warning("MCP %r: ignoring non-JSON line: %r", self.label, line[:200])
+                    continue
+                if not isinstance(message, dict): continue
+                self._route(message)
+        except (OSError, ValueError):
+            pass
+        with self._lock:
+            self._closed = ConnectionError(f"MCP server {self.label!r} exited")
+            pending = list(self._pending.values())
+        for future in pending:
+            if not future.done():
+                future.set_exception(self._closed)
+
+    def _route(self, message):
+        if "method" not in message:
+            with self._lock:
+                future = self._pending.get(message.get("id"))
+            if future is not None and not future.done():
+                future.set_result(message)
+            return
+        if _lists_changed(message):
+            self._tools = None
+            return
+        if message.get("id") is None: return
+        # a request from the server (ping, sampling, roots...): answer ping,
+        # refuse the rest, so the server never waits on a client that can't.
+        reply = {}
+        reply["jsonrpc"] = "2.0"
+        reply["id"] = message["id"]
+        if message["method"] == "ping":
+            reply["result"] = {}
+        else:
+            reply["error"] = {"code": -32601, "message": f"method not supported: {message['method']}"}
+        try:
+            self._write(reply)
+        except (OSError, ValueError):
+            pass
+
+    def list_tools(self, refresh=False):
+        """the server's tools, from the cached catalogue unless refresh=True
+        or the server announced a change since it was fetched."""
+        tools = self._tools
+        if tools is not None and not refresh:
+            return tools
+        response = self._request("tools/list", {}, timeout=self.timeout)
+        tools = _tools_from_response(response)
+        self._tools = tools
+        return tools
+
+    def call_tool(self, name, arguments, meta=None, cancel=None):
+        """run one tool. `meta` rides the request as its _meta - the per-call
+        context (cai_scratch) a server shared across agents reads through
+        cai.paths instead of its spawn env. `cancel`, a threading.Event, gives
+        up on the call (and tells the server) once set."""
+        params = {}
+        params["name"] = name
+        params["arguments"] = arguments or {}
+        if meta:
+            params["_meta"] = meta
+        start = time.monotonic()
+        failed = True
+        try:
+            response = self._request("tools/call", params, timeout=self.timeout, cancel=cancel)
+            failed = "error" in response
+        finally:
+            self._stats.observe(name, time.monotonic() - start, error=failed)
         return _text_from_response(response)
 
+    def stats(self):
+        """per-server and per-tool tools/call latency (see cai.metrics)."""
+        return _server_stats(self._stats)
+
     def close(self):
         if self._process is None: return
         if self._process.poll() is not None: return
@@ -143,15 +296,34 @@ class RemoteMCPServer:
     Each JSON-RPC request is one POST to the server URL; the reply is either a
     JSON body or an SSE stream, from which the response matching the request id
     is read (any notifications ahead of it are skipped). A session id handed back
-    on initialize (the Mcp-Session-Id header) is echoed on later requests. One
-    request/response at a time, matching the loop - no retries or timeouts."""
-
-    def __init__(self, url, label, headers=None, ssl_verify=True):
+    on initialize (the Mcp-Session-Id header) is echoed on later requests. Each
+    request is its own POST, so concurrent callers (parallel tool calls) run
+    side by side - only the id counter is shared. the tools/list catalogue is
+    cached like LocalMCPServer's, dropped when a
+    notifications/tools/list_changed shows up on any reply stream.
+
+    the POSTs share one keep-alive PooledSession (cai.api's), so a tool loop
+    pays one TCP+TLS handshake rather than one per call. `timeout` is the
+    (connect, read) pair in seconds - or one number for the read side, a
+    reply allowed to go that long without a byte. a failed request is retried
+    up to `retries` attempts with OpenAiApi's doubling backoff: any transient
+    failure (network error, 429, 5xx) for the protocol requests, but only a
+    provably unexecuted one for tools/call (the connection never came up, or
+    429/503) - a tool that might have run is not run twice."""
+
+    def __init__(self, url, label, headers=None, ssl_verify=True, timeout=None,
+                 retries=_REMOTE_ATTEMPTS, session=None):
         self.label = label
         self._url = url
         self._req_id = 0
+        self._id_lock = threading.Lock()
+        self._tools = None   # the cached tools/list catalogue
         self._session_id = None
         self._ssl_verify = ssl_verify
+        self._timeout = _remote_timeout(timeout)
+        self._retries = max(1, retries)
+        self._http = session if session is not None else PooledSession()
+        self._stats = LatencyStats()
         self._headers = {}
         if headers is not None:
             self._headers = dict(headers)
@@ -169,16 +341,43 @@ class RemoteMCPServer:
         log.info("MCP server %r started", self.label)
 
     def _post(self, message, expect_reply):
+        """POST one message, retrying as the class docstring describes, and
+        return the 2xx response. raises ConnectionError once the attempts run
+        out or on a failure a retry cannot fix."""
         headers = dict(self._headers)
         headers["Content-Type"] = "application/json"
         headers["Accept"] = "application/json, text/event-stream"
         if self._session_id is not None:
             headers["Mcp-Session-Id"] = self._session_id
-        response = requests.post(self._url, json=message, headers=headers, stream=expect_reply,
-                                 verify=self._ssl_verify)
+        is_call = message.get("method") == "tools/call"
+        attempt = 0
+        while True:
+            attempt += 1
+            status = None
+            try:
+                response = self._http.post(self._url, json=message, headers=headers, stream=expect_reply,
+                                           timeout=self._timeout, verify=self._ssl_verify)
+            except requests.RequestException as e:
+                error = f"MCP server {self.label!r}: {message.get('method')} failed: {e}"
+                retry = isinstance(e, requests.ConnectTimeout) or not is_call
+            else:
+                if response.status_code < 300:
+                    break
+                status = response.status_code
+                error = f"MCP server {self.label!r}: {message.get('method')} failed with {status}"
+                retry = status in _NOT_RUN if is_call else _retryable(status)
+                response.close()
+            if not retry or attempt >= self._retries:
+                raise ConnectionError(error)
+            delay = _retry_delay(attempt)
+            log.warning("%s; retrying in %.1fs (attempt %d/%d)", error, delay, attempt, self._retries)
+            self._stats.retried()
+            time.sleep(delay)
         session_id = response.headers.get("Mcp-Session-Id")
         if session_id:
             self._session_id = session_id
+        if not expect_reply:
+            response.close()
         return response
 
     def _notify(self, method):
@@ -188,15 +387,19 @@ class RemoteMCPServer:
         self._post(message, False)
 
     def _request(self, method, params):
-        self._req_id += 1
-        req_id = self._req_id
+        with self._id_lock:
+            self._req_id += 1
+            req_id = self._req_id
         message = {}
         message["jsonrpc"] = "2.0"
         message["id"] = req_id
         message["method"] = method
         message["params"] = params
         response = self._post(message, True)
-        return self._read_reply(response, req_id)
+        try:
+            return self._read_reply(response, req_id)
+        finally:
+            response.close()
 
     def _read_reply(self, response, req_id):
         """the JSON-RPC response dict matching req_id, from either a JSON body or
@@ -215,20 +418,85 @@ class RemoteMCPServer:
             except json.JSONDecodeError:
                 continue
             if not isinstance(message, dict): continue
-            if message.get("id") != req_id: continue
+            if message.get("id") != req_id:
+                if _lists_changed(message):
+                    self._tools = None
+                continue
             return message
         raise ConnectionError(f"MCP server {self.label!r} closed the stream during request {req_id}")
 
-    def list_tools(self):
+    def list_tools(self, refresh=False):
+        """the server's tools, from the cached catalogue unless refresh=True
+        or the server announced a change since it was fetched."""
+        tools = self._tools
+        if tools is not None and not refresh:
+            return tools
         response = self._request("tools/list", {})
-        return _tools_from_response(response)
-
-    def call_tool(self, name, arguments):
-        response = self._request("tools/call", {"name": name, "arguments": arguments or {}})
+        tools = _tools_from_response(response)
+        self._tools = tools
+        return tools
+
+    def call_tool(self, name, arguments, meta=None, cancel=None):
+        """run one tool. `meta` and `cancel` are accepted for LocalMCPServer's
+        signature: a local scratch path means nothing to a remote server, and
+        a POST in flight is not interrupted."""
+        start = time.monotonic()
+        failed = True
+        try:
+            response = self._request("tools/call", {"name": name, "arguments": arguments or {}})
+            failed = "error" in response
+        finally:
+            self._stats.observe(name, time.monotonic() - start, error=failed)
         return _text_from_response(response)
 
+    def stats(self):
+        """per-server and per-tool tools/call latency, retries and errors, plus
+        the connection pool's reuse counters (see cai.metrics, PoolStats)."""
+        stats = _server_stats(self._stats)
+        stats['pool'] = self._http.stats.snapshot()
+        return stats
+
     def close(self):
-        pass
+        """drop the pooled connections."""
+        self._http.close()
+
+
+def _remote_timeout(timeout):
+    """the requests (connect, read) timeout for a RemoteMCPServer `timeout`:
+    None for the defaults, one number for the read side, or the pair."""
+    if timeout is None:
+        return (_CONNECT_TIMEOUT, _READ_TIMEOUT)
+    if isinstance(timeout, (tuple, list)):
+        return tuple(timeout)
+    return (_CONNECT_TIMEOUT, timeout)
+
+
+def _server_stats(latency):
+    """a server's stats() dict from its LatencyStats: calls, errors, retries,
+    latency (all tools) and tools (name -> latency)."""
+    snapshot = latency.snapshot()
+    stats = {}
+    stats['calls'] = snapshot['latency']['count']
+    stats['errors'] = snapshot['errors']
+    stats['retries'] = snapshot['retries']
+    stats['latency'] = snapshot['latency']
+    stats['tools'] = snapshot['by_name']
+    return stats
+
+
+def _run_interrupt():
+    """the interrupt Event of the run dispatching the current tool (published
+    on its RunGate), or None outside a run."""
+    gate = current_gate()
+    if gate is None:
+        return None
+    return gate.interrupt
+
+
+def _lists_changed(message):
+    """whether a message read off a server is its tools/list_changed
+    notification - the cue to drop the cached catalogue."""
+    return message.get("method") == "notifications/tools/list_changed"
 
 
 def _tools_from_response(response):
@@ -268,22 +536,18 @@ def _function_tool_name(fn):
     return getattr(fn, "_cai_tool_name", fn.__name__)
 
 
-def server_from_spec(name, spec, extra_env=None):
+def server_from_spec(name, spec):
     """build a live MCP server connection from a declared spec - a
-    RemoteMCPServer for a url spec, a LocalMCPServer for a command one.
-    extra_env (the registry's CAI_SCRATCH injection) is merged under a command
-    spec's own env - a declared variable wins; a url server has no process to
-    inject into, so it is ignored there."""
+    RemoteMCPServer for a url spec, a LocalMCPServer for a command one."""
     if "url" in spec:
         return RemoteMCPServer(spec["url"], name,
                                headers=spec.get("headers"),
-                               ssl_verify=spec.get("ssl_verify", True))
-    env = spec.get("env")
-    if extra_env is not None:
-        merged = dict(extra_env)
-        merged.update(env or {})
-        env = merged
-    return LocalMCPServer(spec["command"], name, env=env, cwd=spec.get("cwd"))
+                               ssl_verify=spec.get("ssl_verify", True),
+                               timeout=spec.get("timeout"))
+    return LocalMCPServer(spec["command"], name,
+                          env=spec.get("env"),
+                          cwd=spec.get("cwd"),
+                          timeout=spec.get("timeout"))
 
 
 def schema_from_function(fn):
@@ -352,6 +616,12 @@ def schema_from_function(fn):
     return schema
 
 
+def _read_only_hint(tool):
+    """True when an MCP tool definition carries the readOnlyHint annotation."""
+    annotations = tool.get("annotations") or {}
+    return annotations.get("readOnlyHint") is True
+
+
 def _mcp_tool_schema(exposed, tool):
     """OpenAI schema for one MCP tool definition, exposed under `exposed`."""
     function = {}
@@ -399,23 +669,56 @@ class ToolsRegistry:
     An MCP tool referenced by name ('<mcp_name>__<tool_name>') is lazy: the
     server - declared on the env via cai.mcp_server, or the file <mcp_name>.py
     under one of the env's mcp dirs - is spawned on first use, when its schema
-    is read for the model or when the tool is called, not before."""
+    is read for the model or when the tool is called, not before. a server
+    file whose catalogue is in the SchemaCache (unchanged since it was last
+    listed) isn't even spawned for its schemas: only a call starts it.
+
+    with warm_servers=True a referenced server is instead connected in the
+    background as soon as one of its tools is registered (see warm), so the
+    spawn and handshake overlap the rest of the set-up and the first model
+    call, and a first tool call only waits for its own server."""
 
-    def __init__(self, env=None, scratch=None):
+    def __init__(self, env=None, scratch=None, result_cache=None, schema_cache=None, server_pool=None,
+                 warm_servers=False):
         self.env = env or Environment.default()
         # scratch: a zero-arg callable returning the session scratch directory
-        # (Agent wires its own; see Agent.scratch). every local MCP server this
-        # registry spawns gets it as CAI_SCRATCH, so tools share one place to
-        # exchange binary/bulky intermediates as files. None: no injection.
+        # (Agent wires its own; see Agent.scratch), so tools share one place
+        # to exchange binary/bulky intermediates as files. a bundled builtin
+        # server is shared across agents, so every call to it carries the path
+        # (see _call_meta) and cai.scratch_dir() reads it there; any other
+        # local server is spawned with it as CAI_SCRATCH (see _scratch_env),
+        # one process per scratch dir. None: no injection.
         self.scratch = scratch
         self._functions = {}     # name -> callable
         self._dispatch = {}      # exposed_name -> tagged entry
         self._schemas = {}       # exposed_name -> schema (eager, or resolved lazily)
         self._order = []         # exposed names, registration order
         self._selected = []      # exposed names that are active (sent to the model)
+        self._read_only = set()  # exposed MCP names whose server marks them readOnlyHint
+        # result_cache: a cai.result_cache.ResultCache answering repeated calls
+        # to the opted-in tools below (a sub-agent shares its parent's). None:
+        # no caching.
+        self.result_cache = result_cache
+        self._cached = set()     # exposed names opted in via cache_tool
+        # schema_cache: the on-disk tools/list catalogues of server files;
+        # None: the process-wide SchemaCache.default().
+        self.schema_cache = schema_cache or SchemaCache.default()
         # mcp_name -> LocalMCPServer/RemoteMCPServer: both the connected-once
-        # cache and the set of servers to close.
+        # cache and the set of servers to release. the lock keeps two parallel
+        # tool calls from acquiring the same server twice.
         self._mcp_servers = {}
+        self._servers_lock = threading.Lock()
+        # mcp_name -> the lock held while that one server connects, so a
+        # call waits on its own server's spawn and not on another's.
+        self._server_locks = {}
+        # warm_servers: connect a server in the background once one of its
+        # tools is registered. _warming: mcp_name -> its warm-up thread.
+        self.warm_servers = warm_servers
+        self._warming = {}
+        # server_pool: where servers are acquired from and released to - the
+        # process-wide ServerPool.default() unless given one, so agents and
+        # sub-agents share one process per server.
+        self.server_pool = server_pool or ServerPool.default()
 
     @classmethod
     def for_tools(cls, tools, env=None):
@@ -469,24 +772,63 @@ class ToolsRegistry:
             raise ValueError(f"MCP tool {name!r} must be '<mcp_name>__<tool_name>'")
         self._is_name_free(name)
         mcp_name, tool_name = name.split("__", 1)
+        if self.warm_servers:
+            self.warm(mcp_name)
         try:
-            server = self._load_server(mcp_name)
-            schema = self._find_tool_schema(server, tool_name, name)
+            tool = self._find_tool(mcp_name, tool_name)
         except Exception as e:
             log.error("failed loading MCP tool %r: %s", name, e)
             return
-        if schema is None:
+        if tool is None:
             log.error("MCP server %r exposes no tool %r", mcp_name, tool_name)
             return
         self._dispatch[name] = ("mcp", mcp_name, tool_name)
-        self._schemas[name] = schema
+        self._schemas[name] = _mcp_tool_schema(name, tool)
+        if _read_only_hint(tool):
+            self._read_only.add(name)
         self._order.append(name)
 
-    def _find_tool_schema(self, server, tool_name, exposed):
-        for tool in server.list_tools():
-            if tool["name"] != tool_name: continue
-            return _mcp_tool_schema(exposed, tool)
-        return None
+    def _find_tool(self, mcp_name, tool_name):
+        """tool_name's definition from mcp_name's catalogue: the live server's
+        when it is connected, else the SchemaCache's for an unchanged server
+        file, else the server's own - connecting it, and caching what it lists."""
+        source = None
+        if mcp_name not in self._mcp_servers:
+            source = self._server_file(mcp_name)
+        if source is not None:
+            tool = _named_tool(self.schema_cache.get(source), tool_name)
+            if tool is not None:
+                return tool
+        server = self._load_server(mcp_name)
+        tools = server.list_tools()
+        if source is not None:
+            self.schema_cache.put(source, tools)
+        return _named_tool(tools, tool_name)
+
+    def warm(self, mcp_name):
+        """start connecting mcp_name's server on a background thread, unless it
+        is connected or already warming. a call meanwhile blocks until that
+        connect is done rather than spawning a second one; a failed warm-up is
+        only logged - the next use tries again and reports it."""
+        with self._servers_lock:
+            if mcp_name in self._mcp_servers or mcp_name in self._warming: return
+            thread = threading.Thread(target=self._warm, args=(mcp_name,), daemon=True,
+                                      name=f"cai-warm-{mcp_name}")
+            self._warming[mcp_name] = thread
+        thread.start()
+
+    def _warm(self, mcp_name):
+        try:
+            self._load_server(mcp_name)
+        except Exception as e:
+            log.debug("warming MCP server %r failed: %s", mcp_name, e)
+
+    def _server_file(self, mcp_name):
+        """the source file a server named mcp_name would be spawned from, or
+        None when it is declared (cai.mcp_server) or not found."""
+        if self.env.server_spec(mcp_name) is not None:
+            return None
+        return _mcp_server_path(mcp_name, self.env.mcp_dirs())
 
     def register(self, tool, override=False):
         """make one tool known (dispatchable) without selecting it. `tool` may be
@@ -539,6 +881,7 @@ class ToolsRegistry:
         self.deselect(name)
         if name not in self._dispatch: return
         del self._dispatch[name]
+        self._read_only.discard(name)
         self._schemas.pop(name, None)
         self._functions.pop(name, None)
         self._order.remove(name)
@@ -568,6 +911,50 @@ class ToolsRegistry:
             return self._functions[name]
         return name
 
+    def parallel_safe(self, name):
+        """True if `name` may run alongside other tool calls of the same turn
+        (call_llm's parallel_safe=): a function tool declared
+        @cai.tool(parallel_safe=True), or any read-only tool. unknown names
+        are not."""
+        entry = self._dispatch.get(name)
+        if entry is None:
+            return False
+        if entry[0] == "function" and getattr(self._functions[name], "_cai_parallel_safe", False):
+            return True
+        return self.read_only(name)
+
+    def read_only(self, name):
+        """True if `name` has no side effects, so it may even start before its
+        turn is over (call_llm's speculate=): a function tool declared
+        @cai.tool(read_only=True), or an MCP tool its server annotates
+        readOnlyHint. unknown names are not."""
+        entry = self._dispatch.get(name)
+        if entry is None:
+            return False
+        if entry[0] == "function":
+            return bool(getattr(self._functions[name], "_cai_read_only", False))
+        return name in self._read_only
+
+    def cache_tool(self, name):
+        """opt `name` into the result cache: a repeated call with the same
+        arguments is answered from it. only sensible for a read-only tool; the
+        name needn't be registered yet. a function tool can opt in itself with
+        @cai.tool(cacheable=True)."""
+        self._cached.add(name)
+
+    def cached_tools(self):
+        """the names opted in via cache_tool, for a child registry to inherit."""
+        return sorted(self._cached)
+
+    def cacheable(self, name):
+        """True if calls to `name` go through the result cache."""
+        if self.result_cache is None:
+            return False
+        if name in self._cached:
+            return True
+        fn = self._functions.get(name)
+        return bool(getattr(fn, "_cai_cacheable", False))
+
     def _is_name_free(self, name):
         if name in self._dispatch:
             raise ValueError(f"tool name collision: {name!r}")
@@ -603,7 +990,45 @@ class ToolsRegistry:
 
     def dispatch(self, name, arguments):
         """run one tool by its exposed name. matches call_llm's tools_dispatch
-        contract: always returns a string, never raises."""
+        contract: always returns a string, never raises.
+
+        with a result_cache, a cacheable tool's repeated call is answered from
+        it (an Error: result is never cached), and any tool that is not
+        read-only clears it once it has run - it may have changed what the
+        cached results read."""
+        cache = self.result_cache
+        if cache is None:
+            return self._dispatch_tool(name, arguments)
+        if self.cacheable(name):
+            result = cache.get(name, arguments)
+            if result is not None:
+                return result
+            generation = cache.generation
+            stamps = stamp(self._argument_paths(arguments))
+            result = self._dispatch_tool(name, arguments)
+            if not result.startswith("Error:"):
+                cache.put(name, arguments, result, stamps, generation)
+            return result
+        try:
+            return self._dispatch_tool(name, arguments)
+        finally:
+            if not self.read_only(name):
+                cache.invalidate()
+
+    def _argument_paths(self, arguments):
+        """the absolute paths a call's path-like arguments (path, file_path,
+        *_path) name - what its cache entry is stamped with. a leading
+        $CAI_SCRATCH resolves against this registry's scratch."""
+        paths = []
+        for key, value in (arguments or {}).items():
+            if key != "path" and not key.endswith("_path"): continue
+            if not isinstance(value, str) or not value: continue
+            if value.startswith("$CAI_SCRATCH") and self.scratch is not None:
+                value = (self.scratch() or "") + value[len("$CAI_SCRATCH"):]
+            paths.append(os.path.abspath(os.path.expanduser(value)))
+        return paths
+
+    def _dispatch_tool(self, name, arguments):
         entry = self._dispatch.get(name)
         if entry is None:
             return f"Error: unknown tool '{name}'"
@@ -612,42 +1037,80 @@ class ToolsRegistry:
         _kind, mcp_name, tool_name = entry
         try:
             server = self._load_server(mcp_name)
-            return server.call_tool(tool_name, arguments)
+            return server.call_tool(tool_name, arguments,
+                                    meta=self._call_meta(mcp_name),
+                                    cancel=_run_interrupt())
         except Exception as e:
             log.exception("tool %s failed", name)
             return f"Error: tool '{name}' failed: {e}"
 
     def _load_server(self, mcp_name):
-        """the live server for mcp_name, connected once and cached in this
-        registry. a server declared on the env via cai.mcp_server wins; otherwise
-        its source file is resolved from the env's mcp dirs (the extension dirs
-        first, then the builtins) and spawned as a stdio subprocess."""
+        """the live server for mcp_name, acquired from the server pool once and
+        cached in this registry. a server declared on the env via cai.mcp_server
+        wins; otherwise its source file is resolved from the env's mcp dirs (the
+        extension dirs first, then the builtins) and spawned as a stdio
+        subprocess - unless the pool already holds one from the same spec."""
+        with self._servers_lock:
+            server = self._mcp_servers.get(mcp_name)
+            if server is not None:
+                return server
+            lock = self._server_locks.setdefault(mcp_name, threading.Lock())
+        with lock:
+            return self._connect_server(mcp_name)
+
+    def _connect_server(self, mcp_name):
         server = self._mcp_servers.get(mcp_name)
         if server is not None:
             return server
-        extra_env = self._scratch_env()
         spec = self.env.server_spec(mcp_name)
-        if spec is not None:
-            server = server_from_spec(mcp_name, spec, extra_env=extra_env)
-        else:
+        if spec is None:
             path = _mcp_server_path(mcp_name, self.env.mcp_dirs())
             if path is None:
                 raise FileNotFoundError(
                     f"no MCP server {mcp_name!r} declared, or in any extension mcps dir or builtins")
-            server = LocalMCPServer([sys.executable, path], mcp_name, env=extra_env)
-        self._mcp_servers[mcp_name] = server
+            spec = {"command": [sys.executable, path]}
+        extra_env = self._scratch_env(spec)
+        if extra_env is not None:
+            env = dict(extra_env)
+            env.update(spec.get("env") or {})
+            spec = dict(spec, env=env)
+        key = server_key(mcp_name, spec, spec.get("env"))
+        server = self.server_pool.acquire(key, lambda: server_from_spec(mcp_name, spec))
+        with self._servers_lock:
+            self._mcp_servers[mcp_name] = server
         return server
 
-    def _scratch_env(self):
-        """the env injected into every local MCP spawn: the scratch directory
-        as CAI_SCRATCH when a provider is wired, else None (no injection)."""
-        if self.scratch is None:
+    def _scratch_env(self, spec):
+        """the env a local server outside the bundled builtins is spawned
+        with: the scratch directory as CAI_SCRATCH, as a third-party server
+        reads it from os.environ. it is part of the pool key, so such a
+        server is only shared by registries with the same scratch. None for
+        a url server, a bundled builtin (it reads the per-call cai_scratch
+        instead), or when no provider is wired."""
+        if self.scratch is None or "url" in spec:
+            return None
+        command = spec["command"]
+        if len(command) == 2 and os.path.dirname(command[1]) == builtin_mcp_dir():
             return None
         path = self.scratch()
         if not path:
             return None
         return {"CAI_SCRATCH": path}
 
+    def _call_meta(self, mcp_name):
+        """the per-call context sent with a tools/call: the scratch directory
+        as cai_scratch when a provider is wired and the server's declared env
+        doesn't pin its own CAI_SCRATCH (a declared variable wins), else None."""
+        if self.scratch is None:
+            return None
+        spec = self.env.server_spec(mcp_name) or {}
+        if "CAI_SCRATCH" in (spec.get("env") or {}):
+            return None
+        path = self.scratch()
+        if not path:
+            return None
+        return {"cai_scratch": path}
+
     def _call_function(self, name, arguments):
         fn = self._functions[name]
         target = getattr(fn, "_cai_wrap_target", None)
@@ -677,12 +1140,48 @@ class ToolsRegistry:
             return ""
         return str(result)
 
+    def server_stats(self):
+        """mcp name -> that connected server's stats() (latency histograms per
+        server and per tool; see LocalMCPServer / RemoteMCPServer.stats). a
+        pooled server's figures cover every registry that shares it."""
+        with self._servers_lock:
+            servers = dict(self._mcp_servers)
+        stats = {}
+        for mcp_name, server in servers.items():
+            stats[mcp_name] = server.stats()
+        return stats
+
     def close(self):
-        for server in self._mcp_servers.values():
+        """release this registry's servers to the pool (which closes them once
+        nobody holds them and they idle out). a warm-up still connecting is
+        waited for first, so the server it brings up is released too. a
+        function tool holding resources of its own (the python tool's worker
+        pool) marks them with a zero-arg `_cai_close`, called here."""
+        for fn in list(self._functions.values()):
+            closer = getattr(fn, "_cai_close", None)
+            if closer is None: continue
             try:
-                server.close()
+                closer()
             except Exception:
-                log.exception("closing MCP server %r failed", server.label)
+                log.exception("closing tool %r failed", _function_tool_name(fn))
+        with self._servers_lock:
+            warming = list(self._warming.values())
+            self._warming.clear()
+        for thread in warming:
+            thread.join()
+        with self._servers_lock:
+            servers = list(self._mcp_servers.values())
+            self._mcp_servers.clear()
+        for server in servers:
+            self.server_pool.release(server)
+
+
+def _named_tool(tools, tool_name):
+    """the definition named tool_name in a tools/list catalogue, or None."""
+    for tool in (tools or []):
+        if tool.get("name") != tool_name: continue
+        return tool
+    return None
 
 
 def _mcp_server_path(mcp_name, dirs):
@@ -697,7 +1196,7 @@ def _mcp_server_path(mcp_name, dirs):
     return None
 
 
-def tool(fn):
+def tool(fn=None, *, parallel_safe=False, read_only=False, cacheable=False):
     """decorator: register a function tool on the current Environment, e.g.
 
         @cai.tool
@@ -705,14 +1204,37 @@ def tool(fn):
             \"\"\"Add two numbers.\"\"\"
             return a + b
 
+        @cai.tool(parallel_safe=True)
+        def lookup(key: str) -> str:
+            ...
+
     the tool's name is the function's __name__ (namespaced
     '<extension>__<name>' when an extension is being loaded); its schema comes
     from the signature and the first docstring line (see schema_from_function).
     it lands on the env being load()ed - else the process default - so once
     Environment.load() imports the extensions every agent on that env can select
-    it by name. see Environment / ToolsRegistry."""
-    Environment.target().register_tool(fn)
-    return fn
+    it by name. see Environment / ToolsRegistry.
+
+    parallel_safe=True declares the tool free of side effects another call in
+    the same turn could observe (and thread-safe), so an agent with
+    tool_workers > 1 may run it concurrently with its neighbours.
+    read_only=True goes further - no side effects at all - which also lets an
+    agent with speculate_tools start it while the model is still generating;
+    it implies parallel_safe. cacheable=True opts the tool into an agent's
+    result cache (see ToolsRegistry.cache_tool): a repeated call with the same
+    arguments is answered without running it - declare it read_only too."""
+    def decorator(fn):
+        if parallel_safe:
+            fn._cai_parallel_safe = True
+        if read_only:
+            fn._cai_read_only = True
+        if cacheable:
+            fn._cai_cacheable = True
+        Environment.target().register_tool(fn)
+        return fn
+    if fn is None:
+        return decorator
+    return decorator(fn)
 
 
 def wrap(target):
@@ -749,7 +1271,8 @@ def wrap(target):
     return decorator
 
 
-def mcp_server(name, command=None, url=None, env=None, headers=None, cwd=None, ssl_verify=True):
+def mcp_server(name, command=None, url=None, env=None, headers=None, cwd=None, ssl_verify=True,
+               timeout=None):
     """declare an MCP server from init.py, the programmatic counterpart to
     dropping a <name>.py into ~/.config/cai/mcps/. give exactly one of:
 
@@ -763,6 +1286,10 @@ def mcp_server(name, command=None, url=None, env=None, headers=None, cwd=None, s
 
     a url server verifies the TLS certificate by default; pass ssl_verify=False
     to skip verification (self-signed or otherwise problematic certificates).
+    timeout=<seconds> bounds each request to a command server: a call still
+    running then is cancelled (notifications/cancelled) and reported as an
+    error. by default a call waits as long as the tool takes. for a url server
+    it is the read timeout - how long a reply may go quiet (default 300s).
 
     it lands on the env being load()ed - else the process default. its tools
     surface namespaced '<name>__<tool>'; callers still list them in tools=[...]
@@ -773,4 +1300,5 @@ def mcp_server(name, command=None, url=None, env=None, headers=None, cwd=None, s
                                          env=env,
                                          headers=headers,
                                          cwd=cwd,
-                                         ssl_verify=ssl_verify)
+                                         ssl_verify=ssl_verify,
+                                         timeout=timeout)
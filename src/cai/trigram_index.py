@@ -0,0 +1,423 @@
+"""trigram_index: a persistent trigram index that narrows fs__search's rg runs.
+
+fs__search hands rg the whole tree, so every query reads every byte of it.
+A TrigramIndex remembers, per file, the set of 3-byte sequences (trigrams,
+ASCII-lowercased) it contains. A pattern whose matches must contain some
+literal - "parse_config", "def \\w+_handler\\(", "(foo|bar)_baz" - can only
+match in files holding all of that literal's trigrams, so rg is handed just
+those candidates:
+
+  index = TrigramIndex.for_path(root)
+  index.candidates(pattern, path, file_glob)   # [paths], or None: all of path
+
+The file set is rg's own (`rg --files`, so .gitignore and hidden-file rules
+are exactly what a plain search applies) and the candidates are handed back to
+rg as paths spelled as rg printed them, so the output is unchanged - fs__search
+runs rg with --text, which searches a file it is handed exactly as one it
+finds walking. Binary files are indexed like any other; a file starting with a
+UTF-16 BOM (rg transcodes it, so its raw bytes say nothing) or larger than
+_MAX_FILE_BYTES is not indexed and is always a candidate.
+
+Literals are taken from the pattern's parse (Python's re parser, which agrees
+with rg on the syntax that yields literals); a pattern it cannot parse, one
+whose classes use rg syntax it reads differently (POSIX classes, nesting, set
+operations like &&), or one with no required literal of 3+ characters, is
+searched in full. Case is
+folded on both sides, so (?i) is covered for ASCII literals. A case-folded
+literal is cut at any non-ASCII character and at k and s, which rg's Unicode
+case folding also matches as U+212A (Kelvin sign) and U+017F (long s).
+
+Stored under <config dir>/fs-index/ as one sqlite database per root: a files
+table (path -> id, mtime, size, indexed) and posting lists (trigram -> file
+ids) in segments. Each candidates() call stats the files in scope and indexes the new and
+changed ones into a fresh segment under a fresh id; a changed file's old id
+just stops being current. Once there are more than _MAX_SEGMENTS segments,
+they are merged into one without the stale ids. Stdlib-only."""
+from __future__ import annotations
+
+import array
+import hashlib
+import logging
+import os
+import sqlite3
+import subprocess
+import threading
+import warnings
+
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:  # python < 3.11
+    import sre_parse
+    import sre_constants
+
+from cai import config
+
+
+log = logging.getLogger("cai")
+
+# files larger than this are not indexed (always searched).
+_MAX_FILE_BYTES = 4 << 20
+
+# files indexed per segment during a build, bounding the memory it takes.
+_SEGMENT_FILES = 5000
+
+# merge the segments once there are more than this many.
+_MAX_SEGMENTS = 16
+
+# how many roots the server keeps an open index for at once.
+_MAX_INDEXES = 4
+
+# bumped when the tables change; an older database is rebuilt.
+_VERSION = 1
+
+_BOMS = (b"\xff\xfe", b"\xfe\xff")
+
+_SCHEMA = """
+create table if not exists files (path text primary key, id integer,
+                                  mtime integer, size integer, indexed integer);
+create table if not exists postings (segment integer, gram blob, ids blob,
+                                     primary key (segment, gram));
+create table if not exists meta (key text primary key, value integer);
+"""
+
+
+def index_dir():
+    return os.path.join(config.config_dir(), "fs-index")
+
+
+class TrigramIndex:
+    """one root's trigram index, backed by its sqlite database."""
+
+    _indexes = {}
+    _indexes_lock = threading.Lock()
+
+    def __init__(self, root, path=None):
+        self.root = root
+        if path is None:
+            digest = hashlib.sha1(root.encode("utf-8")).hexdigest()[:16]
+            path = os.path.join(index_dir(), f"{digest}.sqlite")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        if self._db.execute("pragma user_version").fetchone()[0] != _VERSION:
+            self._db.executescript("drop table if exists files; drop table if exists postings;"
+                                   f"drop table if exists meta; pragma user_version = {_VERSION};")
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._files = {}   # rel path -> [id, mtime, size, indexed]
+        for rel, file_id, mtime, size, indexed in self._db.execute("select * from files"):
+            self._files[rel] = [file_id, mtime, size, indexed]
+        self._next_id = self._meta("next_id")
+        self._segment = self._meta("segment")
+        self.indexed = 0
+
+    @classmethod
+    def for_path(cls, path):
+        """the index covering directory `path`: an open one whose root holds
+        it, else one rooted at the working directory when path is inside it,
+        else at path itself."""
+        path = os.path.realpath(path)
+        with cls._indexes_lock:
+            for root, index in cls._indexes.items():
+                if _within(path, root):
+                    return index
+            cwd = os.path.realpath(os.getcwd())
+            root = cwd if _within(path, cwd) else path
+            if len(cls._indexes) >= _MAX_INDEXES:
+                cls._indexes.pop(next(iter(cls._indexes))).close()
+            index = cls(root)
+            cls._indexes[root] = index
+            return index
+
+    def close(self):
+        self._db.close()
+
+    def _meta(self, key):
+        row = self._db.execute("select value from meta where key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def _set_meta(self, key, value):
+        self._db.execute("insert or replace into meta values (?, ?)", (key, value))
+
+    # --- candidates -------------------------------------------------------
+
+    def candidates(self, pattern, path, file_glob=""):
+        """the files under directory `path` that may hold a match of
+        `pattern`, after bringing the files in scope up to date. None when
+        the pattern requires no usable literal or rg cannot list the files
+        (the caller then searches all of path and reports rg's error)."""
+        clauses = required_literals(pattern)
+        if not clauses:
+            return None
+        listed = _rg_files(path, file_glob)
+        if listed is None:
+            return None
+        with self._lock:
+            scope = self._update(path, listed)
+            matched = self._matching(clauses)
+            found = []
+            for shown, record in scope:
+                if not record[3] or record[0] in matched:
+                    found.append(shown)
+            return found
+
+    def _update(self, path, listed):
+        """(path as rg printed it, record) for each file rg listed under
+        `path`, indexing the new and changed ones. rg prints `path` followed
+        by the file's path below it, so only `path` itself is resolved."""
+        base = os.path.relpath(os.path.realpath(path), self.root)
+        prefix = path.rstrip(os.sep) + os.sep
+        scope = []
+        stale = []
+        for shown in listed:
+            if not shown.startswith(prefix):
+                rel = os.path.relpath(os.path.realpath(shown), self.root)
+            elif base == ".":
+                rel = shown[len(prefix):]
+            else:
+                rel = base + os.sep + shown[len(prefix):]
+            try:
+                st = os.stat(shown)
+            except OSError:
+                continue
+            record = self._files.get(rel)
+            if record is None or record[1] != st.st_mtime_ns or record[2] != st.st_size:
+                record = [None, st.st_mtime_ns, st.st_size, False]
+                self._files[rel] = record
+                stale.append((rel, shown, record))
+            scope.append((shown, record))
+        if stale:
+            self._index(stale)
+        return scope
+
+    def _index(self, stale):
+        """index `stale` files under fresh ids, _SEGMENT_FILES to a segment."""
+        for start in range(0, len(stale), _SEGMENT_FILES):
+            postings = {}
+            rows = []
+            for rel, full, record in stale[start:start + _SEGMENT_FILES]:
+                record[0] = self._next_id
+                self._next_id += 1
+                record[3] = _scan(full, record[2], record[0], postings)
+                rows.append((rel, record[0], record[1], record[2], int(record[3])))
+                self.indexed += 1
+            self._segment += 1
+            with self._db:
+                self._db.executemany("insert or replace into files values (?, ?, ?, ?, ?)", rows)
+                self._db.executemany("insert into postings values (?, ?, ?)",
+                                     [(self._segment, gram, ids.tobytes()) for gram, ids in postings.items()])
+                self._set_meta("next_id", self._next_id)
+                self._set_meta("segment", self._segment)
+        segments = self._db.execute("select count(distinct segment) from postings").fetchone()[0]
+        if segments > _MAX_SEGMENTS:
+            self._merge()
+
+    def _merge(self):
+        """fold every segment into one, dropping ids no file holds any more."""
+        live = set()
+        for record in self._files.values():
+            live.add(record[0])
+        merged = {}
+        for gram, blob in self._db.execute("select gram, ids from postings"):
+            ids = array.array("I")
+            ids.frombytes(blob)
+            kept = merged.setdefault(gram, array.array("I"))
+            kept.extend(i for i in ids if i in live)
+        self._segment += 1
+        with self._db:
+            self._db.execute("delete from postings")
+            self._db.executemany("insert into postings values (?, ?, ?)",
+                                 [(self._segment, gram, ids.tobytes()) for gram, ids in merged.items() if ids])
+            self._set_meta("segment", self._segment)
+
+    def _matching(self, clauses):
+        """the file ids that may match: in every clause, some literal whose
+        trigrams a file holds all of."""
+        matched = None
+        for clause in clauses:
+            either = set()
+            for literal in clause:
+                either |= self._holding(literal)
+            matched = either if matched is None else matched & either
+            if not matched:
+                break
+        return matched or set()
+
+    def _holding(self, literal):
+        """the ids of the files holding every trigram of `literal`, starting
+        from its rarest trigram."""
+        postings = []
+        for gram in _grams(literal.encode("utf-8").lower()):
+            posting = array.array("I")
+            for (blob,) in self._db.execute("select ids from postings where gram = ?", (gram,)):
+                posting.frombytes(blob)
+            if not posting:
+                return set()
+            postings.append(posting)
+        postings.sort(key=len)
+        found = set(postings[0])
+        for posting in postings[1:]:
+            found.intersection_update(posting)
+            if not found:
+                break
+        return found
+
+    def stats(self):
+        """the counters as a dict: files, indexed (this process)."""
+        with self._lock:
+            stats = {}
+            stats['files'] = len(self._files)
+            stats['indexed'] = self.indexed
+            return stats
+
+
+def _grams(data):
+    return {data[i:i + 3] for i in range(len(data) - 2)}
+
+
+def _scan(path, size, file_id, postings):
+    """add the trigrams of file `path` to `postings` under file_id. False
+    when it is not indexed (see the module docstring)."""
+    if size > _MAX_FILE_BYTES:
+        return False
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return False
+    if data.startswith(_BOMS):
+        return False
+    for gram in _grams(data.lower()):
+        ids = postings.get(gram)
+        if ids is None:
+            ids = postings[gram] = array.array("I")
+        ids.append(file_id)
+    return True
+
+
+def _rg_files(path, file_glob):
+    """the files rg would search under `path`, spelled as rg prints them."""
+    cmd = ["rg", "--files"]
+    if file_glob:
+        cmd += ["--glob", file_glob]
+    cmd += ["--", path]
+    try:
+        result = subprocess.run(cmd, capture_output=True, timeout=60)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode not in (0, 1):
+        return None
+    out = result.stdout.decode("utf-8", errors="surrogateescape")
+    return [line for line in out.split("\n") if line]
+
+
+# --- literals a pattern requires ---------------------------------------------
+
+_REPEATS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT)
+if hasattr(sre_constants, "POSSESSIVE_REPEAT"):
+    _REPEATS += (sre_constants.POSSESSIVE_REPEAT,)
+
+
+# ASCII letters whose Unicode case folding reaches past ASCII (K, ſ).
+_FOLDS_BEYOND_ASCII = "kKsS"
+
+
+def required_literals(pattern):
+    """what any match of `pattern` must contain, as clauses: a list of sets
+    of literals, each set naming alternatives one of which must appear. []
+    when nothing usable (3+ characters) is required or the pattern is not
+    one this parser reads the way rg does."""
+    if "\\<" in pattern or "\\>" in pattern:   # rg word boundaries, literals to re
+        return []
+    if _rg_class_syntax(pattern):
+        return []
+    try:
+        with warnings.catch_warnings():
+            # "possible nested set / set intersection": read another way by rg.
+            warnings.simplefilter("error", FutureWarning)
+            parsed = sre_parse.parse(pattern)
+    except Exception:
+        return []
+    icase = bool(parsed.state.flags & sre_constants.SRE_FLAG_IGNORECASE)
+    return _clauses(list(parsed), icase)
+
+
+def _rg_class_syntax(pattern):
+    """whether a character class in `pattern` holds what rg reads and Python's
+    parser does not: a [ (a POSIX class like [:alpha:], or a nested class) or
+    a set operation (&&, --, ~~)."""
+    i = 0
+    inside = False
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            i += 2
+            continue
+        if not inside:
+            if char == "[":
+                inside = True
+                i += 1
+                if pattern[i:i + 1] == "^":
+                    i += 1
+                if pattern[i:i + 1] == "]":     # a leading ] is a literal
+                    i += 1
+                continue
+        elif char == "[" or pattern[i:i + 2] in ("&&", "--", "~~"):
+            return True
+        elif char == "]":
+            inside = False
+        i += 1
+    return False
+
+
+def _clauses(items, icase):
+    clauses = []
+    run = []
+
+    def flush():
+        if len(run) >= 3:
+            clauses.append({"".join(run)})
+        run.clear()
+
+    for op, av in items:
+        if op == sre_constants.LITERAL:
+            char = chr(av)
+            if icase and (not char.isascii() or char in _FOLDS_BEYOND_ASCII):
+                flush()
+                continue
+            run.append(char)
+            continue
+        flush()
+        if op == sre_constants.SUBPATTERN:
+            _group, add_flags, del_flags, body = av
+            inner = icase
+            if add_flags & sre_constants.SRE_FLAG_IGNORECASE:
+                inner = True
+            if del_flags & sre_constants.SRE_FLAG_IGNORECASE:
+                inner = False
+            clauses += _clauses(list(body), inner)
+        elif op in _REPEATS:
+            low, _high, body = av
+            if low >= 1:
+                clauses += _clauses(list(body), icase)
+        elif op == sre_constants.BRANCH:
+            either = set()
+            for alternative in av[1]:
+                best = None
+                for clause in _clauses(list(alternative), icase):
+                    if len(clause) == 1:
+                        literal = next(iter(clause))
+                        if best is None or len(literal) > len(best):
+                            best = literal
+                if best is None:
+                    either = None
+                    break
+                either.add(best)
+            if either:
+                clauses.append(either)
+    flush()
+    return clauses
+
+
+def _within(path, root):
+    return path == root or path.startswith(root.rstrip(os.sep) + os.sep)
@@ -33,7 +33,9 @@ import time
 from cai import usage
 from cai.channel import connect
 from cai.commands import CommandContext
+from cai.context import ContextManager
 from cai.environment import Environment
+from cai.result_cache import ResultCache
 from cai.events import EventType
 from cai.screen import Screen
 from cai.screen.buffer import ContentBuffer
@@ -255,6 +257,8 @@ class _Status:
         self._stream_kind = None   # None | "responding" | "reasoning"
         self._last_char = 0.0      # time.monotonic() of the last streamed token
         self._tokens = 0           # exact tokens from the api's usage channel (0 until a sample)
+        self._cached_tokens = 0    # of the last sample's prompt, tokens read from the prompt cache
+        self._prompt_tokens = 0
         self._context_limit = fallback_limit
         self._limit_model = None   # the model _context_limit was resolved for
         self._resolve_limit()
@@ -302,6 +306,12 @@ class _Status:
         with self._lock:
             self._tokens = tokens
 
+    def set_cache(self, cached_tokens, prompt_tokens):
+        # the last sample's prompt-cache reads, for the 'N% cached' readout.
+        with self._lock:
+            self._cached_tokens = cached_tokens
+            self._prompt_tokens = prompt_tokens
+
     def set_note(self, message):
         # a hook's ctx.ui.status(...) reaches here over the wire; show it on the
         # status line for _NOTE_SECONDS, then let the normal readout resume.
@@ -367,7 +377,10 @@ class _Status:
                 text = self._note
             else:
                 text = _status_text(self._model, self._state(now))
-            right = usage.format_ctx(self._tokens, self._context_limit)
+            right = usage.format_ctx(self._tokens,
+                                     self._context_limit,
+                                     self._cached_tokens,
+                                     self._prompt_tokens)
             key = (text, right)
             if key == self._last:
                 return
@@ -617,6 +630,7 @@ class _Worker(threading.Thread):
         # calibration sample the :messages overlay uses for its per-message math.
         messages = self._client.get_messages()
         self._status.set_tokens(tokens)
+        self._status.set_cache(report.get("cached_tokens") or 0, report.get("prompt_tokens") or 0)
         self._sample_tokens = tokens
         self._sample_chars = usage.message_chars(messages)
         self._status.set_sample(self._sample_tokens, self._sample_chars)
@@ -1752,7 +1766,8 @@ def run(*,
         max_steps=None,
         resume_path=None,
         pick_session=False,
-        initial_prompt=None):
+        initial_prompt=None,
+        warm_servers=False):
     """launch the interactive TUI around a fresh in-process Agent. blocks until
     the user quits (:q, Ctrl-C, or EOF). returns the process exit code.
 
@@ -1761,7 +1776,10 @@ def run(*,
     session in place, so autosave writes back to it.
 
     initial_prompt, when given, is submitted as the first user turn at startup
-    (e.g. `cai -i -- hello`) - the TUI comes up, runs it, then takes over input."""
+    (e.g. `cai -i -- hello`) - the TUI comes up, runs it, then takes over input.
+
+    warm_servers (--warm-servers, or the warm_servers setting) starts the
+    agent's MCP servers in the background while the TUI comes up."""
     from cai import config
     from cai.agent import Agent
     from cai.hooks import HookEvent
@@ -1809,7 +1827,13 @@ def run(*,
                   reasoning_effort=reasoning_effort,
                   temperature=temperature,
                   max_steps=max_steps,
-                  tool_result_max_chars=env.settings.tool_result_max_chars)
+                  tool_result_max_chars=env.settings.tool_result_max_chars,
+                  tool_workers=env.settings.tool_workers,
+                  speculate_tools=env.settings.speculate_tools,
+                  result_cache=ResultCache.for_settings(env.settings),
+                  cache_tools=env.settings.cache_tools,
+                  context=ContextManager.for_settings(env.settings),
+                  warm_servers=warm_servers or env.settings.warm_servers)
 
     from cai.wired_agent import UnixWiredAgent
     server = UnixWiredAgent(agent)
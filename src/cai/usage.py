@@ -47,12 +47,17 @@ def fmt_ktok(n):
     return str(n)
 
 
-def format_ctx(tokens, context_limit):
+def format_ctx(tokens, context_limit, cached_tokens=0, prompt_tokens=0):
     """the status-line context string, e.g. 'ctx 5% (5kb/256kb)'.
 
     tokens is the exact count from the api's usage channel - it only refreshes
-    when a real sample arrives, so it reads '?' until the first one."""
+    when a real sample arrives, so it reads '?' until the first one. when the
+    last sample reported prompt-cache reads, the share of its prompt served
+    from the cache follows: 'ctx 5% (5kb/256kb) 92% cached'."""
     pct = "?"
     if context_limit and tokens:
         pct = f"{tokens / context_limit:.0%}"
-    return f"ctx {pct} ({fmt_ktok(tokens)}/{fmt_ktok(context_limit)})"
+    text = f"ctx {pct} ({fmt_ktok(tokens)}/{fmt_ktok(context_limit)})"
+    if cached_tokens and prompt_tokens:
+        text += f" {min(1, cached_tokens / prompt_tokens):.0%} cached"
+    return text
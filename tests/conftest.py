@@ -5,6 +5,8 @@ another."""
 import pytest
 
 from cai.environment import Environment
+from cai.schema_cache import SchemaCache
+from cai.server_pool import ServerPool
 
 
 @pytest.fixture(autouse=True)
@@ -12,3 +14,22 @@ def _fresh_default_environment():
     Environment._default = None
     yield
     Environment._default = None
+
+
+@pytest.fixture(autouse=True)
+def _fresh_schema_cache(tmp_path):
+    # the on-disk MCP schema cache lives in the user's config dir: point every
+    # test at an empty one of its own.
+    SchemaCache._default = SchemaCache(str(tmp_path / "mcp_tools.json"))
+    yield
+    SchemaCache._default = None
+
+
+@pytest.fixture(autouse=True)
+def _fresh_server_pool():
+    # MCP servers are pooled process-wide: give every test its own pool and
+    # close whatever it spawned, so no server outlives the test that made it.
+    ServerPool._default = ServerPool()
+    yield
+    ServerPool._default.close()
+    ServerPool._default = None
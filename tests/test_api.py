@@ -1,17 +1,23 @@
 """Tests for cai.api - the Layer 0 LLM HTTP client.
 
-Fully offline: requests.post is monkeypatched with a fake that records the
-outgoing request and replays a canned blocking body or SSE line stream. No
-network, no API key, no real provider.
+Fully offline: requests.Session.post (what the api's pooled session sends
+through) is monkeypatched with a fake that records the outgoing request and
+replays a canned blocking body or SSE line stream. No network, no API key, no
+real provider - the connection-pool and AsyncOpenAiApi tests talk to a stub
+HTTP server on localhost.
 """
+import asyncio
 import json
 import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 import pytest
 import requests
 
 import cai.api as api
-from cai.api import ApiError, OpenAiApi, _wire_messages
+from cai.api import ApiError, OpenAiApi, WireCache, _wire_messages
 
 
 # --------------------------------------------------------------------------
@@ -20,7 +26,11 @@ from cai.api import ApiError, OpenAiApi, _wire_messages
 
 class FakeResponse:
     """Stand-in for a requests.Response covering both the blocking
-    (status_code/json) and streaming (iter_lines/context-manager) paths."""
+    (status_code/json) and streaming (iter_content/context-manager) paths. it
+    has no raw stream, so the body is read through iter_content - one network
+    read per line."""
+
+    raw = None
 
     def __init__(self, status_code=200, body=None, lines=None, raise_json=False):
         self.status_code = status_code
@@ -35,9 +45,9 @@ class FakeResponse:
             raise ValueError("not json")
         return self._body
 
-    def iter_lines(self):
+    def iter_content(self, chunk_size=None):
         for line in self._lines:
-            yield line
+            yield line + b"\n"
 
     def close(self):
         self.closed = True
@@ -51,7 +61,7 @@ class FakeResponse:
 
 
 class Recorder:
-    """A fake requests.post that records calls and returns a programmed
+    """A fake Session.post that records calls and returns a programmed
     response (or raises a programmed exception). `script` replays a sequence -
     each item a response or an exception, one per call - so a retry path can
     fail first and succeed later."""
@@ -82,8 +92,12 @@ class Recorder:
 
     @property
     def data(self):
-        """The JSON payload of the last request."""
-        return self.calls[-1]['kwargs']['json']
+        """The JSON payload of the last request - sent as json=, or as the
+        ready-encoded data= bytes of a WireCache request."""
+        kwargs = self.calls[-1]['kwargs']
+        if 'data' in kwargs:
+            return json.loads(kwargs['data'])
+        return kwargs['json']
 
 
 def sse(obj):
@@ -93,7 +107,9 @@ def sse(obj):
 
 def install(monkeypatch, response=None, exc=None, script=None):
     rec = Recorder(response=response, exc=exc, script=script)
-    monkeypatch.setattr(api.requests, "post", rec)
+    # set on the class as a plain callable (not a function), so it is never
+    # bound: the pooled session's post(url, **kwargs) lands here unchanged.
+    monkeypatch.setattr(api.requests.Session, "post", rec)
     # retries wait between attempts; a test never should.
     monkeypatch.setattr(api, "_RETRY_BACKOFF", 0)
     return rec
@@ -276,6 +292,209 @@ def test_streaming_sets_stream_and_usage_option(monkeypatch):
     assert rec.data['stream_options'] == {"include_usage": True}
 
 
+# --------------------------------------------------------------------------
+# prompt caching - breakpoints and cached-token accounting
+# --------------------------------------------------------------------------
+
+def caching_client():
+    return OpenAiApi("https://example.test/v1", "sk-test", prompt_cache=True)
+
+
+def marked(text):
+    return [{"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}]
+
+
+def test_prompt_cache_marks_the_stable_prefix(monkeypatch):
+    rec = install(monkeypatch, FakeResponse(body=blocking_body()))
+    tools = [{"type": "function", "function": {"name": "f"}},
+             {"type": "function", "function": {"name": "g"}}]
+    messages = [{"role": "system", "content": "be brief"},
+                {"role": "user", "content": "hi"},
+                {"role": "assistant", "content": "", "tool_calls": [{"id": "c1"}]},
+                {"role": "tool", "tool_call_id": "c1", "content": "r1"},
+                {"role": "assistant", "content": "", "tool_calls": [{"id": "c2"}]},
+                {"role": "tool", "tool_call_id": "c2", "content": "r2"}]
+    caching_client().chat(messages, "m", tools=tools)
+    sent = rec.data['messages']
+    assert sent[0]['content'] == marked("be brief")       # system
+    assert sent[3]['content'] == marked("r1")             # where the last request ended
+    assert sent[5]['content'] == marked("r2")             # where the next one reads up to
+    assert sent[1]['content'] == "hi"                     # the rest stays plain
+    assert sent[2] == messages[2]
+    assert rec.data['tools'][1]['cache_control'] == {"type": "ephemeral"}
+    assert 'cache_control' not in rec.data['tools'][0]
+
+
+def test_prompt_cache_never_touches_the_callers_data(monkeypatch):
+    install(monkeypatch, FakeResponse(body=blocking_body()))
+    tools = [{"type": "function", "function": {"name": "f"}}]
+    messages = [{"role": "system", "content": "s"}, {"role": "user", "content": "hi"}]
+    caching_client().chat(messages, "m", tools=tools)
+    assert messages == [{"role": "system", "content": "s"}, {"role": "user", "content": "hi"}]
+    assert tools == [{"type": "function", "function": {"name": "f"}}]
+
+
+def test_prompt_cache_marks_the_last_part_of_list_content(monkeypatch):
+    rec = install(monkeypatch, FakeResponse(body=blocking_body()))
+    parts = [{"type": "text", "text": "a"}, {"type": "text", "text": "b"}]
+    caching_client().chat([{"role": "user", "content": parts}], "m")
+    sent = rec.data['messages'][0]['content']
+    assert sent[0] == {"type": "text", "text": "a"}
+    assert sent[1]['cache_control'] == {"type": "ephemeral"}
+
+
+def test_prompt_cache_off_sends_plain_content(monkeypatch):
+    rec = install(monkeypatch, FakeResponse(body=blocking_body()))
+    client().chat([{"role": "system", "content": "s"}, {"role": "user", "content": "hi"}], "m")
+    assert rec.data['messages'][0]['content'] == "s"
+
+
+def test_usage_reports_cached_tokens_from_any_shape(monkeypatch):
+    shapes = [{"prompt_tokens": 100, "prompt_tokens_details": {"cached_tokens": 80}},
+              {"prompt_tokens": 100, "cache_read_input_tokens": 80},
+              {"prompt_tokens": 100, "prompt_cache_hit_tokens": 80}]
+    for shape in shapes:
+        install(monkeypatch, FakeResponse(body=blocking_body(usage=shape)))
+        _, _, _, usage = client().chat([], "m")
+        assert usage['cached_tokens'] == 80
+        assert usage['prompt_tokens'] == 100
+
+
+def test_streamed_usage_reports_cached_tokens(monkeypatch):
+    usage = {"prompt_tokens": 10, "total_tokens": 12, "prompt_tokens_details": {"cached_tokens": 8}}
+    install(monkeypatch, FakeResponse(lines=[sse({"choices": [], "usage": usage}), b"data: [DONE]"]))
+    deltas = drain(client().chat([], "m", stream=True))
+    assert deltas[-1][3]['cached_tokens'] == 8
+
+
+def test_usage_without_cache_reads_is_unchanged(monkeypatch):
+    install(monkeypatch, FakeResponse(body=blocking_body(usage={"total_tokens": 5})))
+    assert client().chat([], "m")[3] == {"total_tokens": 5}
+
+
+def test_format_ctx_shows_the_cached_share():
+    from cai.usage import format_ctx
+
+    assert format_ctx(2048, 8192) == "ctx 25% (2kb/8kb)"
+    assert format_ctx(2048, 8192, cached_tokens=1800, prompt_tokens=2000) == "ctx 25% (2kb/8kb) 90% cached"
+
+
+# --------------------------------------------------------------------------
+# wire cache - incremental request-body serialization
+# --------------------------------------------------------------------------
+
+def conversation(turns):
+    messages = [{"role": "user", "content": "start"}]
+    for i in range(turns):
+        messages.append({"role": "assistant", "content": "", "_ts": i,
+                         "tool_calls": [{"id": f"c{i}", "type": "function",
+                                         "function": {"name": "f", "arguments": "{}"}}]})
+        messages.append({"role": "tool", "tool_call_id": f"c{i}", "content": "x" * 200})
+    return messages
+
+
+def test_wire_cache_body_matches_the_uncached_one(monkeypatch):
+    rec = install(monkeypatch, FakeResponse(body=blocking_body()))
+    messages = conversation(3)
+    tools = [{"type": "function", "function": {"name": "f"}}]
+    system = {"role": "system", "content": "s"}
+    client().chat(messages, "m", system_prompt=system, tools=tools, temperature=0.5)
+    plain = rec.data
+    client().chat(messages, "m", system_prompt=system, tools=tools, temperature=0.5, wire_cache=WireCache())
+    assert 'json' not in rec.last['kwargs']
+    assert rec.data == plain
+    assert all('_ts' not in m for m in rec.data['messages'])
+
+
+def test_wire_cache_encodes_only_new_messages(monkeypatch):
+    rec = install(monkeypatch, FakeResponse(body=blocking_body()))
+    cache = WireCache()
+    messages = conversation(5)
+    client().chat(messages, "m", wire_cache=cache)
+    assert (cache.hits, cache.misses) == (0, 11)
+    messages.append({"role": "user", "content": "next"})
+    client().chat(messages, "m", wire_cache=cache)
+    assert (cache.hits, cache.misses) == (11, 12)
+    assert rec.data['messages'][-1] == {"role": "user", "content": "next"}
+
+
+def test_wire_cache_re_encodes_an_edited_message(monkeypatch):
+    rec = install(monkeypatch, FakeResponse(body=blocking_body()))
+    cache = WireCache()
+    messages = conversation(2)
+    client().chat(messages, "m", wire_cache=cache)
+    messages[2]['content'] = "trimmed"                  # a replaced value
+    messages[1]['tool_calls'].append({"id": "extra"})   # a grown list
+    client().chat(messages, "m", wire_cache=cache)
+    assert cache.misses == 5 + 2
+    assert rec.data['messages'][2]['content'] == "trimmed"
+    assert rec.data['messages'][1]['tool_calls'][-1] == {"id": "extra"}
+    messages[1]['tool_calls'][0]['id'] = "renamed"      # same identity and length: unseen ...
+    client().chat(messages, "m", wire_cache=cache)
+    assert rec.data['messages'][1]['tool_calls'][0]['id'] == "c0"
+    cache.clear()                                       # ... until cleared
+    client().chat(messages, "m", wire_cache=cache)
+    assert rec.data['messages'][1]['tool_calls'][0]['id'] == "renamed"
+
+
+def test_wire_cache_keeps_only_the_current_conversation(monkeypatch):
+    install(monkeypatch, FakeResponse(body=blocking_body()))
+    cache = WireCache()
+    client().chat(conversation(4), "m", wire_cache=cache)
+    client().chat(conversation(1), "m", wire_cache=cache)
+    assert len(cache._entries) == 3
+
+
+def test_wire_cache_with_prompt_cache_moves_the_breakpoints(monkeypatch):
+    rec = install(monkeypatch, FakeResponse(body=blocking_body()))
+    cache = WireCache()
+    tools = [{"type": "function", "function": {"name": "f"}}]
+    messages = [{"role": "system", "content": "s"}, {"role": "user", "content": "hi"}]
+    for reply in ("r1", "r2", "r3"):
+        caching_client().chat(messages, "m", tools=tools)
+        plain = rec.data
+        caching_client().chat(messages, "m", tools=tools, wire_cache=cache)
+        assert rec.data == plain
+        messages.append({"role": "assistant", "content": reply})
+        messages.append({"role": "user", "content": "more"})
+    assert rec.data['messages'][1]['content'] == "hi"   # the old tail, unmarked again
+    assert messages[1] == {"role": "user", "content": "hi"}
+
+
+def test_wire_cache_async_body_matches(chunked_server):
+    messages = conversation(2)
+    c = _async_client(chunked_server)
+    result = asyncio.run(c.chat(messages, "m", wire_cache=WireCache()))
+    assert result[0] == "async"
+    assert chunked_server.requests[-1]['messages'] == _wire_messages(messages)
+
+
+def test_wire_cache_benchmark_turn_cost():
+    """a 200-turn, ~2MB transcript: re-encoding a turn from the cache encodes
+    only the new message. the speedup over serializing the whole conversation
+    is printed, not asserted (a loaded CI box would make a ratio flaky)."""
+    messages = conversation(200)
+    for message in messages:
+        if message['role'] == 'tool':
+            message['content'] = "y" * 10000
+    cache = WireCache()
+    cache.encode_messages(messages)
+    messages.append({"role": "user", "content": "next"})
+    hits, misses = cache.hits, cache.misses
+    start = time.perf_counter()
+    for _ in range(5):
+        cached = cache.encode_messages(messages)
+    cached_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(5):
+        plain = json.dumps(_wire_messages(messages), allow_nan=False).encode()
+    plain_time = time.perf_counter() - start
+    print(f"\nwire cache: {plain_time / cached_time:.1f}x faster than a full encode")
+    assert json.loads(cached) == json.loads(plain)
+    assert cache.misses - misses == 1                  # just the new message
+    assert cache.hits - hits == 5 * len(messages) - 1
+
+
 # --------------------------------------------------------------------------
 # blocking path (_complete)
 # --------------------------------------------------------------------------
@@ -481,6 +700,25 @@ def test_streaming_multiple_tool_calls(monkeypatch):
     assert tool_calls[1]['function']['name'] == "f1"
 
 
+def test_streaming_reports_each_tool_call_once_its_arguments_complete(monkeypatch):
+    seen = []
+    lines = []
+    lines.append(sse({"choices": [{"delta": {"tool_calls": [
+        {"index": 0, "id": "t1", "function": {"name": "f0", "arguments": "{\"a\":"}}]}}]}))
+    lines.append(sse({"choices": [{"delta": {"tool_calls": [
+        {"index": 0, "function": {"arguments": "1}"}}]}}]}))
+    lines.append(sse({"choices": [{"delta": {"tool_calls": [
+        {"index": 1, "id": "t2", "function": {"name": "f1", "arguments": "{}"}}]}}]}))
+    lines.append(sse({"choices": [{"delta": {}, "finish_reason": "tool_calls"}]}))
+    lines.append(b"data: [DONE]")
+    install(monkeypatch, FakeResponse(lines=lines))
+    stream = client().chat([], "m", stream=True, on_tool_call=seen.append)
+    next(stream)
+    assert seen == []                       # t1's arguments may still grow
+    drain(stream)
+    assert [(c['id'], c['function']['arguments']) for c in seen] == [("t1", '{"a":1}'), ("t2", "{}")]
+
+
 def test_streaming_tool_use_finish_reason(monkeypatch):
     # Anthropic-native finish_reason="tool_use" must also snapshot.
     lines = []
@@ -582,12 +820,12 @@ def test_streaming_connection_error_retried_then_raises(monkeypatch):
 def test_streaming_mid_stream_drop_raises_without_retry(monkeypatch):
     # once bytes flowed a retry would replay output the consumer already saw:
     # the partial deltas arrive, then the drop surfaces as ApiError, one POST.
-    def lines_then_die():
-        yield sse({"choices": [{"delta": {"content": "par"}, "finish_reason": None}]})
+    def reads_then_die(chunk_size=None):
+        yield sse({"choices": [{"delta": {"content": "par"}, "finish_reason": None}]}) + b"\n"
         raise requests.ConnectionError("reset mid-stream")
 
     resp = FakeResponse()
-    resp.iter_lines = lines_then_die
+    resp.iter_content = reads_then_die
     rec = install(monkeypatch, resp)
     gen = client().chat([], "m", stream=True)
     first = next(gen)
@@ -647,9 +885,9 @@ class BlockingLinesResponse(FakeResponse):
         super().__init__(lines=lines)
         self._released = threading.Event()
 
-    def iter_lines(self):
+    def iter_content(self, chunk_size=None):
         for line in self._lines:
-            yield line
+            yield line + b"\n"
         self._released.wait()
         raise requests.ConnectionError("shut down")
 
@@ -722,3 +960,563 @@ def test_interrupt_during_retry_backoff_stops_retrying(monkeypatch):
     with pytest.raises(ApiError):
         client()._post_with_retry(url, {}, {}, stream=False, interrupt=interrupt)
     assert len(rec.calls) == 1            # gave up instead of retrying
+
+
+# --------------------------------------------------------------------------
+# batching - the polled stream's batched hand-over
+# --------------------------------------------------------------------------
+
+class PacedResponse(FakeResponse):
+    """streams `lines`, sleeping `pause` seconds before each read."""
+
+    def __init__(self, lines, pause):
+        super().__init__(lines=lines)
+        self.pause = pause
+
+    def iter_content(self, chunk_size=None):
+        for line in self._lines:
+            time.sleep(self.pause)
+            yield line + b"\n"
+
+
+def batching_client(**kwargs):
+    return OpenAiApi("https://example.test/v1", "sk-test", **kwargs)
+
+
+def content_lines(texts):
+    lines = []
+    for text in texts:
+        lines.append(sse({"choices": [{"delta": {"content": text}}]}))
+    lines.append(b"data: [DONE]")
+    return lines
+
+
+def test_batched_stream_merges_a_burst(monkeypatch):
+    install(monkeypatch, FakeResponse(lines=content_lines(["a", "b", "c", "d"])))
+    c = batching_client(batch_window=0.2)
+    out = list(c.chat([], "m", stream=True, interrupt=threading.Event()))
+    # the closing tuple carries no usage or tool calls here, so it merges away.
+    assert out == [("abcd", None, None, {})]
+
+
+def test_batched_stream_does_not_hold_a_slow_stream(monkeypatch):
+    # deltas further apart than the window are handed over one by one.
+    install(monkeypatch, PacedResponse(content_lines(["a", "b", "c"]), pause=0.05))
+    c = batching_client(batch_window=0.005)
+    out = list(c.chat([], "m", stream=True, interrupt=threading.Event()))
+    assert [delta[0] for delta in out] == ["a", "b", "c", None]
+
+
+def test_batched_stream_hands_over_a_full_batch_early(monkeypatch):
+    # a long window, but batch_max deltas are in: they go at once, while the
+    # provider is still quiet.
+    lines = [sse({"choices": [{"delta": {"content": text}}]}) for text in "abc"]
+    install(monkeypatch, BlockingLinesResponse(lines))
+    c = batching_client(batch_window=5, batch_max=3)
+    interrupt = threading.Event()
+    gen = c.chat([], "m", stream=True, interrupt=interrupt)
+    start = time.monotonic()
+    assert next(gen) == ("abc", None, None, {})
+    assert time.monotonic() - start < 1
+    interrupt.set()
+    assert list(gen) == []
+
+
+def test_batched_stream_propagates_a_drop(monkeypatch):
+    def reads_then_die(chunk_size=None):
+        yield sse({"choices": [{"delta": {"content": "par"}}]}) + b"\n"
+        raise requests.ConnectionError("reset mid-stream")
+
+    resp = FakeResponse()
+    resp.iter_content = reads_then_die
+    install(monkeypatch, resp)
+    gen = batching_client(batch_window=0.01).chat([], "m", stream=True, interrupt=threading.Event())
+    assert next(gen)[0] == "par"
+    with pytest.raises(ApiError):
+        next(gen)
+
+
+def test_coalesce_drops_progress_ticks():
+    deltas = []
+    for delta in [(None, None, None, {}), ("a", None, None, {}), (None, None, None, {}), ("b", None, None, {})]:
+        api._coalesce(deltas, delta)
+    assert deltas == [("ab", None, None, {})]
+
+
+def test_batch_options_from_config_values():
+    assert api.batch_options(None) == {}
+    assert api.batch_options(16, 32) == {"batch_window": 0.016, "batch_max": 32}
+
+
+def test_pool_options_from_config_values():
+    assert api.pool_options() == {}
+    options = api.pool_options(4, False, 0, 5)
+    assert options == {"pool_size": 4, "keep_alive": False, "idle_timeout": None, "retries": 5}
+    c = OpenAiApi("http://localhost/v1", "sk-test", **api.pool_options(4, True, 30))
+    assert (c._http.pool_size, c._http.keep_alive, c._http.idle_timeout) == (4, True, 30.0)
+
+
+# --------------------------------------------------------------------------
+# the pooled session - against a real keep-alive server on localhost
+# --------------------------------------------------------------------------
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive, so a connection can be reused
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        self.server.connection_headers.append(self.headers.get("Connection"))
+        body = json.dumps(blocking_body(content="pooled")).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def keep_alive_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    server.connection_headers = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _local_client(server, **kwargs):
+    host, port = server.server_address
+    return OpenAiApi(f"http://{host}:{port}/v1", "sk-test", **kwargs)
+
+
+def test_pooled_session_reuses_one_connection(keep_alive_server):
+    c = _local_client(keep_alive_server)
+    for _ in range(3):
+        content, _, _, _ = c.chat([{"role": "user", "content": "hi"}], "m")
+        assert content == "pooled"
+    stats = c.pool_stats()
+    assert stats['requests'] == 3
+    assert stats['new_connections'] == 1
+    assert stats['reused_connections'] == 2
+
+
+def test_pooled_session_is_shared_across_threads(keep_alive_server):
+    c = _local_client(keep_alive_server, pool_size=4)
+    errors = []
+
+    def worker():
+        try:
+            for _ in range(5):
+                c.chat([{"role": "user", "content": "hi"}], "m")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    stats = c.pool_stats()
+    assert stats['requests'] == 20
+    # never more connections than the threads that could race for one.
+    assert stats['new_connections'] <= 4
+    assert stats['reused_connections'] >= 16
+
+
+def test_idle_pool_is_evicted_before_the_next_request(keep_alive_server):
+    c = _local_client(keep_alive_server, idle_timeout=0)
+    c.chat([{"role": "user", "content": "hi"}], "m")
+    c.chat([{"role": "user", "content": "hi"}], "m")
+    stats = c.pool_stats()
+    assert stats['evictions'] >= 1
+    assert stats['new_connections'] == 2
+
+
+def test_keep_alive_off_asks_for_a_fresh_connection(keep_alive_server):
+    c = _local_client(keep_alive_server, keep_alive=False)
+    c.chat([{"role": "user", "content": "hi"}], "m")
+    assert keep_alive_server.connection_headers == ["close"]
+
+
+class _GzipStreamHandler(BaseHTTPRequestHandler):
+    """a streaming answer sent Content-Encoding: gzip, flushed per event."""
+    protocol_version = "HTTP/1.0"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Content-Encoding", "gzip")
+        self.end_headers()
+        packer = zlib.compressobj(wbits=31)
+        for event in (sse({"choices": [{"delta": {"content": "zip"}}]}),
+                      sse({"choices": [{"delta": {"content": "ped"}}]}),
+                      b"data: [DONE]"):
+            self.wfile.write(packer.compress(event + b"\n\n") + packer.flush(zlib.Z_SYNC_FLUSH))
+            self.wfile.flush()
+        self.wfile.write(packer.flush())
+
+    def log_message(self, *args):
+        pass
+
+
+def test_a_gzip_encoded_stream_is_decoded():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _GzipStreamHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        c = _local_client(server)
+        deltas = list(c.chat([], "m", stream=True))
+        assert "".join(d[0] for d in deltas if d[0]) == "zipped"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+# --------------------------------------------------------------------------
+# AsyncOpenAiApi - the asyncio client, against a real server on localhost
+# --------------------------------------------------------------------------
+
+class _ChunkedHandler(BaseHTTPRequestHandler):
+    """answers a blocking request with a content-length JSON body and a
+    streaming one with chunked SSE. server.failures 500s that many requests
+    first; server.stall, when set, holds the stream open after its first event
+    until it is released (a provider gone quiet); server.hangup closes the
+    connection after a blocking answer."""
+    protocol_version = "HTTP/1.1"
+
+    def _chunk(self, data):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length))
+        self.server.requests.append(request)
+        self.server.paths.append(self.path)
+        if self.server.failures:
+            self.server.failures -= 1
+            body = b"overloaded"
+            self.send_response(500)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if not request.get("stream"):
+            body = json.dumps(blocking_body(content="async", usage={"total_tokens": 3})).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            self.close_connection = self.server.hangup
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        self._chunk(sse({"choices": [{"delta": {"content": "hel"}}]}) + b"\n\n")
+        if self.server.stall is not None:
+            self.server.stall.wait(5)
+            return
+        # split one event across two chunks: the line must be reassembled.
+        event = sse({"choices": [{"delta": {"content": "lo"}}]}) + b"\n\n"
+        self._chunk(event[:7])
+        self._chunk(event[7:])
+        self._chunk(sse({"choices": [], "usage": {"total_tokens": 7}}) + b"\n\ndata: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, *args):
+        pass
+
+
+class _BacklogServer(ThreadingHTTPServer):
+    # room for a burst of concurrent connects (the default backlog of 5 makes
+    # the rest wait out a SYN retry).
+    request_queue_size = 64
+
+
+@pytest.fixture
+def chunked_server():
+    server = _BacklogServer(("127.0.0.1", 0), _ChunkedHandler)
+    server.requests = []
+    server.paths = []
+    server.failures = 0
+    server.stall = None
+    server.hangup = False
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    if server.stall is not None:
+        server.stall.set()
+    server.shutdown()
+    server.server_close()
+
+
+def _async_client(server, **kwargs):
+    host, port = server.server_address
+    return api.AsyncOpenAiApi(f"http://{host}:{port}/v1", "sk-test", **kwargs)
+
+
+async def _adrain(agen):
+    out = []
+    async for item in agen:
+        out.append(item)
+    return out
+
+
+def test_async_blocking_chat_reuses_one_connection(chunked_server):
+    c = _async_client(chunked_server)
+
+    async def main():
+        results = []
+        for _ in range(3):
+            results.append(await c.chat([{"role": "user", "content": "hi"}], "m"))
+        return results
+
+    for result in asyncio.run(main()):
+        assert result == ("async", "", None, {"total_tokens": 3})
+    stats = c.pool_stats()
+    assert stats['requests'] == 3
+    assert stats['new_connections'] == 1
+
+
+def test_async_stale_connection_retry_counts_one_request(chunked_server):
+    # the server hangs up on each connection once it answered: the pooled
+    # one is dead by the time the second request wants it.
+    chunked_server.hangup = True
+    c = _async_client(chunked_server)
+
+    async def main():
+        await c.chat([], "m")
+        return await c.chat([], "m")
+
+    assert asyncio.run(main())[0] == "async"
+    stats = c.pool_stats()
+    assert stats['requests'] == 2
+    assert stats['new_connections'] == 2
+
+
+def _no_proxy_env(monkeypatch):
+    for name in ("http_proxy", "https_proxy", "all_proxy", "no_proxy"):
+        monkeypatch.delenv(name, raising=False)
+        monkeypatch.delenv(name.upper(), raising=False)
+
+
+def test_async_client_goes_through_an_http_proxy(chunked_server, monkeypatch):
+    _no_proxy_env(monkeypatch)
+    host, port = chunked_server.server_address
+    monkeypatch.setenv("HTTP_PROXY", f"http://{host}:{port}")
+    # nothing listens on the endpoint itself: only the proxy can answer.
+    c = api.AsyncOpenAiApi("http://api.invalid/v1", "sk-test")
+    assert asyncio.run(c.chat([], "m"))[0] == "async"
+    assert chunked_server.paths == ["http://api.invalid/v1/chat/completions"]
+
+
+def test_async_client_tunnels_https_through_the_proxy(chunked_server, monkeypatch):
+    _no_proxy_env(monkeypatch)
+    host, port = chunked_server.server_address
+    monkeypatch.setenv("HTTPS_PROXY", f"{host}:{port}")
+    c = api.AsyncOpenAiApi("https://api.invalid/v1", "sk-test", retries=1)
+    # the stub answers CONNECT with 501, which shows the request went there.
+    with pytest.raises(ApiError, match="501"):
+        asyncio.run(c.chat([], "m"))
+    assert chunked_server.requests == []
+
+
+def test_async_client_honours_no_proxy(chunked_server, monkeypatch):
+    _no_proxy_env(monkeypatch)
+    host, _port = chunked_server.server_address
+    monkeypatch.setenv("HTTP_PROXY", "http://proxy.invalid:3128")
+    monkeypatch.setenv("NO_PROXY", host)
+    c = _async_client(chunked_server)
+    assert asyncio.run(c.chat([], "m"))[0] == "async"
+    assert chunked_server.paths == ["/v1/chat/completions"]
+
+
+def test_async_stream_reassembles_chunked_sse(chunked_server):
+    c = _async_client(chunked_server)
+
+    async def main():
+        first = await _adrain(c.chat([], "m", stream=True))
+        second = await _adrain(c.chat([], "m", stream=True))
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert first == [("hel", None, None, {}),
+                     ("lo", None, None, {}),
+                     (None, None, None, {"total_tokens": 7})]
+    assert second == first
+    assert chunked_server.requests[0]["stream"] is True
+    # the stream was read to its closing chunk, so its connection was reused.
+    assert c.pool_stats()['new_connections'] == 1
+
+
+def test_async_chat_retries_a_500(chunked_server, monkeypatch):
+    monkeypatch.setattr(api, "_RETRY_BACKOFF", 0)
+    chunked_server.failures = 1
+    c = _async_client(chunked_server)
+    result = asyncio.run(c.chat([], "m"))
+    assert result[0] == "async"
+    assert len(chunked_server.requests) == 2
+
+
+def test_async_chat_exhausted_retries_raise(chunked_server, monkeypatch):
+    monkeypatch.setattr(api, "_RETRY_BACKOFF", 0)
+    chunked_server.failures = 5
+    c = _async_client(chunked_server, retries=2)
+    with pytest.raises(ApiError) as err:
+        asyncio.run(c.chat([], "m"))
+    assert err.value.status == 500
+    assert "overloaded" in str(err.value)
+
+
+def test_async_interrupt_ends_a_stalled_stream(chunked_server):
+    chunked_server.stall = threading.Event()
+    c = _async_client(chunked_server)
+    interrupt = threading.Event()
+
+    async def main():
+        gen = c.chat([], "m", stream=True, interrupt=interrupt)
+        out = [await gen.__anext__()]     # the first event arrives...
+        threading.Timer(0.05, interrupt.set).start()
+        out.extend(await _adrain(gen))    # ...then the kill lands mid-read
+        return out
+
+    start = time.monotonic()
+    out = asyncio.run(main())
+    assert out == [("hel", None, None, {})]
+    assert time.monotonic() - start < 2
+
+
+def test_async_requests_share_one_loop(chunked_server):
+    c = _async_client(chunked_server, pool_size=4)
+
+    async def main():
+        calls = [c.chat([{"role": "user", "content": str(i)}], "m") for i in range(40)]
+        return await asyncio.gather(*calls)
+
+    results = asyncio.run(main())
+    assert [result[0] for result in results] == ["async"] * 40
+    assert len(chunked_server.requests) == 40
+
+
+# --------------------------------------------------------------------------
+# the incremental SSE decoder
+# --------------------------------------------------------------------------
+
+def content_event(text):
+    return sse({"choices": [{"delta": {"content": text}}]}) + b"\n\n"
+
+
+def reasoning_event(text):
+    return sse({"choices": [{"delta": {"reasoning": text}}]}) + b"\n\n"
+
+
+def test_decoder_reassembles_a_line_split_across_reads():
+    decoder = api._SSEDecoder("u")
+    event = content_event("hello")
+    assert decoder.feed(event[:9]) == []
+    assert decoder.feed(event[9:]) == [("hello", None, None, {})]
+
+
+def test_decoder_coalesces_one_reads_content_run():
+    decoder = api._SSEDecoder("u")
+    data = content_event("a") + content_event("b") + content_event("c")
+    assert decoder.feed(data) == [("abc", None, None, {})]
+
+
+def test_decoder_keeps_content_and_reasoning_in_order():
+    decoder = api._SSEDecoder("u")
+    data = reasoning_event("think") + reasoning_event("ing") + content_event("x") + reasoning_event("more")
+    assert decoder.feed(data) == [(None, "thinking", None, {}),
+                                  ("x", None, None, {}),
+                                  (None, "more", None, {})]
+
+
+def test_decoder_does_not_coalesce_across_reads():
+    decoder = api._SSEDecoder("u")
+    assert decoder.feed(content_event("a")) == [("a", None, None, {})]
+    assert decoder.feed(content_event("b")) == [("b", None, None, {})]
+
+
+def test_decoder_handles_crlf_and_stops_at_done():
+    decoder = api._SSEDecoder("u")
+    data = sse({"choices": [{"delta": {"content": "hi"}}]}) + b"\r\n\r\ndata: [DONE]\r\n" + content_event("late")
+    assert decoder.feed(data) == [("hi", None, None, {})]
+    assert decoder.done
+    assert decoder.feed(content_event("later")) == []
+
+
+def test_decoder_flushes_an_unterminated_last_line():
+    decoder = api._SSEDecoder("u")
+    assert decoder.feed(sse({"choices": [{"delta": {"content": "tail"}}]})) == []
+    assert decoder.flush() == [("tail", None, None, {})]
+
+
+def test_decoder_survives_a_multibyte_char_split_across_reads():
+    decoder = api._SSEDecoder("u")
+    event = "data: {\"choices\": [{\"delta\": {\"content\": \"hé\"}}]}\n".encode()
+    cut = event.index("é".encode()) + 1          # mid-character
+    assert decoder.feed(event[:cut]) == []
+    assert decoder.feed(event[cut:]) == [("hé", None, None, {})]
+
+
+def _recorded_stream(tokens=2000):
+    """a provider-shaped stream: `tokens` content chunks carrying the usual
+    id/object/model envelope, a usage chunk and [DONE], cut into reads of the
+    uneven sizes a socket hands back."""
+    events = []
+    for i in range(tokens):
+        chunk = {}
+        chunk['id'] = "chatcmpl-0123456789"
+        chunk['object'] = "chat.completion.chunk"
+        chunk['created'] = 1760000000
+        chunk['model'] = "provider/model-large"
+        chunk['choices'] = [{"index": 0, "delta": {"content": f" tok{i}"}, "finish_reason": None}]
+        events.append(sse(chunk) + b"\n\n")
+    events.append(sse({"choices": [], "usage": {"total_tokens": tokens}}) + b"\n\n")
+    events.append(b"data: [DONE]\n\n")
+    body = b"".join(events)
+    reads = []
+    sizes = [37, 512, 181, 1400, 96, 2048, 733]
+    at = 0
+    i = 0
+    while at < len(body):
+        size = sizes[i % len(sizes)]
+        reads.append(body[at:at + size])
+        at += size
+        i += 1
+    return reads
+
+
+def test_decoder_benchmark_chunks_per_second():
+    # a micro-benchmark: decode a recorded 2000-chunk stream repeatedly and
+    # report chunks/s. the rate is printed, not asserted (a loaded CI box
+    # would make any floor flaky); it is what to compare across changes
+    # (`pytest -s -k benchmark`).
+    reads = _recorded_stream()
+    rounds = 20
+    text = None
+    start = time.perf_counter()
+    for _ in range(rounds):
+        decoder = api._SSEDecoder("u")
+        parts = []
+        for data in reads:
+            for delta in decoder.feed(data):
+                if delta[0]:
+                    parts.append(delta[0])
+        text = "".join(parts)
+    elapsed = time.perf_counter() - start
+    rate = rounds * 2000 / elapsed
+    print(f"\nsse decoder: {rate:,.0f} chunks/s, 2000 chunks -> {len(parts)} deltas")
+    assert text == "".join(f" tok{i}" for i in range(2000))
+    assert decoder.final() == (None, None, None, {"total_tokens": 2000})
+    # the reads carry several events each; coalescing yields one delta per read.
+    assert len(parts) <= len(reads)
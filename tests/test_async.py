@@ -0,0 +1,307 @@
+"""Tests for the asyncio path - cai.llm.async_call_llm and Agent.arun().
+
+Fully offline: a FakeAsyncApi plays the AsyncOpenAiApi contract (a coroutine
+for a blocking call, an async generator for a stream) from a script of turns,
+optionally sleeping to stand in for network latency. The transport itself is
+covered in test_api.py.
+"""
+import asyncio
+import threading
+
+import pytest
+
+from cai.agent import Agent, RunInFlight
+from cai.context import ContextManager, Summarize
+from cai.environment import Environment
+from cai.events import EventType
+from cai.llm import SteerQueue, async_call_llm, call_llm
+from cai.skills import SkillsRegistry
+from cai.tools import ToolsRegistry
+
+
+# --------------------------------------------------------------------------
+# fakes / helpers
+# --------------------------------------------------------------------------
+
+def tool_call(name, call_id="c1", arguments="{}"):
+    function = {}
+    function["name"] = name
+    function["arguments"] = arguments
+    call = {}
+    call["id"] = call_id
+    call["type"] = "function"
+    call["function"] = function
+    return call
+
+
+class FakeAsyncApi:
+    """each turn is a list of (content, reasoning, tool_calls, usage) deltas;
+    the last turn repeats. `delay` seconds pass before each delta."""
+
+    def __init__(self, turns, delay=0):
+        self.turns = turns
+        self.delay = delay
+        self.calls = 0
+
+    def _next_turn(self):
+        turn = self.turns[min(self.calls, len(self.turns) - 1)]
+        self.calls += 1
+        return turn
+
+    def chat(self, messages, model, stream=False, **kwargs):
+        turn = self._next_turn()
+        if stream:
+            return self._stream(turn)
+        return self._complete(turn)
+
+    async def _stream(self, turn):
+        for delta in turn:
+            await asyncio.sleep(self.delay)
+            yield delta
+
+    async def _complete(self, turn):
+        await asyncio.sleep(self.delay)
+        content = "".join(delta[0] or "" for delta in turn)
+        tool_calls = None
+        for delta in turn:
+            if delta[2] is not None:
+                tool_calls = delta[2]
+        return content, "", tool_calls, {}
+
+
+class FakeSyncApi(FakeAsyncApi):
+    """the same script over the blocking contract, to compare the two loops."""
+
+    def chat(self, messages, model, stream=False, **kwargs):
+        turn = self._next_turn()
+        def gen():
+            for delta in turn:
+                yield delta
+        return gen()
+
+
+TOOL_THEN_TEXT = [[(None, None, [tool_call("echo", arguments='{"text": "ping"}')], {})],
+                  [("pong", None, None, {}), (None, None, None, {"total_tokens": 4})]]
+
+
+def echo(text: str) -> str:
+    """echo text back."""
+    return text
+
+
+def bare_agent(tools_registry, async_api):
+    """an Agent without config/network (bypass __init__)."""
+    agent = Agent.__new__(Agent)
+    agent.name = "test"
+    agent.model = "m"
+    agent.api = None
+    agent.async_api = async_api
+    agent.env = Environment()
+    agent._system_prompt = None
+    agent.tools_registry = tools_registry
+    agent.skills_registry = SkillsRegistry.for_skills([], tools_registry=tools_registry)
+    agent._hooks = None
+    agent._ui = None
+    agent.reasoning_effort = None
+    agent.temperature = None
+    agent.max_steps = None
+    agent.tool_result_max_chars = None
+    agent.stream = True
+    agent.interrupt = threading.Event()
+    agent._killed = threading.Event()
+    agent._steer = SteerQueue()
+    agent._run_lock = threading.Lock()
+    agent.messages = []
+    agent.children = []
+    return agent
+
+
+async def collect(stream):
+    events = []
+    async for event in stream:
+        events.append(event)
+    return events
+
+
+# --------------------------------------------------------------------------
+# async_call_llm
+# --------------------------------------------------------------------------
+
+def test_async_loop_matches_the_sync_loop():
+    registry = ToolsRegistry.for_tools([echo])
+    sync_messages = [{"role": "user", "content": "hi"}]
+    gen = call_llm(sync_messages, "m", FakeSyncApi(TOOL_THEN_TEXT),
+                   tools=registry.tools, tools_dispatch=registry.dispatch)
+    sync_events = []
+    try:
+        while True:
+            sync_events.append(next(gen))
+    except StopIteration as stop:
+        sync_text = stop.value
+
+    async_messages = [{"role": "user", "content": "hi"}]
+    stream = async_call_llm(async_messages, "m", FakeAsyncApi(TOOL_THEN_TEXT),
+                            tools=registry.tools, tools_dispatch=registry.dispatch)
+    async_events = asyncio.run(collect(stream))
+
+    assert async_events == sync_events
+    assert stream.text == sync_text == "pong"
+    assert async_messages == sync_messages
+    assert async_messages[2] == {"role": "tool", "tool_call_id": "c1", "content": "ping"}
+
+
+def test_async_loop_blocking_mode():
+    stream = async_call_llm([], "m", FakeAsyncApi([[("all at once", None, None, {})]]), stream=False)
+    events = asyncio.run(collect(stream))
+    assert [event.type for event in events] == [EventType.CONTENT]
+    assert stream.text == "all at once"
+
+
+def test_async_loop_tools_do_not_block_the_event_loop():
+    # a slow tool runs in a worker thread: a ticker on the same loop keeps
+    # ticking while it runs.
+    started = threading.Event()
+    def slow(text: str) -> str:
+        """wait a while."""
+        started.set()
+        threading.Event().wait(0.3)
+        return text
+
+    registry = ToolsRegistry.for_tools([slow])
+    api = FakeAsyncApi([[(None, None, [tool_call("slow", arguments='{"text": "x"}')], {})],
+                        [("done", None, None, {})]])
+
+    async def main():
+        ticks = []
+        async def ticker():
+            while True:
+                ticks.append(1)
+                await asyncio.sleep(0.02)
+        task = asyncio.ensure_future(ticker())
+        stream = async_call_llm([], "m", api, tools=registry.tools, tools_dispatch=registry.dispatch)
+        await stream.wait()
+        task.cancel()
+        return stream.text, len(ticks)
+
+    text, ticks = asyncio.run(main())
+    assert text == "done"
+    assert ticks >= 5
+
+
+# --------------------------------------------------------------------------
+# Agent.arun()
+# --------------------------------------------------------------------------
+
+def test_arun_streams_and_grows_the_conversation():
+    agent = bare_agent(ToolsRegistry.for_tools([echo]), FakeAsyncApi(TOOL_THEN_TEXT))
+    agent.tools_registry.select("echo")
+    handle = agent.arun("hi")
+    events = asyncio.run(collect(handle))
+    assert events[0].type == EventType.USER
+    assert [event.type for event in events[1:]] == [EventType.TOOL_CALL,
+                                                   EventType.TOOL_RESULT,
+                                                   EventType.CONTENT,
+                                                   EventType.USAGE]
+    assert handle.text == "pong"
+    assert [m["role"] for m in agent.messages] == ["user", "assistant", "tool", "assistant"]
+    assert not agent._run_lock.locked()
+
+
+def test_one_loop_drives_hundreds_of_runs():
+    turns = [[("a", None, None, {}), ("b", None, None, {})]]
+    agents = [bare_agent(ToolsRegistry.for_tools([]), FakeAsyncApi(turns, delay=0.05))
+              for _ in range(200)]
+    threads_before = threading.active_count()
+
+    async def main():
+        handles = [agent.arun(f"prompt {i}") for i, agent in enumerate(agents)]
+        await asyncio.gather(*(handle.wait() for handle in handles))
+        return handles, threading.active_count()
+
+    handles, threads_during = asyncio.run(main())
+    assert [handle.text for handle in handles] == ["ab"] * 200
+    assert threads_during <= threads_before + 1    # no thread per run
+
+
+def test_a_summarizing_context_does_not_block_the_loop():
+    quick_done = threading.Event()
+    waited = []
+
+    def summarize(messages, model):
+        # a blocking model call, held until the other run on the loop ends.
+        waited.append(quick_done.wait(5))
+        return "the story so far"
+
+    long = [{"role": "user" if i % 2 == 0 else "assistant", "content": "word " * 200}
+            for i in range(12)]
+    context = ContextManager(500, [Summarize(summarize, keep_last=2)], reserve=0)
+    turns = [[("done", None, None, {})]]
+
+    async def quick():
+        await async_call_llm([{"role": "user", "content": "hi"}], "m", FakeAsyncApi(turns)).wait()
+        quick_done.set()
+
+    async def main():
+        await asyncio.gather(async_call_llm(long, "m", FakeAsyncApi(turns), context=context).wait(),
+                             quick())
+
+    asyncio.run(main())
+    assert waited == [True]
+
+
+def test_cancelling_arun_sets_the_interrupt():
+    agent = bare_agent(ToolsRegistry.for_tools([]),
+                       FakeAsyncApi([[("partial", None, None, {}), ("never", None, None, {})]], delay=0.2))
+
+    async def main():
+        task = asyncio.ensure_future(agent.arun("hi").wait())
+        await asyncio.sleep(0.3)          # the first delta landed, the second is pending
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert agent.interrupt.is_set()
+    assert agent.messages == [{"role": "user", "content": "hi"}]   # no half-answer appended
+    assert not agent._run_lock.locked()
+
+
+def test_cancelling_mid_tool_keeps_tool_calls_paired():
+    release = threading.Event()
+    def stuck(text: str) -> str:
+        """block until released."""
+        release.wait(2)
+        return text
+
+    registry = ToolsRegistry.for_tools([stuck])
+    registry.select("stuck")
+    calls = [tool_call("stuck", "c1", '{"text": "a"}'), tool_call("stuck", "c2", '{"text": "b"}')]
+    agent = bare_agent(registry, FakeAsyncApi([[(None, None, calls, {})], [("next", None, None, {})]]))
+
+    async def main():
+        task = asyncio.ensure_future(agent.arun("go").wait())
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    release.set()
+    tool_messages = [m for m in agent.messages if m["role"] == "tool"]
+    assert [m["tool_call_id"] for m in tool_messages] == ["c1", "c2"]
+    assert all("cancelled" in m["content"] for m in tool_messages)
+    assert agent.async_api.calls == 1    # the follow-up turn never ran
+
+
+def test_concurrent_arun_on_one_agent_raises():
+    agent = bare_agent(ToolsRegistry.for_tools([]), FakeAsyncApi([[("x", None, None, {})]], delay=0.05))
+
+    async def main():
+        first = asyncio.ensure_future(agent.arun("one").wait())
+        await asyncio.sleep(0.01)
+        with pytest.raises(RunInFlight):
+            await agent.arun("two").wait()
+        await first
+
+    asyncio.run(main())
+    assert [m["content"] for m in agent.messages] == ["one", "x"]
@@ -30,6 +30,18 @@ def test_load_optional_reads_the_file():
     assert config.load_optional("absent", "d") == "d"
 
 
+def test_agent_api_takes_the_pool_keys():
+    from cai.agent import Agent
+    _write_config({"base_url": "http://localhost/v1", "model": "m",
+                   "api_pool_size": 2, "api_keep_alive": False,
+                   "api_idle_timeout": 0, "api_retries": 5})
+    with open(config.api_key_path(), "w") as f:
+        f.write("sk-test")
+    api = Agent().api
+    assert (api._http.pool_size, api._http.keep_alive, api._http.idle_timeout) == (2, False, None)
+    assert api.retries == 5
+
+
 def test_settings_shadow_an_optional_key():
     _write_config({"base_url": "u", "model": "m", "python_sandbox": "kernel"})
     Environment.default().settings.python_sandbox = "hook"
@@ -0,0 +1,226 @@
+"""Tests for cai.context - the ContextManager, its strategies, and the
+context= stage of call_llm.
+
+Fully offline: conversations are built by hand, limits are explicit, and a
+fake api records what each turn was sent.
+"""
+import copy
+
+from cai.context import ContextManager, RollingWindow, StubToolResults, Summarize
+from cai.llm import call_llm
+
+
+# --------------------------------------------------------------------------
+# helpers
+# --------------------------------------------------------------------------
+
+def tool_turn(i, size=2000):
+    """one assistant turn calling a tool, and its (bulky) result."""
+    call = {}
+    call["id"] = f"c{i}"
+    call["type"] = "function"
+    call["function"] = {"name": "read", "arguments": "{}"}
+    assistant = {"role": "assistant", "content": "", "tool_calls": [call]}
+    result = {"role": "tool", "tool_call_id": f"c{i}", "content": "x" * size}
+    return [assistant, result]
+
+
+def conversation(turns, size=2000):
+    messages = [{"role": "system", "content": "sys"}, {"role": "user", "content": "go"}]
+    for i in range(turns):
+        messages.extend(tool_turn(i, size))
+    return messages
+
+
+def assert_paired(messages):
+    """every tool message answers a call of the assistant turn before it."""
+    open_ids = set()
+    for m in messages:
+        if m["role"] == "assistant":
+            open_ids = set()
+            for call in m.get("tool_calls") or []:
+                open_ids.add(call["id"])
+        elif m["role"] == "tool":
+            assert m["tool_call_id"] in open_ids
+            open_ids.discard(m["tool_call_id"])
+
+
+def manager(*strategies, limit=2000):
+    return ContextManager(limit, strategies, reserve=0)
+
+
+# --------------------------------------------------------------------------
+# ContextManager
+# --------------------------------------------------------------------------
+
+def test_a_list_that_fits_is_sent_as_is():
+    messages = conversation(2)
+    assert manager(StubToolResults(), limit=100_000).fit(messages) is messages
+
+
+def test_no_known_limit_disables_trimming():
+    class NoModels:
+        def context_length(self, model):
+            return None
+
+    messages = conversation(50)
+    context = ContextManager(strategies=[StubToolResults()], models=NoModels())
+    assert context.fit(messages, "m") is messages
+
+
+def test_limit_resolves_through_the_models_registry():
+    class Models:
+        def context_length(self, model):
+            return {"big": 1_000_000, "small": 1000}.get(model)
+
+    messages = conversation(5)
+    context = ContextManager(strategies=[StubToolResults(keep_last=0)], reserve=0, models=Models())
+    assert context.fit(messages, "big") is messages
+    assert context.fit(messages, "small") is not messages
+
+
+def test_observe_calibrates_the_estimate():
+    messages = conversation(2)
+    context = manager()
+    before = context.estimate(messages)
+    context.observe({"prompt_tokens": before * 2}, messages)
+    assert context.estimate(messages) == before * 2
+
+
+# --------------------------------------------------------------------------
+# strategies
+# --------------------------------------------------------------------------
+
+def test_stub_tool_results_keeps_the_newest_and_the_pairing():
+    messages = conversation(6)
+    snapshot = copy.deepcopy(messages)
+    out = manager(StubToolResults(keep_last=2)).fit(messages)
+    tools = [m for m in out if m["role"] == "tool"]
+    assert len(out) == len(messages)
+    assert "elided" in tools[0]["content"]
+    assert tools[-1]["content"] == "x" * 2000
+    assert tools[-2]["content"] == "x" * 2000
+    assert_paired(out)
+    assert messages == snapshot               # the transcript is untouched
+
+
+def test_stubs_are_reused_on_the_next_turn():
+    messages = conversation(6)
+    context = manager(StubToolResults(keep_last=2))
+    first = context.fit(messages)
+    messages.extend(tool_turn(6))
+    second = context.fit(messages)
+    for a, b in zip(first, second):
+        if "elided" in (a.get("content") or ""):
+            assert b is a                     # the same stub object, a stable prefix
+
+
+def test_rolling_window_cuts_at_a_turn_boundary():
+    messages = conversation(8)
+    out = manager(RollingWindow(keep_last=3)).fit(messages)
+    assert out[0]["role"] == "system"
+    assert "elided" in out[1]["content"]
+    assert out[2]["role"] != "tool"
+    assert_paired(out)
+    assert out[-1] is messages[-1]
+
+
+def test_rolling_window_keeps_its_cut_while_it_fits():
+    messages = conversation(8, size=1000)
+    context = manager(RollingWindow(keep_last=2))
+    first = context.fit(messages)
+    messages.append({"role": "user", "content": "more"})
+    second = context.fit(messages)
+    assert second[2] is first[2]
+
+
+def test_summarize_replaces_the_oldest_turns():
+    seen = []
+
+    def summarize(messages, model):
+        seen.append((len(messages), model))
+        return "the story so far"
+
+    messages = conversation(8)
+    context = manager(Summarize(summarize, keep_last=4))
+    out = context.fit(messages, "m")
+    assert out[0]["role"] == "system"
+    assert out[1]["content"].endswith("the story so far")
+    assert out[-1] is messages[-1]
+    assert_paired(out)
+    assert seen[0][1] == "m"
+    context.fit(messages, "m")                # still fits: the summary is reused
+    assert len(seen) == 1
+
+
+def test_summarize_asks_the_api_when_given_no_callable():
+    class Api:
+        def __init__(self):
+            self.calls = []
+
+        def chat(self, messages, model, **kwargs):
+            self.calls.append((messages, model, kwargs))
+            return ("summary", None, None, {})
+
+    api = Api()
+    context = ContextManager(2000, [Summarize(keep_last=4)], reserve=0, api=api)
+    out = context.fit(conversation(8), "m")
+    assert "summary" in out[1]["content"]
+    messages, model, kwargs = api.calls[0]
+    assert model == "m" and kwargs["stream"] is False
+    assert messages[0]["role"] == "system"
+
+
+def test_strategies_run_in_order_until_it_fits():
+    messages = conversation(8)
+    out = manager(StubToolResults(keep_last=0), RollingWindow(keep_last=2), limit=1000).fit(messages)
+    assert len(out) == len(messages)          # stubbing alone was enough
+    assert_paired(out)
+
+
+def test_settings_build_the_named_strategies():
+    class Settings:
+        context_strategies = ["stub", "window", "bogus"]
+        context_reserve = 100
+
+    context = ContextManager.for_settings(Settings())
+    assert [type(s) for s in context.strategies] == [StubToolResults, RollingWindow]
+    Settings.context_strategies = []
+    assert ContextManager.for_settings(Settings()) is None
+
+
+# --------------------------------------------------------------------------
+# call_llm(context=)
+# --------------------------------------------------------------------------
+
+class RecordingApi:
+    """records the messages of each call; turn 1 asks for a tool, turn 2 answers."""
+
+    def __init__(self):
+        self.sent = []
+
+    def chat(self, messages, model, **kwargs):
+        self.sent.append(list(messages))
+        n = len(self.sent)
+        def gen():
+            if n == 1:
+                call = tool_turn(99)[0]["tool_calls"]
+                yield (None, None, call, {"prompt_tokens": 500})
+            else:
+                yield ("done", None, None, {"prompt_tokens": 600})
+        return gen()
+
+
+def test_call_llm_sends_the_fitted_list_and_keeps_the_transcript():
+    messages = conversation(8)[1:]            # call_llm adds the system prompt
+    api = RecordingApi()
+    context = manager(StubToolResults(keep_last=1))
+    gen = call_llm(messages, "m", api, system_prompt="sys", context=context,
+                   tools_dispatch=lambda name, args: "y" * 100)
+    for _event in gen:
+        pass
+    assert api.sent[0][0]["role"] == "system"
+    assert any("elided" in (m.get("content") or "") for m in api.sent[0])
+    assert not any("elided" in (m.get("content") or "") for m in messages)
+    assert messages[-1]["content"] == "done"
+    assert context.sample_tokens == 600
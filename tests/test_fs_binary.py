@@ -329,6 +329,30 @@ def test_search_file_glob_applies_to_binary_scan():
     assert "skip.dat" not in out
 
 
+def test_search_text_lines_match_rg_vimgrep():
+    import subprocess
+    with open("long.txt", "w") as f:
+        f.write("x" * 10 + "needle" + "y" * 200 + "\n")
+        f.write("needle" + "z" * 150 + "needle" + "q" * 10 + "needle\n")
+        f.write("\u00e9" * 100 + "needle\n")
+        f.write("crlf needle\r\n")
+    cmd = ["rg", "--vimgrep", "--max-columns", "120", "--max-columns-preview", "needle", "long.txt"]
+    expected = subprocess.run(cmd, capture_output=True).stdout.decode().rstrip("\n")
+    out = fs.search("needle", path="long.txt")
+    assert out.replace(os.path.realpath(".") + os.sep, "") == expected
+
+
+def test_search_stops_once_the_window_is_filled():
+    with open("many.txt", "w") as f:
+        for i in range(1, 501):
+            f.write(f"hit {i}\n")
+    out = fs.search("hit", path="many.txt", end=10).split("\n")
+    assert [line.split(":", 1)[1] for line in out[:10]] == [f"{i}:1:hit {i}" for i in range(1, 11)]
+    assert "start=11" in out[10]
+    out = fs.search("hit", path="many.txt", start=499, end=600).split("\n")
+    assert [line.split(":", 1)[1] for line in out] == ["499:1:hit 499", "500:1:hit 500"]
+
+
 def test_search_errors():
     assert fs.search("") == "Error: empty pattern"
     assert fs.search("[unclosed").startswith("Error:")
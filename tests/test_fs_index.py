@@ -0,0 +1,134 @@
+"""Tests for cai.fs_index and the fs server's use of it (fs_index: true):
+list_files answers from the index with the walk's exact output, the walk
+itself pages without listing deeper than a page reaches, the mtime scan
+picks up changes made behind the server's back, and search takes its binary
+flags from the index rather than reading each file's head again. The fs
+module is loaded directly, as in test_fs_binary."""
+import os
+import importlib.util
+
+import pytest
+
+from cai import config, fs_index
+from cai.environment import builtin_mcp_dir
+from cai.fs_index import FileIndex
+
+
+def _load_fs():
+    path = os.path.join(builtin_mcp_dir(), "fs.py")
+    spec = importlib.util.spec_from_file_location("fs_index_under_test", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+fs = _load_fs()
+
+
+@pytest.fixture(autouse=True)
+def _in_tmp(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("CAI_SCRATCH", raising=False)
+    monkeypatch.setattr(FileIndex, "_indexes", {})
+    for rel in ("src/pkg/mod.py", "src/conftest.py", "tests/conftest.py", "README.md", ".git/HEAD"):
+        os.makedirs(os.path.dirname(rel) or ".", exist_ok=True)
+        with open(rel, "w") as f:
+            f.write("print('hello')\n")
+
+
+def _indexed(monkeypatch, on=True):
+    real = config.load_optional
+
+    def load_optional(key, default=None):
+        if key == "fs_index":
+            return on
+        return real(key, default)
+    monkeypatch.setattr(config, "load_optional", load_optional)
+
+
+@pytest.mark.parametrize("pattern", ["", "conftest", r"\.py$"])
+def test_listing_matches_the_walk(monkeypatch, pattern):
+    walked = fs.list_files(".", pattern=pattern)
+    walked_src = fs.list_files("src", pattern=pattern)
+    _indexed(monkeypatch)
+    assert fs.list_files(".", pattern=pattern) == walked
+    assert fs.list_files("src", pattern=pattern) == walked_src
+
+
+def test_walk_pages_are_listed_only_as_deep_as_they_reach(monkeypatch):
+    whole = fs.list_files(".", end=1000).split("\n")
+    paged = []
+    for start in range(1, len(whole) + 1, 3):
+        page = fs.list_files(".", start=start, end=start + 2).split("\n")
+        paged += [line for line in page if not line.startswith("[")]
+    assert paged == whole
+    listed = []
+    real_listdir = os.listdir
+
+    def listdir(path):
+        listed.append(os.path.relpath(path))
+        return real_listdir(path)
+    monkeypatch.setattr(fs.os, "listdir", listdir)
+    out = fs.list_files(".", end=2)
+    assert out.split("\n")[:2] == ["file  README.md", "dir  src"]
+    assert "more follow; call again with start=3" in out
+    assert listed == ["."]
+
+
+@pytest.mark.parametrize("on", [False, True])
+def test_a_start_past_the_last_entry_says_so(monkeypatch, on):
+    _indexed(monkeypatch, on)
+    total = len(fs.list_files(".", end=1000).split("\n"))
+    out = fs.list_files(".", start=total + 5)
+    assert out == f"[No entries at start={total + 5}; there are {total} - call again with a start of 1-{total}]"
+
+
+def test_changes_behind_the_servers_back_are_seen(monkeypatch):
+    _indexed(monkeypatch)
+    assert "new.txt" not in fs.list_files(".")
+    os.makedirs("src/deep")
+    with open("src/deep/new.txt", "w") as f:
+        f.write("x")
+    os.remove("README.md")
+    out = fs.list_files(".")
+    assert "file  src/deep/new.txt" in out and "README.md" not in out
+
+
+def test_an_unchanged_tree_is_not_listed_again(monkeypatch):
+    _indexed(monkeypatch)
+    fs.list_files(".")
+    index = FileIndex.for_path(".")
+    old = os.path.getmtime(".") - 10
+    for root, dirs, _files in os.walk("."):
+        for name in dirs + ["."]:
+            os.utime(os.path.join(root, name), (old, old))
+    fs.list_files(".")                   # settles the racy fresh dirs
+    before = index.stats()['relisted']
+    fs.list_files(".", pattern="mod")
+    assert index.stats()['relisted'] == before
+
+
+def test_search_takes_binary_flags_from_the_index(monkeypatch):
+    with open("blob.bin", "wb") as f:
+        f.write(b"\x00\x01hello\x02")
+    _indexed(monkeypatch)
+    fs.search("hello", ".")
+    sniffed = []
+
+    def sniff(path):
+        sniffed.append(path)
+        return False
+    monkeypatch.setattr(fs, "_is_binary", sniff)
+    monkeypatch.setattr(fs_index, "_is_binary", sniff)
+    out = fs.search("hello", ".")
+    assert "src/pkg/mod.py:1:8:print('hello')" in out
+    assert "blob.bin:2: 5-byte match" in out
+    assert sniffed == []
+
+
+def test_a_symlink_loop_is_listed_but_not_followed(monkeypatch):
+    os.symlink("..", "src/up")
+    _indexed(monkeypatch)
+    out = fs.list_files(".", start=1, end=1000)
+    assert "dir  src/up" in out
+    assert "src/up/src" not in out
@@ -0,0 +1,106 @@
+"""Tests for cai.line_index and fs read_file's use of it: pages read from a
+checkpoint match a read from the top (CRLF, a missing final newline, non-ASCII
+text), negative line numbers read the tail, a file that grew is scanned only
+from its last checkpoint, and a lone CR or an edit through the fs tools is
+handled. _BLOCK is shrunk so small files get many checkpoints."""
+import os
+import importlib.util
+
+import pytest
+
+from cai import line_index
+from cai.environment import builtin_mcp_dir
+from cai.line_index import LineIndex
+
+
+def _load_fs():
+    path = os.path.join(builtin_mcp_dir(), "fs.py")
+    spec = importlib.util.spec_from_file_location("fs_lines_under_test", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+fs = _load_fs()
+
+
+@pytest.fixture(autouse=True)
+def _in_tmp(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("CAI_SCRATCH", raising=False)
+    monkeypatch.setattr(LineIndex, "_indexes", {})
+    monkeypatch.setattr(line_index, "_BLOCK", 64)
+
+
+def _write(name, text):
+    with open(name, "w", encoding="utf-8", newline="") as f:
+        f.write(text)
+
+
+def _read(name, **kwargs):
+    return fs.read_file(name, **kwargs).split("\n[lines")[0]
+
+
+def _plain(name, start, end):
+    with open(name, "r", encoding="utf-8", errors="replace") as f:
+        return "".join(list(f)[start - 1:end])
+
+
+@pytest.mark.parametrize("text", [
+    "".join(f"line {i}\n" for i in range(1, 301)),
+    "".join(f"line {i}\r\n" for i in range(1, 301)) + "no newline",
+    "".join(f"été {i} " * (i % 7) + "\n" for i in range(1, 301)),
+])
+def test_pages_match_a_read_from_the_top(text):
+    _write("log.txt", text)
+    for start in (1, 2, 37, 150, 299, 300):
+        assert _read("log.txt", line_start=start, line_end=start + 4) == _plain("log.txt", start, start + 4)
+    assert LineIndex.for_file("log.txt").stats()['checkpoints'] > 10
+
+
+def test_negative_lines_read_the_tail():
+    _write("log.txt", "".join(f"line {i}\n" for i in range(1, 1001)))
+    assert fs.read_file("log.txt", line_start=-2) == "line 999\nline 1000\n"
+    assert _read("log.txt", line_start=-5, line_end=-4) == "line 996\nline 997\n"
+    assert _read("log.txt", line_end=-999) == "line 1\nline 2\n"
+
+
+def test_a_grown_file_is_scanned_from_its_last_checkpoint():
+    _write("log.txt", "".join(f"line {i}\n" for i in range(1, 1001)))
+    index = LineIndex.for_file("log.txt")
+    before = index.stats()['scanned']
+    with open("log.txt", "a") as f:
+        f.write("line 1001\n")
+    assert fs.read_file("log.txt", line_start=-1) == "line 1001\n"
+    assert index.stats()['scanned'] - before < 200
+    assert index.lines == 1001
+
+
+def test_a_lone_cr_reads_without_an_index():
+    _write("old.txt", "".join(f"line {i}\r" for i in range(1, 301)))
+    assert LineIndex.for_file("old.txt") is None
+    assert _read("old.txt", line_start=200, line_end=201) == _plain("old.txt", 200, 201)
+    assert fs.read_file("old.txt", line_start=-1) == "line 300\n"
+
+
+def test_an_edit_through_the_fs_tools_is_seen():
+    _write("log.txt", "".join(f"line {i}\n" for i in range(1, 301)))
+    fs.read_file("log.txt", line_start=250, line_end=250)
+    fs.edit_file("log.txt", "line 10\n", "line 10\nextra\n")
+    assert _read("log.txt", line_start=250, line_end=250) == "line 249\n"
+
+
+@pytest.mark.parametrize("patch", [
+    lambda: fs.edit_file("log.txt", "line 10 ", "line 10\n"),
+    lambda: fs.copy_bytes("nl.txt", "log.txt", dst_offset_start=7),
+])
+def test_a_same_size_patch_through_the_fs_tools_is_seen(patch):
+    _write("nl.txt", "\n")
+    _write("log.txt", "".join(f"line {i} \n" for i in range(10, 301)))
+    fs.read_file("log.txt", line_start=250, line_end=250)
+    st = os.stat("log.txt")
+    assert patch().startswith("Replaced")
+    # the same size and, on a coarse clock, the same mtime: only the tool's
+    # own invalidation tells the index the lines moved.
+    os.utime("log.txt", ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert _read("log.txt", line_start=250, line_end=250) == "line 258 \n"
@@ -0,0 +1,100 @@
+"""Tests for LocalMCPServer's multiplexed client: concurrent requests pipelined
+to one server, per-request timeouts, cancellation (notifications/cancelled),
+and pending requests failing when the server goes away.
+
+A tiny FastMCP server with an async `nap` tool is written under tmp_path and
+really spawned - no network."""
+import sys
+import threading
+import time
+
+import pytest
+
+import cai
+from cai.tools import LocalMCPServer, MCPRequestCancelled, ToolsRegistry
+
+
+_NAP_SERVER = '''
+import asyncio
+from mcp.server.fastmcp import FastMCP
+
+mcp = FastMCP("nap")
+
+
+@mcp.tool()
+async def nap(seconds: float) -> str:
+    """Sleep, then say so."""
+    await asyncio.sleep(seconds)
+    return f"slept {seconds}"
+
+
+mcp.run()
+'''
+
+
+@pytest.fixture
+def nap_command(tmp_path):
+    path = tmp_path / "nap.py"
+    path.write_text(_NAP_SERVER)
+    return [sys.executable, str(path)]
+
+
+def test_concurrent_calls_are_pipelined(nap_command):
+    server = LocalMCPServer(nap_command, "nap")
+    try:
+        results = []
+        threads = []
+        for i in range(4):
+            thread = threading.Thread(target=lambda i=i: results.append(server.call_tool("nap", {"seconds": 0.4})))
+            threads.append(thread)
+        start = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert time.monotonic() - start < 1.2
+        assert results == ["slept 0.4"] * 4
+    finally:
+        server.close()
+
+
+def test_a_request_times_out_and_the_server_stays_usable(nap_command):
+    server = LocalMCPServer(nap_command, "nap", timeout=0.3)
+    try:
+        with pytest.raises(MCPRequestCancelled, match="timed out"):
+            server.call_tool("nap", {"seconds": 5})
+        assert server.call_tool("nap", {"seconds": 0}) == "slept 0.0"
+    finally:
+        server.close()
+
+
+def test_a_set_cancel_event_gives_up_on_the_call(nap_command):
+    server = LocalMCPServer(nap_command, "nap")
+    try:
+        cancel = threading.Event()
+        threading.Timer(0.2, cancel.set).start()
+        start = time.monotonic()
+        with pytest.raises(MCPRequestCancelled, match="interrupted"):
+            server.call_tool("nap", {"seconds": 5}, cancel=cancel)
+        assert time.monotonic() - start < 2
+    finally:
+        server.close()
+
+
+def test_pending_calls_fail_when_the_server_exits(nap_command):
+    server = LocalMCPServer(nap_command, "nap")
+    threading.Timer(0.3, server.close).start()
+    with pytest.raises(ConnectionError):
+        server.call_tool("nap", {"seconds": 5})
+    with pytest.raises(ConnectionError):
+        server.call_tool("nap", {"seconds": 0})
+
+
+def test_declared_timeout_reaches_the_registry(nap_command):
+    cai.mcp_server("nap", command=nap_command, timeout=0.3)
+    registry = ToolsRegistry.for_tools(["nap__nap"])
+    try:
+        out = registry.dispatch("nap__nap", {"seconds": 5})
+        assert out.startswith("Error:") and "timed out" in out
+    finally:
+        registry.close()
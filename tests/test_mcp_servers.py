@@ -165,16 +165,20 @@ def test_remote_server_ssl_verify_passed_to_requests(monkeypatch):
     seen = []
 
     class FakeResponse:
+        status_code = 200
         headers = {"Content-Type": "application/json"}
 
         def json(self):
             return {"jsonrpc": "2.0", "id": 1, "result": {}}
 
-    def fake_post(url, **kwargs):
+        def close(self):
+            pass
+
+    def fake_post(self, url, **kwargs):
         seen.append(kwargs.get("verify"))
         return FakeResponse()
 
-    monkeypatch.setattr("cai.tools.requests.post", fake_post)
+    monkeypatch.setattr("cai.api.PooledSession.post", fake_post)
     RemoteMCPServer("https://stub/mcp", "stub", ssl_verify=False)
     assert seen == [False, False]      # initialize + initialized notification
 
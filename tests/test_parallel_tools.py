@@ -0,0 +1,400 @@
+"""Tests for parallel tool dispatch - call_llm's tool_workers / parallel_safe
+and speculate, the cai.tool(parallel_safe=/read_only=) flags and
+ToolsRegistry.parallel_safe / read_only.
+
+Fully offline: a FakeApi asks for a turn of tool calls, then answers. The tools
+sleep and log when they start and end, so overlap (or its absence) is visible.
+"""
+import asyncio
+import sys
+import threading
+import time
+
+import cai
+from cai.events import EventType
+from cai.hooks import HooksRegistry, current_gate
+from cai.llm import async_call_llm, call_llm
+from cai.tools import ToolsRegistry
+
+
+# --------------------------------------------------------------------------
+# fakes / helpers
+# --------------------------------------------------------------------------
+
+def tool_call(name, call_id, arguments="{}"):
+    function = {}
+    function["name"] = name
+    function["arguments"] = arguments
+    call = {}
+    call["id"] = call_id
+    call["type"] = "function"
+    call["function"] = function
+    return call
+
+
+class TurnApi:
+    """turn 1 asks for `calls`, turn 2 answers "done"."""
+
+    def __init__(self, calls):
+        self.calls = calls
+        self.turns = 0
+
+    def chat(self, messages, model, **kwargs):
+        self.turns += 1
+        n = self.turns
+        calls = self.calls
+        def gen():
+            if n == 1:
+                yield (None, None, calls, {})
+            else:
+                yield ("done", None, None, {})
+        return gen()
+
+
+class AsyncTurnApi(TurnApi):
+    def chat(self, messages, model, **kwargs):
+        sync = TurnApi.chat(self, messages, model, **kwargs)
+        async def agen():
+            for delta in sync:
+                yield delta
+        return agen()
+
+
+class SlowTools:
+    """a dispatcher whose tools sleep `delays[name]` seconds, logging
+    ('start'|'end', name) and the peak number running at once."""
+
+    def __init__(self, delays):
+        self.delays = delays
+        self.log = []
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, name, args):
+        with self._lock:
+            self.log.append(("start", name))
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(self.delays.get(name, 0))
+        with self._lock:
+            self.log.append(("end", name))
+            self.running -= 1
+        return f"{name} ok"
+
+
+def safe_names(*names):
+    return lambda name: name in names
+
+
+def drain(gen):
+    events = []
+    try:
+        while True:
+            events.append(next(gen))
+    except StopIteration as stop:
+        return events, stop.value
+
+
+def run(calls, tools, **kwargs):
+    messages = [{"role": "user", "content": "go"}]
+    events, text = drain(call_llm(messages, "m", TurnApi(calls), tools_dispatch=tools, **kwargs))
+    return messages, events, text
+
+
+def tool_events(events):
+    out = []
+    for event in events:
+        if event.type == EventType.TOOL_CALL:
+            out.append(("call", event.tool_name))
+        elif event.type == EventType.TOOL_RESULT:
+            out.append(("result", event.tool_name))
+    return out
+
+
+# --------------------------------------------------------------------------
+# call_llm
+# --------------------------------------------------------------------------
+
+def test_parallel_safe_calls_overlap():
+    tools = SlowTools({"a": 0.2, "b": 0.2, "c": 0.2, "d": 0.2})
+    calls = [tool_call(n, f"c{i}") for i, n in enumerate("abcd")]
+    start = time.monotonic()
+    messages, _events, text = run(calls, tools, tool_workers=4, parallel_safe=safe_names(*"abcd"))
+    assert time.monotonic() - start < 0.6
+    assert tools.peak == 4
+    assert text == "done"
+    assert [m["content"] for m in messages if m["role"] == "tool"] == ["a ok", "b ok", "c ok", "d ok"]
+
+
+def test_results_keep_call_order_whatever_finishes_first():
+    tools = SlowTools({"slow": 0.3, "fast": 0.0})
+    calls = [tool_call("slow", "c1"), tool_call("fast", "c2")]
+    after = []
+    hooks = HooksRegistry()
+    hooks.register("after_tool_call", lambda ctx: after.append(ctx.tool_call.name))
+    messages, events, _ = run(calls, tools, hooks=hooks, tool_workers=2,
+                              parallel_safe=safe_names("slow", "fast"))
+    assert tools.log.index(("end", "fast")) < tools.log.index(("end", "slow"))
+    assert tool_events(events) == [("call", "slow"), ("call", "fast"),
+                                   ("result", "slow"), ("result", "fast")]
+    assert [m["tool_call_id"] for m in messages if m["role"] == "tool"] == ["c1", "c2"]
+    assert after == ["slow", "fast"]
+
+
+def test_an_unsafe_call_is_a_barrier():
+    tools = SlowTools({"r1": 0.1, "r2": 0.1, "write": 0.1, "r3": 0.1})
+    calls = [tool_call("r1", "c1"), tool_call("r2", "c2"),
+             tool_call("write", "c3"), tool_call("r3", "c4")]
+    run(calls, tools, tool_workers=4, parallel_safe=safe_names("r1", "r2", "r3"))
+    log = tools.log
+    assert log.index(("start", "write")) > log.index(("end", "r1"))
+    assert log.index(("start", "write")) > log.index(("end", "r2"))
+    assert log.index(("start", "r3")) > log.index(("end", "write"))
+
+
+def test_sequential_without_tool_workers():
+    tools = SlowTools({"a": 0.05, "b": 0.05})
+    calls = [tool_call("a", "c1"), tool_call("b", "c2")]
+    _, events, _ = run(calls, tools, parallel_safe=safe_names("a", "b"))
+    assert tools.peak == 1
+    assert tool_events(events) == [("call", "a"), ("result", "a"), ("call", "b"), ("result", "b")]
+
+
+def test_a_vetoed_call_in_a_batch_does_not_run():
+    tools = SlowTools({})
+    hooks = HooksRegistry()
+    hooks.register("before_tool_call", lambda ctx: ctx.tool_call.name != "b")
+    calls = [tool_call("a", "c1"), tool_call("b", "c2"), tool_call("c", "c3")]
+    messages, _, _ = run(calls, tools, hooks=hooks, tool_workers=3, parallel_safe=safe_names(*"abc"))
+    results = [m["content"] for m in messages if m["role"] == "tool"]
+    assert results[0] == "a ok"
+    assert "aborted by a before_tool_call hook" in results[1]
+    assert results[2] == "c ok"
+    assert ("start", "b") not in tools.log
+
+
+def test_batched_tools_see_the_run_gate():
+    seen = []
+
+    def dispatch(name, args):
+        seen.append(current_gate() is not None)
+        return "ok"
+
+    calls = [tool_call("a", "c1"), tool_call("b", "c2")]
+    run(calls, dispatch, tool_workers=2, parallel_safe=safe_names("a", "b"))
+    assert seen == [True, True]
+
+
+def test_async_call_llm_runs_the_batch_concurrently():
+    tools = SlowTools({"a": 0.2, "b": 0.2, "c": 0.2})
+    calls = [tool_call(n, f"c{i}") for i, n in enumerate("abc")]
+    messages = [{"role": "user", "content": "go"}]
+
+    async def main():
+        stream = async_call_llm(messages, "m", AsyncTurnApi(calls), tools_dispatch=tools,
+                                tool_workers=3, parallel_safe=safe_names(*"abc"))
+        return await stream.wait()
+
+    start = time.monotonic()
+    assert asyncio.run(main()) == "done"
+    assert time.monotonic() - start < 0.5
+    assert [m["content"] for m in messages if m["role"] == "tool"] == ["a ok", "b ok", "c ok"]
+
+
+# --------------------------------------------------------------------------
+# speculative dispatch
+# --------------------------------------------------------------------------
+
+class SpeculatingApi:
+    """turn 1 streams `calls`: each is reported to on_tool_call as soon as it
+    is complete, then the model keeps generating for `tail` seconds before the
+    turn finishes. turn 2 answers "done". `during` runs just before the finish
+    (to land an interrupt mid-turn)."""
+
+    def __init__(self, calls, tail, during=None):
+        self.calls = calls
+        self.tail = tail
+        self.during = during
+        self.turns = 0
+
+    def chat(self, messages, model, on_tool_call=None, **kwargs):
+        self.turns += 1
+        n = self.turns
+        def gen():
+            if n > 1:
+                yield ("done", None, None, {})
+                return
+            for call in self.calls:
+                if on_tool_call is not None:
+                    on_tool_call(call)
+                yield (None, None, None, {})
+            time.sleep(self.tail)
+            if self.during is not None:
+                self.during()
+            yield (None, None, self.calls, {})
+        return gen()
+
+
+def speculate_run(api, tools, **kwargs):
+    messages = [{"role": "user", "content": "go"}]
+    events, text = drain(call_llm(messages, "m", api, tools_dispatch=tools, **kwargs))
+    return messages, events, text
+
+
+def test_read_only_calls_start_while_the_turn_streams():
+    tools = SlowTools({"read": 0.3})
+    api = SpeculatingApi([tool_call("read", "c1", '{"path": "x"}')], tail=0.3)
+    start = time.monotonic()
+    messages, events, text = speculate_run(api, tools, speculate=safe_names("read"))
+    assert time.monotonic() - start < 0.5
+    assert tools.log == [("start", "read"), ("end", "read")]    # once, not twice
+    assert text == "done"
+    assert [m["content"] for m in messages if m["role"] == "tool"] == ["read ok"]
+    assert tool_events(events) == [("call", "read"), ("result", "read")]
+
+
+def test_only_read_only_calls_speculate():
+    tools = SlowTools({})
+    api = SpeculatingApi([tool_call("read", "c1"), tool_call("write", "c2")], tail=0.1)
+    log_at_finish = []
+    api.during = lambda: log_at_finish.extend(tools.log)
+    speculate_run(api, tools, speculate=safe_names("read"))
+    assert ("start", "read") in log_at_finish
+    assert ("start", "write") not in log_at_finish
+    assert tools.log.count(("start", "read")) == 1
+    assert tools.log.count(("start", "write")) == 1
+
+
+def test_a_read_after_a_write_waits_for_the_write():
+    state = {"x": "old"}
+
+    def dispatch(name, args):
+        if name == "write":
+            state["x"] = "new"
+            return "written"
+        return state["x"]
+
+    api = SpeculatingApi([tool_call("write", "c1"), tool_call("read", "c2")], tail=0.1)
+    messages, _, _ = speculate_run(api, dispatch, speculate=safe_names("read"))
+    assert [m["content"] for m in messages if m["role"] == "tool"] == ["written", "new"]
+
+
+def test_a_vetoed_speculative_result_is_discarded():
+    tools = SlowTools({})
+    hooks = HooksRegistry()
+    hooks.register("before_tool_call", lambda ctx: False)
+    api = SpeculatingApi([tool_call("read", "c1")], tail=0.1)
+    messages, _, _ = speculate_run(api, tools, hooks=hooks, speculate=safe_names("read"))
+    result = [m["content"] for m in messages if m["role"] == "tool"][0]
+    assert "aborted by a before_tool_call hook" in result
+
+
+def test_an_interrupted_turn_discards_speculative_results():
+    tools = SlowTools({})
+    interrupt = threading.Event()
+    api = SpeculatingApi([tool_call("read", "c1")], tail=0.1, during=interrupt.set)
+    messages, events, _ = speculate_run(api, tools, interrupt=interrupt, speculate=safe_names("read"))
+    assert [m for m in messages if m["role"] == "tool"] == []
+    assert tool_events(events) == []
+
+
+def test_changed_arguments_run_the_tool_again():
+    seen = []
+
+    def dispatch(name, args):
+        seen.append(dict(args))
+        return "ok"
+
+    def rewrite(ctx):
+        ctx.tool_call.args["path"] = "y"
+
+    hooks = HooksRegistry()
+    hooks.register("before_tool_call", rewrite)
+    api = SpeculatingApi([tool_call("read", "c1", '{"path": "x"}')], tail=0.1)
+    speculate_run(api, dispatch, hooks=hooks, speculate=safe_names("read"))
+    assert seen == [{"path": "x"}, {"path": "y"}]
+
+
+_READ_ONLY_NAP_SERVER = '''
+import asyncio
+from mcp.server.fastmcp import FastMCP
+from mcp.types import ToolAnnotations
+
+mcp = FastMCP("nap")
+
+
+@mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
+async def nap(seconds: float) -> str:
+    """Sleep, then say so."""
+    await asyncio.sleep(seconds)
+    return f"slept {seconds}"
+
+
+mcp.run()
+'''
+
+
+def speculating_threads():
+    return [t for t in threading.enumerate() if t.name.startswith("cai-speculate")]
+
+
+def test_an_interrupt_cancels_a_speculated_mcp_call(tmp_path):
+    path = tmp_path / "nap.py"
+    path.write_text(_READ_ONLY_NAP_SERVER)
+    cai.mcp_server("rnap", command=[sys.executable, str(path)])
+    registry = ToolsRegistry.for_tools(["rnap__nap"])
+    try:
+        before = set(speculating_threads())
+        interrupt = threading.Event()
+        api = SpeculatingApi([tool_call("rnap__nap", "c1", '{"seconds": 30}')],
+                             tail=0.5, during=interrupt.set)
+        speculate_run(api, registry.dispatch, interrupt=interrupt,
+                      speculate=registry.read_only)
+        deadline = time.monotonic() + 3
+        while set(speculating_threads()) - before and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert not set(speculating_threads()) - before
+    finally:
+        registry.close()
+
+
+# --------------------------------------------------------------------------
+# declaring parallel-safe tools
+# --------------------------------------------------------------------------
+
+def test_cai_tool_parallel_safe_flag():
+    @cai.tool(parallel_safe=True)
+    def lookup(key: str) -> str:
+        """Look a key up."""
+        return key
+
+    @cai.tool
+    def store(key: str) -> str:
+        """Store a key."""
+        return key
+
+    @cai.tool(read_only=True)
+    def peek(key: str) -> str:
+        """Peek at a key."""
+        return key
+
+    registry = ToolsRegistry.for_tools(["lookup", "store", "peek"])
+    assert registry.parallel_safe("lookup")
+    assert not registry.read_only("lookup")
+    assert not registry.parallel_safe("store")
+    assert registry.read_only("peek")
+    assert registry.parallel_safe("peek")
+    assert not registry.parallel_safe("missing")
+    assert registry.dispatch("lookup", {"key": "k"}) == "k"
+
+
+def test_mcp_read_only_hint_marks_a_tool_parallel_safe():
+    registry = ToolsRegistry.for_tools(["fs__read_file", "fs__create_file"])
+    try:
+        assert registry.read_only("fs__read_file")
+        assert registry.parallel_safe("fs__read_file")
+        assert not registry.read_only("fs__create_file")
+        assert not registry.parallel_safe("fs__create_file")
+    finally:
+        registry.close()
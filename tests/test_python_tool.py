@@ -1,10 +1,11 @@
 """Tests for the builtin `python` tool: the audit-hook sandbox, the managed
-venv, and the tool_call() tool-proxy that dispatches the agent's own tools in-process
+venv, the warm worker (zygote) pool snippets fork from, and the tool_call() tool-proxy that dispatches the agent's own tools in-process
 through the run's gates. The child is really spawned; for speed most tests point
 the venv at the current interpreter (the sandbox blocks cffi regardless), and one
 test exercises real venv creation."""
 import os
 import sys
+import time
 
 import pytest
 
@@ -419,10 +420,11 @@ def test_kernel_jail_staging_dir_is_cleaned_up(tmp_path, monkeypatch):
     agent = _agent_with_echo()
     try:
         assert _run(agent, "print('ok')").strip() == "ok"
-        assert len(made) == 1
-        assert not os.path.exists(made[0])
+        assert _run(agent, "print('again')").strip() == "again"
+        assert len(made) == 1                   # one jail, kept by the worker
     finally:
         agent.close()
+    assert not os.path.exists(made[0])          # gone with the worker
 
 
 def test_hook_mode_skips_the_kernel_jail(tmp_path, monkeypatch):
@@ -439,8 +441,227 @@ def test_hook_mode_skips_the_kernel_jail(tmp_path, monkeypatch):
         agent.close()
 
 
+# --- worker pool ----------------------------------------------------------
+
+def _set_config(monkeypatch, **values):
+    def fake_optional(key, default=None):
+        return values.get(key, default)
+    monkeypatch.setattr(config, "load_optional", fake_optional)
+
+
+def _workers(agent):
+    return agent.tools_registry._functions["python"]._cai_workers
+
+
+def test_snippets_fork_from_one_warm_worker_and_share_nothing(monkeypatch):
+    _fast_venv(monkeypatch)
+    agent = _agent_with_echo()
+    try:
+        assert _run(agent, "x = 41") == "(no output)"
+        assert "NameError" in _run(agent, "print(x)")
+        assert _run(agent, "print(tool_call('echo', x=3))").strip() == "echo:3"
+        assert _workers(agent).started == 1
+        assert _workers(agent).reused == 2
+    finally:
+        agent.close()
+
+
+def test_a_timed_out_snippet_leaves_the_worker_usable(monkeypatch):
+    _fast_venv(monkeypatch)
+    agent = _agent_with_echo()
+    try:
+        assert _run(agent, "while True: pass", timeout=1) == "Error: run timed out after 1s"
+        assert _run(agent, "print('alive')").strip() == "alive"
+        assert _workers(agent).started == 1
+    finally:
+        agent.close()
+
+
+def test_workers_recycle_and_follow_the_cwd(tmp_path, monkeypatch):
+    _fast_venv(monkeypatch)
+    _set_config(monkeypatch, python_worker_uses=2)
+    agent = _agent_with_echo()
+    try:
+        for _ in range(3):
+            _run(agent, "pass")
+        assert _workers(agent).started == 2          # recycled after two snippets
+        monkeypatch.chdir(tmp_path)
+        assert _run(agent, "import os; print(os.getcwd())").strip() == str(tmp_path)
+        assert _workers(agent).started == 3          # a new jail for the new cwd
+    finally:
+        agent.close()
+
+
+def test_zero_workers_spawns_per_call(monkeypatch):
+    _fast_venv(monkeypatch)
+    _set_config(monkeypatch, python_workers=0)
+    agent = _agent_with_echo()
+    try:
+        assert _run(agent, "print(6 * 7)").strip() == "42"
+        assert _workers(agent).started == 0
+    finally:
+        agent.close()
+
+
+# --- stateful session -----------------------------------------------------
+
+def _session_agent(monkeypatch, **values):
+    _fast_venv(monkeypatch)
+    _set_config(monkeypatch, python_session=True, **values)
+    return _agent_with_echo()
+
+
+def test_session_keeps_globals_between_calls(monkeypatch):
+    agent = _session_agent(monkeypatch)
+    try:
+        assert _run(agent, "rows = [int(echo(x=i).split(':')[1]) for i in range(3)]") == "(no output)"
+        assert _run(agent, "print(sum(rows))").strip() == "3"
+        assert "[exit code 3]" in _run(agent, "import sys; sys.exit(3)")
+        assert "ZeroDivisionError" in _run(agent, "1 / 0")
+        assert _run(agent, "print(len(rows))").strip() == "3"     # survived both
+        out = agent.tools_registry.dispatch("python", {"code": "print('rows' in globals())", "reset": True})
+        assert out.strip() == "False"
+    finally:
+        agent.close()
+
+
+def test_session_restarts_after_a_timeout(monkeypatch):
+    agent = _session_agent(monkeypatch)
+    try:
+        _run(agent, "x = 1")
+        out = _run(agent, "while True: pass", timeout=1)
+        assert out.startswith("Error: run timed out after 1s") and "restarted" in out
+        assert _run(agent, "print('x' in globals())").strip() == "False"
+        assert agent.tools_registry._functions["python"]._cai_session.started == 2
+    finally:
+        agent.close()
+
+
+def test_session_memory_cap(monkeypatch):
+    agent = _session_agent(monkeypatch, python_session_memory_mb=256)
+    try:
+        _run(agent, "keep = 'still here'")
+        assert "MemoryError" in _run(agent, "blob = bytearray(1024 * 1024 * 1024)")
+        assert _run(agent, "print(keep)").strip() == "still here"
+    finally:
+        agent.close()
+
+
+def test_session_notes_a_restart_it_was_not_asked_for(tmp_path, monkeypatch):
+    agent = _session_agent(monkeypatch)
+    try:
+        _run(agent, "x = 1")
+        monkeypatch.chdir(tmp_path)                  # the jail no longer fits
+        out = _run(agent, "print('x' in globals())")
+        assert out.startswith("[python session restarted")
+        assert out.endswith("False")
+    finally:
+        agent.close()
+
+
 # --- tool proxy -----------------------------------------------------------
 
+def _agent_with_big(tmp_path, monkeypatch, replies):
+    """an agent whose `big` tool returns 1000 chars (non-ASCII at the end),
+    with a tiny bulk threshold and the reply dicts recorded."""
+    _fast_venv(monkeypatch)
+    monkeypatch.setattr(pytool, "_BULK_MIN", 100)
+    real_reply = pytool._Bulk.reply
+
+    def spy(self, result):
+        reply = real_reply(self, result)
+        replies.append(reply)
+        return reply
+    monkeypatch.setattr(pytool._Bulk, "reply", spy)
+
+    @cai.tool
+    def big() -> str:
+        """a large result."""
+        return "x" * 998 + "é!"
+    scratch = tmp_path / "scratch"
+    scratch.mkdir()
+    return Agent(model="m", api=object(), tools=["big", "echo"], scratch=str(scratch)), scratch
+
+
+def test_a_large_result_travels_as_a_mapped_file(tmp_path, monkeypatch):
+    _agent_with_echo()
+    replies = []
+    agent, scratch = _agent_with_big(tmp_path, monkeypatch, replies)
+    try:
+        out = _run(agent, "r = big(); print(len(r), r[-3:], echo(x=1))")
+        assert out.strip() == "1000 xé! echo:1"
+        assert "bulk" in replies[0] and "result" in replies[1]     # small stays inline
+        out = _run(agent, "v = tool_bytes('big'); print(type(v).__name__, len(v), bytes(v[-3:]))")
+        assert out.strip() == "memoryview 1001 b'\\xc3\\xa9!'"
+        assert os.listdir(scratch / ".cai-bulk") == []               # nothing left behind
+    finally:
+        agent.close()
+
+def test_a_planted_bulk_symlink_is_not_followed(tmp_path, monkeypatch):
+    _agent_with_echo()
+    replies = []
+    agent, scratch = _agent_with_big(tmp_path, monkeypatch, replies)
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    os.symlink(outside, scratch / ".cai-bulk")     # as a snippet could, e.g. via `ln -s`
+    try:
+        out = _run(agent, "r = big(); print(len(r), r[-3:])")
+        assert out.strip() == "1000 xé!"
+        assert "result" in replies[0]                                # down the pipe instead
+        assert os.listdir(outside) == []
+    finally:
+        agent.close()
+
+
+def test_a_flood_of_output_keeps_head_and_tail_only(monkeypatch):
+    _fast_venv(monkeypatch)
+    agent = _agent_with_echo()
+    stored = []
+    real_text = pytool._Output.text
+
+    def text(self):
+        stored.append(len(self.head) + len(self.tail))
+        return real_text(self)
+    monkeypatch.setattr(pytool._Output, "text", text)
+    try:
+        out = _run(agent, "import sys\nfor i in range(200000): sys.stdout.write('%07d ' % i + 'x' * 92 + '\\n')\nprint('the end')")
+        assert out.startswith("0000000 ") and out.endswith("the end")
+        assert "bytes omitted" in out and len(out) < 21000
+        assert stored[0] <= 3 * 2 * pytool._OUTPUT_LIMIT                # ~20 MB printed
+    finally:
+        agent.close()
+
+
+def test_output_is_posted_as_live_progress(monkeypatch):
+    from cai.ui import BaseUI
+    _fast_venv(monkeypatch)
+    agent = _agent_with_echo()
+
+    class Notes(BaseUI):
+        def __init__(self):
+            self.notes = []
+
+        def status(self, message):
+            self.notes.append(message)
+    ui = Notes()
+    gate = RunGate(hooks=HooksRegistry(),
+                   dispatch=agent.tools_registry.dispatch,
+                   model="m",
+                   config=None,
+                   ui=ui,
+                   messages=[],
+                   usage=None,
+                   hooks_data={})
+    token = hooks.set_gate(gate)
+    try:
+        out = _run(agent, "import time\nfor i in range(4):\n    print(f'step {i}')\n    time.sleep(0.3)")
+        assert out.strip().splitlines() == ["step 0", "step 1", "step 2", "step 3"]
+        assert ui.notes and all(note.startswith("python: step ") for note in ui.notes)
+    finally:
+        hooks.reset_gate(token)
+        agent.close()
+
+
 def test_call_proxies_a_tool_and_only_print_reaches_output(monkeypatch):
     _fast_venv(monkeypatch)
     agent = _agent_with_echo()
@@ -547,6 +768,59 @@ def test_inner_call_without_a_gate_still_dispatches(monkeypatch):
         agent.close()
 
 
+def test_a_batch_runs_side_by_side_in_order_each_gated(monkeypatch):
+    _fast_venv(monkeypatch)
+
+    @cai.tool
+    def nap(x: int) -> str:
+        """sleep a bit, then echo x."""
+        time.sleep(0.3)
+        return f"nap:{x}"
+    agent = Agent(model="m", api=object(), tools=["nap"])
+
+    fired = []
+    inside = []
+
+    def veto_two(ctx):
+        inside.append(1)
+        overlapped = len(inside) > 1
+        time.sleep(0.02)                                      # a gate prompting
+        inside.pop()
+        fired.append(("before", ctx.tool_call.args.get("x"), overlapped))
+        return ctx.tool_call.args.get("x") != 2
+
+    def after(ctx):
+        fired.append(("after", ctx.tool_call.args.get("x"), False))
+    registry = HooksRegistry()
+    registry.register("before_tool_call", veto_two)
+    registry.register("after_tool_call", after)
+    gate = RunGate(hooks=registry,
+                   dispatch=agent.tools_registry.dispatch,
+                   model="m",
+                   config=None,
+                   ui=hooks.NULL_UI,
+                   messages=[],
+                   usage=None,
+                   hooks_data={})
+    token = hooks.set_gate(gate)
+    try:
+        _run(agent, "pass")                                   # warm the worker
+        start = time.monotonic()
+        out = _run(agent, "print(tool_call_many([('nap', {'x': i}) for i in range(6)]))")
+        assert time.monotonic() - start < 1.2                 # 6 x 0.3s, not in sequence
+        results = eval(out)
+        assert results[:2] == ["nap:0", "nap:1"] and results[3:] == ["nap:3", "nap:4", "nap:5"]
+        assert "aborted by a before_tool_call hook" in results[2]
+        assert fired == ([("before", i, False) for i in range(6)]
+                         + [("after", i, False) for i in (0, 1, 3, 4, 5)])  # serial, in order
+        out = _run(agent, "fs = [tool_call_async('nap', x=i) for i in (4, 5)]\n"
+                          "print(fs[1].done(), [f.result() for f in fs], fs[1].done())")
+        assert out.strip() == "False ['nap:4', 'nap:5'] True"
+    finally:
+        hooks.reset_gate(token)
+        agent.close()
+
+
 def test_install_runs_pip_in_the_managed_venv(monkeypatch):
     monkeypatch.setattr(pytool, "ensure_venv", lambda: "/venv/bin/python")
     recorded = []
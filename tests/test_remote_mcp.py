@@ -0,0 +1,150 @@
+"""Tests for RemoteMCPServer's transport: one keep-alive connection across
+requests, retries of transient failures (tools/call only when provably not
+run), the read timeout, and the latency histograms behind stats() /
+ToolsRegistry.server_stats().
+
+A stub Streamable-HTTP server (HTTP/1.1, so connections are kept alive) runs in
+a background thread - no network."""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from cai import api
+from cai.metrics import Histogram
+from cai.tools import RemoteMCPServer
+
+
+@pytest.fixture(autouse=True)
+def _no_backoff(monkeypatch):
+    monkeypatch.setattr(api, "_RETRY_BACKOFF", 0)
+
+
+class Stub:
+    """counts tools/call attempts; fails the first `fail` of them with
+    `status`, and sleeps `delay` seconds before answering a call."""
+
+    def __init__(self, fail=0, status=503, delay=0):
+        self.fail = fail
+        self.status = status
+        self.delay = delay
+        self.calls = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, body=b""):
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length))
+                if body.get("id") is None:
+                    return self._reply(202)
+                if body["method"] == "tools/call":
+                    stub.calls += 1
+                    if stub.calls <= stub.fail:
+                        return self._reply(stub.status)
+                    time.sleep(stub.delay)
+                    result = {"content": [{"type": "text", "text": "ok"}]}
+                else:
+                    result = {}
+                message = {"jsonrpc": "2.0", "id": body["id"], "result": result}
+                self._reply(200, json.dumps(message).encode())
+
+        self.http = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.http.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.http.server_address[1]}/mcp"
+        threading.Thread(target=self.http.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.http.shutdown()
+        self.http.server_close()
+
+
+def test_requests_reuse_one_connection():
+    stub = Stub()
+    try:
+        server = RemoteMCPServer(stub.url, "stub")
+        for _ in range(3):
+            assert server.call_tool("t", {}) == "ok"
+        pool = server.stats()['pool']
+        assert pool['new_connections'] == 1
+        assert pool['reused_connections'] == 4     # initialized + 3 calls
+        server.close()
+    finally:
+        stub.stop()
+
+
+def test_a_503_tool_call_is_retried():
+    stub = Stub(fail=2, status=503)
+    try:
+        server = RemoteMCPServer(stub.url, "stub")
+        assert server.call_tool("t", {}) == "ok"
+        assert stub.calls == 3
+        assert server.stats()['retries'] == 2
+    finally:
+        stub.stop()
+
+
+def test_a_500_tool_call_is_not_retried():
+    stub = Stub(fail=1, status=500)
+    try:
+        server = RemoteMCPServer(stub.url, "stub")
+        with pytest.raises(ConnectionError, match="500"):
+            server.call_tool("t", {})
+        assert stub.calls == 1                      # it may have run: never twice
+        assert server.stats()['errors'] == 1
+    finally:
+        stub.stop()
+
+
+def test_a_quiet_reply_hits_the_read_timeout():
+    stub = Stub(delay=2)
+    try:
+        server = RemoteMCPServer(stub.url, "stub", timeout=0.3)
+        start = time.monotonic()
+        with pytest.raises(ConnectionError, match="timed out"):
+            server.call_tool("t", {})
+        assert time.monotonic() - start < 1.5
+        assert stub.calls == 1
+    finally:
+        stub.stop()
+
+
+def test_stats_keep_a_histogram_per_tool():
+    stub = Stub()
+    try:
+        server = RemoteMCPServer(stub.url, "stub")
+        server.call_tool("a", {})
+        server.call_tool("a", {})
+        server.call_tool("b", {})
+        stats = server.stats()
+        assert stats['calls'] == 3
+        assert stats['tools']['a']['count'] == 2
+        assert stats['tools']['b']['count'] == 1
+        assert sum(stats['latency']['buckets'].values()) == 3
+    finally:
+        stub.stop()
+
+
+def test_histogram_buckets():
+    histogram = Histogram()
+    for seconds in (0.001, 0.02, 0.02, 60):
+        histogram.observe(seconds)
+    snapshot = histogram.snapshot()
+    assert snapshot['count'] == 4
+    assert snapshot['buckets']['<=5'] == 1
+    assert snapshot['buckets']['<=25'] == 2
+    assert snapshot['buckets']['inf'] == 1
+    assert snapshot['max_ms'] == 60000
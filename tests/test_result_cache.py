@@ -0,0 +1,164 @@
+"""Tests for cai.result_cache - the ResultCache and how ToolsRegistry.dispatch
+consults and invalidates it.
+
+Fully offline: function tools count their real runs; the fs MCP server is the
+builtin one, spawned locally. A fake clock drives the TTL.
+"""
+import os
+
+import cai
+from cai.result_cache import ResultCache
+from cai.tools import ToolsRegistry
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def counting_tools():
+    runs = []
+
+    @cai.tool(read_only=True, cacheable=True)
+    def peek(path: str) -> str:
+        """Read a file."""
+        runs.append(path)
+        with open(path) as f:
+            return f.read()
+
+    @cai.tool
+    def poke(path: str) -> str:
+        """Write a file."""
+        with open(path, "w") as f:
+            f.write("poked")
+        return "ok"
+
+    return runs
+
+
+# --------------------------------------------------------------------------
+# ResultCache
+# --------------------------------------------------------------------------
+
+def test_key_is_canonical():
+    cache = ResultCache()
+    cache.put("t", {"a": 1, "b": 2}, "r")
+    assert cache.get("t", {"b": 2, "a": 1}) == "r"
+    assert cache.get("t", {"a": 1}) is None
+    assert cache.get("other", {"a": 1, "b": 2}) is None
+
+
+def test_lru_eviction():
+    cache = ResultCache(max_entries=2)
+    cache.put("t", {"k": 1}, "one")
+    cache.put("t", {"k": 2}, "two")
+    cache.get("t", {"k": 1})             # 1 is now the most recent
+    cache.put("t", {"k": 3}, "three")    # evicts 2
+    assert cache.get("t", {"k": 2}) is None
+    assert cache.get("t", {"k": 1}) == "one"
+    assert cache.stats()['evictions'] == 1
+
+
+def test_ttl_expiry():
+    clock = Clock()
+    cache = ResultCache(ttl=10, clock=clock)
+    cache.put("t", {}, "r")
+    clock.now = 9.9
+    assert cache.get("t", {}) == "r"
+    clock.now = 10
+    assert cache.get("t", {}) is None
+
+
+def test_a_put_racing_an_invalidation_is_dropped():
+    cache = ResultCache()
+    generation = cache.generation
+    cache.invalidate()
+    cache.put("t", {}, "stale", generation=generation)
+    assert cache.get("t", {}) is None
+
+
+def test_stats_count_hits_and_misses_per_tool():
+    cache = ResultCache()
+    cache.get("a", {})
+    cache.put("a", {}, "r")
+    cache.get("a", {})
+    cache.get("b", {})
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['size']) == (1, 2, 1)
+    assert stats['tools'] == {"a": {"hits": 1, "misses": 1}, "b": {"hits": 0, "misses": 1}}
+
+
+# --------------------------------------------------------------------------
+# ToolsRegistry.dispatch
+# --------------------------------------------------------------------------
+
+def test_repeated_call_is_served_from_the_cache(tmp_path):
+    runs = counting_tools()
+    note = tmp_path / "note.txt"
+    note.write_text("hello")
+    registry = ToolsRegistry(result_cache=ResultCache())
+    registry.select("peek")
+    assert registry.dispatch("peek", {"path": str(note)}) == "hello"
+    assert registry.dispatch("peek", {"path": str(note)}) == "hello"
+    assert runs == [str(note)]
+    assert registry.result_cache.stats()['hits'] == 1
+
+
+def test_a_changed_file_invalidates_its_entry(tmp_path):
+    runs = counting_tools()
+    note = tmp_path / "note.txt"
+    note.write_text("hello")
+    registry = ToolsRegistry(result_cache=ResultCache())
+    registry.select("peek")
+    registry.dispatch("peek", {"path": str(note)})
+    note.write_text("changed!")
+    os.utime(note, ns=(0, 1))              # a different mtime whatever the fs resolution
+    assert registry.dispatch("peek", {"path": str(note)}) == "changed!"
+    assert len(runs) == 2
+
+
+def test_a_mutating_tool_clears_the_cache(tmp_path):
+    runs = counting_tools()
+    note = tmp_path / "note.txt"
+    note.write_text("hello")
+    registry = ToolsRegistry(result_cache=ResultCache())
+    registry.select("peek")
+    registry.select("poke")
+    registry.dispatch("peek", {"path": str(note)})
+    registry.dispatch("poke", {"path": str(tmp_path / "other.txt")})
+    registry.dispatch("peek", {"path": str(note)})
+    assert len(runs) == 2
+    assert registry.result_cache.stats()['invalidations'] == 1
+
+
+def test_errors_and_uncached_tools_are_not_cached(tmp_path):
+    runs = counting_tools()
+    registry = ToolsRegistry(result_cache=ResultCache())
+    registry.select("peek")
+    missing = str(tmp_path / "missing.txt")
+    assert registry.dispatch("peek", {"path": missing}).startswith("Error:")
+    assert registry.dispatch("peek", {"path": missing}).startswith("Error:")
+    assert len(runs) == 2
+    assert not registry.cacheable("poke")
+    assert not ToolsRegistry().cacheable("peek")     # no cache, nothing cacheable
+
+
+def test_fs_tools_opt_in_by_name(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "a.txt").write_text("one\ntwo\n")
+    registry = ToolsRegistry(result_cache=ResultCache())
+    registry.cache_tool("fs__read_file")
+    try:
+        registry.select("fs__read_file")
+        registry.select("fs__edit_file")
+        first = registry.dispatch("fs__read_file", {"file_path": "a.txt"})
+        assert registry.dispatch("fs__read_file", {"file_path": "a.txt"}) == first
+        registry.dispatch("fs__edit_file", {"file_path": "a.txt", "old_text": "two", "new_text": "three"})
+        assert "three" in registry.dispatch("fs__read_file", {"file_path": "a.txt"})
+        stats = registry.result_cache.stats()
+        assert stats['tools']["fs__read_file"] == {"hits": 1, "misses": 2}
+    finally:
+        registry.close()
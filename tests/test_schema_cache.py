@@ -0,0 +1,135 @@
+"""Tests for tools/list caching: the per-connection catalogue on
+LocalMCPServer / RemoteMCPServer (dropped on notifications/tools/list_changed)
+and the on-disk cai.schema_cache.SchemaCache that lets a registry register a
+server file's tools without spawning it.
+
+The local cases spawn the bundled fs server; the remote one runs against a stub
+HTTP server in a background thread. The conftest fixture gives every test an
+empty SchemaCache of its own."""
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from cai.schema_cache import SchemaCache
+from cai.tools import RemoteMCPServer, ToolsRegistry
+
+
+def test_schema_cache_round_trip_and_staleness(tmp_path):
+    source = tmp_path / "srv.py"
+    source.write_text("# v1")
+    cache = SchemaCache(str(tmp_path / "cache.json"))
+    assert cache.get(str(source)) is None
+    cache.put(str(source), [{"name": "t"}])
+    assert SchemaCache(cache.path).get(str(source)) == [{"name": "t"}]   # persisted
+    source.write_text("# version 2")
+    os.utime(source, ns=(0, 1))
+    assert cache.get(str(source)) is None
+    assert cache.get(str(tmp_path / "missing.py")) is None
+
+
+def test_one_tools_list_per_connection():
+    registry = ToolsRegistry()
+    try:
+        registry.register("fs__read_file")
+        server = registry._mcp_servers["fs"]
+        sent = []
+        original = server._request
+
+        def counting(method, params):
+            sent.append(method)
+            return original(method, params)
+
+        server._request = counting
+        for name in ("fs__list_files", "fs__search", "fs__create_file"):
+            registry.register(name)
+        assert sent == []
+        assert registry.has("fs__search")
+    finally:
+        registry.close()
+
+
+def test_a_known_server_file_is_not_spawned_to_register():
+    first = ToolsRegistry()
+    try:
+        first.register("fs__read_file")          # spawns, lists, fills the cache
+    finally:
+        first.close()
+    second = ToolsRegistry()
+    try:
+        second.select("fs__read_file")
+        second.select("fs__list_files")
+        assert second._mcp_servers == {}
+        assert [t["function"]["name"] for t in second.tools] == ["fs__read_file", "fs__list_files"]
+        assert second.read_only("fs__read_file")
+        assert "fs" not in second._mcp_servers
+        second.dispatch("fs__list_files", {"path": "."})   # a call spawns it
+        assert "fs" in second._mcp_servers
+    finally:
+        second.close()
+
+
+def test_an_unknown_tool_falls_back_to_the_live_server():
+    first = ToolsRegistry()
+    try:
+        first.register("fs__read_file")
+    finally:
+        first.close()
+    second = ToolsRegistry()
+    try:
+        second.register("fs__no_such_tool")
+        assert not second.has("fs__no_such_tool")
+        assert "fs" in second._mcp_servers
+    finally:
+        second.close()
+
+
+# ─── remote: list_changed drops the catalogue ────────────────────────────────
+
+def _make_stub(lists):
+    """answers tools/list with a catalogue naming the list's number, and every
+    tools/call over SSE with a tools/list_changed notification ahead of it."""
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length))
+            if body.get("id") is None:
+                self.send_response(202)
+                self.end_headers()
+                return
+            method = body["method"]
+            if method == "initialize":
+                result = {"protocolVersion": "2024-11-05", "capabilities": {}}
+            elif method == "tools/list":
+                lists.append(1)
+                result = {"tools": [{"name": f"v{len(lists)}", "inputSchema": {"type": "object"}}]}
+            else:
+                result = {"content": [{"type": "text", "text": "ok"}]}
+            message = {"jsonrpc": "2.0", "id": body["id"], "result": result}
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            if method == "tools/call":
+                self.wfile.write(b'data: {"jsonrpc":"2.0","method":"notifications/tools/list_changed"}\n\n')
+            self.wfile.write(("data: " + json.dumps(message) + "\n\n").encode())
+
+    return HTTPServer(("127.0.0.1", 0), Handler)
+
+
+def test_remote_catalogue_is_cached_until_list_changed():
+    lists = []
+    stub = _make_stub(lists)
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+    try:
+        server = RemoteMCPServer(f"http://127.0.0.1:{stub.server_address[1]}/mcp", "stub")
+        assert server.list_tools()[0]["name"] == "v1"
+        assert server.list_tools()[0]["name"] == "v1"
+        assert len(lists) == 1
+        server.call_tool("v1", {})
+        assert server.list_tools()[0]["name"] == "v2"
+        assert server.list_tools(refresh=True)[0]["name"] == "v3"
+    finally:
+        stub.shutdown()
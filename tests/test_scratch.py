@@ -1,5 +1,5 @@
 """Tests for the session scratch directory: the Agent owns (or inherits) it,
-the ToolsRegistry hands it to every local MCP spawn as CAI_SCRATCH, and the
+the ToolsRegistry hands it to every local MCP tool call as cai_scratch, and the
 builtin fs server admits it alongside the cwd jail. The fs server is really
 spawned - no network, everything under tmp_path."""
 import os
@@ -0,0 +1,229 @@
+"""Tests for cai.server_pool - MCP servers shared across registries: one fs
+process for every registry with the same spec, reference counting, idle
+eviction, the health check, the per-call scratch that makes sharing safe, and
+spawns running side by side (the registry's background warm-up).
+
+The fs server is really spawned; the conftest fixture gives every test a fresh
+pool and closes it afterwards."""
+import sys
+import threading
+import time
+
+import cai
+from cai.server_pool import ServerPool
+from cai.tools import ToolsRegistry
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_registries_share_one_server_process():
+    pool = ServerPool()
+    first = ToolsRegistry(server_pool=pool)
+    second = ToolsRegistry(server_pool=pool)
+    try:
+        first.select("fs__read_file")
+        second.select("fs__list_files")
+        first.dispatch("fs__list_files", {"path": "."})
+        second.dispatch("fs__list_files", {"path": "."})
+        assert first._mcp_servers["fs"] is second._mcp_servers["fs"]
+        assert pool.stats()['spawned'] == 1
+        assert pool.stats()['reused'] == 1
+    finally:
+        first.close()
+        second.close()
+        pool.close()
+
+
+def test_an_idle_server_is_evicted_after_the_timeout():
+    clock = Clock()
+    pool = ServerPool(idle_timeout=10, clock=clock)
+    registry = ToolsRegistry(server_pool=pool)
+    registry.register("fs__list_files")
+    registry.dispatch("fs__list_files", {"path": "."})
+    server = registry._mcp_servers["fs"]
+    registry.close()
+    assert pool.stats()['idle'] == 1
+    clock.now = 5
+    again = ToolsRegistry(server_pool=pool)
+    again.register("fs__list_files")
+    again.dispatch("fs__list_files", {"path": "."})
+    assert again._mcp_servers["fs"] is server             # still warm: reused
+    again.close()
+    clock.now = 20
+    pool.reap()
+    assert pool.stats()['live'] == 0
+    server._process.wait(timeout=5)
+
+
+def test_a_held_server_is_never_evicted():
+    clock = Clock()
+    pool = ServerPool(idle_timeout=1, clock=clock)
+    registry = ToolsRegistry(server_pool=pool)
+    try:
+        registry.register("fs__list_files")
+        registry.dispatch("fs__list_files", {"path": "."})
+        clock.now = 100
+        pool.reap()
+        assert pool.stats()['live'] == 1
+    finally:
+        registry.close()
+        pool.close()
+
+
+def test_a_dead_server_is_respawned():
+    pool = ServerPool()
+    first = ToolsRegistry(server_pool=pool)
+    first.register("fs__list_files")
+    first.dispatch("fs__list_files", {"path": "."})
+    dead = first._mcp_servers["fs"]
+    dead._process.kill()
+    dead._process.wait(timeout=5)
+    second = ToolsRegistry(server_pool=pool)
+    try:
+        second.register("fs__list_files")
+        assert "Error" not in second.dispatch("fs__list_files", {"path": "."})
+        assert second._mcp_servers["fs"] is not dead
+        assert pool.stats()['spawned'] == 2
+    finally:
+        first.close()
+        second.close()
+        pool.close()
+
+
+def test_each_call_carries_its_registrys_scratch(tmp_path):
+    one = tmp_path / "one"
+    two = tmp_path / "two"
+    one.mkdir()
+    two.mkdir()
+    (one / "note.txt").write_text("from one")
+    (two / "note.txt").write_text("from two")
+    pool = ServerPool()
+    first = ToolsRegistry(scratch=lambda: str(one), server_pool=pool)
+    second = ToolsRegistry(scratch=lambda: str(two), server_pool=pool)
+    try:
+        first.select("fs__read_file")
+        second.select("fs__read_file")
+        assert "from one" in first.dispatch("fs__read_file", {"file_path": "$CAI_SCRATCH/note.txt"})
+        assert "from two" in second.dispatch("fs__read_file", {"file_path": "$CAI_SCRATCH/note.txt"})
+        assert first._mcp_servers["fs"] is second._mcp_servers["fs"]
+    finally:
+        first.close()
+        second.close()
+        pool.close()
+
+
+_ENV_SERVER = '''
+import os
+from mcp.server.fastmcp import FastMCP
+
+mcp = FastMCP("where")
+
+
+@mcp.tool()
+def scratch() -> str:
+    """The CAI_SCRATCH this process was spawned with."""
+    return os.environ.get("CAI_SCRATCH", "")
+
+
+mcp.run()
+'''
+
+
+def test_a_third_party_server_is_spawned_with_its_scratch(tmp_path):
+    path = tmp_path / "where.py"
+    path.write_text(_ENV_SERVER)
+    cai.mcp_server("where", command=[sys.executable, str(path)])
+    pool = ServerPool()
+    first = ToolsRegistry(scratch=lambda: str(tmp_path / "one"), server_pool=pool)
+    second = ToolsRegistry(scratch=lambda: str(tmp_path / "two"), server_pool=pool)
+    again = ToolsRegistry(scratch=lambda: str(tmp_path / "one"), server_pool=pool)
+    try:
+        for registry in (first, second, again):
+            registry.select("where__scratch")
+        assert first.dispatch("where__scratch", {}) == str(tmp_path / "one")
+        assert second.dispatch("where__scratch", {}) == str(tmp_path / "two")
+        assert again.dispatch("where__scratch", {}) == str(tmp_path / "one")
+        assert first._mcp_servers["where"] is not second._mcp_servers["where"]
+        assert first._mcp_servers["where"] is again._mcp_servers["where"]
+    finally:
+        first.close()
+        second.close()
+        again.close()
+        pool.close()
+
+
+def test_a_different_cwd_gets_its_own_server(tmp_path, monkeypatch):
+    pool = ServerPool()
+    first = ToolsRegistry(server_pool=pool)
+    second = ToolsRegistry(server_pool=pool)
+    try:
+        first.register("fs__list_files")
+        first.dispatch("fs__list_files", {"path": "."})
+        monkeypatch.chdir(tmp_path)
+        second.register("fs__list_files")
+        second.dispatch("fs__list_files", {"path": "."})
+        assert first._mcp_servers["fs"] is not second._mcp_servers["fs"]
+    finally:
+        first.close()
+        second.close()
+        pool.close()
+
+
+# ─── parallel spawns and background warm-up ──────────────────────────────────
+
+class SlowServer:
+    label = "slow"
+
+    def close(self):
+        pass
+
+
+def _slow_factory(spawns):
+    def factory():
+        spawns.append(1)
+        time.sleep(0.3)
+        return SlowServer()
+    return factory
+
+
+def test_different_keys_spawn_in_parallel_and_one_key_once():
+    pool = ServerPool()
+    spawns = []
+    servers = []
+    threads = []
+    for key in ("a", "b", "a"):
+        thread = threading.Thread(target=lambda key=key: servers.append(pool.acquire(key, _slow_factory(spawns))))
+        threads.append(thread)
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert time.monotonic() - start < 0.55
+    assert len(spawns) == 2
+    assert pool.stats()['reused'] == 1
+
+
+def test_warm_servers_connects_in_the_background():
+    first = ToolsRegistry()
+    try:
+        first.register("fs__read_file")          # fills the schema cache
+    finally:
+        first.close()
+    pool = ServerPool()
+    registry = ToolsRegistry(server_pool=pool, warm_servers=True)
+    try:
+        registry.select("fs__list_files")
+        registry._warming["fs"].join(timeout=30)
+        assert "fs" in registry._mcp_servers       # up without a call
+        assert "Error" not in registry.dispatch("fs__list_files", {"path": "."})
+        assert pool.stats()['spawned'] == 1
+    finally:
+        registry.close()
+        pool.close()
@@ -0,0 +1,142 @@
+"""Tests for cai.trigram_index and fs search with fs_trigram_index on: the
+literals a pattern requires, the same matches as a plain search across text,
+binary, late-NUL, UTF-16, ignored and hidden files, rg handed only the
+candidates, and the index following edits and persisting across processes
+(a fresh TrigramIndex over the same database). rg's output order is its
+own, so outputs are compared as sorted lines."""
+import os
+import importlib.util
+
+import pytest
+
+from cai import config, trigram_index
+from cai.environment import builtin_mcp_dir
+from cai.trigram_index import TrigramIndex, required_literals
+
+
+def _load_fs():
+    path = os.path.join(builtin_mcp_dir(), "fs.py")
+    spec = importlib.util.spec_from_file_location("fs_trigrams_under_test", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+fs = _load_fs()
+
+FILES = {
+    "src/app.py": b"def parse_config(path):\n    return load(path)\n",
+    "src/util.py": b"def helper():\n    return 'PARSE_CONFIG'\n",
+    "src/other.py": b"nothing to see\n",
+    "blob.bin": b"\x00\x01parse_config\x02",
+    "late.txt": b"parse_config here\n" * 1000 + b"\x00",
+    "wide.txt": "\ufeffparse_config in utf-16\n".encode("utf-16-le"),
+    "ignored.py": b"parse_config\n",
+    ".hidden.py": b"parse_config\n",
+    ".gitignore": b"ignored.py\n",
+    "classes.txt": b"xfoo_bar and bfoo\n",
+}
+
+
+@pytest.fixture(autouse=True)
+def _tree(tmp_path, monkeypatch):
+    work = tmp_path / "work"
+    work.mkdir()
+    monkeypatch.chdir(work)
+    monkeypatch.delenv("CAI_SCRATCH", raising=False)
+    monkeypatch.setattr(trigram_index, "index_dir", lambda: str(tmp_path / "index"))
+    monkeypatch.setattr(TrigramIndex, "_indexes", {})
+    os.mkdir(".git")                      # so rg applies .gitignore
+    for rel, data in FILES.items():
+        os.makedirs(os.path.dirname(rel) or ".", exist_ok=True)
+        with open(rel, "wb") as f:
+            f.write(data)
+
+
+def _indexed(monkeypatch):
+    real = config.load_optional
+
+    def load_optional(key, default=None):
+        if key == "fs_trigram_index":
+            return True
+        return real(key, default)
+    monkeypatch.setattr(config, "load_optional", load_optional)
+
+
+def _search(pattern, **kwargs):
+    return sorted(fs.search(pattern, ".", end=100000, **kwargs).split("\n"))
+
+
+@pytest.mark.parametrize("pattern, clauses", [
+    ("parse_config", [{"parse_config"}]),
+    (r"def \w+_handler\(", [{"def "}, {"_handler("}]),
+    ("(foo|barbaz)_qux", [{"foo", "barbaz"}, {"_qux"}]),
+    ("(foo|x)y", []),
+    (r"ab\d", []),
+    ("(?i)Parse", [{"Par"}]),
+    ("(?i)kelvin", [{"elvin"}]),
+    (r"(?-u:\xde\xad)", []),
+    (r"\<word\>", []),
+    ("[[:alpha:]]foo_bar", []),
+    ("[a-z&&[^aeiou]]foo", []),
+    ("[a-c--b]foo_bar", []),
+    ("[]x]foo_bar", [{"foo_bar"}]),
+])
+def test_required_literals(pattern, clauses):
+    assert required_literals(pattern) == clauses
+
+
+@pytest.mark.parametrize("pattern, kwargs", [
+    ("parse_config", {}),
+    ("(?i)parse_config", {}),
+    ("parse_c.nfig", {}),
+    ("helper|nothing", {}),
+    (r"\x01parse", {}),
+    ("parse_config", {"file_glob": "*.py"}),
+    ("no_such_literal", {}),
+    ("[[:alpha:]]foo_bar", {}),
+    ("[a-z&&[^aeiou]]foo", {}),
+])
+def test_indexed_search_matches_plain_search(monkeypatch, pattern, kwargs):
+    plain = _search(pattern, **kwargs)
+    _indexed(monkeypatch)
+    assert _search(pattern, **kwargs) == plain
+    assert _search(pattern, **kwargs) == plain          # and warm
+
+
+def test_case_folding_past_ascii_is_matched(monkeypatch):
+    with open("kelvin.txt", "w", encoding="utf-8") as f:
+        f.write("\u212aelvin and cla\u017f\u017f\n")      # Kelvin sign, long s
+    plain = _search("(?i)kelvin|class")
+    assert any("kelvin.txt" in line for line in plain)
+    _indexed(monkeypatch)
+    assert _search("(?i)kelvin|class") == plain
+
+
+def test_rg_is_handed_only_the_candidates(monkeypatch):
+    _indexed(monkeypatch)
+    calls = []
+    real_rg = fs._rg_json
+
+    def rg(cmd):
+        calls.append(cmd)
+        return real_rg(cmd)
+    monkeypatch.setattr(fs, "_rg_json", rg)
+    fs.search("def helper", ".")
+    [cmd] = calls
+    handed = sorted(os.path.relpath(path) for path in cmd[cmd.index("--") + 2:])
+    assert handed == ["src/util.py", "wide.txt"]         # wide.txt: a BOM, always
+
+
+def test_edits_and_a_reopened_index_are_followed(monkeypatch):
+    _indexed(monkeypatch)
+    assert "No matches" in fs.search("fresh_literal", ".")
+    with open("src/other.py", "w") as f:
+        f.write("fresh_literal\n")
+    assert "src/other.py:1:1:fresh_literal" in fs.search("fresh_literal", ".")
+    first = TrigramIndex.for_path(".")
+    first.close()
+    TrigramIndex._indexes.clear()
+    again = TrigramIndex.for_path(".")
+    assert "src/other.py:1:1:fresh_literal" in fs.search("fresh_literal", ".")
+    assert again.stats()['indexed'] == 0                 # nothing re-read